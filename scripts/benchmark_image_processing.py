@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Image Processing Benchmark
+Times each render stage (resize, text overlay per style, logo overlay,
+post-processing, save per format) at every supported aspect ratio and
+reports per-operation allocations.
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import yaml
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.genai.local_service import LocalImageService
+from src.image_processor_v2 import ImageProcessorV2
+from src.models import CampaignMessage, ComprehensiveBrandGuidelines
+from src.pipeline import HERO_IMAGE_SIZE
+from src.storage import StorageManager
+
+# Ratios supported by ImageProcessorV2.resize_to_aspect_ratio
+ASPECT_RATIOS = ["1:1", "9:16", "16:9", "4:5"]
+SAVE_FORMATS = ["png", "jpg"]
+
+
+def load_styles(pattern: str) -> Dict[str, ComprehensiveBrandGuidelines]:
+    """Load Phase 1 guideline YAMLs directly (no Claude extraction)."""
+    styles = {}
+    for path in sorted(glob.glob(pattern)):
+        with open(path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f)
+        data.setdefault("source_file", path)
+        styles[Path(path).stem] = ComprehensiveBrandGuidelines(**data)
+    return styles
+
+
+def make_logo(directory: Path) -> str:
+    """Write a synthetic RGBA logo to benchmark logo compositing."""
+    logo = Image.new("RGBA", (400, 200), (0, 102, 255, 0))
+    logo.paste((0, 102, 255, 255), (20, 20, 380, 180))
+    path = directory / "benchmark_logo.png"
+    logo.save(path)
+    return str(path)
+
+
+def measure(operation: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """
+    Time an operation and record its allocations.
+
+    Python-level allocations come from tracemalloc; Pillow's pixel buffers are
+    allocated natively, so they are reported from Pillow's block allocator.
+    Allocations are measured in a separate run so tracing doesn't skew timing.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operation()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    Image.core.reset_stats()
+    tracemalloc.start()
+    operation()
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    pil_stats = Image.core.get_stats()
+
+    return {
+        "median_ms": statistics.median(timings),
+        "min_ms": min(timings),
+        "max_ms": max(timings),
+        "python_alloc_peak_kb": python_peak / 1024,
+        "pil_images_created": pil_stats["new_count"],
+        "pil_blocks_allocated": pil_stats["allocated_blocks"] + pil_stats["reused_blocks"],
+    }
+
+
+def run_benchmark(args) -> Dict:
+    """Benchmark every render operation at every aspect ratio."""
+    processor = ImageProcessorV2()
+    storage = StorageManager()
+    width, height = map(int, HERO_IMAGE_SIZE.split("x"))
+    hero_bytes = LocalImageService.render("image processing benchmark hero", width, height)
+    message = CampaignMessage(
+        headline="Benchmark Headline Text",
+        subheadline="A longer subheadline that wraps across the rendered variant",
+        cta="Shop Now"
+    )
+    styles = load_styles(args.guidelines)
+    text_styles = {"default": None}
+    text_styles.update({name: g for name, g in styles.items() if g.text_customization})
+    post_styles = {name: g for name, g in styles.items() if g.post_processing}
+
+    results: Dict[str, Dict] = {}
+
+    def record(name: str, ratio: str, operation: Callable[[], object]) -> None:
+        key = f"{name}@{ratio}"
+        results[key] = measure(operation, args.repeat)
+        print(f"  {key:<48} {results[key]['median_ms']:>9.1f} ms")
+
+    with tempfile.TemporaryDirectory(prefix="image_benchmark_") as tmp:
+        tmp_dir = Path(tmp)
+        logo_path = make_logo(tmp_dir)
+
+        for ratio in ASPECT_RATIOS:
+            print(f"\n📐 {ratio}")
+            resized = processor.resize_to_aspect_ratio(hero_bytes, ratio)
+            record("resize_to_aspect_ratio", ratio, lambda: processor.resize_to_aspect_ratio(hero_bytes, ratio))
+
+            for style, guidelines in text_styles.items():
+                record(
+                    f"apply_text_overlay[{style}]", ratio,
+                    lambda g=guidelines: processor.apply_text_overlay(resized, message, g)
+                )
+
+            record("apply_logo_overlay", ratio, lambda: processor.apply_logo_overlay(resized, logo_path))
+
+            for style, guidelines in post_styles.items():
+                record(
+                    f"apply_post_processing[{style}]", ratio,
+                    lambda g=guidelines: processor.apply_post_processing(resized, g.post_processing)
+                )
+
+            final = processor.apply_text_overlay(resized, message)
+            for fmt in SAVE_FORMATS:
+                path = tmp_dir / f"variant_{ratio.replace(':', 'x')}.{fmt}"
+                record(f"save_image[{fmt}]", ratio, lambda p=path: storage.save_image(final, p))
+
+    return {
+        "benchmark": "image_processing",
+        "timestamp": datetime.now().isoformat(),
+        "parameters": {
+            "repeat": args.repeat,
+            "hero_size": HERO_IMAGE_SIZE,
+            "aspect_ratios": ASPECT_RATIOS,
+            "text_styles": list(text_styles),
+            "post_processing_styles": list(post_styles),
+            "formats": SAVE_FORMATS,
+        },
+        "system": {
+            "platform": platform.system(),
+            "python_version": platform.python_version(),
+            "machine": platform.machine(),
+            "pillow_version": Image.__version__,
+            "cpu_count": str(os.cpu_count()),
+        },
+        "operations": results,
+    }
+
+
+def aggregate_by_operation(results: Dict) -> Dict[str, float]:
+    """Total median time per operation across all ratios."""
+    totals: Dict[str, float] = {}
+    for key, metrics in results["operations"].items():
+        operation = key.split("@")[0]
+        totals[operation] = totals.get(operation, 0.0) + metrics["median_ms"]
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def compare_to_baseline(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Return every operation whose median time grew beyond threshold."""
+    regressions = []
+    for key, metrics in results["operations"].items():
+        previous = baseline.get("operations", {}).get(key)
+        if not previous or not previous["median_ms"]:
+            continue
+        change = (metrics["median_ms"] - previous["median_ms"]) / previous["median_ms"]
+        if change > threshold:
+            regressions.append(
+                f"{key}: {previous['median_ms']:.1f} → {metrics['median_ms']:.1f} ms ({change * 100:+.1f}%)"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark image processing operations per aspect ratio",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python3 scripts/benchmark_image_processing.py
+  python3 scripts/benchmark_image_processing.py --repeat 10 --save-baseline benchmarks/image_baseline.json
+  python3 scripts/benchmark_image_processing.py --baseline benchmarks/image_baseline.json
+        """
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions per operation")
+    parser.add_argument("--guidelines", default="examples/guidelines/phase1_*.yaml",
+                        help="Glob of Phase 1 guideline YAMLs providing text and post-processing styles")
+    parser.add_argument("--output", default="output/benchmarks/image_processing_benchmark.json",
+                        help="Where to write JSON results")
+    parser.add_argument("--baseline", help="Baseline results JSON to compare against")
+    parser.add_argument("--save-baseline", help="Also write results to this baseline path")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="Relative slowdown treated as a regression (default: 0.15)")
+    args = parser.parse_args()
+
+    print(f"🏁 Benchmarking image processing ({args.repeat} repetitions per operation)")
+    results = run_benchmark(args)
+
+    print("\n📊 Total median time per operation (all ratios):")
+    for operation, total_ms in aggregate_by_operation(results).items():
+        print(f"   {operation:<44} {total_ms:>9.1f} ms")
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(json.dumps(results, indent=2))
+    print(f"\n💾 Results: {output_path}")
+
+    if args.save_baseline:
+        baseline_path = Path(args.save_baseline)
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(results, indent=2))
+        print(f"💾 Baseline: {baseline_path}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ Regressions vs {args.baseline}:")
+            for regression in regressions:
+                print(f"   {regression}")
+            sys.exit(1)
+        print(f"\n✅ No regressions vs {args.baseline} (threshold {args.threshold * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
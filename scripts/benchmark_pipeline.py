@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Pipeline Benchmark Harness
+Runs CreativeAutomationPipeline.process_campaign on synthetic briefs without
+network access and compares the results against a saved baseline.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Metrics where a higher value is better; everything else regresses upwards
+HIGHER_IS_BETTER = {"assets_per_sec"}
+COMPARED_METRICS = ["assets_per_sec", "wall_time_s", "peak_rss_mb", "api_calls_per_asset"]
+
+# Stage each scheduler task belongs to, by task name prefix (see src/pipeline.py)
+TASK_STAGES = {
+    "guidelines": "guidelines",
+    "compliance": "compliance",
+    "hero": "image_generation",
+    "localize": "localization",
+    "render": "image_processing",
+    "encode": "image_processing",
+    "save": "saving",
+    "reuse": "saving",
+}
+
+
+def build_brief(
+    products: int,
+    locales: List[str],
+    ratios: List[str],
+    formats: List[str],
+    backend: str,
+    brand_guidelines: Optional[str] = None,
+    localization_guidelines: Optional[str] = None
+) -> Dict:
+    """Build a synthetic campaign brief of the requested shape."""
+    return {
+        "campaign_id": f"BENCH-{products}P-{len(locales)}L-{len(ratios)}R",
+        "campaign_name": "Pipeline Benchmark",
+        "brand_name": "BenchBrand",
+        "campaign_message": {
+            "locale": "en-US",
+            "headline": "Benchmark Headline",
+            "subheadline": "Synthetic subheadline for render timing",
+            "cta": "Shop Now"
+        },
+        "products": [
+            {
+                "product_id": f"BENCH-PROD-{i:03d}",
+                "product_name": f"Benchmark Product {i}",
+                "product_description": f"Synthetic product {i} for pipeline benchmarking",
+                "product_category": "Electronics",
+                "key_features": ["Fast", "Deterministic"],
+                "generation_prompt": f"studio product photo of benchmark product {i}"
+            }
+            for i in range(products)
+        ],
+        "aspect_ratios": ratios,
+        "output_formats": formats,
+        "target_locales": locales,
+        "image_generation_backend": backend,
+        "enable_localization": len(locales) > 1,
+        "brand_guidelines_file": brand_guidelines,
+        "localization_guidelines_file": localization_guidelines
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    try:
+        import resource
+    except ImportError:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def critical_path_stages(critical_path: List[Dict], wall_time_ms: float) -> Dict[str, float]:
+    """
+    Wall time attributed to each stage along the campaign's critical path.
+
+    Stages run concurrently under the task scheduler, so only the critical
+    path adds up to the wall time: each step's duration goes to its stage,
+    its wait for a resource slot to ``queue_wait_ms`` and the remainder
+    (startup, reporting) to ``other_ms``.
+    """
+    stages = {f"{stage}_ms": 0.0 for stage in dict.fromkeys(TASK_STAGES.values())}
+    stages["queue_wait_ms"] = 0.0
+    for step in critical_path:
+        stage = TASK_STAGES.get(step["task"].split(":", 1)[0])
+        if stage:
+            stages[f"{stage}_ms"] += step["duration_ms"]
+        stages["queue_wait_ms"] += step["wait_ms"]
+    stages["other_ms"] = max(0.0, wall_time_ms - sum(stages.values()))
+    return stages
+
+
+async def run_iteration(brief_data: Dict, output_dir: Path, verbose: bool) -> Dict:
+    """
+    Run the campaign into a fresh output directory and collect metrics.
+
+    The pipeline encodes a brief's first output format only, so each format
+    is run as its own campaign and the results are combined.
+    """
+    from src.pipeline import CreativeAutomationPipeline
+    from src.models import CampaignBrief
+    from src.manifest import AssetManifest
+
+    result = {"assets": 0, "errors": 0, "wall_time_s": 0.0, "api_calls": 0, "pipeline_peak_memory_mb": 0.0}
+    stages: Dict[str, float] = {}
+    task_time: Dict[str, float] = {}
+    for output_format in brief_data["output_formats"] or ["png"]:
+        brief = CampaignBrief(**dict(brief_data, output_formats=[output_format]))
+        format_dir = output_dir / output_format
+        pipeline = CreativeAutomationPipeline()
+        pipeline.storage.output_dir = format_dir
+        pipeline.storage._manifest = AssetManifest(format_dir / "asset_manifest.db")
+
+        stdout = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        start = time.perf_counter()
+        with stdout:
+            output = await pipeline.process_campaign(brief)
+        wall_time = time.perf_counter() - start
+        pipeline.storage.manifest.close()
+
+        metrics = output.technical_metrics
+        result["assets"] += output.total_assets
+        result["errors"] += len(output.errors)
+        result["wall_time_s"] += wall_time
+        result["api_calls"] += metrics.total_api_calls
+        result["pipeline_peak_memory_mb"] = max(result["pipeline_peak_memory_mb"], metrics.peak_memory_mb)
+        for stage, ms in critical_path_stages(metrics.critical_path, wall_time * 1000).items():
+            stages[stage] = stages.get(stage, 0.0) + ms
+        # Summed per-task durations; these overlap, so they can exceed wall time
+        for stage, ms in {
+            "image_generation_ms": sum(metrics.latency_histograms.get(name, {}).get("sum", 0.0)
+                                       for name in metrics.latency_histograms if name.startswith("hero_generation.")),
+            "localization_ms": metrics.localization_time_ms,
+            "image_processing_ms": metrics.image_processing_time_ms,
+            "compliance_ms": metrics.compliance_check_time_ms,
+        }.items():
+            task_time[stage] = task_time.get(stage, 0.0) + ms
+
+    assets = result["assets"]
+    wall_time = result["wall_time_s"]
+    result["assets_per_sec"] = assets / wall_time if wall_time else 0.0
+    result["api_calls_per_asset"] = result["api_calls"] / assets if assets else 0.0
+    result["stages"] = stages
+    result["task_time"] = task_time
+    return result
+
+
+def summarize(iterations: List[Dict]) -> Dict:
+    """Median of each metric across iterations (robust to one noisy run)."""
+    summary = {
+        key: statistics.median(run[key] for run in iterations)
+        for key in ["assets", "wall_time_s", "assets_per_sec", "api_calls", "api_calls_per_asset"]
+    }
+    for breakdown in ("stages", "task_time"):
+        summary[breakdown] = {
+            stage: statistics.median(run[breakdown][stage] for run in iterations)
+            for stage in iterations[0][breakdown]
+        }
+    summary["errors"] = sum(run["errors"] for run in iterations)
+    return summary
+
+
+def compare_to_baseline(summary: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Return a description of every metric that regressed beyond threshold."""
+    regressions = []
+    for metric in COMPARED_METRICS:
+        current = summary.get(metric)
+        previous = baseline.get("summary", {}).get(metric)
+        if not current or not previous:
+            continue
+
+        change = (current - previous) / previous
+        regressed = change < -threshold if metric in HIGHER_IS_BETTER else change > threshold
+        if regressed:
+            regressions.append(f"{metric}: {previous:.3f} → {current:.3f} ({change * 100:+.1f}%)")
+    return regressions
+
+
+async def run_benchmark(args) -> Dict:
+    """Start the mock server, run warmup and measured iterations."""
+    from src.genai.mock_server import MockProviderServer
+    from src import config
+
+    locales = [l.strip() for l in args.locales.split(",") if l.strip()]
+    ratios = [r.strip() for r in args.ratios.split(",") if r.strip()]
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    brief_data = build_brief(
+        args.products, locales, ratios, formats, args.backend,
+        args.brand_guidelines, args.localization_guidelines
+    )
+
+    async with MockProviderServer(seed=args.seed) as server:
+        # Claude (and any remote image backend) is served by the local mock
+        os.environ.update(server.env())
+        for key in ["CLAUDE_API_KEY", "OPENAI_API_KEY", "GEMINI_API_KEY", "FIREFLY_API_KEY", "FIREFLY_CLIENT_ID"]:
+            os.environ.setdefault(key, "benchmark")
+        os.environ["LOCAL_LATENCY_MS"] = str(args.latency_ms)
+        os.environ["LOCAL_LATENCY_DISTRIBUTION"] = args.latency_distribution
+        if args.latency_ms and args.backend in ("firefly", "openai", "gemini"):
+            server.configure(args.backend, latency_ms=args.latency_ms)
+        config._config = None
+
+        iterations = []
+        with tempfile.TemporaryDirectory(prefix="pipeline_benchmark_") as tmp:
+            for i in range(args.warmup + args.iterations):
+                result = await run_iteration(brief_data, Path(tmp) / f"run_{i}", args.verbose)
+                if i >= args.warmup:
+                    iterations.append(result)
+                    print(f"  Run {len(iterations)}/{args.iterations}: "
+                          f"{result['assets']} assets in {result['wall_time_s']:.2f}s "
+                          f"({result['assets_per_sec']:.2f} assets/s)")
+
+    summary = summarize(iterations)
+    summary["peak_rss_mb"] = peak_rss_mb()
+
+    return {
+        "benchmark": "pipeline",
+        "timestamp": datetime.now().isoformat(),
+        "parameters": {
+            "backend": args.backend,
+            "products": args.products,
+            "locales": locales,
+            "aspect_ratios": ratios,
+            "output_formats": formats,
+            "latency_ms": args.latency_ms,
+            "latency_distribution": args.latency_distribution,
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+        },
+        "system": {
+            "platform": platform.system(),
+            "python_version": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": str(os.cpu_count()),
+        },
+        "summary": summary,
+        "iterations": iterations,
+    }
+
+
+def print_summary(results: Dict) -> None:
+    summary = results["summary"]
+    print(f"\n📊 Pipeline Benchmark ({results['parameters']['backend']} backend)")
+    print(f"   Assets: {summary['assets']:.0f} per run, {summary['errors']} errors")
+    print(f"   Throughput: {summary['assets_per_sec']:.2f} assets/sec")
+    print(f"   Wall Time: {summary['wall_time_s']:.2f}s (median)")
+    print(f"   API Calls: {summary['api_calls_per_asset']:.3f} per asset")
+    print(f"   Peak RSS: {summary['peak_rss_mb']:.1f} MB")
+    print("\n⏱️  Critical Path by Stage (median ms, share of wall time):")
+    total = sum(summary["stages"].values()) or 1.0
+    for stage, ms in summary["stages"].items():
+        print(f"   {stage:<22} {ms:>10.1f}  ({ms / total * 100:5.1f}%)")
+    print("\n⏱️  Summed Task Time (median ms; stages overlap, so this can exceed wall time):")
+    for stage, ms in summary["task_time"].items():
+        print(f"   {stage:<22} {ms:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the campaign pipeline offline against synthetic briefs",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Default shape against the local synthetic backend
+  python3 scripts/benchmark_pipeline.py
+
+  # Larger campaign with simulated 200ms provider latency, saved as baseline
+  python3 scripts/benchmark_pipeline.py --products 10 --locales en-US,es-MX,fr-FR \\
+      --latency-ms 200 --save-baseline benchmarks/pipeline_baseline.json
+
+  # Exercise the real Firefly client against the mock server and compare
+  python3 scripts/benchmark_pipeline.py --backend firefly --baseline benchmarks/pipeline_baseline.json
+        """
+    )
+    parser.add_argument("--products", type=int, default=2, help="Number of products")
+    parser.add_argument("--locales", default="en-US,es-MX", help="Comma-separated locales")
+    parser.add_argument("--ratios", default="1:1,9:16,16:9", help="Comma-separated aspect ratios")
+    parser.add_argument("--formats", default="png", help="Comma-separated output formats")
+    parser.add_argument("--backend", default="local",
+                        choices=["local", "synthetic", "firefly", "openai", "gemini"],
+                        help="Image backend (remote backends run against the mock server)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated image API latency")
+    parser.add_argument("--latency-distribution", default="fixed",
+                        choices=["fixed", "uniform", "exponential", "lognormal"],
+                        help="Latency distribution for the local backend")
+    parser.add_argument("--brand-guidelines", help="Brand guidelines file to apply")
+    parser.add_argument("--localization-guidelines", default="examples/guidelines/localization_rules.yaml",
+                        help="Localization guidelines file (enables mock Claude localization)")
+    parser.add_argument("--iterations", type=int, default=3, help="Measured runs")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured warmup runs")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for simulated faults and latency")
+    parser.add_argument("--output", default="output/benchmarks/pipeline_benchmark.json",
+                        help="Where to write JSON results")
+    parser.add_argument("--baseline", help="Baseline results JSON to compare against")
+    parser.add_argument("--save-baseline", help="Also write results to this baseline path")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative change treated as a regression (default: 0.10)")
+    parser.add_argument("--verbose", action="store_true", help="Show pipeline output")
+    args = parser.parse_args()
+
+    if args.localization_guidelines and not Path(args.localization_guidelines).exists():
+        args.localization_guidelines = None
+
+    print(f"🏁 Benchmarking pipeline: {args.products} products × {args.locales} × {args.ratios}")
+    results = asyncio.run(run_benchmark(args))
+    print_summary(results)
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(json.dumps(results, indent=2))
+    print(f"\n💾 Results: {output_path}")
+
+    if args.save_baseline:
+        baseline_path = Path(args.save_baseline)
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(results, indent=2))
+        print(f"💾 Baseline: {baseline_path}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare_to_baseline(results["summary"], baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ Regressions vs {args.baseline}:")
+            for regression in regressions:
+                print(f"   {regression}")
+            sys.exit(1)
+        print(f"\n✅ No regressions vs {args.baseline} (threshold {args.threshold * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
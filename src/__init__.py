@@ -6,26 +6,31 @@ Version: 1.0.0
 __version__ = "1.0.0"
 __author__ = "Creative Automation Team"
 
-from src.models import (
-    Product,
-    CampaignMessage,
-    CampaignBrief,
-    ComprehensiveBrandGuidelines,
-    LocalizationGuidelines,
-    GeneratedAsset,
-    CampaignOutput
-)
-
-from src.config import Config, get_config
-
-__all__ = [
-    "Product",
-    "CampaignMessage",
-    "CampaignBrief",
-    "ComprehensiveBrandGuidelines",
-    "LocalizationGuidelines",
-    "GeneratedAsset",
-    "CampaignOutput",
-    "Config",
-    "get_config",
-]
+import importlib
+
+# Re-exports resolve on first access so ``import src.<module>`` stays light
+_EXPORTS = {
+    "Product": "src.models",
+    "CampaignMessage": "src.models",
+    "CampaignBrief": "src.models",
+    "ComprehensiveBrandGuidelines": "src.models",
+    "LocalizationGuidelines": "src.models",
+    "GeneratedAsset": "src.models",
+    "CampaignOutput": "src.models",
+    "Config": "src.config",
+    "get_config": "src.config",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
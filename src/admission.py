@@ -0,0 +1,241 @@
+"""Memory-budgeted admission control for render jobs."""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+import psutil
+
+from src import metrics
+
+
+_MB = 1024 * 1024
+
+# cgroup v2, then v1; v1 reports "no limit" as a page-rounded huge number
+CGROUP_MEMORY_LIMIT_FILES = ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes")
+_UNLIMITED = 1 << 60
+
+
+def container_memory_limit() -> Optional[int]:
+    """The container's cgroup memory limit in bytes, or None when unlimited."""
+    for path in CGROUP_MEMORY_LIMIT_FILES:
+        try:
+            value = Path(path).read_text().strip()
+        except OSError:
+            continue
+        if value == "max":
+            return None
+        try:
+            limit = int(value)
+        except ValueError:
+            continue
+        return limit if 0 < limit < _UNLIMITED else None
+    return None
+
+
+def image_header(image_bytes: bytes) -> Tuple[Tuple[int, int], int]:
+    """Size and band count of an encoded image, read from its header without decoding."""
+    from PIL import Image
+
+    with Image.open(BytesIO(image_bytes)) as image:
+        return image.size, len(image.getbands())
+
+
+@dataclass(eq=False)
+class Reservation:
+    """Bytes held against the budget until ``release()`` (idempotent)."""
+
+    controller: "MemoryAdmissionController"
+    nbytes: int
+    wait_ms: float = 0.0
+    released: bool = False
+
+    def release(self) -> None:
+        if not self.released:
+            self.released = True
+            self.controller._release(self)
+
+
+@dataclass(eq=False)
+class _Waiter:
+    nbytes: int
+    future: asyncio.Future
+    enqueued: float = field(default_factory=time.monotonic)
+    queued: bool = False  # Had to wait for memory at least once
+
+
+class MemoryAdmissionController:
+    """
+    Admit render jobs only while their estimated peak fits a memory budget.
+
+    Each job reserves its estimated peak (see
+    ``ImageProcessorV2.estimate_render_bytes``) before it starts and keeps
+    it until its output is encoded. A job is admitted when the projected
+    RSS stays within ``budget_bytes``; the projection is the larger of the
+    measured RSS and the RSS at the last idle moment plus everything
+    reserved, so memory not yet touched by running jobs is accounted for,
+    and so is growth (caches, fragmentation) they did not predict.
+
+    Jobs are admitted first come, first served: a large job at the head of
+    the queue is not overtaken by smaller ones, so it cannot starve. A job
+    is always admitted when nothing else holds a reservation, so a single
+    job larger than the budget runs alone rather than deadlocking. Waiters
+    re-check every ``poll_interval`` seconds as well as on each release, as
+    RSS can drop without a release (e.g. after garbage collection).
+
+    Meant to be shared by everything rendering in one process; safe to use
+    from successive event loops, but not from several at once.
+    """
+
+    def __init__(
+        self,
+        budget_bytes: int,
+        poll_interval: float = 0.05,
+        rss: Optional[Callable[[], int]] = None
+    ):
+        self.budget_bytes = budget_bytes
+        self.poll_interval = poll_interval
+        if rss is None:
+            process = psutil.Process()
+            rss = lambda: process.memory_info().rss
+        self.rss = rss
+        self._held: List[Reservation] = []
+        self._waiting: List[_Waiter] = []
+        self.reserved_bytes = 0
+        self.peak_reserved_bytes = 0
+        self.baseline_bytes = self.rss()
+        self.admitted = 0
+        self.delayed = 0
+        self.oversized = 0
+
+        registry = metrics.get_registry()
+        registry.gauge("render_memory_budget_bytes", "Memory budget for admitting render jobs").set(budget_bytes)
+        self._reserved_gauge = registry.gauge(
+            "render_memory_reserved_bytes", "Estimated peak memory reserved by admitted render jobs"
+        )
+        self._waiting_gauge = registry.gauge(
+            "render_memory_waiting_jobs", "Render jobs waiting for memory to be admitted"
+        )
+        self._wait_seconds = registry.histogram(
+            "render_memory_admission_wait_seconds", "Time render jobs waited for memory"
+        )
+
+    @classmethod
+    def from_config(cls) -> Optional["MemoryAdmissionController"]:
+        """Controller for the RENDER_MEMORY_* settings, or None when disabled."""
+        from src.config import get_config
+
+        config = get_config()
+        budget = config.RENDER_MEMORY_BUDGET_MB
+        if budget is None:
+            limit = container_memory_limit() or psutil.virtual_memory().total
+            budget_bytes = int(limit * config.RENDER_MEMORY_BUDGET_FRACTION)
+        else:
+            budget_bytes = budget * _MB
+        if budget_bytes <= 0:
+            return None
+        return cls(budget_bytes, poll_interval=config.RENDER_MEMORY_POLL_INTERVAL)
+
+    def projected_bytes(self, nbytes: int = 0) -> int:
+        """RSS expected if a job of ``nbytes`` were admitted now."""
+        return max(self.rss(), self.baseline_bytes + self.reserved_bytes) + nbytes
+
+    def waiting(self) -> int:
+        return len(self._waiting)
+
+    async def acquire(self, nbytes: int) -> Reservation:
+        """Wait until ``nbytes`` fits the budget and reserve it."""
+        waiter = _Waiter(nbytes, asyncio.get_running_loop().create_future())
+        self._waiting.append(waiter)
+        self._waiting_gauge.set(len(self._waiting))
+        self._dispatch()
+        try:
+            while not waiter.future.done():
+                await asyncio.wait([waiter.future], timeout=self.poll_interval)
+                self._dispatch()
+        except asyncio.CancelledError:
+            if waiter in self._waiting:
+                self._waiting.remove(waiter)
+                self._waiting_gauge.set(len(self._waiting))
+                self._dispatch()
+            elif waiter.future.done():
+                waiter.future.result().release()  # Granted just before the cancel landed
+            raise
+        reservation = waiter.future.result()
+        reservation.wait_ms = (time.monotonic() - waiter.enqueued) * 1000
+        if waiter.queued:
+            self.delayed += 1
+        self._wait_seconds.observe(reservation.wait_ms / 1000)
+        return reservation
+
+    @asynccontextmanager
+    async def reserve(self, nbytes: int):
+        """Hold ``nbytes`` of the budget for the block; yields the reservation."""
+        reservation = await self.acquire(nbytes)
+        try:
+            yield reservation
+        finally:
+            reservation.release()
+
+    def _dispatch(self) -> None:
+        while self._waiting:
+            head = self._waiting[0]
+            if head.future.done():
+                self._waiting.pop(0)
+                continue
+            if self._held and self.projected_bytes(head.nbytes) > self.budget_bytes:
+                head.queued = True
+                break
+            self._waiting.pop(0)
+            if not self._held:
+                # Idle: whatever is resident now is the baseline everything else adds to
+                self.baseline_bytes = self.rss()
+                if self.baseline_bytes + head.nbytes > self.budget_bytes:
+                    self.oversized += 1
+            reservation = Reservation(self, head.nbytes)
+            self._held.append(reservation)
+            self.reserved_bytes += head.nbytes
+            self.peak_reserved_bytes = max(self.peak_reserved_bytes, self.reserved_bytes)
+            self.admitted += 1
+            head.future.set_result(reservation)
+        self._reserved_gauge.set(self.reserved_bytes)
+        self._waiting_gauge.set(len(self._waiting))
+
+    def _release(self, reservation: Reservation) -> None:
+        self._held.remove(reservation)
+        self.reserved_bytes -= reservation.nbytes
+        self._dispatch()
+
+    def summary(self) -> dict:
+        """Budget, current and peak reservations in MB, and admission counts."""
+        return {
+            "budget_mb": round(self.budget_bytes / _MB, 1),
+            "reserved_mb": round(self.reserved_bytes / _MB, 1),
+            "peak_reserved_mb": round(self.peak_reserved_bytes / _MB, 1),
+            "admitted": self.admitted,
+            "delayed": self.delayed,
+            "oversized": self.oversized,
+        }
+
+
+_controller: Optional[MemoryAdmissionController] = None
+_configured = False
+
+
+def get_controller() -> Optional[MemoryAdmissionController]:
+    """The process-wide controller (the budget is per process), or None when disabled."""
+    global _controller, _configured
+    if not _configured:
+        _controller = MemoryAdmissionController.from_config()
+        _configured = True
+    return _controller
+
+
+def reset_controller() -> None:
+    """Forget the process-wide controller so the next call re-reads the config."""
+    global _controller, _configured
+    _controller = None
+    _configured = False
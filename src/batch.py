@@ -0,0 +1,335 @@
+"""Process many campaign briefs in one process with shared caches and pools."""
+import asyncio
+import contextvars
+import glob
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src import admission
+from src.config import get_config
+from src.genai.http import shared_session
+from src.histograms import OperationHistograms
+from src.image_processor_v2 import ImageProcessorV2 as ImageProcessor
+from src.models import PRIORITY_LEVELS, BatchBriefResult, BatchReport, CampaignBrief
+from src.pipeline import CreativeAutomationPipeline
+from src.scheduler import PriorityArbiter
+from src.storage import StorageManager
+
+
+class HeroCache:
+    """
+    In-memory LRU of generated hero images keyed by hero fingerprint.
+
+    The fingerprint covers backend, prompt, size and brand guidelines (not
+    the campaign), so briefs that share a product reuse its hero.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()
+        self._size = 0
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, image_bytes: bytes, backend: str) -> None:
+        if len(image_bytes) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._size -= len(self._entries.pop(key)[0])
+        self._entries[key] = (image_bytes, backend)
+        self._size += len(image_bytes)
+        while self._size > self.max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class LRUCache(OrderedDict):
+    """
+    Dict that keeps at most ``max_entries`` items, dropping the least
+    recently used; used for the guideline and translation task caches of
+    long-running processes.
+    """
+
+    def __init__(self, max_entries: int):
+        super().__init__()
+        self.max_entries = max_entries
+
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+        self.move_to_end(key)
+        return self[key]
+
+    def __setitem__(self, key, value) -> None:
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.max_entries:
+            self.popitem(last=False)
+
+
+class RenderPool:
+    """
+    Thread pool shared by every campaign's render and encode work.
+
+    Pillow releases the GIL for most pixel work, so renders from concurrent
+    campaigns overlap instead of blocking the event loop. Each worker thread
+    has its own image processor (and font cache), since FreeType fonts
+    should not be shared between threads.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="render")
+        self._local = threading.local()
+
+    def processor(self) -> ImageProcessor:
+        """The calling worker thread's image processor."""
+        processor = getattr(self._local, "processor", None)
+        if processor is None:
+            processor = self._local.processor = ImageProcessor()
+        return processor
+
+    async def run(self, func: Callable, *args):
+        """Run func on the pool, carrying over context (tracing, histograms)."""
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, lambda: context.run(func, *args)
+        )
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+def discover_briefs(sources: Iterable[str]) -> List[Path]:
+    """
+    Expand directories, glob patterns and manifests into brief paths.
+
+    A manifest is a ``.txt`` file with one path per line (``#`` comments
+    allowed) or a JSON file holding a list of paths or ``{"briefs": [...]}``.
+    Relative paths in a manifest are resolved against the manifest's folder.
+    """
+    briefs: List[Path] = []
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            briefs.extend(sorted(path.glob("*.json")))
+        elif any(char in source for char in "*?["):
+            briefs.extend(Path(match) for match in sorted(glob.glob(source, recursive=True)))
+        elif path.suffix.lower() == ".txt":
+            lines = path.read_text(encoding="utf-8").splitlines()
+            entries = [line.strip() for line in lines if line.strip() and not line.strip().startswith("#")]
+            briefs.extend(_resolve(path.parent, entry) for entry in entries)
+        elif path.suffix.lower() == ".json":
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, list):
+                briefs.extend(_resolve(path.parent, entry) for entry in data)
+            elif isinstance(data, dict) and "briefs" in data:
+                briefs.extend(_resolve(path.parent, entry) for entry in data["briefs"])
+            else:
+                briefs.append(path)
+        else:
+            raise ValueError(f"Not a brief, directory, glob or manifest: '{source}'")
+
+    # Keep order, drop duplicates
+    seen = set()
+    unique = []
+    for brief in briefs:
+        key = brief.resolve()
+        if key not in seen:
+            seen.add(key)
+            unique.append(brief)
+    return unique
+
+
+def _resolve(base: Path, entry: str) -> Path:
+    path = Path(entry)
+    return path if path.is_absolute() else base / path
+
+
+class BatchProcessor:
+    """
+    Run many briefs through pipelines that share their expensive state.
+
+    - one pooled HTTP session whose connection limit
+      (``MAX_CONCURRENT_REQUESTS``) is the global provider budget
+    - at most ``concurrency`` campaigns in flight
+    - one guideline cache, so each guidelines file is parsed once
+    - one translation cache, so a message is localized once per locale
+    - one hero cache, so briefs sharing a product reuse its hero
+    - one image service chain per backend, so hedging history and budget
+      carry across briefs
+    - one render pool and one storage manager / asset manifest
+    - one priority arbiter: campaign slots, image API calls and renders go
+      to the highest-priority brief first (with aging and fair share)
+    """
+
+    def __init__(
+        self,
+        image_backend: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        render_workers: Optional[int] = None,
+        max_connections: Optional[int] = None,
+        hero_cache_mb: Optional[int] = None,
+        update_brief: Optional[bool] = None
+    ):
+        config = get_config()
+        self.image_backend = image_backend
+        self.concurrency = max(1, concurrency or config.BATCH_CONCURRENCY)
+        self.render_workers = max(1, render_workers or config.BATCH_RENDER_WORKERS)
+        self.max_connections = max(1, max_connections or config.MAX_CONCURRENT_REQUESTS)
+        self.storage = StorageManager()
+        self.guideline_cache: Dict = {}
+        self.translation_cache: Dict = {}
+        self.image_services: Dict = {}
+        self.hero_cache = HeroCache((hero_cache_mb or config.BATCH_HERO_CACHE_MB) * 1024 * 1024)
+        # None follows EXPORT_BRIEF_ASSETS (see process_campaign)
+        self.update_brief = update_brief
+
+    def _create_pipeline(self, render_pool: RenderPool, arbiter: PriorityArbiter) -> CreativeAutomationPipeline:
+        pipeline = CreativeAutomationPipeline(image_backend=self.image_backend)
+        pipeline.storage = self.storage
+        pipeline.guideline_cache = self.guideline_cache
+        pipeline.translation_cache = self.translation_cache
+        pipeline.image_services = self.image_services
+        pipeline.hero_cache = self.hero_cache
+        pipeline.render_pool = render_pool
+        pipeline.arbiter = arbiter
+        return pipeline
+
+    async def run(self, brief_paths: List[Path]) -> BatchReport:
+        """Process every brief and return the combined report (also saved to campaign_reports/)."""
+        started_at = datetime.now()
+        start = time.perf_counter()
+        render_pool = RenderPool(self.render_workers)
+        arbiter = PriorityArbiter.from_config({
+            "campaign": self.concurrency,
+            "image_api": self.max_connections,
+            "cpu": self.render_workers,
+        })
+        print(
+            f"\n📚 Batch: {len(brief_paths)} briefs, {self.concurrency} concurrent, "
+            f"{self.render_workers} render workers, {self.max_connections} HTTP connections"
+        )
+
+        async def run_one(brief_path: Path) -> Tuple[BatchBriefResult, Optional[dict]]:
+            try:
+                with open(brief_path, "r", encoding="utf-8") as f:
+                    brief = CampaignBrief(**json.load(f))
+            except Exception as e:
+                print(f"❌ Could not load brief {brief_path}: {e}")
+                return BatchBriefResult(brief_path=str(brief_path), status="failed", errors=[str(e)]), None
+
+            # Briefs start in priority order (with aging) rather than list order
+            async with arbiter.slot(
+                "campaign",
+                brief.campaign_id,
+                PRIORITY_LEVELS[brief.priority],
+                brief.deadline.timestamp() if brief.deadline else None,
+                brief.priority
+            ) as admission_wait_ms:
+                result, metrics = await self._process_brief(brief_path, brief, render_pool, arbiter)
+            result.admission_wait_seconds = admission_wait_ms / 1000
+            return result, metrics
+
+        try:
+            async with shared_session(limit=self.max_connections):
+                outcomes = await asyncio.gather(*[run_one(path) for path in brief_paths])
+        finally:
+            await asyncio.to_thread(render_pool.shutdown)
+
+        wall_time = time.perf_counter() - start
+        results = [result for result, _ in outcomes]
+        merged = OperationHistograms()
+        for _, metrics in outcomes:
+            if metrics:
+                merged.merge(OperationHistograms.from_metrics(
+                    metrics.get("latency_histograms", {}),
+                    metrics.get("bytes_transferred", {})
+                ))
+
+        total_assets = sum(r.total_assets for r in results)
+        memory = admission.get_controller()
+        report = BatchReport(
+            batch_id=started_at.strftime("%Y%m%d_%H%M%S"),
+            started_at=started_at,
+            concurrency=self.concurrency,
+            render_workers=self.render_workers,
+            total_briefs=len(results),
+            succeeded=sum(1 for r in results if r.status == "success"),
+            failed=sum(1 for r in results if r.status != "success"),
+            total_assets=total_assets,
+            wall_time_seconds=wall_time,
+            assets_per_second=total_assets / wall_time if wall_time > 0 else 0.0,
+            total_api_calls=sum(r.total_api_calls for r in results),
+            guideline_files_parsed=len(self.guideline_cache),
+            hero_cache_hits=self.hero_cache.hits,
+            latency_histograms=merged.latencies_to_dict(),
+            queue_wait_by_priority=arbiter.wait_summary(),
+            render_memory=memory.summary() if memory is not None else None,
+            briefs=results
+        )
+        self.save_report(report)
+        return report
+
+    async def _process_brief(
+        self,
+        brief_path: Path,
+        brief: CampaignBrief,
+        render_pool: RenderPool,
+        arbiter: PriorityArbiter
+    ) -> Tuple[BatchBriefResult, Optional[dict]]:
+        try:
+            pipeline = self._create_pipeline(render_pool, arbiter)
+            output = await pipeline.process_campaign(brief, brief_path=str(brief_path), update_brief=self.update_brief)
+        except Exception as e:
+            print(f"❌ Campaign {brief.campaign_id} failed: {e}")
+            return BatchBriefResult(
+                brief_path=str(brief_path),
+                campaign_id=brief.campaign_id,
+                status="failed",
+                priority=brief.priority,
+                errors=[str(e)]
+            ), None
+
+        metrics = output.technical_metrics
+        result = BatchBriefResult(
+            brief_path=str(brief_path),
+            campaign_id=output.campaign_id,
+            status="partial" if output.errors else "success",
+            total_assets=output.total_assets,
+            processing_time_seconds=output.processing_time_seconds,
+            success_rate=output.success_rate,
+            total_api_calls=metrics.total_api_calls if metrics else 0,
+            cache_hits=metrics.cache_hits if metrics else 0,
+            priority=brief.priority,
+            queue_wait_ms=sum(metrics.queue_wait_ms.values()) if metrics else 0.0,
+            deadline_met=metrics.deadline_met if metrics else None,
+            errors=output.errors
+        )
+        return result, metrics.model_dump() if metrics else None
+
+    def save_report(self, report: BatchReport) -> Path:
+        """Write the combined report as indented JSON to campaign_reports/."""
+        path = self.storage.get_reports_dir() / f"batch_report_{report.batch_id}.json"
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(report.model_dump_json(indent=2))
+        return path
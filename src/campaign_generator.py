@@ -1,9 +1,18 @@
 """Campaign brief generator from templates."""
+import csv
 import json
 import re
+import time
+from collections import ChainMap
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.models import BulkGenerationReport
+
+
+PLACEHOLDER_PATTERN = re.compile(r'\{\{([A-Z_0-9]+)\}\}')
 
 
 class CampaignGenerator:
@@ -112,8 +121,7 @@ class CampaignGenerator:
 
     def _extract_placeholders(self, template: str) -> list:
         """Extract all {{PLACEHOLDER}} values from template."""
-        pattern = r'\{\{([A-Z_0-9]+)\}\}'
-        return list(set(re.findall(pattern, template)))
+        return list(set(PLACEHOLDER_PATTERN.findall(template)))
 
     def _get_default_value(self, placeholder: str) -> str:
         """Get default value for a placeholder."""
@@ -154,9 +162,11 @@ class CampaignGenerator:
         Returns:
             Path to generated file
         """
-        # Load template and parse
-        template_content = self.load_template()
-        template_data = json.loads(template_content.replace("{{", "PLACEHOLDER_").replace("}}", ""))
+        # Load template and fill placeholders not set below with their defaults
+        template = CompiledTemplate(json.loads(self.load_template()))
+        template_data = template.render(
+            {placeholder: self._get_default_value(placeholder) for placeholder in template.placeholders}
+        )
 
         # Update basic info
         template_data['campaign_id'] = campaign_id
@@ -199,3 +209,275 @@ class CampaignGenerator:
             json.dump(template_data, f, indent=2)
 
         return output_path
+
+
+class CompiledTemplate:
+    """
+    A JSON template compiled once into a render function.
+
+    ``{{PLACEHOLDER}}`` strings are split into literals and placeholder
+    names at compile time, so rendering is only dict/list construction and
+    lookups in ``values``. A string that is exactly one placeholder takes
+    the value as is (a list stays a list); otherwise values are formatted
+    into the string.
+    """
+
+    def __init__(self, data: Any):
+        self.placeholders: set = set()
+        self._render = self._compile(data)
+
+    def render(self, values: Mapping[str, Any]) -> Any:
+        """Fresh copy of the template with every placeholder looked up in ``values``."""
+        return self._render(values)
+
+    def _compile(self, node: Any) -> Callable[[Mapping[str, Any]], Any]:
+        if isinstance(node, dict):
+            fields = [(key, self._compile(value)) for key, value in node.items()]
+            return lambda values: {key: render(values) for key, render in fields}
+        if isinstance(node, list):
+            items = [self._compile(item) for item in node]
+            return lambda values: [render(values) for render in items]
+        if isinstance(node, str):
+            parts = PLACEHOLDER_PATTERN.split(node)  # literal, name, literal, name, ..., literal
+            if len(parts) == 1:
+                return lambda values: node
+            names = parts[1::2]
+            literals = parts[0::2]
+            self.placeholders.update(names)
+            if len(parts) == 3 and not literals[0] and not literals[1]:
+                name = names[0]
+                return lambda values: values[name]
+            pieces = list(zip(names, literals[1:]))
+            head = literals[0]
+            return lambda values: head + "".join(f"{values[name]}{literal}" for name, literal in pieces)
+        return lambda values: node  # null, bool or number
+
+
+class BulkCampaignGenerator:
+    """
+    Generate campaign briefs from a product feed (CSV or JSONL).
+
+    The template is compiled once: its campaign part per brief and its
+    first product entry per feed row. Rows are streamed and grouped by
+    campaign (the row's ``campaign_id`` column, else ``campaign_id``), and
+    each campaign is sharded into briefs of at most
+    ``max_products_per_brief`` products named ``<campaign_id>-001``,
+    ``-002``, ... Each brief is validated as a ``CampaignBrief`` before it
+    is written.
+
+    Row columns fill the placeholder of the same name upper-cased
+    (``product_name`` -> ``{{PRODUCT_NAME}}``); ``id``, ``name``,
+    ``description``, ``category`` and ``prompt`` work as in
+    ``quick_generate``. ``features`` (``|``-separated in CSV, a list in
+    JSONL) replaces ``key_features``; ``hero`` and ``logo`` become
+    ``existing_assets``.
+    """
+
+    COLUMN_ALIASES = {
+        "ID": "PRODUCT_ID",
+        "NAME": "PRODUCT_NAME",
+        "DESCRIPTION": "PRODUCT_DESCRIPTION",
+        "CATEGORY": "PRODUCT_CATEGORY",
+        "PROMPT": "GENERATION_PROMPT",
+    }
+    REQUIRED_COLUMNS = ("PRODUCT_ID", "PRODUCT_NAME")
+    ASSET_COLUMNS = ("HERO", "LOGO")
+    # Unset per row rather than defaulted: a shared generic prompt would give every SKU the same hero
+    ROW_DEFAULTS = {"GENERATION_PROMPT": None}
+
+    def __init__(
+        self,
+        template_path: Optional[str] = None,
+        max_products_per_brief: Optional[int] = None,
+        campaign_id: Optional[str] = None,
+        campaign_name: Optional[str] = None,
+        **values
+    ):
+        """
+        Args:
+            template_path: Brief template (default: examples/templates/campaign_template.json)
+            max_products_per_brief: Products per generated brief (default: BULK_MAX_PRODUCTS_PER_BRIEF)
+            campaign_id: Campaign for rows without a campaign_id column
+            campaign_name: Campaign name for rows without a campaign_name column
+            **values: Template values shared by every brief (e.g. brand_name, headline)
+        """
+        from src.config import get_config
+
+        generator = CampaignGenerator(template_path)
+        data = json.loads(generator.load_template())
+        products = data.pop("products", None) or [{}]
+        self.campaign_template = CompiledTemplate(data)
+        self.product_template = CompiledTemplate(products[0])
+
+        self.max_products_per_brief = max(1, max_products_per_brief or get_config().BULK_MAX_PRODUCTS_PER_BRIEF)
+        self.campaign_id = campaign_id
+        self.campaign_name = campaign_name
+        self.values = {key.upper(): value for key, value in values.items() if value is not None}
+        placeholders = self.campaign_template.placeholders | self.product_template.placeholders
+        self.defaults = {placeholder: generator._get_default_value(placeholder) for placeholder in placeholders}
+        self.product_defaults = dict(self.defaults, **self.ROW_DEFAULTS)
+
+    def generate(
+        self,
+        feed_path: str,
+        output_dir: str,
+        feed_format: Optional[str] = None,
+        write: bool = True
+    ) -> "BulkGenerationReport":
+        """
+        Stream a feed into validated briefs under ``output_dir``.
+
+        Args:
+            feed_path: CSV or JSONL product feed
+            output_dir: Directory for the generated briefs
+            feed_format: 'csv' or 'jsonl' (default: from the file extension)
+            write: False only validates the briefs (a dry run)
+
+        Returns:
+            Counts, generation rate, brief paths and per-row errors
+        """
+        from src.models import BulkGenerationReport
+
+        start = time.perf_counter()
+        report = BulkGenerationReport(feed=str(feed_path), output_dir=str(output_dir))
+        output = Path(output_dir)
+        if write:
+            output.mkdir(parents=True, exist_ok=True)
+
+        shards: Dict[str, Dict[str, Any]] = {}  # campaign -> name, open shard's products, shards emitted
+        for line, row in read_feed(feed_path, feed_format):
+            report.rows += 1
+            if isinstance(row, Exception):
+                report.skipped_rows += 1
+                report.errors.append(f"line {line}: {row}")
+                continue
+            try:
+                campaign_id, campaign_name, product = self._product(row)
+            except ValueError as e:
+                report.skipped_rows += 1
+                report.errors.append(f"line {line}: {e}")
+                continue
+
+            shard = shards.setdefault(campaign_id, {"name": campaign_name, "products": [], "count": 0})
+            shard["products"].append(product)
+            if len(shard["products"]) >= self.max_products_per_brief:
+                self._emit(campaign_id, shard, output, write, report)
+
+        for campaign_id, shard in shards.items():
+            if shard["products"]:
+                self._emit(campaign_id, shard, output, write, report)
+
+        report.elapsed_seconds = time.perf_counter() - start
+        if report.elapsed_seconds > 0:
+            report.rows_per_second = report.rows / report.elapsed_seconds
+            report.briefs_per_second = report.briefs / report.elapsed_seconds
+        return report
+
+    def _product(self, row: Mapping[str, Any]) -> Tuple[str, str, Dict[str, Any]]:
+        """Campaign ID, campaign name and validated product for one feed row."""
+        from pydantic import ValidationError
+        from src.models import Product
+
+        values = {}
+        for column, value in row.items():
+            if column is None or value is None or value == "":
+                continue
+            key = column.strip().upper()
+            values[self.COLUMN_ALIASES.get(key, key)] = value.strip() if isinstance(value, str) else value
+
+        missing = [column.lower() for column in self.REQUIRED_COLUMNS if column not in values]
+        if missing:
+            raise ValueError(f"missing {', '.join(missing)}")
+        campaign_id = str(values.pop("CAMPAIGN_ID", None) or self.campaign_id or "")
+        if not campaign_id:
+            raise ValueError("no campaign_id column and no default campaign ID")
+        campaign_name = str(values.pop("CAMPAIGN_NAME", None) or self.campaign_name or campaign_id)
+
+        features = values.pop("FEATURES", None)
+        if isinstance(features, str):
+            features = [feature.strip() for feature in features.split("|") if feature.strip()]
+        for number, feature in enumerate(features or [], 1):
+            values.setdefault(f"FEATURE_{number}", feature)
+        assets = {column.lower(): str(values.pop(column)) for column in self.ASSET_COLUMNS if column in values}
+
+        product = self.product_template.render(ChainMap(values, self.values, self.product_defaults))
+        if features:
+            product["key_features"] = list(features)
+        if assets:
+            product["existing_assets"] = assets
+
+        # Checked per row so one bad product is skipped instead of failing its whole brief
+        try:
+            Product.model_validate(product)
+        except ValidationError as e:
+            first = e.errors()[0]
+            location = ".".join(str(part) for part in first["loc"])
+            raise ValueError(f"invalid product at {location}: {first['msg']}") from None
+        return campaign_id, campaign_name, product
+
+    def _emit(
+        self,
+        campaign_id: str,
+        shard: Dict[str, Any],
+        output: Path,
+        write: bool,
+        report: "BulkGenerationReport"
+    ) -> None:
+        """Validate and write the campaign's open shard as one brief."""
+        from pydantic import ValidationError
+        from src.models import CampaignBrief
+
+        shard["count"] += 1
+        products, shard["products"] = shard["products"], []
+        brief_id = f"{campaign_id}-{shard['count']:03d}"
+        brief = self.campaign_template.render(ChainMap(
+            {"CAMPAIGN_ID": brief_id, "CAMPAIGN_NAME": f"{shard['name']} ({shard['count']})"},
+            self.values,
+            self.defaults
+        ))
+        brief["products"] = products
+
+        try:
+            CampaignBrief.model_validate(brief)
+        except ValidationError as e:
+            report.invalid_briefs += 1
+            first = e.errors()[0]
+            location = ".".join(str(part) for part in first["loc"])
+            report.errors.append(f"{brief_id}: {e.error_count()} validation error(s), first at {location}: {first['msg']}")
+            return
+
+        report.briefs += 1
+        report.products += len(products)
+        if write:
+            safe_id = re.sub(r'[^a-z0-9_-]', '_', brief_id.lower())
+            path = output / f"{safe_id}.json"
+            with open(path, 'w') as f:
+                json.dump(brief, f, indent=2)
+            report.brief_paths.append(str(path))
+
+
+def read_feed(path: str, feed_format: Optional[str] = None) -> Iterator[Tuple[int, Any]]:
+    """
+    Stream (line number, row) from a CSV or JSONL feed.
+
+    Rows are dicts; a JSONL line that is not a JSON object comes back as a
+    ValueError so one bad line does not end the stream.
+    """
+    feed_format = (feed_format or ("jsonl" if Path(path).suffix.lower() in (".jsonl", ".ndjson") else "csv")).lower()
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if feed_format == "csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        if feed_format != "jsonl":
+            raise ValueError(f"Unsupported feed format: '{feed_format}' (use csv or jsonl)")
+        for line, text in enumerate(f, 1):
+            if not text.strip():
+                continue
+            try:
+                row = json.loads(text)
+            except json.JSONDecodeError as e:
+                yield line, ValueError(f"invalid JSON: {e.msg}")
+                continue
+            yield line, row if isinstance(row, dict) else ValueError("not a JSON object")
@@ -1,11 +1,14 @@
-"""CLI interface for Creative Automation Pipeline."""
+"""CLI interface for Creative Automation Pipeline.
+
+Heavy modules (the pipeline, GenAI backends, Pillow, document parsers) are
+imported inside the commands that need them, so validation and listing
+commands start quickly.
+"""
 import click
 import json
-import asyncio
 from pathlib import Path
-from src.pipeline import CreativeAutomationPipeline
-from src.models import CampaignBrief
 from src.config import get_config
+from src.profiling import PROFILE_MODES
 
 
 @click.group()
@@ -20,15 +23,25 @@ def cli():
 
 @cli.command()
 @click.option('--brief', '-b', required=True, type=click.Path(exists=True), help='Path to campaign brief JSON file')
-@click.option('--backend', type=click.Choice(['firefly', 'openai', 'gemini', 'dalle', 'imagen'], case_sensitive=False), help='Override image generation backend')
+@click.option('--backend', type=click.Choice(['firefly', 'openai', 'gemini', 'dalle', 'imagen', 'local', 'synthetic'], case_sensitive=False), help='Override image generation backend')
 @click.option('--verbose', '-v', is_flag=True, help='Enable verbose output')
 @click.option('--dry-run', is_flag=True, help='Validate brief without processing')
-def process(brief: str, backend: str, verbose: bool, dry_run: bool):
+@click.option('--update-brief', is_flag=True, help='Export generated asset paths back into the brief (backs it up first)')
+@click.option('--metrics-port', type=int, help='Serve Prometheus metrics on this port while running (0 = any free port)')
+@click.option('--metrics-textfile', type=click.Path(), help='Write Prometheus metrics to this node-exporter textfile')
+@click.option('--profile', 'profile_mode', type=click.Choice(PROFILE_MODES), help='Profile the run (cProfile or tracemalloc); artifacts go next to the campaign reports')
+@click.option('--profile-top', type=int, default=25, show_default=True, help='Entries in the profile summary')
+@click.option('--critical-path', 'show_critical_path', is_flag=True, help='Print the chain of tasks that determined the run time')
+def process(brief: str, backend: str, verbose: bool, dry_run: bool, update_brief: bool,
+            metrics_port: int, metrics_textfile: str, profile_mode: str, profile_top: int,
+            show_critical_path: bool):
     """Process campaign brief and generate creative assets.
     
     Example:
         python -m src.cli process --brief examples/campaign_brief.json
     """
+    from src.models import CampaignBrief
+
     try:
         # Load campaign brief
         click.echo(f"\n📄 Loading campaign brief from {brief}...")
@@ -49,8 +62,42 @@ def process(brief: str, backend: str, verbose: bool, dry_run: bool):
             return
         
         # Process campaign
+        import asyncio
+        from src import metrics
+        from src.pipeline import CreativeAutomationPipeline
+        from src.profiling import CampaignProfiler
+
         pipeline = CreativeAutomationPipeline(image_backend=backend)
-        output = asyncio.run(pipeline.process_campaign(campaign_brief, brief_path=brief))
+        config = get_config()
+
+        async def run():
+            async with metrics.exporters(
+                port=metrics_port if metrics_port is not None else config.METRICS_PORT,
+                textfile=Path(metrics_textfile) if metrics_textfile else config.METRICS_TEXTFILE,
+                host=config.METRICS_HOST,
+                interval=config.METRICS_TEXTFILE_INTERVAL
+            ):
+                return await pipeline.process_campaign(
+                    campaign_brief,
+                    brief_path=brief,
+                    update_brief=True if update_brief else None
+                )
+
+        if profile_mode:
+            with CampaignProfiler(
+                profile_mode,
+                pipeline.storage.get_reports_dir(),
+                campaign_brief.campaign_id,
+                top=profile_top
+            ) as profiler:
+                output = asyncio.run(run())
+            click.echo(f"\n🔬 {profile_mode.upper()} profile:")
+            if profiler.peak_bytes is not None:
+                click.echo(f"   Peak traced memory: {profiler.peak_bytes / (1024 * 1024):.1f} MB")
+            for artifact in profiler.artifacts:
+                click.echo(f"   {artifact}")
+        else:
+            output = asyncio.run(run())
         
         # Display summary
         click.echo("\n" + "="*60)
@@ -65,6 +112,11 @@ def process(brief: str, backend: str, verbose: bool, dry_run: bool):
             click.echo(f"\n⚠️  Errors encountered: {len(output.errors)}")
             for error in output.errors:
                 click.echo(f"  - {error}")
+
+        if show_critical_path:
+            from src.scheduler import format_critical_path
+            click.echo(f"\n⏱️  Critical path:")
+            click.echo(format_critical_path(output.technical_metrics.critical_path))
         
         click.echo(f"\n✅ Output directory: {get_config().OUTPUT_DIR}/{output.campaign_id}")
         
@@ -79,6 +131,271 @@ def process(brief: str, backend: str, verbose: bool, dry_run: bool):
         raise click.Abort()
 
 
+@cli.command()
+@click.option('--brief', '-b', required=True, type=click.Path(exists=True), help='Path to campaign brief JSON file')
+@click.option('--backend', type=click.Choice(['firefly', 'openai', 'gemini', 'dalle', 'imagen', 'local', 'synthetic'], case_sensitive=False), help='Override image generation backend')
+@click.option('--parse-guidelines', is_flag=True, help='Parse guidelines that need Claude (spends those calls) for an exact plan')
+@click.option('--tasks', 'show_tasks', is_flag=True, help='List every planned task with its simulated start and duration')
+@click.option('--json', 'as_json', is_flag=True, help='Print the plan as JSON')
+def plan(brief: str, backend: str, parse_guidelines: bool, show_tasks: bool, as_json: bool):
+    """Show the work, duration and API spend of a brief without running it.
+
+    Resolves existing assets and manifest reuse the way a run would, then
+    estimates duration from past campaign reports and spend from
+    IMAGE_API_COSTS and CLAUDE_COST_PER_CALL.
+
+    Example:
+        python -m src.cli plan --brief examples/campaign_brief.json --backend openai
+    """
+    import asyncio
+    import contextlib
+    import sys
+    from src.models import CampaignBrief
+    from src.planner import CampaignPlanner, format_plan
+
+    try:
+        with open(brief, 'r') as f:
+            campaign_brief = CampaignBrief(**json.load(f))
+
+        planner = CampaignPlanner(image_backend=backend, parse_guidelines=parse_guidelines)
+        # Guideline loading and the compliance check print progress; keep --json output clean
+        with contextlib.redirect_stdout(sys.stderr if as_json else sys.stdout):
+            campaign_plan = asyncio.run(planner.plan(campaign_brief))
+    except json.JSONDecodeError as e:
+        click.echo(f"❌ Error: Invalid JSON in brief file - {e}", err=True)
+        raise click.Abort()
+    except Exception as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        raise click.Abort()
+
+    if as_json:
+        click.echo(campaign_plan.model_dump_json(indent=2))
+        return
+
+    click.echo("\n" + "="*60)
+    click.echo("🧮 CAMPAIGN PLAN")
+    click.echo("="*60)
+    click.echo(format_plan(campaign_plan, show_tasks=show_tasks))
+
+
+@cli.command('process-batch')
+@click.argument('sources', nargs=-1, required=True)
+@click.option('--backend', type=click.Choice(['firefly', 'openai', 'gemini', 'dalle', 'imagen', 'local', 'synthetic'], case_sensitive=False), help='Override image generation backend')
+@click.option('--concurrency', '-c', type=int, help='Campaigns processed at once (default: BATCH_CONCURRENCY)')
+@click.option('--render-workers', type=int, help='Shared render threads (default: BATCH_RENDER_WORKERS)')
+@click.option('--dry-run', is_flag=True, help='List and validate the briefs without processing')
+def process_batch(sources, backend: str, concurrency: int, render_workers: int, dry_run: bool):
+    """Process many briefs in one process with shared connections and caches.
+
+    SOURCES are brief files, directories of *.json briefs, glob patterns or
+    manifests (.txt with one path per line, or JSON {"briefs": [...]}).
+
+    Example:
+        python -m src.cli process-batch examples/ --concurrency 4
+    """
+    import asyncio
+    from src.batch import BatchProcessor, discover_briefs
+    from src.models import CampaignBrief
+
+    try:
+        brief_paths = discover_briefs(sources)
+    except Exception as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        raise click.Abort()
+
+    if not brief_paths:
+        click.echo("❌ Error: No briefs found", err=True)
+        raise click.Abort()
+
+    if dry_run:
+        invalid = 0
+        for path in brief_paths:
+            try:
+                with open(path, 'r') as f:
+                    CampaignBrief(**json.load(f))
+                click.echo(f"  ✓ {path}")
+            except Exception as e:
+                invalid += 1
+                click.echo(f"  ❌ {path}: {e}")
+        click.echo(f"\n✓ Dry run complete - {len(brief_paths) - invalid}/{len(brief_paths)} briefs valid")
+        if invalid:
+            raise click.Abort()
+        return
+
+    processor = BatchProcessor(image_backend=backend, concurrency=concurrency, render_workers=render_workers)
+    report = asyncio.run(processor.run(brief_paths))
+
+    click.echo("\n" + "="*60)
+    click.echo("📊 BATCH SUMMARY")
+    click.echo("="*60)
+    click.echo(f"Briefs: {report.succeeded}/{report.total_briefs} succeeded")
+    click.echo(f"Total Assets: {report.total_assets}")
+    click.echo(f"Wall Time: {report.wall_time_seconds:.1f}s ({report.assets_per_second:.2f} assets/s)")
+    click.echo(f"API Calls: {report.total_api_calls}  |  Batch hero reuse: {report.hero_cache_hits}")
+    for result in report.briefs:
+        icon = "✅" if result.status == "success" else "⚠️ " if result.status == "partial" else "❌"
+        deadline = " (missed deadline)" if result.deadline_met is False else ""
+        click.echo(
+            f"  {icon} {result.campaign_id or result.brief_path} [{result.priority}]: "
+            f"{result.total_assets} assets, {result.processing_time_seconds:.1f}s{deadline}"
+        )
+    if report.queue_wait_by_priority:
+        click.echo("Queue wait by priority (mean / p90 / max):")
+        for priority, wait in report.queue_wait_by_priority.items():
+            click.echo(
+                f"  {priority}: {wait['mean_ms']:.0f} / {wait['p90_ms']:.0f} / {wait['max_ms']:.0f} ms "
+                f"({wait['count']:.0f} waits)"
+            )
+    if report.render_memory:
+        memory = report.render_memory
+        click.echo(
+            f"Render memory: peak {memory['peak_reserved_mb']:.0f} of {memory['budget_mb']:.0f} MB reserved, "
+            f"{memory['delayed']:.0f} of {memory['admitted']:.0f} renders delayed"
+        )
+    click.echo(f"\n📋 Report: {processor.storage.get_reports_dir()}/batch_report_{report.batch_id}.json")
+
+    if report.failed:
+        raise click.Abort()
+
+
+@cli.command()
+@click.argument('directory', type=click.Path(exists=True, file_okay=False))
+@click.option('--backend', type=click.Choice(['firefly', 'openai', 'gemini', 'dalle', 'imagen', 'local', 'synthetic'], case_sensitive=False), help='Override image generation backend')
+@click.option('--concurrency', '-c', type=int, help='Campaigns processed at once (default: BATCH_CONCURRENCY)')
+@click.option('--debounce', type=float, help='Seconds of quiet before processing a burst of changes (default: WATCH_DEBOUNCE_SECONDS)')
+@click.option('--mode', type=click.Choice(['auto', 'inotify', 'poll'], case_sensitive=False), help='Change detection (default: WATCH_MODE)')
+@click.option('--state', 'state_path', type=click.Path(dir_okay=False), help='Watch state file (default: WATCH_STATE_PATH)')
+@click.option('--once', is_flag=True, help='Process what is due now and exit instead of watching')
+def watch(directory: str, backend: str, concurrency: int, debounce: float, mode: str, state_path: str, once: bool):
+    """Process briefs dropped into DIRECTORY and re-run them when they change.
+
+    A brief re-runs when it, or a guideline, logo or hero file it references,
+    changes; unchanged variants are reused from the asset manifest. State
+    persists between runs, so restarts only pick up what changed meanwhile.
+
+    Example:
+        python -m src.cli watch briefs/ --backend local
+    """
+    import asyncio
+    from src.batch import BatchProcessor
+    from src.watcher import BriefWatcher
+
+    processor = BatchProcessor(image_backend=backend, concurrency=concurrency, update_brief=False)
+    brief_watcher = BriefWatcher(
+        Path(directory),
+        processor=processor,
+        state_path=Path(state_path) if state_path else None,
+        debounce_seconds=debounce,
+        mode=mode
+    )
+    try:
+        if once:
+            report = asyncio.run(brief_watcher.run_once())
+            if report is None:
+                click.echo("✓ Nothing to do - every brief is up to date")
+            else:
+                click.echo(f"✓ {report.succeeded}/{report.total_briefs} briefs succeeded, {report.total_assets} assets")
+            return
+        asyncio.run(brief_watcher.run())
+    except KeyboardInterrupt:
+        pass
+    click.echo(f"\n👋 Stopped watching after {brief_watcher.runs} runs (state: {brief_watcher.state.path})")
+
+
+@cli.command()
+@click.option('--host', help='Interface to listen on (default: SERVER_HOST)')
+@click.option('--port', type=int, help='Port to listen on (default: SERVER_PORT)')
+@click.option('--backend', type=click.Choice(['firefly', 'openai', 'gemini', 'dalle', 'imagen', 'local', 'synthetic'], case_sensitive=False), help='Override image generation backend')
+@click.option('--workers', type=int, help='Jobs processed at once (default: SERVER_WORKERS)')
+@click.option('--queue-size', type=int, help='Jobs allowed to wait before submissions get 503 (default: SERVER_QUEUE_SIZE)')
+def serve(host: str, port: int, backend: str, workers: int, queue_size: int):
+    """Run the pipeline as a long-lived HTTP job server.
+
+    Example:
+        python -m src.cli serve --port 8080 --backend local
+        curl -X POST --data @examples/campaign_brief.json localhost:8080/jobs
+    """
+    import asyncio
+    from src.server import PipelineServer
+
+    config = get_config()
+
+    async def run():
+        server = PipelineServer(image_backend=backend, workers=workers, queue_size=queue_size)
+        url = await server.start(host or config.SERVER_HOST, port if port is not None else config.SERVER_PORT)
+        click.echo(f"🚀 Pipeline server listening on {url} ({server.workers} workers, queue of {server.queue_size})")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.stop()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        click.echo("\n👋 Server stopped")
+
+
+@cli.command()
+@click.option('--brief', '-b', required=True, type=click.Path(exists=True), help='Path to campaign brief JSON file')
+@click.option('--queue', 'queue_path', type=click.Path(), help='Work queue database (default: WORK_QUEUE_PATH)')
+@click.option('--wait/--no-wait', default=True, show_default=True, help='Wait for workers to finish and assemble the output')
+@click.option('--timeout', type=float, help='Give up waiting after this many seconds')
+def submit(brief: str, queue_path: str, wait: bool, timeout: float):
+    """Split a campaign into durable tasks for `worker` processes.
+
+    Example:
+        python -m src.cli submit --brief examples/campaign_brief.json
+    """
+    import asyncio
+    from src.distributed import Coordinator, open_queue
+    from src.models import CampaignBrief
+
+    try:
+        with open(brief, 'r') as f:
+            campaign_brief = CampaignBrief(**json.load(f))
+        queue = open_queue(Path(queue_path) if queue_path else None)
+        coordinator = Coordinator(queue)
+        run_id = coordinator.submit(campaign_brief)
+        counts = queue.counts(run_id)
+        click.echo(f"📬 Queued run {run_id}: {sum(counts.values())} tasks in {queue.db_path}")
+        if not wait:
+            return
+
+        click.echo("⏳ Waiting for workers (start them with: python -m src.cli worker)...")
+        output = asyncio.run(coordinator.wait(run_id, timeout=timeout))
+    except Exception as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        raise click.Abort()
+
+    click.echo(f"\n✅ Run {run_id}: {output.total_assets} assets, success rate {output.success_rate * 100:.1f}%")
+    for error in output.errors:
+        click.echo(f"  - {error}")
+
+
+@cli.command()
+@click.option('--queue', 'queue_path', type=click.Path(), help='Work queue database (default: WORK_QUEUE_PATH)')
+@click.option('--backend', type=click.Choice(['firefly', 'openai', 'gemini', 'dalle', 'imagen', 'local', 'synthetic'], case_sensitive=False), help='Override image generation backend')
+@click.option('--concurrency', '-c', type=int, default=1, show_default=True, help='Tasks executed at once')
+@click.option('--exit-when-idle', is_flag=True, help='Exit once the queue has no pending or running tasks')
+def worker(queue_path: str, backend: str, concurrency: int, exit_when_idle: bool):
+    """Claim and execute campaign tasks from the work queue.
+
+    Run any number of workers, on any host that shares the queue database
+    and output directory.
+    """
+    import asyncio
+    from src.distributed import Worker, open_queue
+
+    queue = open_queue(Path(queue_path) if queue_path else None)
+    task_worker = Worker(queue, image_backend=backend, concurrency=concurrency)
+    click.echo(f"👷 Worker {task_worker.worker_id} polling {queue.db_path}")
+    try:
+        asyncio.run(task_worker.run(stop_when_idle=exit_when_idle))
+    except KeyboardInterrupt:
+        pass
+    click.echo(f"👋 Worker stopped: {task_worker.completed} tasks done, {task_worker.failed} failed")
+
+
 @cli.command()
 def validate_config():
     """Validate API keys and configuration."""
@@ -170,5 +487,67 @@ def new_campaign(campaign_id, campaign_name, interactive, output, **kwargs):
         raise click.Abort()
 
 
+@cli.command('bulk-generate')
+@click.argument('feed', type=click.Path(exists=True, dir_okay=False))
+@click.option('--output-dir', '-o', default='examples/bulk', show_default=True, help='Directory for the generated briefs')
+@click.option('--template', help='Brief template (default: examples/templates/campaign_template.json)')
+@click.option('--format', 'feed_format', type=click.Choice(['csv', 'jsonl'], case_sensitive=False), help='Feed format (default: from the file extension)')
+@click.option('--campaign-id', help='Campaign for rows without a campaign_id column')
+@click.option('--campaign-name', help='Campaign name for rows without a campaign_name column')
+@click.option('--max-products', type=int, help='Products per brief (default: BULK_MAX_PRODUCTS_PER_BRIEF)')
+@click.option('--brand-name', help='Brand name')
+@click.option('--headline', help='Campaign headline')
+@click.option('--subheadline', help='Campaign subheadline')
+@click.option('--cta', help='Call to action')
+@click.option('--set', 'extra', multiple=True, metavar='PLACEHOLDER=VALUE', help='Any other template value (repeatable)')
+@click.option('--dry-run', is_flag=True, help='Validate the briefs without writing them')
+def bulk_generate(feed, output_dir, template, feed_format, campaign_id, campaign_name, max_products, extra, dry_run, **kwargs):
+    """Generate campaign briefs from a CSV or JSONL product feed.
+
+    Each row is a product (product_id, product_name, product_description,
+    product_category, features, generation_prompt, hero, logo, and
+    optionally campaign_id / campaign_name). Products are grouped by
+    campaign and split into briefs of at most --max-products.
+
+    Example:
+        python -m src.cli bulk-generate catalog.csv --campaign-id FALL2026 --brand-name TechStyle
+    """
+    from src.campaign_generator import BulkCampaignGenerator
+
+    values = {k: v for k, v in kwargs.items() if v is not None}
+    for item in extra:
+        placeholder, separator, value = item.partition('=')
+        if not separator:
+            raise click.BadParameter(f"expected PLACEHOLDER=VALUE, got '{item}'", param_hint='--set')
+        values[placeholder.strip()] = value
+
+    try:
+        generator = BulkCampaignGenerator(
+            template_path=template,
+            max_products_per_brief=max_products,
+            campaign_id=campaign_id,
+            campaign_name=campaign_name,
+            **values
+        )
+        report = generator.generate(feed, output_dir, feed_format=feed_format, write=not dry_run)
+    except Exception as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        raise click.Abort()
+
+    click.echo(f"\n📦 Read {report.rows} row(s) from {feed} in {report.elapsed_seconds:.2f}s "
+               f"({report.rows_per_second:.0f} rows/s, {report.briefs_per_second:.0f} briefs/s)")
+    verb = "Validated" if dry_run else "Generated"
+    click.echo(f"✅ {verb} {report.briefs} brief(s) with {report.products} product(s)"
+               + ("" if dry_run else f" in {output_dir}"))
+    if report.skipped_rows or report.invalid_briefs:
+        click.echo(f"⚠️  {report.skipped_rows} row(s) skipped, {report.invalid_briefs} invalid brief(s):")
+        for error in report.errors[:10]:
+            click.echo(f"   - {error}")
+        if len(report.errors) > 10:
+            click.echo(f"   ... and {len(report.errors) - 10} more")
+    if report.briefs and not dry_run:
+        click.echo(f"\n📝 Next step: python -m src.cli process-batch {output_dir}")
+
+
 if __name__ == '__main__':
     cli()
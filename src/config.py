@@ -38,10 +38,45 @@ class Config:
         self.MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "5"))
         self.API_TIMEOUT = int(os.getenv("API_TIMEOUT", "30"))
         self.MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
+
+        # Failover: ordered backends tried after the primary one fails
+        self.FALLBACK_IMAGE_BACKENDS = [
+            b.strip().lower()
+            for b in os.getenv("FALLBACK_IMAGE_BACKENDS", "").split(",")
+            if b.strip()
+        ]
+        self.FAILOVER_MAX_RETRIES = int(os.getenv("FAILOVER_MAX_RETRIES", "1"))
+        self.CIRCUIT_BREAKER_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_BREAKER_FAILURE_THRESHOLD", "3"))
+        self.CIRCUIT_BREAKER_LATENCY_MS = float(os.getenv("CIRCUIT_BREAKER_LATENCY_MS", "0"))
+        self.CIRCUIT_BREAKER_RESET_SECONDS = float(os.getenv("CIRCUIT_BREAKER_RESET_SECONDS", "30"))
+
+        # Hedging: fire a duplicate hero request when the first one runs long
+        self.HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+        self.HEDGE_BACKEND = os.getenv("HEDGE_BACKEND", "").strip().lower()
+        self.HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+        self.HEDGE_INITIAL_DELAY_MS = float(os.getenv("HEDGE_INITIAL_DELAY_MS", "10000"))
+        self.HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "5"))
+        self.HEDGE_MAX_RATIO = float(os.getenv("HEDGE_MAX_RATIO", "0.1"))
+
+        # Local synthetic backend: simulated latency and failure rates
+        self.LOCAL_LATENCY_MS = float(os.getenv("LOCAL_LATENCY_MS", "0"))
+        self.LOCAL_LATENCY_DISTRIBUTION = os.getenv("LOCAL_LATENCY_DISTRIBUTION", "fixed")
+        self.LOCAL_LATENCY_SPREAD = float(os.getenv("LOCAL_LATENCY_SPREAD", "0.5"))
+        self.LOCAL_ERROR_RATE = float(os.getenv("LOCAL_ERROR_RATE", "0"))
+        self.LOCAL_RATE_LIMIT_RATE = float(os.getenv("LOCAL_RATE_LIMIT_RATE", "0"))
+        local_seed = os.getenv("LOCAL_SEED", "")
+        self.LOCAL_SEED = int(local_seed) if local_seed else None
         
         # Paths
         self.OUTPUT_DIR = Path(os.getenv("OUTPUT_DIR", "./output"))
         self.TEMP_DIR = Path(os.getenv("TEMP_DIR", "./temp"))
+        self.ASSET_MANIFEST_PATH = Path(
+            os.getenv("ASSET_MANIFEST_PATH", str(self.OUTPUT_DIR / "asset_manifest.db"))
+        )
+
+        # Asset manifest is the source of truth; writing paths back into the
+        # campaign brief (with a timestamped backup) is an optional export
+        self.EXPORT_BRIEF_ASSETS = os.getenv("EXPORT_BRIEF_ASSETS", "false").lower() == "true"
         
         # Create directories
         self.OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -51,12 +86,95 @@ class Config:
         self.DEFAULT_IMAGE_SIZE = (1024, 1024)
         self.SUPPORTED_FORMATS = ["png", "jpg", "jpeg"]
         
-        # API Endpoints
-        self.FIREFLY_API_URL = "https://firefly-api.adobe.io/v3/images/generate"
-        self.CLAUDE_API_URL = "https://api.anthropic.com/v1/messages"
+        # API Endpoints (overridable, e.g. to point at src.genai.mock_server)
+        self.FIREFLY_API_URL = os.getenv("FIREFLY_API_URL", "https://firefly-api.adobe.io/v3/images/generate")
+        self.OPENAI_API_URL = os.getenv("OPENAI_API_URL", "https://api.openai.com/v1/images/generations")
+        self.GEMINI_API_URL = os.getenv(
+            "GEMINI_API_URL",
+            "https://generativelanguage.googleapis.com/v1beta/models/imagen-4.0-generate-001:predict"
+        )
+        self.CLAUDE_API_URL = os.getenv("CLAUDE_API_URL", "https://api.anthropic.com/v1/messages")
         
         # Logging
         self.LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
+        # Tracing: per-campaign span export (chrome trace-event or OTLP JSON)
+        self.TRACE_ENABLED = os.getenv("TRACE_ENABLED", "false").lower() == "true"
+        self.TRACE_FORMAT = os.getenv("TRACE_FORMAT", "chrome").lower()
+        self.TRACE_DIR = Path(os.getenv("TRACE_DIR", str(self.OUTPUT_DIR / "traces")))
+
+        # Operational metrics: Prometheus /metrics endpoint and/or node-exporter textfile
+        metrics_port = os.getenv("METRICS_PORT", "")
+        self.METRICS_PORT = int(metrics_port) if metrics_port else None
+        self.METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+        metrics_textfile = os.getenv("METRICS_TEXTFILE", "")
+        self.METRICS_TEXTFILE = Path(metrics_textfile) if metrics_textfile else None
+        self.METRICS_TEXTFILE_INTERVAL = float(os.getenv("METRICS_TEXTFILE_INTERVAL", "15"))
+
+        # Background memory sampling for peak_memory_mb and the report's memory timeline
+        self.MEMORY_SAMPLE_INTERVAL_MS = float(os.getenv("MEMORY_SAMPLE_INTERVAL_MS", "50"))
+        self.MEMORY_SAMPLE_TRACEMALLOC = os.getenv("MEMORY_SAMPLE_TRACEMALLOC", "false").lower() == "true"
+        self.MEMORY_TIMELINE_MAX_SAMPLES = int(os.getenv("MEMORY_TIMELINE_MAX_SAMPLES", "500"))
+
+        # Task scheduler: concurrent nodes per resource within one campaign's dependency graph
+        self.SCHEDULER_IMAGE_API_CONCURRENCY = int(os.getenv("SCHEDULER_IMAGE_API_CONCURRENCY", str(self.MAX_CONCURRENT_REQUESTS)))
+        self.SCHEDULER_LLM_CONCURRENCY = int(os.getenv("SCHEDULER_LLM_CONCURRENCY", "4"))
+        self.SCHEDULER_CPU_WORKERS = int(os.getenv("SCHEDULER_CPU_WORKERS", str(min(8, os.cpu_count() or 1))))
+        self.SCHEDULER_DISK_CONCURRENCY = int(os.getenv("SCHEDULER_DISK_CONCURRENCY", "4"))
+
+        # Priority scheduling between campaigns sharing a batch or server
+        self.PRIORITY_AGING_SECONDS = float(os.getenv("PRIORITY_AGING_SECONDS", "30"))
+        self.PRIORITY_FAIR_SHARE = float(os.getenv("PRIORITY_FAIR_SHARE", "0.5"))
+        self.PRIORITY_DEADLINE_HORIZON_SECONDS = float(os.getenv("PRIORITY_DEADLINE_HORIZON_SECONDS", "600"))
+
+        # Render memory admission: budget for concurrent render jobs (auto = fraction of the container limit)
+        render_memory_budget = os.getenv("RENDER_MEMORY_BUDGET_MB", "auto").lower()
+        self.RENDER_MEMORY_BUDGET_MB = None if render_memory_budget in ("", "auto") else int(render_memory_budget)
+        self.RENDER_MEMORY_BUDGET_FRACTION = float(os.getenv("RENDER_MEMORY_BUDGET_FRACTION", "0.8"))
+        self.RENDER_MEMORY_POLL_INTERVAL = float(os.getenv("RENDER_MEMORY_POLL_INTERVAL", "0.05"))
+
+        # Batch processing: campaigns in flight, shared render threads and hero cache budget
+        self.BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+        self.BATCH_RENDER_WORKERS = int(os.getenv("BATCH_RENDER_WORKERS", str(min(8, os.cpu_count() or 1))))
+        self.BATCH_HERO_CACHE_MB = int(os.getenv("BATCH_HERO_CACHE_MB", "256"))
+
+        # Bulk brief generation (bulk-generate): products per generated brief
+        self.BULK_MAX_PRODUCTS_PER_BRIEF = int(os.getenv("BULK_MAX_PRODUCTS_PER_BRIEF", "10"))
+
+        # Watch-folder mode: change detection, debouncing and the persisted per-brief state
+        self.WATCH_MODE = os.getenv("WATCH_MODE", "auto").lower()
+        self.WATCH_DEBOUNCE_SECONDS = float(os.getenv("WATCH_DEBOUNCE_SECONDS", "2"))
+        self.WATCH_MAX_DELAY_SECONDS = float(os.getenv("WATCH_MAX_DELAY_SECONDS", "30"))
+        self.WATCH_POLL_INTERVAL = float(os.getenv("WATCH_POLL_INTERVAL", "1"))
+        self.WATCH_STATE_PATH = Path(os.getenv("WATCH_STATE_PATH", str(self.OUTPUT_DIR / "watch_state.json")))
+
+        # Durable work queue (submit / worker): SQLite database on the shared output volume
+        self.WORK_QUEUE_PATH = Path(os.getenv("WORK_QUEUE_PATH", str(self.OUTPUT_DIR / "work_queue.db")))
+        self.WORK_QUEUE_LEASE_SECONDS = float(os.getenv("WORK_QUEUE_LEASE_SECONDS", "60"))
+        self.WORK_QUEUE_MAX_ATTEMPTS = int(os.getenv("WORK_QUEUE_MAX_ATTEMPTS", "3"))
+        self.WORK_QUEUE_RETRY_BACKOFF_SECONDS = float(os.getenv("WORK_QUEUE_RETRY_BACKOFF_SECONDS", "2"))
+        self.WORK_QUEUE_POLL_INTERVAL = float(os.getenv("WORK_QUEUE_POLL_INTERVAL", "0.5"))
+
+        # Pre-flight planning (plan): API prices in USD and how many past reports feed latency estimates
+        self.IMAGE_API_COSTS = {
+            name.strip().lower(): float(price)
+            for name, _, price in (
+                entry.partition("=")
+                for entry in os.getenv("IMAGE_API_COSTS", "firefly=0.04,openai=0.08,gemini=0.04,local=0").split(",")
+            )
+            if name.strip() and price.strip()
+        }
+        self.CLAUDE_COST_PER_CALL = float(os.getenv("CLAUDE_COST_PER_CALL", "0.01"))
+        self.PLAN_HISTORY_REPORTS = int(os.getenv("PLAN_HISTORY_REPORTS", "50"))
+
+        # Pipeline server (serve): HTTP job API over warm pipelines
+        self.SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+        self.SERVER_PORT = int(os.getenv("SERVER_PORT", "8080"))
+        self.SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "2"))
+        self.SERVER_QUEUE_SIZE = int(os.getenv("SERVER_QUEUE_SIZE", "16"))
+        self.SERVER_JOB_HISTORY = int(os.getenv("SERVER_JOB_HISTORY", "200"))
+        self.SERVER_GUIDELINE_CACHE_SIZE = int(os.getenv("SERVER_GUIDELINE_CACHE_SIZE", "64"))
+        self.SERVER_TRANSLATION_CACHE_SIZE = int(os.getenv("SERVER_TRANSLATION_CACHE_SIZE", "4096"))
     
     def validate(self) -> tuple[bool, list[str]]:
         """Validate configuration."""
@@ -72,6 +190,8 @@ class Config:
             has_image_backend = True
         if self.GEMINI_API_KEY:
             has_image_backend = True
+        if self.DEFAULT_IMAGE_BACKEND in ("local", "synthetic"):
+            has_image_backend = True
         
         if not has_image_backend:
             errors.append(
@@ -89,13 +209,21 @@ class Config:
             )
         
         # Validate default backend
-        valid_backends = ["firefly", "openai", "dall-e", "dalle", "gemini", "imagen"]
+        valid_backends = ["firefly", "openai", "dall-e", "dalle", "gemini", "imagen", "local", "synthetic"]
         if self.DEFAULT_IMAGE_BACKEND not in valid_backends:
             errors.append(
                 f"Invalid DEFAULT_IMAGE_BACKEND: '{self.DEFAULT_IMAGE_BACKEND}'. "
                 f"Must be one of: {', '.join(valid_backends)}"
             )
         
+        # Validate trace export format
+        valid_trace_formats = ["chrome", "otlp"]
+        if self.TRACE_FORMAT not in valid_trace_formats:
+            errors.append(
+                f"Invalid TRACE_FORMAT: '{self.TRACE_FORMAT}'. "
+                f"Must be one of: {', '.join(valid_trace_formats)}"
+            )
+
         if warnings:
             for warning in warnings:
                 print(f"⚠️  Warning: {warning}")
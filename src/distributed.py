@@ -0,0 +1,540 @@
+"""Run campaigns as durable tasks: a coordinator plans and assembles, workers execute."""
+import asyncio
+import hashlib
+import os
+import socket
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src import metrics
+from src.batch import RenderPool
+from src.config import get_config
+from src.genai.http import shared_session
+from src.histograms import OperationHistograms
+from src.manifest import VARIANT_KIND, fingerprint
+from src.models import (
+    CampaignBrief,
+    CampaignMessage,
+    CampaignOutput,
+    ComprehensiveBrandGuidelines,
+    GeneratedAsset,
+    LocalizationGuidelines,
+    Product,
+    TechnicalMetrics
+)
+from src.pipeline import HERO_IMAGE_SIZE, CreativeAutomationPipeline, hero_prompt, variant_input_fingerprint
+from src.storage import StorageManager
+from src.work_queue import DONE, FAILED, LEASED, PENDING, WorkQueue
+
+
+COMPLIANCE_TASK = "compliance"
+HERO_TASK = "hero"
+LOCALIZE_TASK = "localize"
+RENDER_TASK = "render"
+
+
+class TaskFailure(Exception):
+    """A task error that retrying cannot fix (e.g. a compliance violation)."""
+
+
+def plan_tasks(brief: CampaignBrief, run_id: str) -> List[Dict[str, Any]]:
+    """
+    Decompose a brief into queue tasks.
+
+    One hero per product, one localization per non-source locale (when
+    localization guidelines are configured) and one render per product,
+    locale and ratio, which waits on its hero and localization. With a legal
+    compliance file, every hero waits on a compliance task so a blocked
+    campaign generates nothing.
+    """
+    tasks: List[Dict[str, Any]] = []
+    gate: List[str] = []
+    if brief.legal_compliance_file:
+        gate = [f"{run_id}:{COMPLIANCE_TASK}"]
+        tasks.append({"task_id": gate[0], "kind": COMPLIANCE_TASK, "payload": {}})
+
+    localize_ids: Dict[str, str] = {}
+    if brief.enable_localization and brief.localization_guidelines_file:
+        for locale in brief.target_locales:
+            if locale != brief.campaign_message.locale:
+                localize_ids[locale] = f"{run_id}:{LOCALIZE_TASK}:{locale}"
+                tasks.append({
+                    "task_id": localize_ids[locale],
+                    "kind": LOCALIZE_TASK,
+                    "payload": {"locale": locale},
+                    "depends_on": gate
+                })
+
+    output_format = brief.output_formats[0] if brief.output_formats else "png"
+    for product in brief.products:
+        hero_id = f"{run_id}:{HERO_TASK}:{product.product_id}"
+        tasks.append({
+            "task_id": hero_id,
+            "kind": HERO_TASK,
+            "payload": {"product_id": product.product_id},
+            "depends_on": gate
+        })
+        for locale in brief.target_locales:
+            for ratio in brief.aspect_ratios:
+                tasks.append({
+                    "task_id": f"{run_id}:{RENDER_TASK}:{product.product_id}:{locale}:{ratio}",
+                    "kind": RENDER_TASK,
+                    "payload": {
+                        "product_id": product.product_id,
+                        "locale": locale,
+                        "aspect_ratio": ratio,
+                        "format": output_format
+                    },
+                    "depends_on": [hero_id] + ([localize_ids[locale]] if locale in localize_ids else [])
+                })
+    return tasks
+
+
+def open_queue(path: Optional[Path] = None) -> WorkQueue:
+    """Open the configured work queue database."""
+    config = get_config()
+    return WorkQueue(path or config.WORK_QUEUE_PATH, retry_backoff_seconds=config.WORK_QUEUE_RETRY_BACKOFF_SECONDS)
+
+
+class Coordinator:
+    """Submit campaigns to the work queue and assemble their output once workers finish."""
+
+    def __init__(self, queue: WorkQueue, storage: Optional[StorageManager] = None):
+        self.queue = queue
+        self.storage = storage or StorageManager()
+
+    def submit(self, brief: CampaignBrief, max_attempts: Optional[int] = None) -> str:
+        """Enqueue a campaign run and return its run ID."""
+        run_id = f"{brief.campaign_id}-{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.queue.add_run(
+            run_id,
+            brief.campaign_id,
+            brief.model_dump(mode="json"),
+            plan_tasks(brief, run_id),
+            max_attempts=max_attempts or get_config().WORK_QUEUE_MAX_ATTEMPTS
+        )
+        return run_id
+
+    def is_finished(self, run_id: str) -> bool:
+        counts = self.queue.counts(run_id)
+        return counts[PENDING] == 0 and counts[LEASED] == 0
+
+    async def wait(self, run_id: str, poll_interval: Optional[float] = None, timeout: Optional[float] = None) -> CampaignOutput:
+        """Poll until every task of the run is done or failed, then assemble the output."""
+        if self.queue.get_run(run_id) is None:
+            raise ValueError(f"Unknown run: '{run_id}'")
+        poll_interval = poll_interval or get_config().WORK_QUEUE_POLL_INTERVAL
+        deadline = time.monotonic() + timeout if timeout else None
+        while not await asyncio.to_thread(self.is_finished, run_id):
+            if deadline and time.monotonic() > deadline:
+                raise TimeoutError(f"Run {run_id} did not finish within {timeout}s: {self.queue.counts(run_id)}")
+            await asyncio.sleep(poll_interval)
+        return self.assemble(run_id)
+
+    def assemble(self, run_id: str) -> CampaignOutput:
+        """Build the CampaignOutput (and consolidated report) from task results."""
+        run = self.queue.get_run(run_id)
+        brief = CampaignBrief(**run["brief"])
+        tasks = self.queue.run_tasks(run_id)
+
+        generated_assets: List[GeneratedAsset] = []
+        errors: List[str] = []
+        skipped = 0
+        timings = OperationHistograms()
+        api_times: List[float] = []
+        cache_hits = cache_misses = 0
+        render_ms = localization_ms = compliance_ms = 0.0
+        retry_reasons: List[str] = []
+        backend = brief.image_generation_backend
+
+        for task in tasks:
+            result = task["result"] or {}
+            if task["attempts"] > 1 and task["error"]:
+                retry_reasons.append(f"{task['task_id']}: {task['error']}")
+            if task["status"] == FAILED:
+                if task["error"] and task["error"].startswith("Dependency "):
+                    skipped += 1
+                else:
+                    errors.append(f"{task['kind']} task {task['task_id']} failed: {task['error']}")
+                continue
+            if task["status"] != DONE:
+                continue
+
+            if task["kind"] == HERO_TASK:
+                backend = result.get("backend") or backend
+                if result.get("source") == "generated":
+                    cache_misses += 1
+                    api_times.append(result["elapsed_ms"])
+                    timings.observe(f"hero_generation.{result['backend']}", result["elapsed_ms"])
+                else:
+                    cache_hits += 1
+            elif task["kind"] == LOCALIZE_TASK:
+                localization_ms += result.get("elapsed_ms", 0.0)
+                timings.observe("localization", result.get("elapsed_ms", 0.0))
+            elif task["kind"] == COMPLIANCE_TASK:
+                compliance_ms += result.get("elapsed_ms", 0.0)
+            elif task["kind"] == RENDER_TASK:
+                generated_assets.append(GeneratedAsset(**result["asset"]))
+                if not result.get("reused"):
+                    render_ms += result.get("elapsed_ms", 0.0)
+                    timings.observe("render", result.get("elapsed_ms", 0.0))
+
+        if skipped:
+            errors.append(f"{skipped} task(s) skipped because a dependency failed")
+
+        finished = [task["finished_at"] for task in tasks if task["finished_at"]]
+        elapsed = (max(finished) if finished else time.time()) - run["created_at"]
+        total_expected = len(brief.products) * len(brief.target_locales) * len(brief.aspect_ratios)
+        hero_lookups = cache_hits + cache_misses
+
+        technical_metrics = TechnicalMetrics(
+            backend_used=backend,
+            total_api_calls=len(api_times),
+            latency_histograms=timings.latencies_to_dict(),
+            cache_hits=cache_hits,
+            cache_misses=cache_misses,
+            cache_hit_rate=cache_hits / hero_lookups * 100 if hero_lookups else 0.0,
+            retry_count=sum(max(0, task["attempts"] - 1) for task in tasks),
+            retry_reasons=retry_reasons,
+            avg_api_response_time_ms=sum(api_times) / len(api_times) if api_times else 0.0,
+            min_api_response_time_ms=min(api_times) if api_times else 0.0,
+            max_api_response_time_ms=max(api_times) if api_times else 0.0,
+            image_processing_time_ms=render_ms,
+            localization_time_ms=localization_ms,
+            compliance_check_time_ms=compliance_ms,
+            system_info={"run_id": run_id, "workers": ", ".join(sorted({
+                task["result"]["worker"] for task in tasks if task["result"] and task["result"].get("worker")
+            }))}
+        )
+        output = CampaignOutput(
+            campaign_id=brief.campaign_id,
+            campaign_name=brief.campaign_name,
+            generated_assets=generated_assets,
+            total_assets=len(generated_assets),
+            locales_processed=brief.target_locales,
+            products_processed=[p.product_id for p in brief.products],
+            processing_time_seconds=elapsed,
+            success_rate=len(generated_assets) / total_expected if total_expected else 0.0,
+            errors=errors,
+            generation_timestamp=datetime.now(),
+            technical_metrics=technical_metrics
+        )
+
+        report_writer = self.storage.open_report_writer(brief.campaign_id)
+        for asset in generated_assets:
+            report_writer.write_asset(asset)
+        report_writer.finalize(output)
+        return output
+
+
+@dataclass
+class _RunContext:
+    """Brief and parsed guidelines a worker needs for one run's tasks."""
+    brief: CampaignBrief
+    backend: str
+    brand_guidelines: Optional[ComprehensiveBrandGuidelines]
+    localization_guidelines: Optional[LocalizationGuidelines]
+
+    def product(self, product_id: str) -> Product:
+        return next(p for p in self.brief.products if p.product_id == product_id)
+
+
+class Worker:
+    """
+    Claim and execute campaign tasks from the work queue.
+
+    Workers on any host sharing the queue database and the output volume
+    cooperate on the same runs. Each worker keeps one warm pipeline (image
+    services, guideline and translation caches) and renders on a thread
+    pool, so the event loop stays free to heartbeat leases during long
+    renders.
+    """
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        worker_id: Optional[str] = None,
+        image_backend: Optional[str] = None,
+        concurrency: int = 1,
+        lease_seconds: Optional[float] = None,
+        poll_interval: Optional[float] = None
+    ):
+        config = get_config()
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:4]}"
+        self.image_backend = image_backend
+        self.concurrency = max(1, concurrency)
+        self.lease_seconds = lease_seconds or config.WORK_QUEUE_LEASE_SECONDS
+        self.poll_interval = poll_interval or config.WORK_QUEUE_POLL_INTERVAL
+        self.pipeline = CreativeAutomationPipeline(image_backend=image_backend)
+        self.completed = 0
+        self.failed = 0
+        self._runs: "OrderedDict[str, _RunContext]" = OrderedDict()
+        self._image_services: Dict[str, Any] = {}
+        self._tasks_total = metrics.get_registry().counter(
+            "work_queue_tasks_total", "Work queue tasks executed by kind and outcome", ("kind", "outcome")
+        )
+
+    async def run(self, stop_when_idle: bool = False, max_tasks: Optional[int] = None) -> None:
+        """
+        Process tasks until cancelled.
+
+        ``stop_when_idle`` returns once the queue has no pending or leased
+        tasks; ``max_tasks`` returns after that many tasks.
+        """
+        config = get_config()
+        self.pipeline.render_pool = RenderPool(self.concurrency)
+        try:
+            async with shared_session(limit=config.MAX_CONCURRENT_REQUESTS):
+                await asyncio.gather(*[
+                    self._loop(stop_when_idle, max_tasks) for _ in range(self.concurrency)
+                ])
+        finally:
+            await asyncio.to_thread(self.pipeline.render_pool.shutdown)
+            self.pipeline.render_pool = None
+
+    async def _loop(self, stop_when_idle: bool, max_tasks: Optional[int]) -> None:
+        while max_tasks is None or self.completed + self.failed < max_tasks:
+            # Queue calls are blocking SQLite transactions (up to its busy timeout), so
+            # they run off the event loop that the other slots' API calls share
+            task = await asyncio.to_thread(self.queue.claim, self.worker_id, self.lease_seconds)
+            if task is None:
+                counts = await asyncio.to_thread(self.queue.counts)
+                if stop_when_idle and counts[PENDING] == 0 and counts[LEASED] == 0:
+                    return
+                await asyncio.sleep(self.poll_interval)
+                continue
+            await self.execute(task)
+
+    async def execute(self, task: Dict[str, Any]) -> bool:
+        """Run one claimed task and record its outcome; True on success."""
+        heartbeat = asyncio.create_task(self._heartbeat(task["task_id"]))
+        handler = {
+            COMPLIANCE_TASK: self._run_compliance,
+            HERO_TASK: self._run_hero,
+            LOCALIZE_TASK: self._run_localize,
+            RENDER_TASK: self._run_render,
+        }[task["kind"]]
+        start = time.perf_counter()
+        try:
+            context = await self._context(task["run_id"])
+            result = await handler(task, context)
+        except TaskFailure as e:
+            await self._record_failure(task, str(e), retry=False)
+            return False
+        except Exception as e:
+            await self._record_failure(task, f"{type(e).__name__}: {e}", retry=True)
+            return False
+        finally:
+            heartbeat.cancel()
+
+        result.setdefault("elapsed_ms", (time.perf_counter() - start) * 1000)
+        result["worker"] = self.worker_id
+        if not await asyncio.to_thread(self.queue.complete, task["task_id"], self.worker_id, result):
+            print(f"⚠️  Lease on {task['task_id']} was lost; result discarded")
+            return False
+        self.completed += 1
+        self._tasks_total.inc(kind=task["kind"], outcome="done")
+        return True
+
+    async def _record_failure(self, task: Dict[str, Any], error: str, retry: bool) -> None:
+        print(f"❌ Task {task['task_id']} failed (attempt {task['attempts']}): {error}")
+        await asyncio.to_thread(self.queue.fail, task["task_id"], self.worker_id, error, retry=retry)
+        self.failed += 1
+        self._tasks_total.inc(kind=task["kind"], outcome="failed")
+
+    async def _heartbeat(self, task_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await asyncio.to_thread(self.queue.extend_lease, task_id, self.worker_id, self.lease_seconds):
+                print(f"⚠️  Lost lease on {task_id}")
+                return
+
+    async def _context(self, run_id: str) -> _RunContext:
+        """Load (once per run) the brief and its guidelines."""
+        context = self._runs.get(run_id)
+        if context is not None:
+            self._runs.move_to_end(run_id)
+            return context
+
+        run = await asyncio.to_thread(self.queue.get_run, run_id)
+        if run is None:
+            raise TaskFailure(f"Unknown run: '{run_id}'")
+        brief = CampaignBrief(**run["brief"])
+        brand_guidelines = None
+        localization_guidelines = None
+        if brief.brand_guidelines_file:
+            brand_guidelines = await self._load_guidelines(self.pipeline.brand_parser, brief.brand_guidelines_file)
+        if brief.enable_localization and brief.localization_guidelines_file:
+            localization_guidelines = await self._load_guidelines(self.pipeline.locale_parser, brief.localization_guidelines_file)
+
+        context = _RunContext(
+            brief=brief,
+            backend=self.image_backend or brief.image_generation_backend,
+            brand_guidelines=brand_guidelines,
+            localization_guidelines=localization_guidelines
+        )
+        self._runs[run_id] = context
+        while len(self._runs) > 16:
+            self._runs.popitem(last=False)
+        return context
+
+    async def _load_guidelines(self, parser, file_path: str):
+        # As in process_campaign, unreadable guidelines are a warning, not a failure
+        try:
+            return await self.pipeline._parse_guidelines(parser, file_path)
+        except Exception as e:
+            print(f"⚠️  Error loading guidelines from {file_path}: {e}")
+            return None
+
+    def _image_service(self, backend: str):
+        if backend not in self._image_services:
+            self._image_services[backend] = self.pipeline._create_image_service(backend)[0]
+        return self._image_services[backend]
+
+    # Task handlers
+
+    async def _run_compliance(self, task: Dict[str, Any], context: _RunContext) -> Dict[str, Any]:
+        brief = context.brief
+        try:
+            legal_guidelines = await self.pipeline._parse_guidelines(self.pipeline.legal_parser, brief.legal_compliance_file)
+        except Exception as e:
+            print(f"⚠️  Error loading legal guidelines: {e}")
+            return {"checked": False}
+        try:
+            self.pipeline._check_legal_compliance(brief, legal_guidelines)
+        except Exception as e:
+            raise TaskFailure(str(e))
+        return {"checked": True}
+
+    async def _run_hero(self, task: Dict[str, Any], context: _RunContext) -> Dict[str, Any]:
+        brief = context.brief
+        product = context.product(task["payload"]["product_id"])
+
+        existing = (product.existing_assets or {}).get("hero")
+        if existing and Path(existing).exists():
+            hero_bytes = Path(existing).read_bytes()
+            return {
+                "path": existing,
+                "fingerprint": fingerprint("hero-file", hashlib.sha256(hero_bytes).hexdigest()),
+                "backend": context.backend,
+                "source": "brief"
+            }
+
+        prompt = hero_prompt(product)
+        hero_fingerprint = fingerprint("hero", context.backend, prompt, HERO_IMAGE_SIZE, context.brand_guidelines)
+        record = self.pipeline.storage.manifest.lookup_hero(
+            brief.campaign_id, product.product_id, input_fingerprint=hero_fingerprint
+        )
+        if record:
+            return {
+                "path": record["file_path"],
+                "fingerprint": hero_fingerprint,
+                "backend": record["backend"] or context.backend,
+                "source": "manifest"
+            }
+
+        start = time.perf_counter()
+        hero_bytes, served_backend = await self._image_service(context.backend).generate_image_with_backend(
+            prompt,
+            size=HERO_IMAGE_SIZE,
+            brand_guidelines=context.brand_guidelines
+        )
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        hero_backend = served_backend or context.backend
+        path = self.pipeline._persist_hero(brief.campaign_id, product.product_id, hero_bytes, hero_fingerprint, hero_backend)
+        return {
+            "path": path,
+            "fingerprint": hero_fingerprint,
+            "backend": hero_backend,
+            "source": "generated",
+            "elapsed_ms": elapsed_ms
+        }
+
+    async def _run_localize(self, task: Dict[str, Any], context: _RunContext) -> Dict[str, Any]:
+        message = context.brief.campaign_message
+        if context.localization_guidelines is not None:
+            message = await self.pipeline._localize(message, task["payload"]["locale"], context.localization_guidelines)
+        return {"message": message.model_dump(mode="json")}
+
+    async def _run_render(self, task: Dict[str, Any], context: _RunContext) -> Dict[str, Any]:
+        brief = context.brief
+        storage = self.pipeline.storage
+        payload = task["payload"]
+        product = context.product(payload["product_id"])
+        locale, ratio, output_format = payload["locale"], payload["aspect_ratio"], payload["format"]
+
+        run_id = task["run_id"]
+        hero = (await asyncio.to_thread(self.queue.get_task, f"{run_id}:{HERO_TASK}:{product.product_id}"))["result"]
+        localized = await asyncio.to_thread(self.queue.get_task, f"{run_id}:{LOCALIZE_TASK}:{locale}")
+        message = CampaignMessage(**localized["result"]["message"]) if localized else brief.campaign_message
+
+        logo_path = (product.existing_assets or {}).get("logo")
+        if logo_path and not Path(logo_path).exists():
+            logo_path = None
+
+        variant_fingerprint = variant_input_fingerprint(
+            hero["fingerprint"],
+            brief.campaign_message,
+            locale,
+            context.localization_guidelines,
+            ratio,
+            output_format,
+            context.brand_guidelines,
+            logo_path
+        )
+
+        asset_path = None
+        asset_backend = hero["backend"]
+        existing = (product.existing_assets or {}).get(f"{locale}_{ratio}")
+        if existing and Path(existing).exists():
+            asset_path = existing
+        else:
+            record = storage.manifest.lookup_variant(
+                brief.campaign_id, product.product_id, locale, ratio, output_format,
+                input_fingerprint=variant_fingerprint
+            )
+            if record:
+                asset_path = record["file_path"]
+                asset_backend = record["backend"] or asset_backend
+
+        reused = asset_path is not None
+        if not reused:
+            hero_bytes = await asyncio.to_thread(Path(hero["path"]).read_bytes)
+            asset_path = storage.get_asset_path(brief.campaign_id, locale, product.product_id, ratio, output_format)
+            # The rendered frame stays resident until it is encoded, so its reservation covers the save too
+            async with self.pipeline._render_memory(hero_bytes, ratio, context.brand_guidelines, logo_path):
+                final_image = await self.pipeline._render_now(
+                    hero_bytes, ratio, message, context.brand_guidelines, logo_path
+                )
+                if self.pipeline.render_pool is not None:
+                    await self.pipeline.render_pool.run(storage.save_image, final_image, asset_path)
+                else:
+                    await asyncio.to_thread(storage.save_image, final_image, asset_path)
+                del final_image
+            storage.manifest.record(
+                brief.campaign_id,
+                product.product_id,
+                VARIANT_KIND,
+                str(asset_path),
+                variant_fingerprint,
+                locale=locale,
+                aspect_ratio=ratio,
+                format=output_format,
+                backend=hero["backend"]
+            )
+
+        asset = GeneratedAsset(
+            product_id=product.product_id,
+            locale=locale,
+            aspect_ratio=ratio,
+            file_path=str(asset_path),
+            generation_method=asset_backend,
+            timestamp=datetime.now()
+        )
+        return {"asset": asset.model_dump(mode="json"), "reused": reused}
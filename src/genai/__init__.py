@@ -1,19 +1,36 @@
-"""GenAI services for image generation and text processing."""
+"""GenAI services for image generation and text processing.
 
-from src.genai.claude import ClaudeService
-from src.genai.base import ImageGenerationService
-from src.genai.firefly import FireflyImageService
-from src.genai.openai_service import OpenAIImageService
-from src.genai.gemini_service import GeminiImageService
-from src.genai.claude_service_image import ClaudeImageService
-from src.genai.factory import ImageGenerationFactory
+Services are imported on first attribute access, so importing one module
+(e.g. ``src.genai.factory``) doesn't load every backend and aiohttp.
+"""
+import importlib
 
-__all__ = [
-    "ClaudeService",
-    "ImageGenerationService",
-    "FireflyImageService",
-    "OpenAIImageService",
-    "GeminiImageService",
-    "ClaudeImageService",
-    "ImageGenerationFactory",
-]
+_EXPORTS = {
+    "ClaudeService": "src.genai.claude",
+    "ImageGenerationService": "src.genai.base",
+    "GeneratedImage": "src.genai.base",
+    "FireflyImageService": "src.genai.firefly",
+    "OpenAIImageService": "src.genai.openai_service",
+    "GeminiImageService": "src.genai.gemini_service",
+    "ClaudeImageService": "src.genai.claude_service_image",
+    "LocalImageService": "src.genai.local_service",
+    "ImageGenerationFactory": "src.genai.factory",
+    "SingleFlightImageService": "src.genai.single_flight",
+    "FailoverImageService": "src.genai.failover",
+    "CircuitBreaker": "src.genai.failover",
+    "HedgedImageService": "src.genai.hedging",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,11 +1,27 @@
 """Abstract base class for image generation services."""
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from typing import Optional
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
 from src.models import ComprehensiveBrandGuidelines
 
 
+@dataclass
+class GeneratedImage:
+    """One image candidate returned by a (possibly batched) request."""
+    image_bytes: bytes
+    index: int
+    elapsed_ms: float  # Latency of the provider call that produced this image
+    batch_size: int  # Number of images that call returned
+    backend: str
+
+
 class ImageGenerationService(ABC):
     """Abstract base class for all image generation backends."""
+
+    # Maximum images a single provider request can return
+    MAX_BATCH_SIZE = 1
     
     def __init__(self, api_key: str, max_retries: int = 3):
         self.api_key = api_key
@@ -31,7 +47,97 @@ class ImageGenerationService(ABC):
             bytes: Raw image data
         """
         pass
+
+    async def generate_image_with_backend(
+        self,
+        prompt: str,
+        size: str = "1024x1024",
+        brand_guidelines: Optional[ComprehensiveBrandGuidelines] = None
+    ) -> Tuple[bytes, Optional[str]]:
+        """
+        Generate an image and report which backend served it.
+
+        Composite services (e.g. failover) return the serving backend name;
+        single backends return None, meaning "this service".
+        """
+        image_bytes = await self.generate_image(prompt, size=size, brand_guidelines=brand_guidelines)
+        return image_bytes, None
+
+    async def generate_images(
+        self,
+        prompt: str,
+        count: int,
+        size: str = "1024x1024",
+        brand_guidelines: Optional[ComprehensiveBrandGuidelines] = None
+    ) -> List[GeneratedImage]:
+        """
+        Generate several candidate images for one prompt.
+
+        Uses the provider's native batch parameter and splits into
+        concurrent requests of at most MAX_BATCH_SIZE images.
+
+        Args:
+            prompt: Text description of the image to generate
+            count: Number of candidates to return
+            size: Image dimensions (format depends on backend)
+            brand_guidelines: Optional brand guidelines to apply
+
+        Returns:
+            List of GeneratedImage candidates in request order
+        """
+        if count < 1:
+            raise ValueError(f"Image count must be at least 1, got {count}")
+
+        batch_sizes = [
+            min(self.MAX_BATCH_SIZE, count - start)
+            for start in range(0, count, self.MAX_BATCH_SIZE)
+        ]
+
+        async def run_batch(batch_size: int) -> tuple[List[bytes], float]:
+            start = time.perf_counter()
+            images = await self._generate_batch(prompt, batch_size, size, brand_guidelines)
+            return images, (time.perf_counter() - start) * 1000
+
+        results = await asyncio.gather(*[run_batch(n) for n in batch_sizes])
+
+        candidates: List[GeneratedImage] = []
+        for images, elapsed_ms in results:
+            for image_bytes in images:
+                candidates.append(GeneratedImage(
+                    image_bytes=image_bytes,
+                    index=len(candidates),
+                    elapsed_ms=elapsed_ms,
+                    batch_size=len(images),
+                    backend=self.get_backend_name()
+                ))
+        return candidates
+
+    async def _generate_batch(
+        self,
+        prompt: str,
+        count: int,
+        size: str,
+        brand_guidelines: Optional[ComprehensiveBrandGuidelines]
+    ) -> List[bytes]:
+        """
+        Generate up to MAX_BATCH_SIZE images in one provider request.
+
+        Backends with a native batch parameter override this; the default
+        issues one generate_image call per image.
+        """
+        return [
+            await self.generate_image(prompt, size=size, brand_guidelines=brand_guidelines)
+            for _ in range(count)
+        ]
     
+    def _require_batch_size(self, images: List[bytes], count: int) -> List[bytes]:
+        """Fail clearly when a provider returns fewer images than requested."""
+        if len(images) != count:
+            raise Exception(
+                f"{self.get_backend_name()} returned {len(images)} of {count} requested images"
+            )
+        return images
+
     def _build_brand_compliant_prompt(
         self,
         base_prompt: str,
@@ -59,6 +165,16 @@ class ImageGenerationService(ABC):
         
         return enhanced
     
+    def backend_identity(self) -> Tuple:
+        """
+        Identify where requests go: backend, configured endpoint and key.
+
+        Requests to services with the same identity are interchangeable, so
+        single-flight coalescing keys on it. Composite services combine the
+        identities of the services they wrap.
+        """
+        return (self.get_backend_name(), getattr(self, "api_url", None), self.api_key)
+
     @abstractmethod
     def get_backend_name(self) -> str:
         """Return the backend name for logging/reporting."""
@@ -0,0 +1,47 @@
+"""Per-campaign accounting of image requests made through shared service chains."""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+
+class ImageCallStats:
+    """
+    Coalescing, hedging and failover events caused by one campaign.
+
+    Service chains are shared by concurrently running campaigns (a batch or
+    the server), so their own counters mix every campaign's calls. Events
+    are recorded here instead, in the context of the caller that made the
+    request; tasks a service spawns inherit that context.
+    """
+
+    def __init__(self):
+        self.coalesced_requests = 0  # Served by another caller's in-flight request
+        self.hedge_requests = 0  # Requests that went through the hedger
+        self.hedged_requests = 0  # Duplicate requests fired
+        self.hedge_wins = 0  # Duplicates that returned first
+        self.failover_events: List[str] = []  # Attempts that failed over to the next backend
+        self.skip_events: List[str] = []  # Backends passed over while their circuit was open
+
+    @property
+    def hedge_rate(self) -> float:
+        """Percentage of hedger requests that fired a hedge (0-100)."""
+        return self.hedged_requests / self.hedge_requests * 100 if self.hedge_requests else 0.0
+
+
+_current: ContextVar[Optional[ImageCallStats]] = ContextVar("current_image_call_stats", default=None)
+
+
+@contextmanager
+def collect() -> Iterator[ImageCallStats]:
+    """Attribute image requests made anywhere in the enclosed block."""
+    stats = ImageCallStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def current() -> Optional[ImageCallStats]:
+    """The active collection, if any."""
+    return _current.get()
@@ -4,6 +4,8 @@ import json
 import asyncio
 from typing import Dict, Any, Optional
 from src.config import get_config
+from src import metrics
+from src.genai.http import client_session
 from src.models import ComprehensiveBrandGuidelines, LocalizationGuidelines, CampaignMessage
 
 
@@ -186,13 +188,14 @@ Make it culturally appropriate and engaging for {target_locale} market."""
         
         for attempt in range(self.max_retries):
             try:
-                async with aiohttp.ClientSession() as session:
+                async with client_session() as session:
                     async with session.post(
                         self.api_url,
                         headers=headers,
                         json=payload,
                         timeout=aiohttp.ClientTimeout(total=30)
                     ) as response:
+                        metrics.record_api_response("claude", response.status)
                         if response.status == 200:
                             data = await response.json()
                             # Safely extract response with validation
@@ -1,25 +1,56 @@
 """Factory for creating image generation service instances."""
-from typing import Optional
+import importlib
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Type, TYPE_CHECKING
 from src.genai.base import ImageGenerationService
-from src.genai.firefly import FireflyImageService
-from src.genai.openai_service import OpenAIImageService
-from src.genai.gemini_service import GeminiImageService
-from src.genai.claude_service_image import ClaudeImageService
+
+if TYPE_CHECKING:
+    from src.genai.failover import FailoverImageService
+
+
+class LazyBackendRegistry(Mapping):
+    """
+    Backend name -> service class, importing each backend module on first lookup.
+
+    Backends pull in aiohttp and provider-specific code, so listing or
+    validating backends stays cheap until a service is actually created.
+    """
+
+    def __init__(self, paths: Dict[str, str]):
+        self._paths = dict(paths)  # name -> "module:ClassName"
+        self._classes: Dict[str, Type[ImageGenerationService]] = {}
+
+    def __getitem__(self, name: str) -> Type[ImageGenerationService]:
+        if name not in self._classes:
+            module_name, class_name = self._paths[name].split(":")
+            self._classes[name] = getattr(importlib.import_module(module_name), class_name)
+        return self._classes[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._paths
 
 
 class ImageGenerationFactory:
     """Factory for creating image generation service instances based on backend."""
     
     # Registry of available backends
-    BACKENDS = {
-        "firefly": FireflyImageService,
-        "openai": OpenAIImageService,
-        "dall-e": OpenAIImageService,  # Alias
-        "dalle": OpenAIImageService,   # Alias
-        "gemini": GeminiImageService,
-        "imagen": GeminiImageService,  # Alias
-        "claude": ClaudeImageService,  # Placeholder for future
-    }
+    BACKENDS = LazyBackendRegistry({
+        "firefly": "src.genai.firefly:FireflyImageService",
+        "openai": "src.genai.openai_service:OpenAIImageService",
+        "dall-e": "src.genai.openai_service:OpenAIImageService",  # Alias
+        "dalle": "src.genai.openai_service:OpenAIImageService",   # Alias
+        "gemini": "src.genai.gemini_service:GeminiImageService",
+        "imagen": "src.genai.gemini_service:GeminiImageService",  # Alias
+        "claude": "src.genai.claude_service_image:ClaudeImageService",  # Placeholder for future
+        "local": "src.genai.local_service:LocalImageService",  # Offline procedural images
+        "synthetic": "src.genai.local_service:LocalImageService",  # Alias
+    })
     
     @staticmethod
     def create(
@@ -32,7 +63,7 @@ class ImageGenerationFactory:
         Create an image generation service instance.
         
         Args:
-            backend: Backend name ('firefly', 'openai', 'gemini', 'claude')
+            backend: Backend name ('firefly', 'openai', 'gemini', 'claude', 'local')
             api_key: Optional API key (will use config if not provided)
             client_id: Optional client ID (Firefly only)
             max_retries: Maximum retry attempts
@@ -67,6 +98,42 @@ class ImageGenerationFactory:
                 max_retries=max_retries
             )
     
+    @staticmethod
+    def create_failover(
+        backends: List[str],
+        max_retries: Optional[int] = None
+    ) -> "FailoverImageService":
+        """
+        Create a failover service over an ordered list of backends.
+
+        Each backend gets its own circuit breaker; backends whose breaker is
+        open are skipped without a request. Per-backend retries default to
+        FAILOVER_MAX_RETRIES since the next backend acts as the retry.
+
+        Args:
+            backends: Backend names in priority order
+            max_retries: Retry attempts per backend (config default if None)
+
+        Returns:
+            FailoverImageService instance
+        """
+        from src.config import get_config
+        from src.genai.failover import FailoverImageService
+
+        if max_retries is None:
+            max_retries = get_config().FAILOVER_MAX_RETRIES
+
+        services = []
+        for backend in backends:
+            backend_lower = backend.lower()
+            if any(name == backend_lower for name, _ in services):
+                continue
+            services.append((
+                backend_lower,
+                ImageGenerationFactory.create(backend_lower, max_retries=max_retries)
+            ))
+        return FailoverImageService(services)
+
     @staticmethod
     def list_backends() -> list[str]:
         """Return list of available backend names."""
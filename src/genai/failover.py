@@ -0,0 +1,212 @@
+"""Cross-backend failover with per-backend circuit breakers."""
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from src.genai import call_stats
+from src.genai.base import GeneratedImage, ImageGenerationService
+from src.models import ComprehensiveBrandGuidelines
+from src.config import get_config
+
+
+class CircuitBreaker:
+    """
+    Track the health of one backend.
+
+    The breaker opens after ``failure_threshold`` consecutive failures (a
+    call slower than ``latency_threshold_ms`` counts as a failure). While
+    open, requests are rejected immediately. After ``reset_timeout`` seconds
+    a single half-open probe is let through; success closes the breaker,
+    failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        latency_threshold_ms: Optional[float] = None,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = failure_threshold
+        self.latency_threshold_ms = latency_threshold_ms
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """Current state, moving OPEN to HALF_OPEN once the timeout elapses."""
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent to the backend now."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self, latency_ms: float = 0.0) -> None:
+        """Record a completed call; slow calls count as failures."""
+        if self.latency_threshold_ms and latency_ms > self.latency_threshold_ms:
+            self.record_failure()
+            return
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Give back a half-open probe whose call was cancelled."""
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a failed call, opening the breaker when over threshold."""
+        self._consecutive_failures += 1
+        self._probe_in_flight = False
+        if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            self._state = self.OPEN
+            self._opened_at = self._clock()
+
+
+# Breakers are shared per backend so every campaign in a process sees the same health
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(backend: str) -> CircuitBreaker:
+    """Get the process-wide circuit breaker for a backend."""
+    if backend not in _circuit_breakers:
+        config = get_config()
+        _circuit_breakers[backend] = CircuitBreaker(
+            failure_threshold=config.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+            latency_threshold_ms=config.CIRCUIT_BREAKER_LATENCY_MS or None,
+            reset_timeout=config.CIRCUIT_BREAKER_RESET_SECONDS
+        )
+    return _circuit_breakers[backend]
+
+
+class FailoverImageService(ImageGenerationService):
+    """
+    Try an ordered list of backends, skipping any whose breaker is open.
+
+    ``generate_image_with_backend`` reports which backend actually served
+    the request so it can be recorded on each generated asset.
+    """
+
+    def __init__(
+        self,
+        services: List[Tuple[str, ImageGenerationService]],
+        breakers: Optional[Dict[str, CircuitBreaker]] = None
+    ):
+        if not services:
+            raise ValueError("Failover requires at least one backend")
+        primary = services[0][1]
+        super().__init__(api_key=primary.api_key, max_retries=primary.max_retries)
+        self.services = services
+        self.breakers = breakers or {name: get_circuit_breaker(name) for name, _ in services}
+        self.failover_events: List[str] = []  # Attempts that failed over to the next backend
+        self.skip_events: List[str] = []  # Backends passed over, untried, while their circuit was open
+
+    async def generate_image(
+        self,
+        prompt: str,
+        size: str = "1024x1024",
+        brand_guidelines: Optional[ComprehensiveBrandGuidelines] = None
+    ) -> bytes:
+        """Generate an image from the first healthy backend."""
+        image_bytes, _ = await self.generate_image_with_backend(prompt, size, brand_guidelines)
+        return image_bytes
+
+    async def generate_image_with_backend(
+        self,
+        prompt: str,
+        size: str = "1024x1024",
+        brand_guidelines: Optional[ComprehensiveBrandGuidelines] = None
+    ) -> Tuple[bytes, Optional[str]]:
+        """Generate an image and return it with the serving backend name."""
+        return await self._call_with_failover(
+            lambda service: service.generate_image(
+                prompt,
+                size=size,
+                brand_guidelines=brand_guidelines
+            )
+        )
+
+    async def generate_images(
+        self,
+        prompt: str,
+        count: int,
+        size: str = "1024x1024",
+        brand_guidelines: Optional[ComprehensiveBrandGuidelines] = None
+    ) -> List[GeneratedImage]:
+        """Generate a batch of candidates from the first healthy backend."""
+        images, _ = await self._call_with_failover(
+            lambda service: service.generate_images(
+                prompt,
+                count,
+                size=size,
+                brand_guidelines=brand_guidelines
+            )
+        )
+        return images
+
+    async def _call_with_failover(self, call):
+        errors = []
+        stats = call_stats.current()
+        for name, service in self.services:
+            breaker = self.breakers[name]
+            if not breaker.allow_request():
+                errors.append(f"{name}: circuit open")
+                self.skip_events.append(f"{name}: skipped (circuit open)")
+                if stats is not None:
+                    stats.skip_events.append(f"{name}: skipped (circuit open)")
+                continue
+
+            start = time.perf_counter()
+            try:
+                result = await call(service)
+            except asyncio.CancelledError:
+                # Cancelled (e.g. a losing hedge) says nothing about backend health
+                breaker.release_probe()
+                raise
+            except Exception as e:
+                breaker.record_failure()
+                errors.append(f"{name}: {e}")
+                self.failover_events.append(f"{name}: {e}")
+                if stats is not None:
+                    stats.failover_events.append(f"{name}: {e}")
+                print(f"  ⚠️  Backend '{name}' failed, trying next: {e}")
+                continue
+
+            breaker.record_success((time.perf_counter() - start) * 1000)
+            return result, name
+
+        raise Exception(f"All image backends failed: {'; '.join(errors)}")
+
+    def backend_identity(self) -> Tuple:
+        """Identities of every backend in the chain, in order."""
+        return tuple(service.backend_identity() for _, service in self.services)
+
+    def get_backend_name(self) -> str:
+        """Return the ordered backend chain."""
+        return " → ".join(service.get_backend_name() for _, service in self.services)
+
+    def validate_config(self) -> tuple[bool, list[str]]:
+        """Valid when at least one backend in the chain is configured."""
+        all_errors = []
+        for name, service in self.services:
+            is_valid, errors = service.validate_config()
+            if is_valid:
+                return True, []
+            all_errors.extend(f"{name}: {error}" for error in errors)
+        return False, all_errors
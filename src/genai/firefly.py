@@ -1,14 +1,19 @@
 """Adobe Firefly API service for image generation."""
 import aiohttp
 import asyncio
-from typing import Optional
+from typing import List, Optional
 from src.genai.base import ImageGenerationService
 from src.models import ComprehensiveBrandGuidelines
 from src.config import get_config
+from src import metrics
+from src.genai.http import client_session
 
 
 class FireflyImageService(ImageGenerationService):
     """Service for generating images using Adobe Firefly API."""
+
+    # Firefly returns up to 4 variations per request
+    MAX_BATCH_SIZE = 4
     
     def __init__(
         self,
@@ -31,6 +36,17 @@ class FireflyImageService(ImageGenerationService):
         brand_guidelines: Optional[ComprehensiveBrandGuidelines] = None
     ) -> bytes:
         """Generate image using Firefly API."""
+        images = await self._generate_batch(prompt, 1, size, brand_guidelines)
+        return images[0]
+
+    async def _generate_batch(
+        self,
+        prompt: str,
+        count: int,
+        size: str,
+        brand_guidelines: Optional[ComprehensiveBrandGuidelines]
+    ) -> List[bytes]:
+        """Generate up to MAX_BATCH_SIZE images in one Firefly request."""
         
         # Enhance prompt with brand guidelines
         if brand_guidelines:
@@ -48,12 +64,12 @@ class FireflyImageService(ImageGenerationService):
             "prompt": prompt,
             "size": {"width": width, "height": height},
             "contentClass": "photo",
-            "n": 1
+            "n": count
         }
         
         for attempt in range(self.max_retries):
             try:
-                async with aiohttp.ClientSession() as session:
+                async with client_session() as session:
                     # Generate image
                     async with session.post(
                         self.api_url,
@@ -61,16 +77,19 @@ class FireflyImageService(ImageGenerationService):
                         json=payload,
                         timeout=aiohttp.ClientTimeout(total=60)
                     ) as response:
+                        metrics.record_api_response("firefly", response.status)
                         if response.status == 200:
                             data = await response.json()
-                            image_url = data['outputs'][0]['image']['url']
+                            image_urls = self._require_batch_size([
+                                output['image']['url']
+                                for output in data['outputs'][:count]
+                            ], count)
                             
-                            # Download image
-                            async with session.get(image_url) as img_response:
-                                if img_response.status == 200:
-                                    return await img_response.read()
-                                else:
-                                    raise Exception(f"Image download failed: {img_response.status}")
+                            # Download images concurrently
+                            return list(await asyncio.gather(*[
+                                self._download_image(session, image_url)
+                                for image_url in image_urls
+                            ]))
                         
                         elif response.status == 429:
                             await asyncio.sleep(2 ** attempt)
@@ -90,6 +109,13 @@ class FireflyImageService(ImageGenerationService):
                 raise
         
         raise Exception("Max retries exceeded for Firefly API")
+
+    async def _download_image(self, session: aiohttp.ClientSession, image_url: str) -> bytes:
+        """Download a generated image from its pre-signed URL."""
+        async with session.get(image_url) as img_response:
+            if img_response.status == 200:
+                return await img_response.read()
+            raise Exception(f"Image download failed: {img_response.status}")
     
     def get_backend_name(self) -> str:
         """Return backend name."""
@@ -3,15 +3,20 @@ import aiohttp
 import asyncio
 import base64
 import json
-from typing import Optional
+from typing import List, Optional
 from src.genai.base import ImageGenerationService
 from src.models import ComprehensiveBrandGuidelines
 from src.config import get_config
+from src import metrics
+from src.genai.http import client_session
 
 
 class GeminiImageService(ImageGenerationService):
     """Service for generating images using Google Gemini Imagen 4."""
 
+    # Imagen accepts sampleCount between 1 and 4
+    MAX_BATCH_SIZE = 4
+
     def __init__(self, api_key: Optional[str] = None, max_retries: int = 3):
         config = get_config()
         super().__init__(
@@ -21,7 +26,7 @@ class GeminiImageService(ImageGenerationService):
         # Using Imagen 4 via Google AI Studio API (latest version as of 2025/2026)
         # Note: This uses the generativelanguage API with API key authentication
         # Available models: imagen-4.0-generate-001 (standard), imagen-4.0-fast-generate-001, imagen-4.0-ultra-generate-001
-        self.api_url = "https://generativelanguage.googleapis.com/v1beta/models/imagen-4.0-generate-001:predict"
+        self.api_url = config.GEMINI_API_URL
         self.model = "imagen-4.0-generate-001"
 
     async def generate_image(
@@ -31,6 +36,17 @@ class GeminiImageService(ImageGenerationService):
         brand_guidelines: Optional[ComprehensiveBrandGuidelines] = None
     ) -> bytes:
         """Generate image using Gemini Imagen 4."""
+        images = await self._generate_batch(prompt, 1, size, brand_guidelines)
+        return images[0]
+
+    async def _generate_batch(
+        self,
+        prompt: str,
+        count: int,
+        size: str,
+        brand_guidelines: Optional[ComprehensiveBrandGuidelines]
+    ) -> List[bytes]:
+        """Generate up to MAX_BATCH_SIZE images in one Imagen request."""
 
         # Enhance prompt with brand guidelines
         if brand_guidelines:
@@ -53,7 +69,7 @@ class GeminiImageService(ImageGenerationService):
                 }
             ],
             "parameters": {
-                "sampleCount": 1,
+                "sampleCount": count,
                 "aspectRatio": self._get_aspect_ratio(width, height)
             }
         }
@@ -68,22 +84,27 @@ class GeminiImageService(ImageGenerationService):
 
         for attempt in range(self.max_retries):
             try:
-                async with aiohttp.ClientSession() as session:
+                async with client_session() as session:
                     async with session.post(
                         self.api_url,
                         headers=headers,
                         json=payload,
                         timeout=aiohttp.ClientTimeout(total=60)
                     ) as response:
+                        metrics.record_api_response("gemini", response.status)
                         if response.status == 200:
                             data = await response.json()
                             # Imagen predict endpoint returns base64 encoded images
                             # Response format: {"predictions": [{"bytesBase64Encoded": "..."}]}
+                            # Safety-filtered images are omitted or carry only a raiFilteredReason
                             if 'predictions' in data:
-                                image_b64 = data['predictions'][0]['bytesBase64Encoded']
+                                return self._require_batch_size([
+                                    base64.b64decode(prediction['bytesBase64Encoded'])
+                                    for prediction in data['predictions']
+                                    if 'bytesBase64Encoded' in prediction
+                                ][:count], count)
                             else:
                                 raise Exception(f"Unexpected response format: {data.keys()}")
-                            return base64.b64decode(image_b64)
 
                         elif response.status == 429:
                             await asyncio.sleep(2 ** attempt)
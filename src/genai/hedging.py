@@ -0,0 +1,176 @@
+"""Hedged image requests to cut tail latency."""
+import asyncio
+import math
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+from src.genai.base import GeneratedImage, ImageGenerationService
+from src.genai import call_stats
+from src.models import ComprehensiveBrandGuidelines
+
+
+class HedgedImageService(ImageGenerationService):
+    """
+    Fire a duplicate request when the first one is slower than usual.
+
+    If a request has not returned after the configured percentile of the
+    latencies observed so far, a second request is sent to ``hedge_service``
+    (the same backend by default). The first successful result wins and the
+    other request is cancelled. Until ``min_samples`` latencies have been
+    observed, ``initial_delay_ms`` is used as the hedge delay. A primary
+    request cancelled because its hedge won is recorded at its elapsed
+    time, a lower bound on its latency, so slow requests still count.
+
+    Hedges are capped by ``max_hedge_ratio``: a duplicate is only fired if
+    the hedges sent so far, including it, stay within that fraction of
+    requests.
+    """
+
+    def __init__(
+        self,
+        service: ImageGenerationService,
+        hedge_service: Optional[ImageGenerationService] = None,
+        hedge_backend: Optional[str] = None,
+        percentile: float = 95.0,
+        initial_delay_ms: float = 10000.0,
+        min_samples: int = 5,
+        max_hedge_ratio: float = 0.1,
+        window: int = 100
+    ):
+        super().__init__(api_key=service.api_key, max_retries=service.max_retries)
+        self.service = service
+        self.hedge_service = hedge_service or service
+        self.hedge_backend = hedge_backend
+        self.percentile = percentile
+        self.initial_delay_ms = initial_delay_ms
+        self.min_samples = min_samples
+        self.max_hedge_ratio = max_hedge_ratio
+        self._latencies = deque(maxlen=window)
+        self.request_count = 0  # Requests received
+        self.hedge_count = 0  # Duplicate requests fired
+        self.hedge_wins = 0  # Duplicates that returned first
+
+    @property
+    def hedge_rate(self) -> float:
+        """Percentage of requests that fired a hedge (0-100)."""
+        return self.hedge_count / self.request_count * 100 if self.request_count else 0.0
+
+    def hedge_delay_ms(self) -> float:
+        """Delay before hedging: the observed latency percentile."""
+        if len(self._latencies) < self.min_samples:
+            return self.initial_delay_ms
+        ordered = sorted(self._latencies)
+        rank = max(1, math.ceil(self.percentile / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+    def _budget_allows_hedge(self) -> bool:
+        return self.hedge_count + 1 <= self.max_hedge_ratio * self.request_count
+
+    async def generate_image(
+        self,
+        prompt: str,
+        size: str = "1024x1024",
+        brand_guidelines: Optional[ComprehensiveBrandGuidelines] = None
+    ) -> bytes:
+        """Generate an image, hedging if the request runs long."""
+        image_bytes, _ = await self.generate_image_with_backend(prompt, size, brand_guidelines)
+        return image_bytes
+
+    async def generate_image_with_backend(
+        self,
+        prompt: str,
+        size: str = "1024x1024",
+        brand_guidelines: Optional[ComprehensiveBrandGuidelines] = None
+    ) -> Tuple[bytes, Optional[str]]:
+        """Hedged generate_image that also reports the serving backend."""
+        self.request_count += 1
+        stats = call_stats.current()
+        if stats is not None:
+            stats.hedge_requests += 1
+        primary = asyncio.ensure_future(
+            self._timed_call(self.service, prompt, size, brand_guidelines, record_cancelled=True)
+        )
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay_ms() / 1000)
+            if done or not self._budget_allows_hedge():
+                return await primary
+
+            self.hedge_count += 1
+            if stats is not None:
+                stats.hedged_requests += 1
+            hedge = asyncio.ensure_future(
+                self._timed_call(self.hedge_service, prompt, size, brand_guidelines)
+            )
+            tasks.append(hedge)
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        image_bytes, served_by = task.result()
+                        if task is hedge:
+                            self.hedge_wins += 1
+                            if stats is not None:
+                                stats.hedge_wins += 1
+                            served_by = served_by or self.hedge_backend
+                        return image_bytes, served_by
+
+            # Both failed: surface the original request's error
+            return primary.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def generate_images(
+        self,
+        prompt: str,
+        count: int,
+        size: str = "1024x1024",
+        brand_guidelines: Optional[ComprehensiveBrandGuidelines] = None
+    ) -> List[GeneratedImage]:
+        """Forward batch requests unhedged; a batch already spreads its risk."""
+        return await self.service.generate_images(
+            prompt,
+            count,
+            size=size,
+            brand_guidelines=brand_guidelines
+        )
+
+    async def _timed_call(
+        self,
+        service: ImageGenerationService,
+        prompt: str,
+        size: str,
+        brand_guidelines: Optional[ComprehensiveBrandGuidelines],
+        record_cancelled: bool = False
+    ) -> Tuple[bytes, Optional[str]]:
+        start = time.perf_counter()
+        try:
+            result = await service.generate_image_with_backend(
+                prompt,
+                size=size,
+                brand_guidelines=brand_guidelines
+            )
+        except asyncio.CancelledError:
+            # A hedge started late, so only the primary's elapsed time bounds its latency
+            if record_cancelled:
+                self._latencies.append((time.perf_counter() - start) * 1000)
+            raise
+        self._latencies.append((time.perf_counter() - start) * 1000)
+        return result
+
+    def backend_identity(self) -> Tuple:
+        """Identities of the primary and hedge backends (either may serve)."""
+        return (self.service.backend_identity(), self.hedge_service.backend_identity())
+
+    def get_backend_name(self) -> str:
+        """Return the wrapped backend name."""
+        return self.service.get_backend_name()
+
+    def validate_config(self) -> tuple[bool, list[str]]:
+        """Validate the wrapped backend configuration."""
+        return self.service.validate_config()
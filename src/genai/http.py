@@ -0,0 +1,43 @@
+"""Shared aiohttp session for provider calls."""
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Optional
+
+import aiohttp
+
+
+_shared_session: ContextVar[Optional[aiohttp.ClientSession]] = ContextVar("shared_session", default=None)
+
+
+@asynccontextmanager
+async def client_session() -> AsyncIterator[aiohttp.ClientSession]:
+    """
+    Yield the shared session when one is active, else a short-lived session.
+
+    Services call this instead of ``aiohttp.ClientSession()`` so a batch can
+    reuse one connection pool (and its keep-alive connections) across every
+    campaign, while single runs keep their per-request sessions.
+    """
+    session = _shared_session.get()
+    if session is not None and not session.closed:
+        yield session
+        return
+    async with aiohttp.ClientSession() as session:
+        yield session
+
+
+@asynccontextmanager
+async def shared_session(limit: int = 100, limit_per_host: int = 0) -> AsyncIterator[aiohttp.ClientSession]:
+    """
+    Share one pooled session with every ``client_session()`` in the block.
+
+    ``limit`` caps open connections across all providers (a global
+    concurrency budget); ``limit_per_host`` caps each provider (0 = no cap).
+    """
+    connector = aiohttp.TCPConnector(limit=limit, limit_per_host=limit_per_host)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        token = _shared_session.set(session)
+        try:
+            yield session
+        finally:
+            _shared_session.reset(token)
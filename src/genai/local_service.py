@@ -0,0 +1,173 @@
+"""Local synthetic image service for offline and load testing."""
+import asyncio
+import hashlib
+import io
+import random
+from typing import List, Optional
+from PIL import Image, ImageDraw
+from src.genai.base import ImageGenerationService
+from src.models import ComprehensiveBrandGuidelines
+from src.config import get_config
+from src import metrics
+
+
+class LocalImageService(ImageGenerationService):
+    """
+    Render deterministic procedural images without any network access.
+
+    The same prompt, size and brand guidelines always produce the same PNG.
+    Latency, server errors and 429 rate limits are simulated so concurrency,
+    caching and retry behaviour can be exercised at scale in CI.
+    """
+
+    # Simulated provider returns up to 4 images per request
+    MAX_BATCH_SIZE = 4
+
+    LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        max_retries: int = 3,
+        latency_ms: Optional[float] = None,
+        latency_distribution: Optional[str] = None,
+        latency_spread: Optional[float] = None,
+        error_rate: Optional[float] = None,
+        rate_limit_rate: Optional[float] = None,
+        seed: Optional[int] = None
+    ):
+        config = get_config()
+        super().__init__(api_key=api_key or "local", max_retries=max_retries)
+        self.latency_ms = config.LOCAL_LATENCY_MS if latency_ms is None else latency_ms
+        self.latency_distribution = (latency_distribution or config.LOCAL_LATENCY_DISTRIBUTION).lower()
+        self.latency_spread = config.LOCAL_LATENCY_SPREAD if latency_spread is None else latency_spread
+        self.error_rate = config.LOCAL_ERROR_RATE if error_rate is None else error_rate
+        self.rate_limit_rate = config.LOCAL_RATE_LIMIT_RATE if rate_limit_rate is None else rate_limit_rate
+        self._rng = random.Random(config.LOCAL_SEED if seed is None else seed)
+        self.request_count = 0
+        self.error_count = 0
+        self.rate_limited_count = 0
+
+        if self.latency_distribution not in self.LATENCY_DISTRIBUTIONS:
+            raise ValueError(
+                f"Unsupported latency distribution: '{self.latency_distribution}'. "
+                f"Available: {', '.join(self.LATENCY_DISTRIBUTIONS)}"
+            )
+
+    async def generate_image(
+        self,
+        prompt: str,
+        size: str = "1024x1024",
+        brand_guidelines: Optional[ComprehensiveBrandGuidelines] = None
+    ) -> bytes:
+        """Render a procedural image for the prompt."""
+        images = await self._generate_batch(prompt, 1, size, brand_guidelines)
+        return images[0]
+
+    async def _generate_batch(
+        self,
+        prompt: str,
+        count: int,
+        size: str,
+        brand_guidelines: Optional[ComprehensiveBrandGuidelines]
+    ) -> List[bytes]:
+        """Render up to MAX_BATCH_SIZE images behind one simulated request."""
+
+        # Enhance prompt with brand guidelines
+        if brand_guidelines:
+            prompt = self._build_brand_compliant_prompt(prompt, brand_guidelines)
+
+        width, height = map(int, size.split('x'))
+
+        for attempt in range(self.max_retries):
+            self.request_count += 1
+            await asyncio.sleep(self._sample_latency_ms() / 1000)
+
+            roll = self._rng.random()
+            if roll < self.rate_limit_rate:
+                self.rate_limited_count += 1
+                metrics.record_api_response("local", 429)
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(2 ** attempt)
+                    continue
+                raise Exception("Local API error: 429")
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.error_count += 1
+                metrics.record_api_response("local", 500)
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(2 ** attempt)
+                    continue
+                raise Exception("Local API error: 500")
+
+            metrics.record_api_response("local", 200)
+            # Rendering is CPU-bound; keep it off the event loop
+            return await asyncio.gather(*[
+                asyncio.to_thread(self.render, prompt, width, height, index)
+                for index in range(count)
+            ])
+
+        raise Exception("Max retries exceeded for local backend")
+
+    def _sample_latency_ms(self) -> float:
+        """Draw one simulated request latency."""
+        if self.latency_ms <= 0:
+            return 0.0
+        if self.latency_distribution == "uniform":
+            spread = self.latency_ms * self.latency_spread
+            return max(0.0, self._rng.uniform(self.latency_ms - spread, self.latency_ms + spread))
+        if self.latency_distribution == "exponential":
+            return self._rng.expovariate(1 / self.latency_ms)
+        if self.latency_distribution == "lognormal":
+            # latency_ms is the median; latency_spread is sigma, giving a heavy tail
+            return self._rng.lognormvariate(0, self.latency_spread) * self.latency_ms
+        return self.latency_ms
+
+    @staticmethod
+    def render(prompt: str, width: int, height: int, index: int = 0) -> bytes:
+        """
+        Render a deterministic PNG from a hash of the prompt.
+
+        Args:
+            prompt: Prompt text to derive colours and shapes from
+            width: Image width in pixels
+            height: Image height in pixels
+            index: Candidate index within a batch
+
+        Returns:
+            bytes: PNG image data
+        """
+        digest = hashlib.sha256(f"{prompt}|{width}x{height}|{index}".encode("utf-8")).digest()
+
+        start = tuple(digest[0:3])
+        end = tuple(digest[3:6])
+        gradient = Image.linear_gradient("L").rotate(digest[6] % 4 * 90).resize((width, height))
+        image = Image.composite(
+            Image.new("RGB", (width, height), end),
+            Image.new("RGB", (width, height), start),
+            gradient
+        )
+
+        draw = ImageDraw.Draw(image)
+        for i in range(4):
+            b = digest[8 + i * 6: 14 + i * 6]
+            cx = b[0] * width // 255
+            cy = b[1] * height // 255
+            radius = (b[2] % 64 + 16) * min(width, height) // 320
+            box = [cx - radius, cy - radius, cx + radius, cy + radius]
+            color = (b[3], b[4], b[5])
+            if b[2] % 2:
+                draw.ellipse(box, fill=color)
+            else:
+                draw.rectangle(box, fill=color)
+
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    def get_backend_name(self) -> str:
+        """Return backend name."""
+        return "Local Synthetic"
+
+    def validate_config(self) -> tuple[bool, list[str]]:
+        """The local backend needs no credentials."""
+        return True, []
@@ -0,0 +1,359 @@
+"""Local mock server emulating the Firefly, OpenAI, Gemini and Claude APIs."""
+import argparse
+import asyncio
+import base64
+import json
+import random
+import re
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from aiohttp import web
+from src.genai.local_service import LocalImageService
+
+
+PROVIDERS = ("firefly", "openai", "gemini", "claude")
+
+# Imagen aspect ratios rendered at the long edge of 1024
+GEMINI_ASPECT_SIZES = {
+    "1:1": (1024, 1024),
+    "16:9": (1024, 576),
+    "9:16": (576, 1024),
+    "4:3": (1024, 768),
+    "3:4": (768, 1024),
+}
+
+
+@dataclass
+class ProviderBehavior:
+    """Steady-state behaviour of one emulated provider."""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0  # Fraction of requests answered with 500
+    throttle_rate: float = 0.0  # Fraction of requests answered with 429
+
+
+@dataclass
+class InjectedFault:
+    """One-shot response override consumed by the next matching request."""
+    status: Optional[int] = None
+    latency_ms: float = 0.0
+    dropped_images: int = 0  # Images left out of a successful response (e.g. safety-filtered)
+
+
+@dataclass
+class RequestTrace:
+    """A request received by the mock server."""
+    provider: str
+    method: str
+    path: str
+    status: int
+    started_at: float
+    duration_ms: float
+    payload: Optional[Dict[str, Any]] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+class MockProviderServer:
+    """
+    Serve the request/response shapes the real image and text services parse.
+
+    Firefly and OpenAI responses point at image URLs served by this server,
+    Gemini returns base64 images and Claude returns a messages response, so
+    the services' download, decode and retry paths all run for real. Images
+    are rendered with ``LocalImageService.render``.
+
+    Behaviour is scriptable per provider: steady-state latency and
+    error/throttle rates via ``configure``, and one-shot faults (an error
+    status, extra latency or images missing from the response) via
+    ``inject``. Every request is recorded in ``traces``.
+
+    Usage:
+        async with MockProviderServer() as server:
+            monkeypatch.setenv("OPENAI_API_URL", server.urls["openai"])
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        image_size: Optional[Tuple[int, int]] = None,
+        seed: Optional[int] = None
+    ):
+        self.host = host
+        self.port = port
+        self.image_size = image_size  # Override the requested size (e.g. small images for benchmarks)
+        self.behaviors: Dict[str, ProviderBehavior] = {p: ProviderBehavior() for p in PROVIDERS}
+        self.traces: List[RequestTrace] = []
+        self.claude_response: Optional[str] = None
+        self._faults: Dict[str, Deque[InjectedFault]] = {p: deque() for p in PROVIDERS}
+        self._images: Dict[str, bytes] = {}
+        self._rng = random.Random(seed)
+        self._runner: Optional[web.AppRunner] = None
+
+        self.app = web.Application()
+        self.app.router.add_post("/firefly/v3/images/generate", self._handle_firefly)
+        self.app.router.add_post("/openai/v1/images/generations", self._handle_openai)
+        self.app.router.add_post("/gemini/v1beta/models/{model}", self._handle_gemini)
+        self.app.router.add_post("/claude/v1/messages", self._handle_claude)
+        self.app.router.add_get("/images/{image_id}", self._handle_image)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self) -> str:
+        """Start serving and return the base URL."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self.base_url
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "MockProviderServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def urls(self) -> Dict[str, str]:
+        """Endpoint URL per provider, as used by the service classes."""
+        return {
+            "firefly": f"{self.base_url}/firefly/v3/images/generate",
+            "openai": f"{self.base_url}/openai/v1/images/generations",
+            "gemini": f"{self.base_url}/gemini/v1beta/models/imagen-4.0-generate-001:predict",
+            "claude": f"{self.base_url}/claude/v1/messages",
+        }
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables that point the services at this server."""
+        return {
+            "FIREFLY_API_URL": self.urls["firefly"],
+            "OPENAI_API_URL": self.urls["openai"],
+            "GEMINI_API_URL": self.urls["gemini"],
+            "CLAUDE_API_URL": self.urls["claude"],
+        }
+
+    # ------------------------------------------------------------------
+    # Scripting
+    # ------------------------------------------------------------------
+
+    def configure(self, provider: str, **behavior) -> None:
+        """Set steady-state latency_ms, jitter_ms, error_rate or throttle_rate."""
+        current = self.behaviors[self._check_provider(provider)]
+        for name, value in behavior.items():
+            if not hasattr(current, name):
+                raise ValueError(f"Unknown behavior: '{name}'")
+            setattr(current, name, value)
+
+    def inject(
+        self,
+        provider: str,
+        status: Optional[int] = None,
+        latency_ms: float = 0.0,
+        count: int = 1,
+        dropped_images: int = 0
+    ) -> None:
+        """Queue ``count`` one-shot faults for the provider's next requests."""
+        faults = self._faults[self._check_provider(provider)]
+        for _ in range(count):
+            faults.append(InjectedFault(status=status, latency_ms=latency_ms, dropped_images=dropped_images))
+
+    def requests_for(self, provider: str) -> List[RequestTrace]:
+        """Recorded requests for one provider (``"images"`` for downloads)."""
+        return [trace for trace in self.traces if trace.provider == provider]
+
+    def reset(self) -> None:
+        """Clear traces, queued faults and behaviours."""
+        self.traces.clear()
+        for provider in PROVIDERS:
+            self.behaviors[provider] = ProviderBehavior()
+            self._faults[provider].clear()
+
+    @staticmethod
+    def _check_provider(provider: str) -> str:
+        if provider not in PROVIDERS:
+            raise ValueError(f"Unknown provider: '{provider}'. Available: {', '.join(PROVIDERS)}")
+        return provider
+
+    # ------------------------------------------------------------------
+    # Handlers
+    # ------------------------------------------------------------------
+
+    async def _handle_firefly(self, request: web.Request) -> web.Response:
+        async def respond(payload: Dict[str, Any], dropped: int) -> web.Response:
+            width = payload["size"]["width"]
+            height = payload["size"]["height"]
+            urls = await self._store_images(payload["prompt"], width, height, max(0, payload.get("n", 1) - dropped))
+            return web.json_response({"outputs": [{"seed": i, "image": {"url": url}} for i, url in enumerate(urls)]})
+
+        return await self._serve("firefly", request, respond)
+
+    async def _handle_openai(self, request: web.Request) -> web.Response:
+        async def respond(payload: Dict[str, Any], dropped: int) -> web.Response:
+            width, height = map(int, payload.get("size", "1024x1024").split("x"))
+            urls = await self._store_images(payload["prompt"], width, height, max(0, payload.get("n", 1) - dropped))
+            return web.json_response({"created": int(time.time()), "data": [{"url": url} for url in urls]})
+
+        return await self._serve("openai", request, respond)
+
+    async def _handle_gemini(self, request: web.Request) -> web.Response:
+        async def respond(payload: Dict[str, Any], dropped: int) -> web.Response:
+            parameters = payload.get("parameters", {})
+            width, height = GEMINI_ASPECT_SIZES.get(parameters.get("aspectRatio", "1:1"), (1024, 1024))
+            sample_count = parameters.get("sampleCount", 1)
+            images = await self._render(
+                payload["instances"][0]["prompt"], width, height, max(0, sample_count - dropped)
+            )
+            # Filtered samples come back as a reason instead of image bytes
+            filtered = [{"raiFilteredReason": "Filtered by the mock safety filter"}] * (sample_count - len(images))
+            return web.json_response({"predictions": [
+                {"bytesBase64Encoded": base64.b64encode(image).decode("ascii"), "mimeType": "image/png"}
+                for image in images
+            ] + filtered})
+
+        return await self._serve("gemini", request, respond)
+
+    async def _handle_claude(self, request: web.Request) -> web.Response:
+        async def respond(payload: Dict[str, Any], dropped: int) -> web.Response:
+            prompt = payload["messages"][-1]["content"]
+            text = self.claude_response if self.claude_response is not None else self._claude_text(prompt)
+            return web.json_response({
+                "id": f"msg_{uuid.uuid4().hex[:24]}",
+                "type": "message",
+                "role": "assistant",
+                "model": payload.get("model"),
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn",
+            })
+
+        return await self._serve("claude", request, respond)
+
+    async def _handle_image(self, request: web.Request) -> web.Response:
+        started_at = time.time()
+        # Pre-signed URLs are single-use here so long benchmark runs stay bounded
+        image = self._images.pop(request.match_info["image_id"], None)
+        response = web.Response(status=404) if image is None else web.Response(body=image, content_type="image/png")
+        self.traces.append(RequestTrace(
+            provider="images",
+            method=request.method,
+            path=request.path,
+            status=response.status,
+            started_at=started_at,
+            duration_ms=(time.time() - started_at) * 1000,
+        ))
+        return response
+
+    async def _serve(self, provider: str, request: web.Request, respond) -> web.Response:
+        """Apply latency and faults, then build the provider response."""
+        started_at = time.time()
+        start = time.perf_counter()
+        payload = await request.json()
+
+        behavior = self.behaviors[provider]
+        fault = self._faults[provider].popleft() if self._faults[provider] else None
+
+        latency_ms = behavior.latency_ms + fault.latency_ms if fault else behavior.latency_ms
+        if behavior.jitter_ms:
+            latency_ms += self._rng.uniform(0, behavior.jitter_ms)
+        if latency_ms > 0:
+            await asyncio.sleep(latency_ms / 1000)
+
+        status = fault.status if fault and fault.status else None
+        if status is None:
+            roll = self._rng.random()
+            if roll < behavior.throttle_rate:
+                status = 429
+            elif roll < behavior.throttle_rate + behavior.error_rate:
+                status = 500
+
+        if status and status != 200:
+            response = web.json_response({"error": {"message": f"Injected {status}"}}, status=status)
+        else:
+            response = await respond(payload, fault.dropped_images if fault else 0)
+
+        self.traces.append(RequestTrace(
+            provider=provider,
+            method=request.method,
+            path=request.path,
+            status=response.status,
+            started_at=started_at,
+            duration_ms=(time.perf_counter() - start) * 1000,
+            payload=payload,
+            headers=dict(request.headers),
+        ))
+        return response
+
+    async def _render(self, prompt: str, width: int, height: int, count: int) -> List[bytes]:
+        width, height = self.image_size or (width, height)
+        return list(await asyncio.gather(*[
+            asyncio.to_thread(LocalImageService.render, prompt, width, height, index)
+            for index in range(count)
+        ]))
+
+    async def _store_images(self, prompt: str, width: int, height: int, count: int) -> List[str]:
+        """Render images and return the URLs they can be downloaded from."""
+        urls = []
+        for image in await self._render(prompt, width, height, count):
+            image_id = f"{uuid.uuid4().hex}.png"
+            self._images[image_id] = image
+            urls.append(f"{self.base_url}/images/{image_id}")
+        return urls
+
+    @staticmethod
+    def _claude_text(prompt: str) -> str:
+        """Echo localization requests back as JSON tagged with the locale."""
+        match = re.search(r"Localize the following campaign message to (\S+):", prompt)
+        if not match:
+            return "{}"
+
+        locale = match.group(1)
+        fields = {}
+        for key, label in (("headline", "Headline"), ("subheadline", "Subheadline"), ("cta", "CTA")):
+            line = re.search(rf"^- {label}: (.*)$", prompt, re.MULTILINE)
+            if line:
+                fields[key] = f"[{locale}] {line.group(1)}"
+        return json.dumps(fields)
+
+
+async def _serve_forever(host: str, port: int) -> None:
+    server = MockProviderServer(host=host, port=port)
+    await server.start()
+    print(f"Mock provider server listening on {server.base_url}")
+    for name, value in server.env().items():
+        print(f"export {name}={value}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the mock Firefly/OpenAI/Gemini/Claude server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(_serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,19 @@
 """OpenAI DALL-E 3 image generation service."""
 import aiohttp
 import asyncio
-from typing import Optional
+from typing import List, Optional
 from src.genai.base import ImageGenerationService
 from src.models import ComprehensiveBrandGuidelines
 from src.config import get_config
+from src import metrics
+from src.genai.http import client_session
 
 
 class OpenAIImageService(ImageGenerationService):
     """Service for generating images using OpenAI DALL-E 3."""
+
+    # DALL-E 3 only accepts n=1, so batches are split into parallel requests
+    MAX_BATCH_SIZE = 1
     
     def __init__(self, api_key: Optional[str] = None, max_retries: int = 3):
         config = get_config()
@@ -16,7 +21,7 @@ class OpenAIImageService(ImageGenerationService):
             api_key=api_key or config.OPENAI_API_KEY,
             max_retries=max_retries
         )
-        self.api_url = "https://api.openai.com/v1/images/generations"
+        self.api_url = config.OPENAI_API_URL
         self.model = "dall-e-3"
     
     async def generate_image(
@@ -26,6 +31,17 @@ class OpenAIImageService(ImageGenerationService):
         brand_guidelines: Optional[ComprehensiveBrandGuidelines] = None
     ) -> bytes:
         """Generate image using DALL-E 3."""
+        images = await self._generate_batch(prompt, 1, size, brand_guidelines)
+        return images[0]
+
+    async def _generate_batch(
+        self,
+        prompt: str,
+        count: int,
+        size: str,
+        brand_guidelines: Optional[ComprehensiveBrandGuidelines]
+    ) -> List[bytes]:
+        """Generate up to MAX_BATCH_SIZE images in one OpenAI request."""
         
         # Enhance prompt with brand guidelines
         if brand_guidelines:
@@ -42,7 +58,7 @@ class OpenAIImageService(ImageGenerationService):
         payload = {
             "model": self.model,
             "prompt": prompt,
-            "n": 1,
+            "n": count,
             "size": dalle_size,
             "quality": "hd",  # Use HD quality
             "style": "natural"  # Natural vs vivid
@@ -50,7 +66,7 @@ class OpenAIImageService(ImageGenerationService):
         
         for attempt in range(self.max_retries):
             try:
-                async with aiohttp.ClientSession() as session:
+                async with client_session() as session:
                     # Generate image
                     async with session.post(
                         self.api_url,
@@ -58,16 +74,18 @@ class OpenAIImageService(ImageGenerationService):
                         json=payload,
                         timeout=aiohttp.ClientTimeout(total=60)
                     ) as response:
+                        metrics.record_api_response("openai", response.status)
                         if response.status == 200:
                             data = await response.json()
-                            image_url = data['data'][0]['url']
+                            image_urls = self._require_batch_size(
+                                [item['url'] for item in data['data'][:count]], count
+                            )
                             
-                            # Download image
-                            async with session.get(image_url) as img_response:
-                                if img_response.status == 200:
-                                    return await img_response.read()
-                                else:
-                                    raise Exception(f"Image download failed: {img_response.status}")
+                            # Download images concurrently
+                            return list(await asyncio.gather(*[
+                                self._download_image(session, image_url)
+                                for image_url in image_urls
+                            ]))
                         
                         elif response.status == 429:
                             await asyncio.sleep(2 ** attempt)
@@ -87,6 +105,13 @@ class OpenAIImageService(ImageGenerationService):
                 raise
         
         raise Exception("Max retries exceeded for OpenAI API")
+
+    async def _download_image(self, session: aiohttp.ClientSession, image_url: str) -> bytes:
+        """Download a generated image from its URL."""
+        async with session.get(image_url) as img_response:
+            if img_response.status == 200:
+                return await img_response.read()
+            raise Exception(f"Image download failed: {img_response.status}")
     
     def _convert_size_format(self, size: str) -> str:
         """Convert generic size to DALL-E 3 format."""
@@ -0,0 +1,127 @@
+"""Single-flight request coalescing for image generation services."""
+import asyncio
+from typing import Dict, List, Optional, Tuple
+from src.genai.base import GeneratedImage, ImageGenerationService
+from src.models import ComprehensiveBrandGuidelines
+from src import metrics
+from src.genai import call_stats
+
+
+class SingleFlightImageService(ImageGenerationService):
+    """
+    Wrap an image service so identical in-flight requests share one call.
+
+    Requests are identical when they go to the same backend identity
+    (backend, endpoint and key; for wrapped chains, every backend in the
+    chain) with the same prompt, size and brand guidelines. The in-flight table is shared by every
+    wrapper in the process, so concurrently running campaigns coalesce too.
+    """
+
+    _inflight: Dict[Tuple, asyncio.Future] = {}
+
+    def __init__(self, service: ImageGenerationService):
+        super().__init__(api_key=service.api_key, max_retries=service.max_retries)
+        self.service = service
+        self.backend_name = service.backend_name
+        self.request_count = 0  # Calls forwarded to the wrapped service
+        self.coalesced_count = 0  # Calls served by another caller's request
+
+    async def generate_image(
+        self,
+        prompt: str,
+        size: str = "1024x1024",
+        brand_guidelines: Optional[ComprehensiveBrandGuidelines] = None
+    ) -> bytes:
+        """Generate an image, joining an identical in-flight request if any."""
+        image_bytes, _ = await self.generate_image_with_backend(prompt, size, brand_guidelines)
+        return image_bytes
+
+    async def generate_image_with_backend(
+        self,
+        prompt: str,
+        size: str = "1024x1024",
+        brand_guidelines: Optional[ComprehensiveBrandGuidelines] = None
+    ) -> Tuple[bytes, Optional[str]]:
+        """Coalesced generate_image that also reports the serving backend."""
+        loop = asyncio.get_running_loop()
+        key = self._request_key(prompt, size, brand_guidelines)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None and not inflight.done() and inflight.get_loop() is loop:
+            self.coalesced_count += 1
+            stats = call_stats.current()
+            if stats is not None:
+                stats.coalesced_requests += 1
+            metrics.get_registry().counter(
+                "genai_coalesced_requests_total", "Image requests served by an identical in-flight call"
+            ).inc()
+            # Shield so one cancelled waiter doesn't cancel the shared request
+            return await asyncio.shield(inflight)
+
+        self.request_count += 1
+        task = loop.create_task(
+            self.service.generate_image_with_backend(
+                prompt,
+                size=size,
+                brand_guidelines=brand_guidelines
+            )
+        )
+        self._inflight[key] = task
+        self._update_inflight_gauge()
+        task.add_done_callback(lambda done: self._release(key, done))
+        return await asyncio.shield(task)
+
+    async def generate_images(
+        self,
+        prompt: str,
+        count: int,
+        size: str = "1024x1024",
+        brand_guidelines: Optional[ComprehensiveBrandGuidelines] = None
+    ) -> List[GeneratedImage]:
+        """Forward batch requests so the wrapped backend batches natively."""
+        self.request_count += 1
+        return await self.service.generate_images(
+            prompt,
+            count,
+            size=size,
+            brand_guidelines=brand_guidelines
+        )
+
+    def _request_key(
+        self,
+        prompt: str,
+        size: str,
+        brand_guidelines: Optional[ComprehensiveBrandGuidelines]
+    ) -> Tuple:
+        """Identity of a request as seen by the upstream backend."""
+        guidelines_key = brand_guidelines.model_dump_json() if brand_guidelines else None
+        return (
+            self.service.backend_identity(),
+            prompt,
+            size,
+            guidelines_key
+        )
+
+    @classmethod
+    def _release(cls, key: Tuple, task: asyncio.Future) -> None:
+        if cls._inflight.get(key) is task:
+            del cls._inflight[key]
+        cls._update_inflight_gauge()
+
+    @classmethod
+    def _update_inflight_gauge(cls) -> None:
+        metrics.get_registry().gauge(
+            "genai_inflight_requests", "Distinct image requests currently awaiting a provider"
+        ).set(len(cls._inflight))
+
+    def backend_identity(self) -> Tuple:
+        """Identity of the wrapped backend."""
+        return self.service.backend_identity()
+
+    def get_backend_name(self) -> str:
+        """Return the wrapped backend name."""
+        return self.service.get_backend_name()
+
+    def validate_config(self) -> tuple[bool, list[str]]:
+        """Validate the wrapped backend configuration."""
+        return self.service.validate_config()
@@ -0,0 +1,196 @@
+"""Mergeable log-bucket latency histograms and byte counters."""
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+
+# Each bucket is 2^(1/16) wider than the last: <= 4.4% relative error on any percentile
+BUCKET_GROWTH = 2 ** (1 / 16)
+_LOG_GROWTH = math.log(BUCKET_GROWTH)
+REPORTED_PERCENTILES = (50, 90, 99)
+
+
+class LatencyHistogram:
+    """
+    Streaming histogram over fixed logarithmic buckets.
+
+    Memory is proportional to the number of distinct buckets hit, not the
+    number of samples, and two histograms merge by adding bucket counts, so
+    histograms from separate runs can be combined for trend reporting.
+    """
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0  # Samples <= 0 (e.g. sub-resolution timings)
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def record(self, value: float) -> None:
+        """Add one sample."""
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if value <= 0:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / _LOG_GROWTH)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def percentile(self, q: float) -> float:
+        """Approximate q-th percentile (0-100); 0.0 when empty."""
+        if not self.count:
+            return 0.0
+
+        rank = max(1, math.ceil(q / 100 * self.count))
+        seen = self.zero_count
+        if seen >= rank:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                # Bucket upper bound, clamped to the observed range
+                return min(max(BUCKET_GROWTH ** index, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """Add another histogram's samples into this one."""
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        if other.max is not None:
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize with summary percentiles and raw buckets (for merging)."""
+        data = {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.mean,
+            "min": self.min or 0.0,
+            "max": self.max or 0.0,
+        }
+        for q in REPORTED_PERCENTILES:
+            data[f"p{q}"] = self.percentile(q)
+        data["zero_count"] = self.zero_count
+        data["buckets"] = {str(index): count for index, count in sorted(self.buckets.items())}
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        """Rebuild a histogram serialized with ``to_dict``."""
+        histogram = cls()
+        histogram.buckets = {int(index): count for index, count in data.get("buckets", {}).items()}
+        histogram.zero_count = data.get("zero_count", 0)
+        histogram.count = data.get("count", 0)
+        histogram.sum = data.get("sum", 0.0)
+        if histogram.count:
+            histogram.min = data.get("min", 0.0)
+            histogram.max = data.get("max", 0.0)
+        return histogram
+
+
+class OperationHistograms:
+    """Latency histograms per operation name plus bytes transferred per channel."""
+
+    def __init__(self):
+        self.latencies: Dict[str, LatencyHistogram] = {}
+        self.bytes: Dict[str, int] = {}
+
+    def observe(self, operation: str, value_ms: float) -> None:
+        if operation not in self.latencies:
+            self.latencies[operation] = LatencyHistogram()
+        self.latencies[operation].record(value_ms)
+
+    def add_bytes(self, channel: str, size: int) -> None:
+        self.bytes[channel] = self.bytes.get(channel, 0) + size
+
+    def merge(self, other: "OperationHistograms") -> "OperationHistograms":
+        for operation, histogram in other.latencies.items():
+            self.latencies.setdefault(operation, LatencyHistogram()).merge(histogram)
+        for channel, size in other.bytes.items():
+            self.add_bytes(channel, size)
+        return self
+
+    def latencies_to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {name: histogram.to_dict() for name, histogram in sorted(self.latencies.items())}
+
+    @classmethod
+    def from_metrics(cls, latency_histograms: Dict[str, Dict[str, Any]], bytes_transferred: Dict[str, int]) -> "OperationHistograms":
+        """Rebuild from the ``TechnicalMetrics`` fields of a campaign report."""
+        histograms = cls()
+        histograms.latencies = {
+            name: LatencyHistogram.from_dict(data) for name, data in latency_histograms.items()
+        }
+        histograms.bytes = dict(bytes_transferred)
+        return histograms
+
+
+_current: ContextVar[Optional[OperationHistograms]] = ContextVar("current_histograms", default=None)
+
+
+@contextmanager
+def collect() -> Iterator[OperationHistograms]:
+    """Gather observations made anywhere in the enclosed block."""
+    histograms = OperationHistograms()
+    token = _current.set(histograms)
+    try:
+        yield histograms
+    finally:
+        _current.reset(token)
+
+
+def current() -> Optional[OperationHistograms]:
+    """The active collection, if any."""
+    return _current.get()
+
+
+def observe(operation: str, value_ms: float) -> None:
+    """Record a latency into the active collection (no-op outside ``collect``)."""
+    histograms = _current.get()
+    if histograms is not None:
+        histograms.observe(operation, value_ms)
+
+
+def add_bytes(channel: str, size: int) -> None:
+    """Count bytes into the active collection (no-op outside ``collect``)."""
+    histograms = _current.get()
+    if histograms is not None:
+        histograms.add_bytes(channel, size)
+
+
+@contextmanager
+def timer(operation: str) -> Iterator[None]:
+    """Time the enclosed block into the operation's histogram."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(operation, (time.perf_counter() - start) * 1000)
+
+
+def merge_reports(report_paths) -> OperationHistograms:
+    """Merge the histograms of several campaign reports (for trend dashboards)."""
+    from src.storage import read_report_summary
+
+    merged = OperationHistograms()
+    for path in report_paths:
+        metrics = read_report_summary(path).get("technical_metrics") or {}
+        merged.merge(OperationHistograms.from_metrics(
+            metrics.get("latency_histograms", {}),
+            metrics.get("bytes_transferred", {})
+        ))
+    return merged
@@ -1,4 +1,5 @@
 """Enhanced image processing with per-element text control and post-processing (Phase 1)."""
+import os
 from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageEnhance
 from typing import Tuple, Optional
 from io import BytesIO
@@ -13,11 +14,22 @@ from src.models import (
 )
 
 
+# Output size per aspect ratio; unknown ratios render square
+ASPECT_RATIO_SIZES = {
+    "1:1": (1024, 1024),
+    "9:16": (1080, 1920),
+    "16:9": (1920, 1080),
+    "4:5": (1080, 1350)
+}
+DEFAULT_SIZE = (1024, 1024)
+
+
 class ImageProcessorV2:
     """Enhanced image processor with Phase 1 features."""
 
     def __init__(self):
         self.font_cache = {}  # Cache loaded fonts for performance
+        self.logo_cache = {}  # Decoded RGBA logos by (path, mtime)
 
     def resize_to_aspect_ratio(
         self,
@@ -26,34 +38,69 @@ class ImageProcessorV2:
     ) -> Image.Image:
         """Resize image to target aspect ratio."""
         image = Image.open(BytesIO(image_bytes))
-
-        ratio_map = {
-            "1:1": (1024, 1024),
-            "9:16": (1080, 1920),
-            "16:9": (1920, 1080),
-            "4:5": (1080, 1350)
-        }
-
-        target_size = ratio_map.get(target_ratio, (1024, 1024))
+        target_size = ASPECT_RATIO_SIZES.get(target_ratio, DEFAULT_SIZE)
 
         # Calculate crop box to maintain aspect ratio
-        img_ratio = image.width / image.height
-        target_img_ratio = target_size[0] / target_size[1]
-
-        if img_ratio > target_img_ratio:
-            # Image is wider, crop width
-            new_width = int(image.height * target_img_ratio)
-            left = (image.width - new_width) // 2
-            image = image.crop((left, 0, left + new_width, image.height))
-        else:
-            # Image is taller, crop height
-            new_height = int(image.width / target_img_ratio)
-            top = (image.height - new_height) // 2
-            image = image.crop((0, top, image.width, top + new_height))
+        left, top, right, bottom = _crop_box(image.size, target_size)
+        image = image.crop((left, top, right, bottom))
 
         # Resize to target
         return image.resize(target_size, Image.Resampling.LANCZOS)
 
+    def estimate_render_bytes(
+        self,
+        hero_size: Tuple[int, int],
+        hero_bands: int,
+        target_ratio: str,
+        brand_guidelines: Optional[ComprehensiveBrandGuidelines] = None,
+        has_logo: bool = False
+    ) -> int:
+        """
+        Peak bytes of pixel data alive while rendering one variant.
+
+        Mirrors the render path stage by stage: the decoded hero, its crop,
+        the resampler's intermediate (output width by crop height) and the
+        resized frame; the text overlay's copy, RGBA conversion and a
+        background box's full-frame overlay plus composite (boxes are drawn
+        one at a time); the logo's
+        RGBA copy, layer, composite and RGB result; post-processing's copy
+        and filter outputs. The resized frame stays referenced by the caller
+        for the whole render, so it is counted in every stage after the first.
+        Encoding needs less than any of these.
+        """
+        target_size = ASPECT_RATIO_SIZES.get(target_ratio, DEFAULT_SIZE)
+        left, top, right, bottom = _crop_box(hero_size, target_size)
+        hero = hero_size[0] * hero_size[1]
+        crop = (right - left) * (bottom - top)
+        frame = target_size[0] * target_size[1]
+
+        resample = target_size[0] * (bottom - top)
+
+        stages = [(hero + crop + resample + frame) * hero_bands]
+
+        boxes = sum(
+            1 for element in ("headline", "subheadline", "cta")
+            if self._background_enabled(self._get_text_element_style(element, brand_guidelines))
+        )
+        # RGBA working copy plus either a box's overlay and composite or the RGB result
+        text = 4 + (8 if boxes else 3)
+        stages.append(frame * (hero_bands + max(hero_bands + 4, text)))
+
+        if has_logo:
+            # Input + RGBA + layer + composite + RGB result
+            stages.append(frame * (hero_bands + 3 + 4 + 4 + 4 + 3))
+
+        post_processing = brand_guidelines.post_processing if brand_guidelines else None
+        if post_processing is not None and post_processing.enabled:
+            # Input + copy + filter output + enhancer blend
+            stages.append(frame * (hero_bands + 3 + 3 + 3 + 3))
+
+        return max(stages)
+
+    @staticmethod
+    def _background_enabled(style: TextElementStyle) -> bool:
+        return bool(style.background and style.background.enabled)
+
     def apply_text_overlay(
         self,
         image: Image.Image,
@@ -176,7 +223,7 @@ class ImageProcessorV2:
         text_height = bbox[3] - bbox[1]
 
         # 1. Draw background box (if enabled)
-        if style.background and style.background.enabled:
+        if self._background_enabled(style):
             img = self._draw_background_box(
                 img, x_pos, y_pos, text_width, text_height, style.background
             )
@@ -407,9 +454,7 @@ class ImageProcessorV2:
         (Unchanged from original implementation)
         """
         try:
-            logo = Image.open(logo_path)
-            if logo.mode != 'RGBA':
-                logo = logo.convert('RGBA')
+            logo = self._load_logo(logo_path)
 
             # Get settings
             placement = "bottom-right"
@@ -466,6 +511,16 @@ class ImageProcessorV2:
             print(f"⚠️  Error applying logo overlay: {e}")
             return image
 
+    def _load_logo(self, logo_path: str) -> Image.Image:
+        """Decode a logo once per file version; callers only read the cached image."""
+        cache_key = (str(logo_path), os.stat(logo_path).st_mtime_ns)
+        logo = self.logo_cache.get(cache_key)
+        if logo is None:
+            with Image.open(logo_path) as opened:
+                logo = opened.convert('RGBA')
+            self.logo_cache[cache_key] = logo
+        return logo
+
     def _calculate_logo_position(
         self,
         image_size: Tuple[int, int],
@@ -560,3 +615,21 @@ class ImageProcessorV2:
         """Convert hex color to RGB tuple."""
         hex_color = hex_color.lstrip('#')
         return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+
+
+def _crop_box(size: Tuple[int, int], target_size: Tuple[int, int]) -> Tuple[int, int, int, int]:
+    """Centered crop of ``size`` matching the aspect ratio of ``target_size``."""
+    width, height = size
+    img_ratio = width / height
+    target_img_ratio = target_size[0] / target_size[1]
+
+    if img_ratio > target_img_ratio:
+        # Image is wider, crop width
+        new_width = int(height * target_img_ratio)
+        left = (width - new_width) // 2
+        return left, 0, left + new_width, height
+
+    # Image is taller, crop height
+    new_height = int(width / target_img_ratio)
+    top = (height - new_height) // 2
+    return 0, top, width, top + new_height
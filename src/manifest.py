@@ -0,0 +1,201 @@
+"""SQLite-backed asset manifest for generated campaign assets."""
+import hashlib
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+HERO_KIND = "hero"
+VARIANT_KIND = "variant"
+
+
+def fingerprint(*parts: Any) -> str:
+    """
+    Build a stable fingerprint from the inputs that determine an asset.
+
+    Parts are JSON-serialized (pydantic models via ``model_dump``) so that
+    semantically identical inputs always hash to the same value.
+    """
+    hasher = hashlib.sha256()
+    for part in parts:
+        if hasattr(part, "model_dump"):
+            part = part.model_dump(mode="json")
+        hasher.update(json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+        hasher.update(b"\x1f")
+    return hasher.hexdigest()
+
+
+class AssetManifest:
+    """
+    Indexed record of every hero image and rendered variant.
+
+    The manifest is the source of truth for asset reuse. Each row is keyed by
+    (campaign, product, kind, locale, ratio, format) so reuse checks are a
+    single primary-key lookup regardless of how many assets exist.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS assets (
+            campaign_id   TEXT NOT NULL,
+            product_id    TEXT NOT NULL,
+            kind          TEXT NOT NULL,
+            locale        TEXT NOT NULL DEFAULT '',
+            aspect_ratio  TEXT NOT NULL DEFAULT '',
+            format        TEXT NOT NULL DEFAULT '',
+            file_path     TEXT NOT NULL,
+            fingerprint   TEXT NOT NULL,
+            size_bytes    INTEGER NOT NULL DEFAULT 0,
+            backend       TEXT,
+            created_at    TEXT NOT NULL,
+            updated_at    TEXT NOT NULL,
+            PRIMARY KEY (campaign_id, product_id, kind, locale, aspect_ratio, format)
+        );
+        CREATE INDEX IF NOT EXISTS idx_assets_fingerprint ON assets (fingerprint);
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.db_path),
+            check_same_thread=False,
+            timeout=30
+        )
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            # WAL lets several processes read while one writes
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self.SCHEMA)
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def record(
+        self,
+        campaign_id: str,
+        product_id: str,
+        kind: str,
+        file_path: str,
+        input_fingerprint: str,
+        locale: str = "",
+        aspect_ratio: str = "",
+        format: str = "",
+        backend: Optional[str] = None
+    ) -> None:
+        """Insert or update an asset record."""
+        path = Path(file_path)
+        size_bytes = path.stat().st_size if path.exists() else 0
+        now = datetime.now().isoformat()
+
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO assets (
+                    campaign_id, product_id, kind, locale, aspect_ratio, format,
+                    file_path, fingerprint, size_bytes, backend, created_at, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (campaign_id, product_id, kind, locale, aspect_ratio, format)
+                DO UPDATE SET
+                    file_path = excluded.file_path,
+                    fingerprint = excluded.fingerprint,
+                    size_bytes = excluded.size_bytes,
+                    backend = excluded.backend,
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    campaign_id, product_id, kind, locale, aspect_ratio, format,
+                    str(file_path), input_fingerprint, size_bytes, backend, now, now
+                )
+            )
+            self._conn.commit()
+
+    def lookup(
+        self,
+        campaign_id: str,
+        product_id: str,
+        kind: str,
+        locale: str = "",
+        aspect_ratio: str = "",
+        format: str = "",
+        input_fingerprint: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find a reusable asset record.
+
+        Returns None when no record exists, the fingerprint does not match,
+        or the recorded file has been removed from disk.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT * FROM assets
+                WHERE campaign_id = ? AND product_id = ? AND kind = ?
+                  AND locale = ? AND aspect_ratio = ? AND format = ?
+                """,
+                (campaign_id, product_id, kind, locale, aspect_ratio, format)
+            ).fetchone()
+
+        if row is None:
+            return None
+        if input_fingerprint is not None and row["fingerprint"] != input_fingerprint:
+            return None
+        if not Path(row["file_path"]).exists():
+            return None
+        return dict(row)
+
+    def lookup_hero(
+        self,
+        campaign_id: str,
+        product_id: str,
+        input_fingerprint: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Find a reusable hero image for a product."""
+        return self.lookup(
+            campaign_id, product_id, HERO_KIND,
+            input_fingerprint=input_fingerprint
+        )
+
+    def lookup_variant(
+        self,
+        campaign_id: str,
+        product_id: str,
+        locale: str,
+        aspect_ratio: str,
+        format: str,
+        input_fingerprint: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Find a reusable rendered variant."""
+        return self.lookup(
+            campaign_id, product_id, VARIANT_KIND,
+            locale=locale, aspect_ratio=aspect_ratio, format=format,
+            input_fingerprint=input_fingerprint
+        )
+
+    def campaign_assets(self, campaign_id: str) -> List[Dict[str, Any]]:
+        """Return all records for a campaign."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM assets WHERE campaign_id = ? "
+                "ORDER BY product_id, kind, locale, aspect_ratio, format",
+                (campaign_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self, campaign_id: Optional[str] = None) -> int:
+        """Count records, optionally for a single campaign."""
+        with self._lock:
+            if campaign_id is None:
+                row = self._conn.execute("SELECT COUNT(*) FROM assets").fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT COUNT(*) FROM assets WHERE campaign_id = ?",
+                    (campaign_id,)
+                ).fetchone()
+        return row[0]
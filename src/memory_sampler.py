@@ -0,0 +1,140 @@
+"""Background RSS (and optional tracemalloc) sampling during a campaign run."""
+import threading
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+import psutil
+
+from src.config import get_config
+
+
+_MB = 1024 * 1024
+
+# tracemalloc is process-wide: concurrent campaigns' samplers share one trace,
+# which is stopped when the last of them exits (and never if it was already on)
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_owned = False
+
+
+def _acquire_tracemalloc() -> None:
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0:
+            _tracemalloc_owned = not tracemalloc.is_tracing()
+            if _tracemalloc_owned:
+                tracemalloc.start()
+        _tracemalloc_users += 1
+
+
+def _release_tracemalloc() -> None:
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_owned:
+            tracemalloc.stop()
+            _tracemalloc_owned = False
+
+
+class MemorySampler:
+    """
+    Poll process memory from a daemon thread while a campaign runs.
+
+    A thread (rather than an asyncio task) keeps sampling while rendering
+    and encoding block the event loop, which is exactly when transient
+    peaks happen. The peak is tracked over every sample; the stored
+    timeline is thinned to ``max_samples`` points by dropping every other
+    sample and doubling the interval, so long campaigns stay bounded.
+    """
+
+    def __init__(
+        self,
+        interval_ms: Optional[float] = None,
+        trace_python: Optional[bool] = None,
+        max_samples: Optional[int] = None
+    ):
+        config = get_config()
+        self.interval_ms = config.MEMORY_SAMPLE_INTERVAL_MS if interval_ms is None else interval_ms
+        self.trace_python = config.MEMORY_SAMPLE_TRACEMALLOC if trace_python is None else trace_python
+        self.max_samples = max(2, config.MEMORY_TIMELINE_MAX_SAMPLES if max_samples is None else max_samples)
+
+        self.peak_rss_mb = 0.0
+        self.peak_python_mb: Optional[float] = None
+        self._process = psutil.Process()
+        self._samples: List[Dict[str, float]] = []
+        self._stride = 1  # Keep every Nth sample in the timeline
+        self._sample_count = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._tracing = False
+        self._start = time.perf_counter()
+
+    def start(self) -> "MemorySampler":
+        if self.trace_python and not self._tracing:
+            _acquire_tracemalloc()
+            self._tracing = True
+        self._start = time.perf_counter()
+        self.sample()
+        if self.interval_ms > 0:
+            self._thread = threading.Thread(target=self._run, name="memory-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.sample()
+        if self._tracing:
+            _release_tracemalloc()
+            self._tracing = False
+
+    def __enter__(self) -> "MemorySampler":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_ms / 1000):
+            self.sample()
+
+    def sample(self) -> Dict[str, float]:
+        """Take one sample now (also called by the thread)."""
+        point = {
+            "t_s": round(time.perf_counter() - self._start, 3),
+            "rss_mb": round(self._process.memory_info().rss / _MB, 2),
+        }
+        traced_peak = None
+        if self.trace_python and tracemalloc.is_tracing():
+            current, traced_peak = tracemalloc.get_traced_memory()
+            point["python_mb"] = round(current / _MB, 2)
+
+        with self._lock:
+            self.peak_rss_mb = max(self.peak_rss_mb, point["rss_mb"])
+            if traced_peak is not None:
+                # tracemalloc tracks its own exact peak between samples
+                self.peak_python_mb = max(self.peak_python_mb or 0.0, round(traced_peak / _MB, 2))
+            if self._sample_count % self._stride == 0:
+                self._samples.append(point)
+                if len(self._samples) > self.max_samples:
+                    self._samples = self._samples[::2]
+                    self._stride *= 2
+            self._sample_count += 1
+        return point
+
+    @property
+    def sample_count(self) -> int:
+        return self._sample_count
+
+    @property
+    def timeline_interval_ms(self) -> float:
+        """Spacing between retained timeline points after thinning."""
+        return self.interval_ms * self._stride
+
+    def timeline(self) -> List[Dict[str, float]]:
+        with self._lock:
+            return list(self._samples)
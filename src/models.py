@@ -390,6 +390,10 @@ class LocalizationGuidelines(BaseModel):
         }
 
 
+# Campaign priority classes, lowest first; the level is the scheduler's base priority
+PRIORITY_LEVELS = {"low": 0, "normal": 1, "high": 2, "urgent": 3}
+
+
 class CampaignBrief(BaseModel):
     """Complete campaign brief with all configuration."""
     campaign_id: str = Field(..., description="Unique campaign identifier")
@@ -431,6 +435,14 @@ class CampaignBrief(BaseModel):
         default_factory=lambda: ["en-US"],
         description="Target locales for campaign"
     )
+    priority: str = Field(
+        default="normal",
+        description="Scheduling priority when campaigns share a batch or server: 'low', 'normal', 'high' or 'urgent'"
+    )
+    deadline: Optional[datetime] = Field(
+        default=None,
+        description="When the assets are needed; work is boosted as it approaches"
+    )
 
     @field_validator('products')
     def validate_products(cls, v):
@@ -446,9 +458,15 @@ class CampaignBrief(BaseModel):
                 raise ValueError(f"Invalid aspect ratio: {ratio}. Must be one of {valid_ratios}")
         return v
 
+    @field_validator('priority')
+    def validate_priority(cls, v):
+        if v.lower() not in PRIORITY_LEVELS:
+            raise ValueError(f"Invalid priority: {v}. Must be one of {list(PRIORITY_LEVELS)}")
+        return v.lower()
+
     @field_validator('image_generation_backend')
     def validate_backend(cls, v):
-        valid_backends = {"firefly", "openai", "dall-e", "dalle", "gemini", "imagen", "claude"}
+        valid_backends = {"firefly", "openai", "dall-e", "dalle", "gemini", "imagen", "claude", "local", "synthetic"}
         if v.lower() not in valid_backends:
             raise ValueError(
                 f"Invalid image generation backend: {v}. "
@@ -505,11 +523,27 @@ class TechnicalMetrics(BaseModel):
     """Advanced technical metrics for campaign generation."""
     backend_used: str = Field(..., description="AI backend used (firefly, openai, gemini)")
     total_api_calls: int = Field(default=0, description="Total API calls made")
+    coalesced_requests: int = Field(default=0, description="Image requests served by an identical in-flight call")
+    hedged_requests: int = Field(default=0, description="Duplicate image requests fired against slow calls")
+    hedge_wins: int = Field(default=0, description="Hedged requests that returned before the original")
+    hedge_rate: float = Field(default=0.0, description="Percentage of image requests that were hedged (0-100)")
+    latency_histograms: Dict[str, Dict[str, Any]] = Field(
+        default_factory=dict,
+        description="Mergeable log-bucket latency histograms (ms) with p50/p90/p99 per operation"
+    )
+    bytes_transferred: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Bytes transferred per channel (image_download, disk_write)"
+    )
     cache_hits: int = Field(default=0, description="Number of cache hits (hero image reuse)")
     cache_misses: int = Field(default=0, description="Number of cache misses")
     cache_hit_rate: float = Field(default=0.0, description="Cache hit rate percentage (0-100)")
     retry_count: int = Field(default=0, description="Total number of retries across all operations")
     retry_reasons: List[str] = Field(default_factory=list, description="Reasons for retries")
+    circuit_open_skips: int = Field(
+        default=0,
+        description="Backends skipped without a request because their circuit breaker was open (not retries)"
+    )
     avg_api_response_time_ms: float = Field(default=0.0, description="Average API response time in milliseconds")
     min_api_response_time_ms: float = Field(default=0.0, description="Minimum API response time")
     max_api_response_time_ms: float = Field(default=0.0, description="Maximum API response time")
@@ -517,8 +551,27 @@ class TechnicalMetrics(BaseModel):
     localization_time_ms: float = Field(default=0.0, description="Total localization time")
     compliance_check_time_ms: float = Field(default=0.0, description="Total compliance checking time")
     peak_memory_mb: float = Field(default=0.0, description="Peak memory usage in MB")
+    peak_python_memory_mb: Optional[float] = Field(
+        default=None,
+        description="Peak Python heap traced by tracemalloc (MEMORY_SAMPLE_TRACEMALLOC=true)"
+    )
+    memory_timeline: List[Dict[str, float]] = Field(
+        default_factory=list,
+        description="Background memory samples: t_s, rss_mb and optionally python_mb"
+    )
+    memory_sample_interval_ms: float = Field(default=0.0, description="Spacing between memory_timeline points")
     system_info: Dict[str, str] = Field(default_factory=dict, description="System environment details")
     full_error_traces: List[Dict[str, str]] = Field(default_factory=list, description="Full error stack traces")
+    queue_wait_ms: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Time tasks waited for a free slot, summed per resource (local limits and shared arbitration)"
+    )
+    deadline_met: Optional[bool] = Field(default=None, description="Whether the campaign finished before its deadline (None without one)")
+    render_memory_wait_ms: float = Field(default=0.0, description="Time renders waited for the memory admission budget, summed")
+    critical_path: List[Dict[str, Any]] = Field(
+        default_factory=list,
+        description="Scheduler tasks that determined the run's wall-clock time (task, resource, start/duration/wait ms)"
+    )
 
 
 class BusinessMetrics(BaseModel):
@@ -630,3 +683,122 @@ class CampaignOutput(BaseModel):
                 }
             }
         }
+
+
+class BatchBriefResult(BaseModel):
+    """Outcome of one brief in a batch run."""
+    brief_path: str = Field(..., description="Brief file")
+    campaign_id: Optional[str] = Field(default=None, description="Campaign identifier (None if the brief failed to load)")
+    status: str = Field(..., description="'success', 'partial' (some products failed) or 'failed'")
+    total_assets: int = Field(default=0, description="Assets generated or reused")
+    processing_time_seconds: float = Field(default=0.0, description="Campaign processing time")
+    success_rate: float = Field(default=0.0, description="Success rate (0-1)")
+    total_api_calls: int = Field(default=0, description="Image API calls made")
+    cache_hits: int = Field(default=0, description="Hero cache hits (brief, manifest or batch)")
+    priority: str = Field(default="normal", description="Brief priority class")
+    admission_wait_seconds: float = Field(default=0.0, description="Time the brief waited for a campaign slot")
+    queue_wait_ms: float = Field(default=0.0, description="Time the campaign's tasks waited for resource slots")
+    deadline_met: Optional[bool] = Field(default=None, description="Whether the brief finished before its deadline")
+    errors: List[str] = Field(default_factory=list, description="Errors encountered")
+
+
+class BatchReport(BaseModel):
+    """Combined throughput report for a multi-brief batch run."""
+    batch_id: str = Field(..., description="Batch identifier (start timestamp)")
+    started_at: datetime = Field(default_factory=datetime.now, description="Batch start time")
+    concurrency: int = Field(..., description="Campaigns processed concurrently")
+    render_workers: int = Field(default=0, description="Shared render pool threads")
+    total_briefs: int = Field(default=0, description="Briefs in the batch")
+    succeeded: int = Field(default=0, description="Briefs processed without errors")
+    failed: int = Field(default=0, description="Briefs that failed or had product errors")
+    total_assets: int = Field(default=0, description="Assets across all briefs")
+    wall_time_seconds: float = Field(default=0.0, description="Elapsed time for the whole batch")
+    assets_per_second: float = Field(default=0.0, description="Batch throughput")
+    total_api_calls: int = Field(default=0, description="Image API calls across all briefs")
+    guideline_files_parsed: int = Field(default=0, description="Distinct guideline files parsed (shared cache)")
+    hero_cache_hits: int = Field(default=0, description="Heroes reused from another brief in the batch")
+    latency_histograms: Dict[str, Dict[str, Any]] = Field(
+        default_factory=dict,
+        description="Per-operation latency histograms merged across all briefs"
+    )
+    queue_wait_by_priority: Dict[str, Dict[str, float]] = Field(
+        default_factory=dict,
+        description="Wait for shared slots (campaign admission, image API, render) per priority class"
+    )
+    render_memory: Optional[Dict[str, float]] = Field(
+        default=None,
+        description="Render memory admission: budget, peak reserved MB, admitted and delayed renders"
+    )
+    briefs: List[BatchBriefResult] = Field(default_factory=list, description="Per-brief results")
+
+
+class JobStatus(BaseModel):
+    """State of a campaign job submitted to the pipeline server."""
+    job_id: str = Field(..., description="Job identifier")
+    campaign_id: str = Field(..., description="Campaign identifier from the brief")
+    priority: str = Field(default="normal", description="Brief priority class")
+    deadline: Optional[datetime] = Field(default=None, description="Brief deadline, if any")
+    status: str = Field(default="queued", description="'queued', 'running', 'succeeded', 'failed' or 'cancelled'")
+    submitted_at: datetime = Field(default_factory=datetime.now, description="When the job was accepted")
+    started_at: Optional[datetime] = Field(default=None, description="When a worker picked the job up")
+    finished_at: Optional[datetime] = Field(default=None, description="When the job finished")
+    products_total: int = Field(default=0, description="Products in the brief")
+    products_completed: int = Field(default=0, description="Products finished (successfully or not)")
+    expected_assets: int = Field(default=0, description="Assets the brief should produce")
+    assets_completed: int = Field(default=0, description="Assets generated or reused so far")
+    success_rate: Optional[float] = Field(default=None, description="Campaign success rate once finished")
+    processing_time_seconds: Optional[float] = Field(default=None, description="Campaign processing time once finished")
+    errors: List[str] = Field(default_factory=list, description="Product or job errors")
+
+
+class PlannedTask(BaseModel):
+    """One node of a campaign's pre-flight work graph."""
+    name: str = Field(..., description="Task name as the pipeline's scheduler would run it (e.g. 'render:P1:en-US:1:1')")
+    action: str = Field(..., description="'parse', 'generate', 'reuse', 'localize', 'render', 'encode' or 'save'")
+    resource: str = Field(..., description="Scheduler resource the task draws from (image_api, llm, cpu, disk, io)")
+    deps: List[str] = Field(default_factory=list, description="Tasks that must finish first")
+    backend: Optional[str] = Field(default=None, description="Image backend for hero generation")
+    assumed: bool = Field(default=False, description="Reuse depends on guidelines that were not parsed for the plan")
+    estimate_ms: float = Field(default=0.0, description="Expected (p50) duration")
+    start_ms: float = Field(default=0.0, description="Simulated start offset")
+    end_ms: float = Field(default=0.0, description="Simulated end offset")
+
+
+class CampaignPlan(BaseModel):
+    """Pre-flight plan for a brief: the work it would do, how long it would take and what it would cost."""
+    campaign_id: str = Field(..., description="Campaign identifier from the brief")
+    backend: str = Field(..., description="Image backend the campaign would use")
+    created_at: datetime = Field(default_factory=datetime.now, description="When the plan was made")
+    tasks: List[PlannedTask] = Field(default_factory=list, description="Work graph in scheduling order")
+    hero_calls: Dict[str, int] = Field(default_factory=dict, description="New hero generations per backend")
+    claude_calls: Dict[str, int] = Field(default_factory=dict, description="Claude calls for guideline extraction and localization")
+    renders: int = Field(default=0, description="Variants to render (each also encoded and saved)")
+    reused_assets: int = Field(default=0, description="Variants reused from the brief or the manifest")
+    assumed_reuse: int = Field(default=0, description="Of those, reuses that hold only if unparsed guidelines are unchanged")
+    estimated_duration_seconds: float = Field(default=0.0, description="Simulated wall-clock time with p50 latencies")
+    estimated_duration_p90_seconds: float = Field(default=0.0, description="Simulated wall-clock time with p90 latencies")
+    estimated_cost_usd: float = Field(default=0.0, description="API spend for the planned calls")
+    worst_case_cost_usd: float = Field(default=0.0, description="API spend if no assumed reuse holds")
+    cost_breakdown: Dict[str, float] = Field(default_factory=dict, description="Spend per image backend and for Claude")
+    latency_sources: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Per operation, where its latency came from ('history (N samples)' or 'default')"
+    )
+    critical_path: List[Dict[str, Any]] = Field(default_factory=list, description="Chain of tasks that sets the duration")
+    warnings: List[str] = Field(default_factory=list, description="Anything that would fail the run or make the plan inexact")
+
+
+class BulkGenerationReport(BaseModel):
+    """Result of generating briefs from a product feed."""
+    feed: str = Field(..., description="Product feed that was read")
+    output_dir: str = Field(..., description="Directory the briefs were written to")
+    rows: int = Field(default=0, description="Feed rows read")
+    products: int = Field(default=0, description="Products placed in valid briefs")
+    skipped_rows: int = Field(default=0, description="Rows skipped as unreadable or missing required columns")
+    briefs: int = Field(default=0, description="Valid briefs generated")
+    invalid_briefs: int = Field(default=0, description="Briefs that failed CampaignBrief validation (not written)")
+    elapsed_seconds: float = Field(default=0.0, description="Wall-clock generation time")
+    rows_per_second: float = Field(default=0.0, description="Feed rows processed per second")
+    briefs_per_second: float = Field(default=0.0, description="Briefs generated per second")
+    brief_paths: List[str] = Field(default_factory=list, description="Generated brief files in generation order")
+    errors: List[str] = Field(default_factory=list, description="Per-row and per-brief errors")
@@ -1,19 +1,37 @@
 """Parser for brand guidelines documents."""
-import fitz  # PyMuPDF
-import docx
 import re
 from pathlib import Path
-from typing import List
-from src.genai.claude import ClaudeService
+from typing import List, Optional, TYPE_CHECKING
 from src.models import ComprehensiveBrandGuidelines
 
+if TYPE_CHECKING:
+    from src.genai.claude import ClaudeService
+
 
 class BrandGuidelinesParser:
     """Parse brand guidelines from various document formats."""
+
+    kind = "brand"  # Names the parse's latency histogram (guideline_parse.<kind>)
+
+    def __init__(self, claude_service: Optional["ClaudeService"] = None):
+        self._claude_service = claude_service
+
+    @property
+    def claude_service(self) -> "ClaudeService":
+        """Claude client, created on first use so constructing a parser stays cheap."""
+        if self._claude_service is None:
+            from src.genai.claude import ClaudeService
+            self._claude_service = ClaudeService()
+        return self._claude_service
+
+    @claude_service.setter
+    def claude_service(self, service: "ClaudeService") -> None:
+        self._claude_service = service
     
-    def __init__(self, claude_service: ClaudeService = None):
-        self.claude_service = claude_service or ClaudeService()
-    
+    def needs_claude(self, file_path: str) -> bool:
+        """Whether parsing this file calls Claude (brand guides always do)."""
+        return True
+
     async def parse(self, file_path: str) -> ComprehensiveBrandGuidelines:
         """Parse brand guidelines from file."""
         path = Path(file_path)
@@ -41,6 +59,8 @@ class BrandGuidelinesParser:
     
     def _extract_pdf(self, file_path: str) -> str:
         """Extract text from PDF using PyMuPDF."""
+        import fitz  # PyMuPDF; imported on demand, it is slow to load
+
         text = ""
         with fitz.open(file_path) as doc:
             for page in doc:
@@ -49,6 +69,8 @@ class BrandGuidelinesParser:
     
     def _extract_docx(self, file_path: str) -> str:
         """Extract text from DOCX using python-docx."""
+        import docx
+
         doc = docx.Document(file_path)
         return "\n".join([para.text for para in doc.paragraphs])
 
@@ -9,6 +9,12 @@ from src.parsers.brand_parser import BrandGuidelinesParser
 class LegalComplianceParser(BrandGuidelinesParser):
     """Parse legal compliance guidelines from various formats."""
 
+    kind = "legal"
+
+    def needs_claude(self, file_path: str) -> bool:
+        """Legal guidelines are only read from YAML or JSON."""
+        return False
+
     async def parse(self, file_path: str) -> LegalComplianceGuidelines:
         """Parse legal compliance guidelines from file."""
         path = Path(file_path)
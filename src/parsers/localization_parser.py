@@ -2,14 +2,19 @@
 import yaml
 import json
 from pathlib import Path
-from src.genai.claude import ClaudeService
 from src.models import LocalizationGuidelines
 from src.parsers.brand_parser import BrandGuidelinesParser
 
 
 class LocalizationGuidelinesParser(BrandGuidelinesParser):
     """Parse localization guidelines from various formats."""
-    
+
+    kind = "localization"
+
+    def needs_claude(self, file_path: str) -> bool:
+        """YAML and JSON are read directly; documents go through Claude."""
+        return Path(file_path).suffix.lower() not in ['.yaml', '.yml', '.json']
+
     async def parse(self, file_path: str) -> LocalizationGuidelines:
         """Parse localization guidelines from file."""
         path = Path(file_path)
@@ -1,14 +1,20 @@
 """Main pipeline orchestrator for creative automation."""
 import asyncio
+import contextlib
+import functools
+import hashlib
 import time
+import traceback
 import psutil
 import platform
+from functools import cached_property
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple, TYPE_CHECKING
 from datetime import datetime
 
 from src.models import (
     CampaignBrief,
+    Product,
     ComprehensiveBrandGuidelines,
     LocalizationGuidelines,
     LegalComplianceGuidelines,
@@ -16,17 +22,29 @@ from src.models import (
     GeneratedAsset,
     CampaignOutput,
     TechnicalMetrics,
-    BusinessMetrics
+    BusinessMetrics,
+    PRIORITY_LEVELS
 )
 from src.genai.factory import ImageGenerationFactory
-from src.genai.claude import ClaudeService
-from src.parsers.brand_parser import BrandGuidelinesParser
-from src.parsers.localization_parser import LocalizationGuidelinesParser
-from src.parsers.legal_parser import LegalComplianceParser
+from src.genai.single_flight import SingleFlightImageService
+from src.genai.hedging import HedgedImageService
+from src.genai import call_stats
 from src.image_processor_v2 import ImageProcessorV2 as ImageProcessor
 from src.legal_checker import LegalComplianceChecker
 from src.storage import StorageManager
+from src.config import get_config
+from src.manifest import HERO_KIND, VARIANT_KIND, fingerprint
+from src import admission, histograms, metrics, progress, tracing
+from src.memory_sampler import MemorySampler
+from src.scheduler import DONE, FAILED, THREAD, DagScheduler, TaskGraph, critical_path_summary
 
+if TYPE_CHECKING:
+    from src.admission import MemoryAdmissionController, Reservation
+    from src.batch import HeroCache, RenderPool
+    from src.scheduler import PriorityArbiter
+
+# Hero images are generated once per product at this size and cropped per ratio
+HERO_IMAGE_SIZE = "2048x2048"
 
 class CreativeAutomationPipeline:
     """Main pipeline orchestrator."""
@@ -41,17 +59,83 @@ class CreativeAutomationPipeline:
         """
         self.default_image_backend = image_backend
         self.image_service = None  # Will be created based on campaign brief
-        self.claude_service = ClaudeService()
-        self.brand_parser = BrandGuidelinesParser(self.claude_service)
-        self.locale_parser = LocalizationGuidelinesParser(self.claude_service)
-        self.legal_parser = LegalComplianceParser(self.claude_service)
         self.image_processor = ImageProcessor()
         self.storage = StorageManager()
+
+        # Per pipeline by default; src.batch and src.server share them across pipelines
+        self.guideline_cache: Dict[Tuple[str, str, int], asyncio.Future] = {}
+        self.translation_cache: Dict[str, asyncio.Future] = {}
+        self.hero_cache: Optional["HeroCache"] = None
+        self.render_pool: Optional["RenderPool"] = None
+        # Image service chain per backend, kept across campaigns so hedging
+        # history and budget (and single-flight) are not reset per campaign
+        self.image_services: Dict[str, tuple] = {}
+        # Orders API calls and renders between campaigns by brief priority
+        self.arbiter: Optional["PriorityArbiter"] = None
+        # Holds renders back while their memory would overrun the budget (process-wide by default)
+        self.memory_admission: Optional["MemoryAdmissionController"] = None
+
+    # Claude and the document parsers are only needed for guideline files and
+    # localization, so they (and aiohttp, PyMuPDF, python-docx) load on first use
+
+    @cached_property
+    def claude_service(self):
+        from src.genai.claude import ClaudeService
+        return ClaudeService()
+
+    @cached_property
+    def brand_parser(self):
+        from src.parsers.brand_parser import BrandGuidelinesParser
+        return BrandGuidelinesParser(self.claude_service)
+
+    @cached_property
+    def locale_parser(self):
+        from src.parsers.localization_parser import LocalizationGuidelinesParser
+        return LocalizationGuidelinesParser(self.claude_service)
+
+    @cached_property
+    def legal_parser(self):
+        from src.parsers.legal_parser import LegalComplianceParser
+        return LegalComplianceParser(self.claude_service)
     
+    async def _parse_guidelines(self, parser, file_path: str):
+        """
+        Parse a guidelines file once per (parser, file, mtime).
+
+        Campaigns sharing a cache (e.g. a batch) also share an in-progress
+        parse, so a brand guide used by every brief is extracted once.
+        """
+        path = Path(file_path)
+        if not path.exists():
+            return await parser.parse(file_path)  # Raises the parser's own error
+
+        key = (type(parser).__name__, str(path.resolve()), path.stat().st_mtime_ns)
+
+        async def parse():
+            with histograms.timer(f"guideline_parse.{parser.kind}"):
+                return await parser.parse(file_path)
+
+        return await _cached_task(self.guideline_cache, key, parse)
+
+    async def _localize(
+        self,
+        message: CampaignMessage,
+        locale: str,
+        localization_guidelines: LocalizationGuidelines
+    ) -> CampaignMessage:
+        """Localize a message once per (message, locale, guidelines)."""
+        key = fingerprint("localize", message, locale, localization_guidelines)
+        return await _cached_task(
+            self.translation_cache,
+            key,
+            lambda: self.claude_service.localize_message(message, locale, localization_guidelines)
+        )
+
     async def process_campaign(
         self,
         brief: CampaignBrief,
-        brief_path: Optional[str] = None
+        brief_path: Optional[str] = None,
+        update_brief: Optional[bool] = None
     ) -> CampaignOutput:
         """
         Process complete campaign and generate all assets.
@@ -59,10 +143,52 @@ class CreativeAutomationPipeline:
         Args:
             brief: Campaign brief with product and localization info
             brief_path: Optional path to brief file for backup/update
+            update_brief: Export manifest asset paths back into the brief.
+                          If None, uses the EXPORT_BRIEF_ASSETS config flag.
 
         Returns:
             CampaignOutput with generated assets and metrics
         """
+        config = get_config()
+        # Per-operation latency histograms, the campaign's own image-request
+        # events and a memory timeline are gathered for every run
+        with histograms.collect(), call_stats.collect(), MemorySampler() as memory_sampler:
+            if not config.TRACE_ENABLED:
+                return await self._process_campaign(brief, brief_path, update_brief, memory_sampler)
+
+            campaign_trace = tracing.trace(
+                "campaign",
+                campaign_id=brief.campaign_id,
+                products=len(brief.products),
+                locales=len(brief.target_locales),
+                aspect_ratios=len(brief.aspect_ratios)
+            )
+            try:
+                with campaign_trace:
+                    return await self._process_campaign(brief, brief_path, update_brief, memory_sampler)
+            finally:
+                # Exported after the root span closes, even if the campaign failed;
+                # a failed export is logged rather than replacing the campaign's outcome
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                try:
+                    trace_path = campaign_trace.tracer.export(
+                        config.TRACE_DIR / f"trace_{brief.campaign_id}_{timestamp}.json",
+                        config.TRACE_FORMAT
+                    )
+                except (OSError, ValueError) as e:
+                    print(f"   ⚠️  Trace export failed: {e}")
+                else:
+                    print(f"   Trace: {trace_path}")
+
+    async def _process_campaign(
+        self,
+        brief: CampaignBrief,
+        brief_path: Optional[str],
+        update_brief: Optional[bool],
+        memory_sampler: Optional[MemorySampler] = None
+    ) -> CampaignOutput:
+        """Run the campaign; see process_campaign."""
+        config = get_config()
         start_time = time.time()
 
         # Initialize metric tracking
@@ -73,33 +199,25 @@ class CreativeAutomationPipeline:
         retry_reasons = []
         full_error_traces = []
         total_api_calls = 0
-        image_processing_start = 0
         image_processing_total_ms = 0.0
         localization_total_ms = 0.0
-        compliance_check_start = 0
         compliance_check_total_ms = 0.0
         process = psutil.Process()
         initial_memory_mb = process.memory_info().rss / (1024 * 1024)
         peak_memory_mb = initial_memory_mb
 
-        # Backup original brief if path provided
-        if brief_path:
-            try:
-                backup_path = self.storage.backup_campaign_brief(brief_path)
-                print(f"📋 Backed up original brief to: {backup_path}")
-            except Exception as e:
-                print(f"⚠️  Could not backup brief: {e}")
-                # Continue processing even if backup fails
-
         # Initialize image generation service based on brief or default
         backend = self.default_image_backend or brief.image_generation_backend
         try:
-            self.image_service = ImageGenerationFactory.create(backend)
+            if backend not in self.image_services:
+                self.image_services[backend] = self._create_image_service(backend)
+            self.image_service, _, _ = self.image_services[backend]
             backend_name = self.image_service.get_backend_name()
         except Exception as e:
             print(f"❌ Error initializing backend '{backend}': {e}")
             raise
 
+
         print(f"\n🚀 Processing Campaign: {brief.campaign_name}")
         print(f"Campaign ID: {brief.campaign_id}")
         print(f"Image Backend: {backend_name}")
@@ -108,314 +226,541 @@ class CreativeAutomationPipeline:
 
         # Note: Output directories created automatically when assets are saved
         
-        # Load external guidelines
+        # Live operational metrics (scraped via /metrics or a textfile; see src/metrics.py)
+        registry = metrics.get_registry()
+        products_pending = registry.gauge("pipeline_products_pending", "Products queued in running campaigns")
+        renders_in_flight = registry.gauge("pipeline_renders_in_flight", "Asset variants currently rendering")
+        cache_hits_total = registry.counter("pipeline_cache_hits_total", "Assets reused instead of generated", ("kind",))
+        cache_misses_total = registry.counter("pipeline_cache_misses_total", "Assets generated because no reusable copy existed", ("kind",))
+        hero_seconds = registry.histogram("pipeline_hero_generation_seconds", "Hero image generation latency", ("backend",))
+        render_seconds = registry.histogram("pipeline_render_seconds", "Asset variant render latency")
+
+        # The campaign runs as a dependency graph (src/scheduler.py) instead of
+        # nested product/locale/ratio loops: guidelines -> compliance -> plan,
+        # then per product a hero, per locale a localization, and per variant
+        # render -> encode -> save. Every node starts as soon as its inputs are
+        # ready: API calls and disk writes on the event loop, rendering and
+        # encoding on the render pool, each class of work under its own limit.
+        graph = TaskGraph()
+        render_pool = self.render_pool
+        own_render_pool = render_pool is None
+        if own_render_pool:
+            from src.batch import RenderPool
+            render_pool = RenderPool(config.SCHEDULER_CPU_WORKERS)
+        memory = self.memory_admission or admission.get_controller()
+        render_jobs: Dict[str, Tuple[str, str, Optional[str]]] = {}  # render task -> hero task, ratio, logo
+        render_memory: Dict[str, "Reservation"] = {}  # render task -> reservation held until encoded
+        hero_headers: Dict[str, Tuple[Tuple[int, int], int]] = {}
+        render_memory_wait_ms = 0.0
+
+        @contextlib.asynccontextmanager
+        async def reserve_render_memory(node):
+            """Reserve a render's estimated peak before it starts; keep it until encoded."""
+            nonlocal render_memory_wait_ms
+            if node.name in render_jobs:
+                hero_task, ratio, logo_path = render_jobs[node.name]
+                if hero_task not in hero_headers:
+                    hero_headers[hero_task] = admission.image_header(graph.result(hero_task)[0])
+                hero_size, hero_bands = hero_headers[hero_task]
+                estimate = self.image_processor.estimate_render_bytes(
+                    hero_size, hero_bands, ratio, brand_guidelines, has_logo=bool(logo_path)
+                )
+                render_memory[node.name] = await memory.acquire(estimate)
+                render_memory_wait_ms += render_memory[node.name].wait_ms
+            try:
+                yield
+            finally:
+                if node.name.startswith("encode:"):
+                    held = render_memory.pop("render:" + node.name.split(":", 1)[1], None)
+                elif node.name in render_memory and node.status != DONE:
+                    held = render_memory.pop(node.name)
+                else:
+                    held = None
+                if held is not None:
+                    held.release()
+
+        scheduler = DagScheduler(
+            limits={
+                "image_api": config.SCHEDULER_IMAGE_API_CONCURRENCY,
+                "llm": config.SCHEDULER_LLM_CONCURRENCY,
+                "cpu": render_pool.workers,
+                "disk": config.SCHEDULER_DISK_CONCURRENCY,
+            },
+            thread_runner=render_pool.run,
+            admit=self._admission(brief),
+            reserve=reserve_render_memory if memory is not None else None
+        )
+
         brand_guidelines = None
         localization_guidelines = None
         legal_guidelines = None
+        output_format = brief.output_formats[0] if brief.output_formats else "png"
+        generated_assets: List[GeneratedAsset] = []
+        errors = []
+        report_writer = None
 
-        if brief.brand_guidelines_file:
+        async def load_brand_guidelines():
+            nonlocal brand_guidelines
             print(f"\n📋 Loading brand guidelines from {brief.brand_guidelines_file}...")
             try:
-                brand_guidelines = await self.brand_parser.parse(brief.brand_guidelines_file)
+                brand_guidelines = await self._parse_guidelines(self.brand_parser, brief.brand_guidelines_file)
                 print("✓ Brand guidelines loaded")
             except Exception as e:
                 print(f"⚠️  Error loading brand guidelines: {e}")
 
-        if brief.enable_localization and brief.localization_guidelines_file:
+        async def load_localization_guidelines():
+            nonlocal localization_guidelines
             print(f"\n🌍 Loading localization guidelines from {brief.localization_guidelines_file}...")
             try:
-                localization_guidelines = await self.locale_parser.parse(brief.localization_guidelines_file)
+                localization_guidelines = await self._parse_guidelines(self.locale_parser, brief.localization_guidelines_file)
                 print("✓ Localization guidelines loaded")
             except Exception as e:
                 print(f"⚠️  Error loading localization guidelines: {e}")
 
-        if brief.legal_compliance_file:
+        async def load_legal_guidelines():
+            nonlocal legal_guidelines
             print(f"\n⚖️  Loading legal compliance guidelines from {brief.legal_compliance_file}...")
             try:
-                legal_guidelines = await self.legal_parser.parse(brief.legal_compliance_file)
+                legal_guidelines = await self._parse_guidelines(self.legal_parser, brief.legal_compliance_file)
                 print("✓ Legal compliance guidelines loaded")
+            except FileNotFoundError as e:
+                print(f"⚠️  Error loading legal guidelines: {e}")
+            except Exception as e:
+                print(f"⚠️  Error during legal compliance check: {e}")
 
+        async def check_compliance():
+            nonlocal compliance_check_total_ms
+            if legal_guidelines is None:
+                return
+            try:
                 # Run compliance check on campaign content
-                print(f"\n⚖️  Checking legal compliance...")
                 compliance_check_start = time.time()
-                checker = LegalComplianceChecker(legal_guidelines)
-
-                # Check campaign message
-                is_compliant, violations = checker.check_content(
-                    brief.campaign_message,
-                    product_content=None,
-                    locale=brief.target_locales[0] if brief.target_locales else "en-US"
-                )
-
-                # Check each product
-                for product in brief.products:
-                    product_content = {
-                        "description": product.product_description,
-                        "features": product.key_features
-                    }
-                    product_compliant, product_violations = checker.check_content(
-                        brief.campaign_message,
-                        product_content=product_content,
-                        locale=brief.target_locales[0] if brief.target_locales else "en-US"
-                    )
-
-                    if not product_compliant:
-                        is_compliant = False
-
-                # Display compliance report
-                if violations:
-                    print("\n" + checker.generate_report())
-
-                    # Check if there are blocking errors
-                    summary = checker.get_violation_summary()
-                    if summary["errors"] > 0:
-                        print(f"\n❌ Campaign cannot proceed due to {summary['errors']} legal compliance error(s)")
-                        print("   Please fix the errors above and try again.")
-                        raise Exception("Legal compliance check failed - errors must be resolved")
-                    elif summary["warnings"] > 0:
-                        print(f"\n⚠️  Campaign can proceed but {summary['warnings']} warning(s) should be reviewed")
-                else:
-                    print("✓ No legal compliance violations found")
+                self._check_legal_compliance(brief, legal_guidelines)
 
                 # Track compliance check time
                 compliance_check_total_ms = (time.time() - compliance_check_start) * 1000
-
-            except FileNotFoundError as e:
-                print(f"⚠️  Error loading legal guidelines: {e}")
             except Exception as e:
                 if "Legal compliance check failed" in str(e):
                     raise  # Re-raise compliance errors
                 print(f"⚠️  Error during legal compliance check: {e}")
-        
-        # Process products concurrently
-        print(f"\n🎨 Generating assets for {len(brief.products)} products...")
 
-        generated_assets: List[GeneratedAsset] = []
-        hero_images: Dict[str, str] = {}  # Track hero images for brief update
-        errors = []
+        async def localize(locale: str) -> CampaignMessage:
+            nonlocal localization_total_ms
+            loc_start = time.time()
+            with tracing.span("localize", locale=locale):
+                localized_message = await self._localize(brief.campaign_message, locale, localization_guidelines)
+            localization_ms = (time.time() - loc_start) * 1000
+            localization_total_ms += localization_ms
+            histograms.observe("localization", localization_ms)
+            return localized_message
+
+        async def fetch_hero(product: Product, product_span, hero_fingerprint: str, brief_hero: Optional[bytes]):
+            """Load, reuse or generate a product's hero; returns (bytes, backend)."""
+            nonlocal cache_hits, cache_misses, total_api_calls
+            with tracing.use_span(product_span), tracing.span("hero", product_id=product.product_id) as hero_span:
+                if brief_hero is not None:
+                    hero_span.set_attribute("source", "brief")
+                    cache_hits += 1  # Track cache hit
+                    cache_hits_total.inc(kind="hero")
+                    return brief_hero, backend
+
+                hero_record = self.storage.manifest.lookup_hero(
+                    brief.campaign_id,
+                    product.product_id,
+                    input_fingerprint=hero_fingerprint
+                )
 
-        # Process each product
-        for product in brief.products:
-            print(f"\n📦 Processing product: {product.product_name} ({product.product_id})")
-            
+                # Heroes generated by other campaigns in the same batch
+                cached_hero = None
+                if hero_record is None and self.hero_cache is not None:
+                    cached_hero = self.hero_cache.get(hero_fingerprint)
+
+                if hero_record:
+                    print(f"  ✓ Reusing hero image from manifest: {hero_record['file_path']}")
+                    with open(hero_record['file_path'], 'rb') as f:
+                        hero_image_bytes = f.read()
+                    hero_span.set_attribute("source", "manifest")
+                    cache_hits += 1  # Track cache hit
+                    cache_hits_total.inc(kind="hero")
+                    return hero_image_bytes, hero_record['backend'] or backend
+
+                if cached_hero:
+                    hero_image_bytes, hero_backend = cached_hero
+                    print(f"  ✓ Reusing hero image generated earlier in this batch")
+                    hero_span.set_attribute("source", "batch")
+                    cache_hits += 1  # Track cache hit
+                    cache_hits_total.inc(kind="hero")
+                    self._persist_hero(brief.campaign_id, product.product_id, hero_image_bytes, hero_fingerprint, hero_backend)
+                    return hero_image_bytes, hero_backend
+
+                print(f"  🎨 Generating hero image for {product.product_id} with {backend_name}...")
+
+                # Track API call timing
+                api_start = time.time()
+                hero_image_bytes, served_backend = await self.image_service.generate_image_with_backend(
+                    hero_prompt(product),
+                    size=HERO_IMAGE_SIZE,
+                    brand_guidelines=brand_guidelines
+                )
+                # Record which backend actually served the hero (failover may differ)
+                hero_backend = served_backend or backend
+                hero_span.set_attribute("source", "generated")
+                hero_span.set_attribute("backend", hero_backend)
+                api_response_time_ms = (time.time() - api_start) * 1000
+                api_response_times.append(api_response_time_ms)
+                histograms.observe(f"hero_generation.{hero_backend}", api_response_time_ms)
+                histograms.add_bytes("image_download", len(hero_image_bytes))
+                hero_seconds.observe(api_response_time_ms / 1000, backend=hero_backend)
+                total_api_calls += 1
+                cache_misses += 1  # Track cache miss
+                cache_misses_total.inc(kind="hero")
+                print(f"  ✓ Hero image generated for {product.product_id}")
+
+                # Save generated hero image for future reuse
+                self._persist_hero(brief.campaign_id, product.product_id, hero_image_bytes, hero_fingerprint, hero_backend)
+                if self.hero_cache is not None:
+                    self.hero_cache.put(hero_fingerprint, hero_image_bytes, hero_backend)
+                return hero_image_bytes, hero_backend
+
+        def render(product_span, hero_task: str, localize_task: Optional[str], locale: str, ratio: str, logo_path: Optional[str]):
+            """Render one variant on a render pool thread."""
+            hero_image_bytes, _ = graph.result(hero_task)
+            message = graph.result(localize_task) if localize_task else brief.campaign_message
+            img_proc_start = time.time()
+            renders_in_flight.inc()
             try:
-                hero_image_saved = False
-                hero_image_path = None
-
-                # Generate or load hero image
-                if product.existing_assets and 'hero' in product.existing_assets:
-                    print(f"  ✓ Using existing hero image: {product.existing_assets['hero']}")
-                    try:
-                        with open(product.existing_assets['hero'], 'rb') as f:
-                            hero_image_bytes = f.read()
-                        hero_image_path = product.existing_assets['hero']
-                        hero_image_saved = True
-                        cache_hits += 1  # Track cache hit
-                    except (FileNotFoundError, IOError) as e:
-                        print(f"  ⚠️  Could not read existing image: {e}")
-                        print(f"  🎨 Generating hero image instead with {backend_name}...")
-                        prompt = product.generation_prompt or f"professional product photo of {product.product_name}, {product.product_description}"
-
-                        # Track API call timing
-                        api_start = time.time()
-                        hero_image_bytes = await self.image_service.generate_image(
-                            prompt,
-                            size="2048x2048",
-                            brand_guidelines=brand_guidelines
-                        )
-                        api_response_time_ms = (time.time() - api_start) * 1000
-                        api_response_times.append(api_response_time_ms)
-                        total_api_calls += 1
-                        cache_misses += 1  # Track cache miss
-                else:
-                    print(f"  🎨 Generating hero image with {backend_name}...")
-                    prompt = product.generation_prompt or f"professional product photo of {product.product_name}, {product.product_description}"
-
-                    # Track API call timing
-                    api_start = time.time()
-                    hero_image_bytes = await self.image_service.generate_image(
-                        prompt,
-                        size="2048x2048",
-                        brand_guidelines=brand_guidelines
+                with tracing.use_span(product_span), tracing.span("render", locale=locale, aspect_ratio=ratio):
+                    final_image = self._render_variant(
+                        hero_image_bytes,
+                        ratio,
+                        message,
+                        brand_guidelines,
+                        logo_path,
+                        processor=render_pool.processor()
                     )
-                    api_response_time_ms = (time.time() - api_start) * 1000
-                    api_response_times.append(api_response_time_ms)
-                    total_api_calls += 1
-                    cache_misses += 1  # Track cache miss
-                    print(f"  ✓ Hero image generated")
-
-                    # Save generated hero image for future reuse
-                    hero_dir = self.storage.output_dir / product.product_id / brief.campaign_id / "hero"
-                    hero_dir.mkdir(parents=True, exist_ok=True)
-                    hero_image_path = str(hero_dir / f"{product.product_id}_hero.png")
-
-                    # Convert bytes to PIL Image and save
-                    from PIL import Image
-                    from io import BytesIO
-                    hero_img = Image.open(BytesIO(hero_image_bytes))
-                    hero_img.save(hero_image_path, optimize=True, quality=95)
-                    hero_image_saved = True
-                    print(f"  💾 Saved hero image: {hero_image_path}")
-                
-                # Process each locale
-                for locale in brief.target_locales:
-                    print(f"\n  🌍 Processing locale: {locale}")
-
-                    # Localize message (only if needed)
-                    if locale != brief.campaign_message.locale and localization_guidelines:
-                        loc_start = time.time()
-                        localized_message = await self.claude_service.localize_message(
-                            brief.campaign_message,
+            finally:
+                renders_in_flight.dec()
+            render_ms = (time.time() - img_proc_start) * 1000
+            histograms.observe("render", render_ms)
+            render_seconds.observe(render_ms / 1000)
+            return final_image
+
+        def encode(product_span, render_task: str) -> bytes:
+            """Encode a rendered variant on a render pool thread."""
+            with tracing.use_span(product_span), histograms.timer("encode"):
+                return self.storage.encode_image(graph.result(render_task), output_format)
+
+        def record_asset(product: Product, locale: str, ratio: str, asset_path: Path, asset_backend: str) -> None:
+            """Track an asset (whether reused or generated)."""
+            asset = GeneratedAsset(
+                product_id=product.product_id,
+                locale=locale,
+                aspect_ratio=ratio,
+                file_path=str(asset_path),
+                generation_method=asset_backend,  # Backend that served the hero
+                timestamp=datetime.now()
+            )
+            generated_assets.append(asset)
+            report_writer.write_asset(asset)
+            progress.emit("asset_completed", **asset.model_dump(mode="json"))
+
+        async def save(product_span, product: Product, encode_task: str, hero_task: str, locale: str, ratio: str, asset_path: Path, variant_fingerprint: str):
+            _, hero_backend = graph.result(hero_task)
+            with tracing.use_span(product_span):
+                await asyncio.to_thread(self.storage.write_encoded, graph.result(encode_task), asset_path)
+            self.storage.manifest.record(
+                brief.campaign_id,
+                product.product_id,
+                VARIANT_KIND,
+                str(asset_path),
+                variant_fingerprint,
+                locale=locale,
+                aspect_ratio=ratio,
+                format=output_format,
+                backend=hero_backend
+            )
+            print(f"    ✓ Saved: {asset_path}")
+            record_asset(product, locale, ratio, asset_path, hero_backend)
+
+        async def reuse(product: Product, hero_task: str, locale: str, ratio: str, asset_path: Path, asset_backend: Optional[str]):
+            record_asset(product, locale, ratio, asset_path, asset_backend or graph.result(hero_task)[1])
+
+        def fail_product(product: Product, product_span, error: BaseException) -> None:
+            error_msg = f"Error processing product {product.product_id}: {str(error)}"
+            print(f"  ❌ {error_msg}")
+            errors.append(error_msg)
+            product_span.set_attribute("error", str(error))
+            product_span.set_status("error")
+            progress.emit("product_failed", product_id=product.product_id, error=str(error))
+
+            # Capture full error trace
+            full_error_traces.append({
+                "product_id": product.product_id,
+                "error": str(error),
+                "traceback": "".join(traceback.format_exception(type(error), error, error.__traceback__))
+            })
+
+        async def finish_product(product: Product, product_span, tasks: List[str]):
+            """Runs once all of a product's work has finished (or failed)."""
+            nonlocal peak_memory_mb
+            failed = next((graph[task] for task in tasks if graph[task].status != DONE), None)
+            if failed is not None:
+                fail_product(product, product_span, failed.error)
+
+            # Update peak memory usage after each product
+            current_memory_mb = process.memory_info().rss / (1024 * 1024)
+            peak_memory_mb = max(peak_memory_mb, current_memory_mb)
+            products_pending.dec()
+            product_span.end()
+            progress.emit("product_completed", product_id=product.product_id)
+
+        def plan_product(product: Product, product_span) -> List[str]:
+            """Add a product's hero and variant tasks; returns the tasks to wait for."""
+            hero_task = f"hero:{product.product_id}"
+            brief_hero = None
+            hero_fingerprint = None
+
+            if product.existing_assets and 'hero' in product.existing_assets:
+                print(f"  ✓ Using existing hero image: {product.existing_assets['hero']}")
+                try:
+                    with open(product.existing_assets['hero'], 'rb') as f:
+                        brief_hero = f.read()
+                    hero_fingerprint = fingerprint("hero-file", hashlib.sha256(brief_hero).hexdigest())
+                except (FileNotFoundError, IOError) as e:
+                    print(f"  ⚠️  Could not read existing image: {e}")
+                    print(f"  🎨 Generating hero image instead with {backend_name}...")
+            if brief_hero is None:
+                hero_fingerprint = fingerprint("hero", backend, hero_prompt(product), HERO_IMAGE_SIZE, brand_guidelines)
+
+            graph.add(
+                hero_task,
+                functools.partial(fetch_hero, product, product_span, hero_fingerprint, brief_hero),
+                deps=["plan"],
+                resource="image_api"
+            )
+            tasks = [hero_task]
+
+            logo_path = None
+            if product.existing_assets and 'logo' in product.existing_assets:
+                if Path(product.existing_assets['logo']).exists():
+                    logo_path = product.existing_assets['logo']
+
+            for locale in brief.target_locales:
+                for ratio in brief.aspect_ratios:
+                    key = f"{product.product_id}:{locale}:{ratio}"
+                    asset_path = None
+                    asset_backend = None
+                    variant_fingerprint = variant_input_fingerprint(
+                        hero_fingerprint,
+                        brief.campaign_message,
+                        locale,
+                        localization_guidelines,
+                        ratio,
+                        output_format,
+                        brand_guidelines,
+                        logo_path
+                    )
+
+                    # Check if this specific asset already exists in the brief
+                    asset_key = f"{locale}_{ratio}"
+                    if product.existing_assets and asset_key in product.existing_assets:
+                        existing_path = product.existing_assets[asset_key]
+                        # Verify the file actually exists
+                        if Path(existing_path).exists():
+                            print(f"    ✓ Using existing {ratio} asset: {existing_path}")
+                            asset_path = Path(existing_path)
+                            cache_hits_total.inc(kind="variant")
+                        else:
+                            print(f"    ⚠️  Existing asset not found, regenerating {ratio}...")
+
+                    # Then check the manifest for an asset built from identical inputs
+                    if asset_path is None:
+                        variant_record = self.storage.manifest.lookup_variant(
+                            brief.campaign_id,
+                            product.product_id,
                             locale,
-                            localization_guidelines
+                            ratio,
+                            output_format,
+                            input_fingerprint=variant_fingerprint
                         )
-                        localization_total_ms += (time.time() - loc_start) * 1000
-                    else:
-                        localized_message = brief.campaign_message
-
-                    # Generate variations for each aspect ratio
-                    for ratio in brief.aspect_ratios:
-                        # Check if this specific asset already exists
-                        asset_key = f"{locale}_{ratio}"
-
-                        if product.existing_assets and asset_key in product.existing_assets:
-                            existing_path = product.existing_assets[asset_key]
-                            # Verify the file actually exists
-                            if Path(existing_path).exists():
-                                print(f"    ✓ Using existing {ratio} asset: {existing_path}")
-                                asset_path = Path(existing_path)
-                            else:
-                                print(f"    ⚠️  Existing asset not found, regenerating {ratio}...")
-                                # Generate since file doesn't exist
-                                img_proc_start = time.time()
-
-                                resized_image = self.image_processor.resize_to_aspect_ratio(
-                                    hero_image_bytes,
-                                    ratio
-                                )
-                                final_image = self.image_processor.apply_text_overlay(
-                                    resized_image,
-                                    localized_message,
-                                    brand_guidelines
-                                )
-
-                                # Apply logo overlay if logo asset exists
-                                if product.existing_assets and 'logo' in product.existing_assets:
-                                    logo_path = product.existing_assets['logo']
-                                    if Path(logo_path).exists():
-                                        final_image = self.image_processor.apply_logo_overlay(
-                                            final_image,
-                                            logo_path,
-                                            brand_guidelines
-                                        )
-
-                                # NEW: Apply post-processing (Phase 1)
-                                if brand_guidelines and brand_guidelines.post_processing:
-                                    final_image = self.image_processor.apply_post_processing(
-                                        final_image,
-                                        brand_guidelines.post_processing
-                                    )
-
-                                image_processing_total_ms += (time.time() - img_proc_start) * 1000
-
-                                output_format = brief.output_formats[0] if brief.output_formats else "png"
-                                asset_path = self.storage.get_asset_path(
-                                    brief.campaign_id,
-                                    locale,
-                                    product.product_id,
-                                    ratio,
-                                    output_format
-                                )
-                                self.storage.save_image(final_image, asset_path)
-                                print(f"    ✓ Saved: {asset_path}")
-                        else:
-                            # Asset doesn't exist in brief, generate it
-                            print(f"    📐 Generating {ratio} variation...")
-
-                            # Track image processing time
-                            img_proc_start = time.time()
-
-                            # Resize image
-                            resized_image = self.image_processor.resize_to_aspect_ratio(
-                                hero_image_bytes,
-                                ratio
-                            )
-
-                            # Apply text overlay
-                            final_image = self.image_processor.apply_text_overlay(
-                                resized_image,
-                                localized_message,
-                                brand_guidelines
-                            )
-
-                            # Apply logo overlay if logo asset exists
-                            if product.existing_assets and 'logo' in product.existing_assets:
-                                logo_path = product.existing_assets['logo']
-                                if Path(logo_path).exists():
-                                    final_image = self.image_processor.apply_logo_overlay(
-                                        final_image,
-                                        logo_path,
-                                        brand_guidelines
-                                    )
-
-                            # NEW: Apply post-processing (Phase 1)
-                            if brand_guidelines and brand_guidelines.post_processing:
-                                final_image = self.image_processor.apply_post_processing(
-                                    final_image,
-                                    brand_guidelines.post_processing
-                                )
-
-                            image_processing_total_ms += (time.time() - img_proc_start) * 1000
-
-                            # Save
-                            output_format = brief.output_formats[0] if brief.output_formats else "png"
-                            asset_path = self.storage.get_asset_path(
-                                brief.campaign_id,
-                                locale,
-                                product.product_id,
-                                ratio,
-                                output_format
-                            )
-
-                            self.storage.save_image(final_image, asset_path)
-                            print(f"    ✓ Saved: {asset_path}")
-
-                        # Track asset (whether reused or generated)
-                        asset = GeneratedAsset(
-                            product_id=product.product_id,
-                            locale=locale,
-                            aspect_ratio=ratio,
-                            file_path=str(asset_path),
-                            generation_method=backend,  # Fixed: Use actual backend name
-                            timestamp=datetime.now()
+                        if variant_record:
+                            print(f"    ✓ Reusing {ratio} asset from manifest: {variant_record['file_path']}")
+                            asset_path = Path(variant_record['file_path'])
+                            asset_backend = variant_record['backend']
+                            cache_hits_total.inc(kind="variant")
+
+                    if asset_path is not None:
+                        graph.add(
+                            f"reuse:{key}",
+                            functools.partial(reuse, product, hero_task, locale, ratio, asset_path, asset_backend),
+                            deps=[hero_task]
                         )
-                        generated_assets.append(asset)
+                        tasks.append(f"reuse:{key}")
+                        continue
 
-                # Track hero image path if saved
-                if hero_image_saved and hero_image_path:
-                    hero_images[product.product_id] = hero_image_path
+                    # Localized once per locale, and only if some variant needs it
+                    localize_task = None
+                    if locale != brief.campaign_message.locale and localization_guidelines:
+                        localize_task = f"localize:{locale}"
+                        if localize_task not in graph:
+                            graph.add(localize_task, functools.partial(localize, locale), deps=["plan"], resource="llm")
+
+                    print(f"    📐 Queued {ratio} variation for {locale}")
+                    cache_misses_total.inc(kind="variant")
+                    asset_path = self.storage.get_asset_path(
+                        brief.campaign_id,
+                        locale,
+                        product.product_id,
+                        ratio,
+                        output_format
+                    )
+                    render_jobs[f"render:{key}"] = (hero_task, ratio, logo_path)
+                    graph.add(
+                        f"render:{key}",
+                        functools.partial(render, product_span, hero_task, localize_task, locale, ratio, logo_path),
+                        deps=[hero_task] + ([localize_task] if localize_task else []),
+                        resource="cpu",
+                        executor=THREAD,
+                        retain=False
+                    )
+                    graph.add(
+                        f"encode:{key}",
+                        functools.partial(encode, product_span, f"render:{key}"),
+                        deps=[f"render:{key}"],
+                        resource="cpu",
+                        executor=THREAD,
+                        retain=False
+                    )
+                    graph.add(
+                        f"save:{key}",
+                        functools.partial(save, product_span, product, f"encode:{key}", hero_task, locale, ratio, asset_path, variant_fingerprint),
+                        deps=[f"encode:{key}", hero_task],
+                        resource="disk"
+                    )
+                    tasks.append(f"save:{key}")
+            return tasks
+
+        async def plan():
+            """Expand the per-product work once guidelines and compliance are settled."""
+            nonlocal report_writer
+            print(f"\n🎨 Generating assets for {len(brief.products)} products...")
+
+            # Assets are streamed into a single consolidated report as they complete
+            report_writer = self.storage.open_report_writer(brief.campaign_id)
+            products_pending.inc(len(brief.products))
+            progress.emit(
+                "campaign_started",
+                campaign_id=brief.campaign_id,
+                products=len(brief.products),
+                expected_assets=len(brief.products) * len(brief.target_locales) * len(brief.aspect_ratios)
+            )
 
-            except Exception as e:
-                import traceback
-                error_msg = f"Error processing product {product.product_id}: {str(e)}"
-                print(f"  ❌ {error_msg}")
-                errors.append(error_msg)
-
-                # Capture full error trace
-                full_error_traces.append({
-                    "product_id": product.product_id,
-                    "error": str(e),
-                    "traceback": traceback.format_exc()
-                })
+            for product in brief.products:
+                print(f"\n📦 Processing product: {product.product_name} ({product.product_id})")
+                progress.emit("product_started", product_id=product.product_id)
+                product_span = tracing.open_span("product", product_id=product.product_id)
+                try:
+                    tasks = plan_product(product, product_span)
+                except Exception as e:
+                    # Tasks added before the error still run; the product is reported failed
+                    fail_product(product, product_span, e)
+                    tasks = [name for name in graph.nodes if name.split(":")[1:2] == [product.product_id]]
+                graph.add(
+                    f"product:{product.product_id}",
+                    functools.partial(finish_product, product, product_span, tasks),
+                    deps=tasks,
+                    always_run=True
+                )
+
+        guideline_tasks = []
+        if brief.brand_guidelines_file:
+            guideline_tasks.append(graph.add("guidelines:brand", load_brand_guidelines).name)
+        if brief.enable_localization and brief.localization_guidelines_file:
+            guideline_tasks.append(graph.add("guidelines:localization", load_localization_guidelines).name)
+        if brief.legal_compliance_file:
+            guideline_tasks.append(graph.add("guidelines:legal", load_legal_guidelines).name)
+            guideline_tasks.append(graph.add("compliance", check_compliance, deps=["guidelines:legal"]).name)
+        graph.add("plan", plan, deps=guideline_tasks)
+
+        try:
+            await scheduler.run(graph)
+
+            # A blocking compliance violation (or a planning error) fails the whole campaign
+            for task in ("compliance", "plan"):
+                if task in graph and graph[task].status == FAILED:
+                    raise graph[task].error
+        except BaseException:
+            # Failed or cancelled (e.g. a server job): drop the partial report
+            if report_writer is not None:
+                report_writer.abort()
+            raise
+        finally:
+            # Renders whose encode never ran (cancelled) still hold memory
+            for held in render_memory.values():
+                held.release()
+            if own_render_pool:
+                render_pool.shutdown()
+
+        # Tasks finish in any order; report assets in brief order
+        product_order = {product.product_id: i for i, product in enumerate(brief.products)}
+        locale_order = {locale: i for i, locale in enumerate(brief.target_locales)}
+        ratio_order = {ratio: i for i, ratio in enumerate(brief.aspect_ratios)}
+        generated_assets.sort(key=lambda asset: (
+            product_order.get(asset.product_id, 0),
+            locale_order.get(asset.locale, 0),
+            ratio_order.get(asset.aspect_ratio, 0)
+        ))
+        image_processing_total_ms = sum(
+            node.duration_ms for node in graph if node.name.startswith("render:") and node.status == DONE
+        )
+        critical_path_steps = critical_path_summary(graph)
+        queue_wait_ms: Dict[str, float] = {}
+        for node in graph:
+            if node.wait_ms > 0:
+                queue_wait_ms[node.resource] = round(queue_wait_ms.get(node.resource, 0.0) + node.wait_ms, 1)
+        deadline_met = time.time() <= brief.deadline.timestamp() if brief.deadline else None
 
-            # Update peak memory usage after each product
-            current_memory_mb = process.memory_info().rss / (1024 * 1024)
-            peak_memory_mb = max(peak_memory_mb, current_memory_mb)
-        
         # Calculate metrics
         elapsed_time = time.time() - start_time
         total_expected = len(brief.products) * len(brief.target_locales) * len(brief.aspect_ratios)
         success_rate = len(generated_assets) / total_expected if total_expected > 0 else 0.0
+        registry.counter(
+            "pipeline_campaigns_total", "Campaigns processed by outcome", ("status",)
+        ).inc(status="failed" if errors else "success")
+        registry.counter("pipeline_assets_total", "Assets produced (generated or reused)").inc(len(generated_assets))
+        registry.counter("pipeline_product_errors_total", "Products that failed to process").inc(len(errors))
+        registry.gauge(
+            "pipeline_last_campaign_duration_seconds", "Wall-clock duration of the most recent campaign"
+        ).set(elapsed_time)
+
+        # The service chain is shared with concurrently running campaigns, so
+        # only events recorded in this campaign's context are counted (absent
+        # when called outside process_campaign)
+        image_calls = call_stats.current() or call_stats.ImageCallStats()
+
+        # Failed attempts that moved to the next backend count as retries; backends
+        # skipped because their circuit was open were never tried
+        retry_reasons.extend(image_calls.failover_events)
+        retry_count += len(image_calls.failover_events)
+        circuit_open_skips = len(image_calls.skip_events)
+
+        # Coalesced requests never reached the backend
+        coalesced_requests = image_calls.coalesced_requests
+        total_api_calls -= coalesced_requests
+
+        # Streaming per-operation histograms (absent when called outside process_campaign)
+        run_histograms = histograms.current() or histograms.OperationHistograms()
+
+        # The background sampler sees transient peaks inside a product
+        if memory_sampler:
+            memory_sampler.sample()
+            peak_memory_mb = max(peak_memory_mb, memory_sampler.peak_rss_mb)
+
+        # Hedges are extra API calls on top of the original requests
+        hedged_requests = image_calls.hedged_requests
+        hedge_wins = image_calls.hedge_wins
+        hedge_rate = image_calls.hedge_rate
+        total_api_calls += hedged_requests
 
         # Calculate technical metrics
         cache_hit_rate = (cache_hits / (cache_hits + cache_misses) * 100) if (cache_hits + cache_misses) > 0 else 0.0
@@ -434,11 +779,18 @@ class CreativeAutomationPipeline:
         technical_metrics = TechnicalMetrics(
             backend_used=backend,
             total_api_calls=total_api_calls,
+            coalesced_requests=coalesced_requests,
+            hedged_requests=hedged_requests,
+            hedge_wins=hedge_wins,
+            hedge_rate=hedge_rate,
+            latency_histograms=run_histograms.latencies_to_dict(),
+            bytes_transferred=dict(run_histograms.bytes),
             cache_hits=cache_hits,
             cache_misses=cache_misses,
             cache_hit_rate=cache_hit_rate,
             retry_count=retry_count,
             retry_reasons=retry_reasons,
+            circuit_open_skips=circuit_open_skips,
             avg_api_response_time_ms=avg_api_response_time,
             min_api_response_time_ms=min_api_response_time,
             max_api_response_time_ms=max_api_response_time,
@@ -446,8 +798,15 @@ class CreativeAutomationPipeline:
             localization_time_ms=localization_total_ms,
             compliance_check_time_ms=compliance_check_total_ms,
             peak_memory_mb=peak_memory_mb,
+            peak_python_memory_mb=memory_sampler.peak_python_mb if memory_sampler else None,
+            memory_timeline=memory_sampler.timeline() if memory_sampler else [],
+            memory_sample_interval_ms=memory_sampler.timeline_interval_ms if memory_sampler else 0.0,
             system_info=system_info,
-            full_error_traces=full_error_traces
+            full_error_traces=full_error_traces,
+            queue_wait_ms=queue_wait_ms,
+            deadline_met=deadline_met,
+            render_memory_wait_ms=round(render_memory_wait_ms, 1),
+            critical_path=critical_path_steps
         )
 
         # Calculate business metrics
@@ -518,21 +877,18 @@ class CreativeAutomationPipeline:
             business_metrics=business_metrics
         )
 
-        # Save per-product reports
-        report_paths = []
-        for product in brief.products:
-            report_path = self.storage.save_report(
-                output,
-                brief.campaign_id,
-                product.product_id
-            )
-            report_paths.append(report_path)
-            print(f"   📄 Report saved: {report_path}")
+        # Publish the consolidated campaign report
+        report_path = report_writer.finalize(output)
+        print(f"   📄 Report saved: {report_path}")
 
-        # Update original brief with generated asset paths
-        if brief_path:
+        # Optionally export manifest asset paths back into the original brief
+        if update_brief is None:
+            update_brief = self.storage.config.EXPORT_BRIEF_ASSETS
+        if brief_path and update_brief:
             try:
-                self.storage.update_campaign_brief(brief_path, output, hero_images)
+                backup_path = self.storage.backup_campaign_brief(brief_path)
+                print(f"📋 Backed up original brief to: {backup_path}")
+                self.storage.export_manifest_to_brief(brief_path, brief.campaign_id)
             except Exception as e:
                 print(f"⚠️  Could not update brief: {e}")
                 # Don't fail the pipeline if update fails
@@ -541,18 +897,44 @@ class CreativeAutomationPipeline:
         print(f"   Total assets generated: {len(generated_assets)}")
         print(f"   Processing time: {elapsed_time:.1f} seconds")
         print(f"   Success rate: {success_rate * 100:.1f}%")
-        print(f"   Reports saved: {len(report_paths)} product reports")
+        print(f"   Report: {report_path}")
 
         # Display enhanced metrics
         print(f"\n📊 Technical Metrics:")
         print(f"   Backend: {backend}")
         print(f"   API Calls: {total_api_calls} total, {cache_hits} cache hits ({cache_hit_rate:.1f}% hit rate)")
+        if coalesced_requests:
+            print(f"   Coalesced Requests: {coalesced_requests} (shared an in-flight API call)")
+        if hedged_requests:
+            print(f"   Hedged Requests: {hedged_requests} ({hedge_rate:.1f}% of requests, {hedge_wins} won)")
         print(f"   API Response Time: {avg_api_response_time:.0f}ms avg ({min_api_response_time:.0f}-{max_api_response_time:.0f}ms range)")
         print(f"   Image Processing: {image_processing_total_ms:.0f}ms total")
         print(f"   Localization: {localization_total_ms:.0f}ms total")
         if compliance_check_total_ms > 0:
             print(f"   Compliance Check: {compliance_check_total_ms:.0f}ms")
         print(f"   Peak Memory: {peak_memory_mb:.1f} MB")
+        if queue_wait_ms:
+            waits = ", ".join(f"{resource} {wait:.0f}ms" for resource, wait in sorted(queue_wait_ms.items()))
+            print(f"   Queue Wait ({brief.priority} priority): {waits}")
+        if render_memory_wait_ms >= 1:
+            print(f"   Render Memory Wait: {render_memory_wait_ms:.0f}ms (budget {memory.budget_bytes / (1024 * 1024):.0f} MB)")
+        if deadline_met is False:
+            print(f"   ⚠️  Deadline missed: {brief.deadline.isoformat()}")
+        if critical_path_steps:
+            last_step = critical_path_steps[-1]
+            print(
+                f"   Critical Path: {last_step['start_ms'] + last_step['duration_ms']:.0f}ms over "
+                f"{len(critical_path_steps)} tasks (ends with {last_step['task']})"
+            )
+        if memory_sampler and memory_sampler.peak_python_mb is not None:
+            print(f"   Peak Python Heap: {memory_sampler.peak_python_mb:.1f} MB")
+        if run_histograms.latencies:
+            print(f"   Latency Percentiles (p50 / p90 / p99):")
+            for operation, histogram in sorted(run_histograms.latencies.items()):
+                print(
+                    f"      {operation}: {histogram.percentile(50):.0f} / {histogram.percentile(90):.0f} / "
+                    f"{histogram.percentile(99):.0f} ms ({histogram.count} samples)"
+                )
 
         print(f"\n💰 Business Metrics:")
         print(f"   Time Saved: {time_saved_hours:.1f} hours ({time_saved_percentage:.1f}% vs manual)")
@@ -563,3 +945,286 @@ class CreativeAutomationPipeline:
         print(f"   Compliance Pass Rate: {compliance_pass_rate:.1f}%")
 
         return output
+
+    def _admission(self, brief: CampaignBrief):
+        """
+        Scheduler hook taking the task's slot from the shared arbiter, or
+        None without one.
+
+        Render memory is reserved earlier, through the scheduler's
+        ``reserve`` hook: the memory a render waits for is released by
+        another render's encode, which needs a cpu and an arbiter slot, so a
+        render must not hold either while it waits.
+        """
+        if self.arbiter is None:
+            return None
+        arbiter = self.arbiter
+        level = PRIORITY_LEVELS[brief.priority]
+        deadline = brief.deadline.timestamp() if brief.deadline else None
+        return lambda node: arbiter.slot(node.resource, brief.campaign_id, level, deadline, brief.priority)
+
+    def _check_legal_compliance(self, brief: CampaignBrief, legal_guidelines: LegalComplianceGuidelines) -> None:
+        """Check the campaign message and products; raise on blocking violations."""
+        print(f"\n⚖️  Checking legal compliance...")
+        checker = LegalComplianceChecker(legal_guidelines)
+
+        # Check campaign message
+        is_compliant, violations = checker.check_content(
+            brief.campaign_message,
+            product_content=None,
+            locale=brief.target_locales[0] if brief.target_locales else "en-US"
+        )
+
+        # Check each product
+        for product in brief.products:
+            product_content = {
+                "description": product.product_description,
+                "features": product.key_features
+            }
+            product_compliant, product_violations = checker.check_content(
+                brief.campaign_message,
+                product_content=product_content,
+                locale=brief.target_locales[0] if brief.target_locales else "en-US"
+            )
+
+            if not product_compliant:
+                is_compliant = False
+
+        # Display compliance report
+        if violations:
+            print("\n" + checker.generate_report())
+
+            # Check if there are blocking errors
+            summary = checker.get_violation_summary()
+            if summary["errors"] > 0:
+                print(f"\n❌ Campaign cannot proceed due to {summary['errors']} legal compliance error(s)")
+                print("   Please fix the errors above and try again.")
+                raise Exception("Legal compliance check failed - errors must be resolved")
+            elif summary["warnings"] > 0:
+                print(f"\n⚠️  Campaign can proceed but {summary['warnings']} warning(s) should be reviewed")
+        else:
+            print("✓ No legal compliance violations found")
+
+    def _create_image_service(self, backend: str):
+        """
+        Build the image service chain for a backend.
+
+        Returns (service, failover_service, hedged_service): failover across
+        FALLBACK_IMAGE_BACKENDS, optional hedging, then single-flight on top.
+        The inner services are returned (or None) for their metrics.
+        """
+        config = get_config()
+        fallback_backends = [b for b in config.FALLBACK_IMAGE_BACKENDS if b != backend]
+        failover_service = None
+        hedged_service = None
+        if fallback_backends:
+            failover_service = ImageGenerationFactory.create_failover([backend] + fallback_backends)
+            base_service = failover_service
+        else:
+            base_service = ImageGenerationFactory.create(backend)
+
+        # Optionally race a duplicate request against slow heroes
+        if config.HEDGE_ENABLED:
+            hedge_backend = config.HEDGE_BACKEND or None
+            hedged_service = HedgedImageService(
+                base_service,
+                hedge_service=ImageGenerationFactory.create(hedge_backend) if hedge_backend else None,
+                hedge_backend=hedge_backend,
+                percentile=config.HEDGE_PERCENTILE,
+                initial_delay_ms=config.HEDGE_INITIAL_DELAY_MS,
+                min_samples=config.HEDGE_MIN_SAMPLES,
+                max_hedge_ratio=config.HEDGE_MAX_RATIO
+            )
+            base_service = hedged_service
+
+        # Identical in-flight hero requests share a single API call
+        return SingleFlightImageService(base_service), failover_service, hedged_service
+
+    def _persist_hero(
+        self,
+        campaign_id: str,
+        product_id: str,
+        hero_image_bytes: bytes,
+        hero_fingerprint: str,
+        hero_backend: str
+    ) -> str:
+        """Save a hero image, record it in the manifest and return its path."""
+        hero_image_path = self._save_hero_image(hero_image_bytes, campaign_id, product_id)
+        self.storage.manifest.record(
+            campaign_id,
+            product_id,
+            HERO_KIND,
+            hero_image_path,
+            hero_fingerprint,
+            backend=hero_backend
+        )
+        print(f"  💾 Saved hero image: {hero_image_path}")
+        return hero_image_path
+
+    def _save_hero_image(
+        self,
+        hero_image_bytes: bytes,
+        campaign_id: str,
+        product_id: str
+    ) -> str:
+        """Persist a generated hero image for future reuse."""
+        from PIL import Image
+        from io import BytesIO
+
+        hero_dir = self.storage.output_dir / product_id / campaign_id / "hero"
+        hero_dir.mkdir(parents=True, exist_ok=True)
+        hero_image_path = str(hero_dir / f"{product_id}_hero.png")
+
+        hero_img = Image.open(BytesIO(hero_image_bytes))
+        with histograms.timer("hero_write"):
+            hero_img.save(hero_image_path, optimize=True, quality=95)
+        histograms.add_bytes("disk_write", Path(hero_image_path).stat().st_size)
+        return hero_image_path
+
+    async def _render(
+        self,
+        hero_image_bytes: bytes,
+        ratio: str,
+        message: CampaignMessage,
+        brand_guidelines: Optional[ComprehensiveBrandGuidelines],
+        logo_path: Optional[str] = None
+    ):
+        """
+        Render a variant inline, or on the shared render pool when one is set,
+        once the memory admission controller (if enabled) has room for it.
+        """
+        async with self._render_memory(hero_image_bytes, ratio, brand_guidelines, logo_path):
+            return await self._render_now(hero_image_bytes, ratio, message, brand_guidelines, logo_path)
+
+    @contextlib.asynccontextmanager
+    async def _render_memory(
+        self,
+        hero_image_bytes: bytes,
+        ratio: str,
+        brand_guidelines: Optional[ComprehensiveBrandGuidelines],
+        logo_path: Optional[str] = None
+    ):
+        """
+        Hold a render's estimated peak memory for the block, when admission
+        control is enabled. Callers that encode the frame keep it open until
+        the encode finishes, since the frame stays resident until then.
+        """
+        memory = self.memory_admission or admission.get_controller()
+        if memory is None:
+            yield None
+            return
+
+        hero_size, hero_bands = admission.image_header(hero_image_bytes)
+        estimate = self.image_processor.estimate_render_bytes(
+            hero_size, hero_bands, ratio, brand_guidelines, has_logo=bool(logo_path)
+        )
+        async with memory.reserve(estimate) as reservation:
+            yield reservation
+
+    async def _render_now(
+        self,
+        hero_image_bytes: bytes,
+        ratio: str,
+        message: CampaignMessage,
+        brand_guidelines: Optional[ComprehensiveBrandGuidelines],
+        logo_path: Optional[str] = None
+    ):
+        if self.render_pool is None:
+            return self._render_variant(hero_image_bytes, ratio, message, brand_guidelines, logo_path)
+
+        pool = self.render_pool
+        return await pool.run(
+            lambda: self._render_variant(
+                hero_image_bytes, ratio, message, brand_guidelines, logo_path,
+                processor=pool.processor()
+            )
+        )
+
+    def _render_variant(
+        self,
+        hero_image_bytes: bytes,
+        ratio: str,
+        message: CampaignMessage,
+        brand_guidelines: Optional[ComprehensiveBrandGuidelines],
+        logo_path: Optional[str] = None,
+        processor: Optional[ImageProcessor] = None
+    ):
+        """Crop, overlay text and logo, and post-process a single variant."""
+        processor = processor or self.image_processor
+        resized_image = processor.resize_to_aspect_ratio(
+            hero_image_bytes,
+            ratio
+        )
+        final_image = processor.apply_text_overlay(
+            resized_image,
+            message,
+            brand_guidelines
+        )
+
+        # Apply logo overlay if logo asset exists
+        if logo_path:
+            final_image = processor.apply_logo_overlay(
+                final_image,
+                logo_path,
+                brand_guidelines
+            )
+
+        # Apply post-processing (Phase 1)
+        if brand_guidelines and brand_guidelines.post_processing:
+            final_image = processor.apply_post_processing(
+                final_image,
+                brand_guidelines.post_processing
+            )
+
+        return final_image
+
+
+def hero_prompt(product: Product) -> str:
+    """Image generation prompt for a product's hero."""
+    return product.generation_prompt or f"professional product photo of {product.product_name}, {product.product_description}"
+
+
+def variant_input_fingerprint(
+    hero_fingerprint: str,
+    message: CampaignMessage,
+    locale: str,
+    localization_guidelines: Optional[LocalizationGuidelines],
+    ratio: str,
+    output_format: str,
+    brand_guidelines: Optional[ComprehensiveBrandGuidelines],
+    logo_path: Optional[str]
+) -> str:
+    """Fingerprint of every input that determines a rendered variant."""
+    return fingerprint(
+        "variant",
+        hero_fingerprint,
+        message,
+        locale,
+        localization_guidelines,
+        ratio,
+        output_format,
+        brand_guidelines,
+        logo_path
+    )
+
+
+async def _cached_task(cache: Dict, key, factory):
+    """
+    Await the cached task for ``key``, starting ``factory()`` on a miss.
+
+    Concurrent callers share the in-progress task. Failures are evicted so a
+    later call retries, and a task from a different (closed) event loop is
+    replaced rather than awaited.
+    """
+    loop = asyncio.get_running_loop()
+    future = cache.get(key)
+    if future is None or (not future.done() and future.get_loop() is not loop):
+        future = loop.create_task(factory())
+        cache[key] = future
+    try:
+        return await asyncio.shield(future)
+    except Exception:
+        # Don't cache failures; a later campaign may succeed
+        if cache.get(key) is future:
+            del cache[key]
+        raise
@@ -0,0 +1,460 @@
+"""Pre-flight planning: the work, duration and API spend of a brief before it runs."""
+import hashlib
+import heapq
+import math
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.config import get_config
+from src.genai.factory import ImageGenerationFactory
+from src.histograms import LatencyHistogram, OperationHistograms, merge_reports
+from src.manifest import fingerprint
+from src.models import CampaignBrief, CampaignPlan, PlannedTask
+from src.pipeline import HERO_IMAGE_SIZE, CreativeAutomationPipeline, hero_prompt, variant_input_fingerprint
+from src.scheduler import DONE, TaskGraph, critical_path_summary
+
+
+# Latencies (ms) used until campaign reports have recorded the operation
+DEFAULT_LATENCY_MS = {
+    "hero_generation": 15000.0,
+    "hero_generation.local": 200.0,
+    "localization": 3000.0,
+    "guideline_parse": 5000.0,  # A Claude extraction; structured files parse in milliseconds
+    "render": 400.0,
+    "encode": 150.0,
+    "disk_write": 20.0,
+}
+OFFLINE_PARSE_MS = 10.0
+
+# Backend names that share a provider (and so a price and a latency profile)
+BACKEND_ALIASES = {"dall-e": "openai", "dalle": "openai", "imagen": "gemini", "synthetic": "local"}
+
+# Stands in for guidelines the plan did not parse (they need a Claude call)
+UNRESOLVED = object()
+
+
+def canonical_backend(backend: str) -> str:
+    return BACKEND_ALIASES.get(backend.lower(), backend.lower())
+
+
+class LatencyModel:
+    """
+    p50 and p90 latency per operation from past campaign reports.
+
+    Operations never recorded fall back to ``DEFAULT_LATENCY_MS``; where
+    each estimate came from is kept in ``sources`` for the plan.
+    """
+
+    def __init__(self, histograms: Optional[OperationHistograms] = None):
+        self.histograms = histograms or OperationHistograms()
+        self.sources: Dict[str, str] = {}
+
+    @classmethod
+    def from_reports(cls, reports_dir: Path, limit: int) -> "LatencyModel":
+        """Merge the histograms of the ``limit`` most recent campaign reports."""
+        reports = sorted(
+            Path(reports_dir).glob("campaign_report_*.jsonl"),
+            key=lambda path: path.stat().st_mtime,
+            reverse=True
+        )[:limit]
+        merged = OperationHistograms()
+        for path in reports:
+            try:
+                merged.merge(merge_reports([path]))
+            except (OSError, ValueError):
+                continue  # Unfinished or damaged report
+        return cls(merged)
+
+    def estimate(self, operation: str, default: Optional[float] = None) -> Tuple[float, float]:
+        """(p50, p90) in ms for an operation, e.g. ``hero_generation.firefly``."""
+        histogram = self.histograms.latencies.get(operation)
+        family, _, backend = operation.partition(".")
+        if family == "hero_generation" and backend:
+            # Aliases and failover-served heroes are recorded under each backend's own name
+            histogram = LatencyHistogram()
+            for name, recorded in self.histograms.latencies.items():
+                prefix, _, recorded_backend = name.partition(".")
+                if prefix == family and canonical_backend(recorded_backend) == canonical_backend(backend):
+                    histogram.merge(recorded)
+        if histogram is not None and histogram.count:
+            self.sources[operation] = f"history ({histogram.count} samples)"
+            return histogram.percentile(50), histogram.percentile(90)
+
+        if default is None:
+            default = DEFAULT_LATENCY_MS.get(operation)
+        if default is None and family == "hero_generation":
+            default = DEFAULT_LATENCY_MS.get(f"hero_generation.{canonical_backend(backend)}")
+        if default is None:
+            default = DEFAULT_LATENCY_MS.get(family, 0.0)
+        self.sources[operation] = "default"
+        return default, default
+
+
+class CampaignPlanner:
+    """
+    Work out what a brief would do without generating anything.
+
+    Mirrors ``CreativeAutomationPipeline._process_campaign``'s decisions:
+    heroes from the brief or the manifest, variants from the brief's
+    existing assets or the manifest (by input fingerprint), localization
+    once per locale that still has a variant to render. The resulting task
+    graph is then simulated under the SCHEDULER_* limits with latencies from
+    past campaign reports to estimate the duration and critical path, and
+    priced with IMAGE_API_COSTS and CLAUDE_COST_PER_CALL.
+
+    Structured guideline files are parsed locally. Guidelines that need
+    Claude (brand guides, document-format localization rules) are only
+    parsed with ``parse_guidelines=True``, which spends those calls now;
+    otherwise reuse that depends on them is looked up without a fingerprint
+    and reported as assumed, since it only holds if they did not change.
+    """
+
+    def __init__(
+        self,
+        image_backend: Optional[str] = None,
+        parse_guidelines: bool = False,
+        latency: Optional[LatencyModel] = None
+    ):
+        self.image_backend = image_backend
+        self.parse_guidelines = parse_guidelines
+        self.pipeline = CreativeAutomationPipeline(image_backend)
+        self.storage = self.pipeline.storage
+        self._latency = latency
+
+    @property
+    def latency(self) -> LatencyModel:
+        if self._latency is None:
+            self._latency = LatencyModel.from_reports(
+                self.storage.get_reports_dir(), get_config().PLAN_HISTORY_REPORTS
+            )
+        return self._latency
+
+    async def plan(self, brief: CampaignBrief) -> CampaignPlan:
+        config = get_config()
+        backend = self.image_backend or brief.image_generation_backend
+        if backend.lower() not in ImageGenerationFactory.BACKENDS:
+            available = ", ".join(ImageGenerationFactory.BACKENDS.keys())
+            raise ValueError(f"Unsupported backend: '{backend}'. Available backends: {available}")
+
+        plan = CampaignPlan(campaign_id=brief.campaign_id, backend=backend)
+        latency = self.latency
+        durations: Dict[str, Tuple[float, float]] = {}
+        extra_hero_calls = 0  # Needed if assumed reuse does not hold
+        assumed_locales = set()  # Likewise, locales that would then need localizing
+
+        def add(name: str, action: str, resource: str, deps: List[str], operation: Optional[str] = None,
+                default: Optional[float] = None, **fields) -> str:
+            plan.tasks.append(PlannedTask(name=name, action=action, resource=resource, deps=deps, **fields))
+            durations[name] = latency.estimate(operation, default) if operation else (0.0, 0.0)
+            return name
+
+        # Guidelines
+        guidelines = {}
+        guideline_tasks = []
+        for kind, attr, path in (
+            ("brand", "brand_parser", brief.brand_guidelines_file),
+            ("localization", "locale_parser",
+             brief.localization_guidelines_file if brief.enable_localization else None),
+            ("legal", "legal_parser", brief.legal_compliance_file),
+        ):
+            if not path:
+                continue
+            guidelines[kind], needs_claude = await self._load_guidelines(kind, attr, path, config, plan)
+            if needs_claude:
+                plan.claude_calls["guidelines"] = plan.claude_calls.get("guidelines", 0) + 1
+            guideline_tasks.append(add(
+                f"guidelines:{kind}", "parse", "io", [], f"guideline_parse.{kind}",
+                None if needs_claude else OFFLINE_PARSE_MS
+            ))
+        brand_guidelines = guidelines.get("brand")
+        localization_guidelines = guidelines.get("localization")
+        legal_guidelines = guidelines.get("legal")
+
+        if legal_guidelines is not None:
+            try:
+                self.pipeline._check_legal_compliance(brief, legal_guidelines)
+            except Exception as e:
+                if "Legal compliance check failed" in str(e):
+                    plan.warnings.append(f"The campaign would fail compliance: {e}")
+
+        # Products
+        output_format = brief.output_formats[0] if brief.output_formats else "png"
+        manifest = self.storage.manifest
+        guidelines_resolved = brand_guidelines is not UNRESOLVED and localization_guidelines is not UNRESOLVED
+        for product in brief.products:
+            hero_task = f"hero:{product.product_id}"
+            hero_fingerprint = None
+            if product.existing_assets and 'hero' in product.existing_assets:
+                try:
+                    with open(product.existing_assets['hero'], 'rb') as f:
+                        hero_fingerprint = fingerprint("hero-file", hashlib.sha256(f.read()).hexdigest())
+                    add(hero_task, "reuse", "image_api", guideline_tasks)
+                except (FileNotFoundError, IOError):
+                    plan.warnings.append(
+                        f"{product.product_id}: existing hero {product.existing_assets['hero']} is unreadable; "
+                        "it would be generated"
+                    )
+            if hero_fingerprint is None:
+                if brand_guidelines is not UNRESOLVED:
+                    hero_fingerprint = fingerprint(
+                        "hero", backend, hero_prompt(product), HERO_IMAGE_SIZE, brand_guidelines
+                    )
+                hero_record = manifest.lookup_hero(
+                    brief.campaign_id, product.product_id, input_fingerprint=hero_fingerprint
+                )
+                if hero_record:
+                    add(hero_task, "reuse", "image_api", guideline_tasks, assumed=hero_fingerprint is None)
+                    extra_hero_calls += hero_fingerprint is None
+                else:
+                    add(hero_task, "generate", "image_api", guideline_tasks, f"hero_generation.{backend}", backend=backend)
+                    plan.hero_calls[backend] = plan.hero_calls.get(backend, 0) + 1
+
+            logo_path = None
+            if product.existing_assets and 'logo' in product.existing_assets:
+                if Path(product.existing_assets['logo']).exists():
+                    logo_path = product.existing_assets['logo']
+
+            for locale in brief.target_locales:
+                needs_localization = bool(
+                    locale != brief.campaign_message.locale and localization_guidelines
+                )
+                for ratio in brief.aspect_ratios:
+                    key = f"{product.product_id}:{locale}:{ratio}"
+                    reused = False
+                    assumed = False
+
+                    asset_key = f"{locale}_{ratio}"
+                    if product.existing_assets and asset_key in product.existing_assets:
+                        reused = Path(product.existing_assets[asset_key]).exists()
+
+                    if not reused:
+                        variant_fingerprint = None
+                        if guidelines_resolved and hero_fingerprint is not None:
+                            variant_fingerprint = variant_input_fingerprint(
+                                hero_fingerprint,
+                                brief.campaign_message,
+                                locale,
+                                localization_guidelines,
+                                ratio,
+                                output_format,
+                                brand_guidelines,
+                                logo_path
+                            )
+                        reused = manifest.lookup_variant(
+                            brief.campaign_id, product.product_id, locale, ratio, output_format,
+                            input_fingerprint=variant_fingerprint
+                        ) is not None
+                        assumed = reused and variant_fingerprint is None
+
+                    if reused:
+                        add(f"reuse:{key}", "reuse", "io", [hero_task], assumed=assumed)
+                        plan.reused_assets += 1
+                        plan.assumed_reuse += assumed
+                        if assumed and needs_localization:
+                            assumed_locales.add(f"localize:{locale}")
+                        continue
+
+                    localize_task = None
+                    if needs_localization:
+                        localize_task = f"localize:{locale}"
+                        if localize_task not in durations:
+                            add(localize_task, "localize", "llm", guideline_tasks, "localization")
+                            plan.claude_calls["localization"] = plan.claude_calls.get("localization", 0) + 1
+
+                    add(f"render:{key}", "render", "cpu",
+                        [hero_task] + ([localize_task] if localize_task else []), "render")
+                    add(f"encode:{key}", "encode", "cpu", [f"render:{key}"], "encode")
+                    add(f"save:{key}", "save", "disk", [f"encode:{key}", hero_task], "disk_write")
+                    plan.renders += 1
+
+        # Duration: the graph under the scheduler's resource limits
+        limits = {
+            "image_api": config.SCHEDULER_IMAGE_API_CONCURRENCY,
+            "llm": config.SCHEDULER_LLM_CONCURRENCY,
+            "cpu": config.SCHEDULER_CPU_WORKERS,
+            "disk": config.SCHEDULER_DISK_CONCURRENCY,
+        }
+        p90_schedule = simulate_schedule(plan.tasks, {name: d[1] for name, d in durations.items()}, limits)
+        schedule = simulate_schedule(plan.tasks, {name: d[0] for name, d in durations.items()}, limits)
+        for task in plan.tasks:
+            task.start_ms, task.end_ms = (round(t, 1) for t in schedule[task.name])
+            task.estimate_ms = round(task.end_ms - task.start_ms, 1)
+        plan.estimated_duration_seconds = round(max((end for _, end in schedule.values()), default=0.0) / 1000, 2)
+        plan.estimated_duration_p90_seconds = round(max((end for _, end in p90_schedule.values()), default=0.0) / 1000, 2)
+        plan.critical_path = plan_critical_path(plan.tasks)
+        plan.latency_sources = dict(sorted(latency.sources.items()))
+
+        # Spend
+        for name, calls in plan.hero_calls.items():
+            price = self._image_price(name, config, plan)
+            plan.cost_breakdown[canonical_backend(name)] = round(
+                plan.cost_breakdown.get(canonical_backend(name), 0.0) + calls * price, 4
+            )
+        claude_calls = sum(plan.claude_calls.values())
+        if claude_calls:
+            plan.cost_breakdown["claude"] = round(claude_calls * config.CLAUDE_COST_PER_CALL, 4)
+        plan.estimated_cost_usd = round(sum(plan.cost_breakdown.values()), 4)
+
+        worst_case = (
+            plan.estimated_cost_usd
+            + extra_hero_calls * self._image_price(backend, config, plan)
+            + len(assumed_locales - set(durations)) * config.CLAUDE_COST_PER_CALL
+        )
+        if config.HEDGE_ENABLED:
+            hero_calls = sum(plan.hero_calls.values()) + extra_hero_calls
+            hedge_backend = config.HEDGE_BACKEND or backend
+            worst_case += math.ceil(hero_calls * config.HEDGE_MAX_RATIO) * self._image_price(hedge_backend, config, plan)
+        plan.worst_case_cost_usd = round(worst_case, 4)
+
+        if config.FALLBACK_IMAGE_BACKENDS:
+            plan.warnings.append(
+                "Failover is configured (" + ", ".join(config.FALLBACK_IMAGE_BACKENDS) + "); "
+                f"heroes are priced at {backend}'s rate but may be served by a fallback"
+            )
+        return plan
+
+    async def _load_guidelines(self, kind: str, attr: str, path: str, config, plan: CampaignPlan):
+        """The guidelines the run would load (or UNRESOLVED) and whether loading them calls Claude."""
+        from src.parsers.brand_parser import BrandGuidelinesParser
+        from src.parsers.legal_parser import LegalComplianceParser
+        from src.parsers.localization_parser import LocalizationGuidelinesParser
+
+        parser_class = {
+            "brand": BrandGuidelinesParser,
+            "localization": LocalizationGuidelinesParser,
+            "legal": LegalComplianceParser,
+        }[kind]
+        if not Path(path).exists():
+            plan.warnings.append(f"{kind.capitalize()} guidelines file not found: {path}; the run would skip it")
+            return None, False
+        if not config.CLAUDE_API_KEY:
+            # The pipeline cannot build its parsers without Claude, so the run would skip them all
+            plan.warnings.append(f"CLAUDE_API_KEY is not set; {kind} guidelines would not be loaded")
+            return None, False
+
+        needs_claude = parser_class().needs_claude(path)
+        if needs_claude and not self.parse_guidelines:
+            plan.warnings.append(
+                f"{kind.capitalize()} guidelines ({path}) need Claude and were not parsed; "
+                "reuse that depends on them is assumed (use --parse-guidelines for an exact plan)"
+            )
+            return UNRESOLVED, True
+        try:
+            return await self.pipeline._parse_guidelines(getattr(self.pipeline, attr), path), needs_claude
+        except Exception as e:
+            plan.warnings.append(f"Error loading {kind} guidelines: {e}; the run would skip them")
+            return None, needs_claude
+
+    @staticmethod
+    def _image_price(backend: str, config, plan: CampaignPlan) -> float:
+        costs = config.IMAGE_API_COSTS
+        price = costs.get(backend.lower(), costs.get(canonical_backend(backend)))
+        if price is None:
+            message = f"No price for backend '{backend}' in IMAGE_API_COSTS; counted as $0"
+            if message not in plan.warnings:
+                plan.warnings.append(message)
+            return 0.0
+        return price
+
+
+def simulate_schedule(
+    tasks: List[PlannedTask],
+    durations: Dict[str, float],
+    limits: Dict[str, int]
+) -> Dict[str, Tuple[float, float]]:
+    """
+    (start, end) offsets in ms for each task when run like ``DagScheduler``.
+
+    Ready tasks start in insertion order while their resource has a free
+    slot; resources without a limit are unbounded.
+    """
+    limits = {resource: max(1, limit) for resource, limit in limits.items()}
+    by_name = {task.name: task for task in tasks}
+    pending = list(tasks)
+    finished: Dict[str, float] = {}
+    schedule: Dict[str, Tuple[float, float]] = {}
+    running: List[Tuple[float, int, str]] = []
+    in_use: Dict[str, int] = {}
+    now = 0.0
+    seq = 0
+    while pending or running:
+        waiting = []
+        for task in pending:
+            limit = limits.get(task.resource)
+            if any(dep not in finished for dep in task.deps) or (
+                limit is not None and in_use.get(task.resource, 0) >= limit
+            ):
+                waiting.append(task)
+                continue
+            in_use[task.resource] = in_use.get(task.resource, 0) + 1
+            end = now + durations.get(task.name, 0.0)
+            schedule[task.name] = (now, end)
+            heapq.heappush(running, (end, seq, task.name))
+            seq += 1
+        pending = waiting
+        if not running:
+            break  # Only tasks with missing dependencies remain
+
+        now, _, name = heapq.heappop(running)
+        done = [name]
+        while running and running[0][0] == now:
+            done.append(heapq.heappop(running)[2])
+        for name in done:
+            finished[name] = now
+            in_use[by_name[name].resource] -= 1
+    return schedule
+
+
+def plan_critical_path(tasks: List[PlannedTask]) -> List[Dict]:
+    """``critical_path_summary`` of the simulated schedule."""
+    graph = TaskGraph()
+    for task in tasks:
+        node = graph.add(task.name, None, deps=task.deps, resource=task.resource)
+        node.status = DONE
+        node.start = task.start_ms / 1000
+        node.end = task.end_ms / 1000
+        node.ready_at = max((graph[dep].end for dep in task.deps), default=0.0)
+    return [
+        {key: value for key, value in step.items() if key != "status"}
+        for step in critical_path_summary(graph)
+    ]
+
+
+def format_plan(plan: CampaignPlan, show_tasks: bool = False) -> str:
+    """Human-readable plan for the CLI."""
+    from src.scheduler import format_critical_path
+
+    hero_calls = ", ".join(f"{calls} × {name}" for name, calls in plan.hero_calls.items()) or "none"
+    lines = [
+        f"Campaign {plan.campaign_id} on {plan.backend}",
+        f"   Hero generations: {hero_calls}",
+        f"   Claude calls: {plan.claude_calls.get('guidelines', 0)} guideline extraction(s), "
+        f"{plan.claude_calls.get('localization', 0)} localization(s)",
+        f"   Renders: {plan.renders} (each encoded and saved)",
+        f"   Reused assets: {plan.reused_assets}"
+        + (f" ({plan.assumed_reuse} assumed)" if plan.assumed_reuse else ""),
+        f"   Estimated duration: {plan.estimated_duration_seconds:.1f}s "
+        f"(p90 {plan.estimated_duration_p90_seconds:.1f}s)",
+        f"   Estimated API spend: ${plan.estimated_cost_usd:.2f}"
+        + (f" (worst case ${plan.worst_case_cost_usd:.2f})"
+           if plan.worst_case_cost_usd > plan.estimated_cost_usd else ""),
+    ]
+    for name, cost in plan.cost_breakdown.items():
+        lines.append(f"      {name}: ${cost:.2f}")
+    lines.append("   Latency estimates:")
+    for operation, source in plan.latency_sources.items():
+        lines.append(f"      {operation}: {source}")
+    if show_tasks:
+        lines.append("   Tasks:")
+        width = max((len(task.name) for task in plan.tasks), default=0)
+        for task in plan.tasks:
+            flag = " (assumed)" if task.assumed else ""
+            lines.append(
+                f"   {task.start_ms:>8.0f}ms  {task.name:<{width}}  {task.action:<8} {task.resource:<9}"
+                f" {task.estimate_ms:>8.0f}ms{flag}"
+            )
+    lines.append("   Critical path:")
+    lines.append(format_critical_path(plan.critical_path))
+    for warning in plan.warnings:
+        lines.append(f"   ⚠️  {warning}")
+    return "\n".join(lines)
@@ -0,0 +1,111 @@
+"""Opt-in CPU (cProfile) and memory (tracemalloc) profiling of a campaign run."""
+import cProfile
+import io
+import pstats
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+
+PROFILE_MODES = ("cpu", "memory")
+
+
+class CampaignProfiler:
+    """
+    Profile the enclosed block and write artifacts to ``output_dir``.
+
+    ``cpu`` dumps a ``.pstats`` file (open with ``python -m pstats`` or
+    snakeviz) and a text summary of the top functions by cumulative time.
+    cProfile only sees the thread that enabled it, so work pushed to
+    ``asyncio.to_thread`` appears as the awaiting call.
+
+    ``memory`` traces Python allocations with tracemalloc and writes the
+    true peak plus the top allocation sites, with a snapshot for offline
+    comparison. Pillow pixel buffers are allocated natively and are not
+    included; RSS in the report metrics covers those.
+
+    Usage:
+        with CampaignProfiler("cpu", reports_dir, campaign_id) as profiler:
+            run()
+        print(profiler.artifacts)
+    """
+
+    def __init__(self, mode: str, output_dir: Path, name: str, top: int = 25, frames: int = 10):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unsupported profile mode: '{mode}'. Available: {', '.join(PROFILE_MODES)}")
+
+        self.mode = mode
+        self.output_dir = Path(output_dir)
+        self.top = top
+        self.frames = frames
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.basename = f"profile_{mode}_{name}_{timestamp}"
+        self.artifacts: List[Path] = []
+        self.summary = ""
+        self.peak_bytes: Optional[int] = None
+        self._profiler: Optional[cProfile.Profile] = None
+        self._was_tracing = False
+
+    def __enter__(self) -> "CampaignProfiler":
+        if self.mode == "cpu":
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            self._was_tracing = tracemalloc.is_tracing()
+            if not self._was_tracing:
+                tracemalloc.start(self.frames)
+            tracemalloc.reset_peak()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if self.mode == "cpu":
+            self._profiler.disable()
+            self._write_cpu()
+        else:
+            self._write_memory()
+
+    def _write_cpu(self) -> None:
+        stats_path = self.output_dir / f"{self.basename}.pstats"
+        self._profiler.dump_stats(str(stats_path))
+
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profiler, stream=stream)
+        stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+        self.summary = stream.getvalue()
+
+        summary_path = self.output_dir / f"{self.basename}.txt"
+        summary_path.write_text(self.summary, encoding="utf-8")
+        self.artifacts = [stats_path, summary_path]
+
+    def _write_memory(self) -> None:
+        snapshot = tracemalloc.take_snapshot()
+        current, self.peak_bytes = tracemalloc.get_traced_memory()
+        if not self._was_tracing:
+            tracemalloc.stop()
+
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        lines = [
+            f"Peak traced memory: {self.peak_bytes / (1024 * 1024):.1f} MB",
+            f"Still allocated at exit: {current / (1024 * 1024):.1f} MB",
+            "(Python allocations only; Pillow pixel buffers are native)",
+            "",
+            f"Top {self.top} allocation sites by size:",
+        ]
+        for index, stat in enumerate(snapshot.statistics("lineno")[:self.top], 1):
+            frame = stat.traceback[0]
+            lines.append(
+                f"{index:>3}. {frame.filename}:{frame.lineno}: "
+                f"{stat.size / 1024:.1f} KiB in {stat.count} blocks"
+            )
+        self.summary = "\n".join(lines) + "\n"
+
+        snapshot_path = self.output_dir / f"{self.basename}.tracemalloc"
+        snapshot.dump(str(snapshot_path))
+        summary_path = self.output_dir / f"{self.basename}.txt"
+        summary_path.write_text(self.summary, encoding="utf-8")
+        self.artifacts = [snapshot_path, summary_path]
@@ -0,0 +1,26 @@
+"""Campaign progress events for live listeners (e.g. the server's SSE stream)."""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+Listener = Callable[[str, Dict[str, Any]], None]
+
+_listener: ContextVar[Optional[Listener]] = ContextVar("progress_listener", default=None)
+
+
+@contextmanager
+def listen(callback: Listener) -> Iterator[None]:
+    """Deliver events emitted anywhere in the enclosed block to ``callback(event, data)``."""
+    token = _listener.set(callback)
+    try:
+        yield
+    finally:
+        _listener.reset(token)
+
+
+def emit(event: str, **data: Any) -> None:
+    """Send an event to the active listener (no-op outside ``listen``)."""
+    callback = _listener.get()
+    if callback is not None:
+        callback(event, data)
@@ -0,0 +1,622 @@
+"""Dependency-graph task scheduler with per-resource limits and critical-path reporting."""
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncContextManager, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.histograms import LatencyHistogram
+
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+FINISHED = (DONE, FAILED, SKIPPED)
+
+ASYNC = "async"
+THREAD = "thread"
+
+
+@dataclass(eq=False)
+class Node:
+    """
+    One unit of work in a task graph.
+
+    ``executor`` is ``"async"`` for a coroutine function awaited on the event
+    loop (network and other I/O) or ``"thread"`` for a blocking function run
+    on the scheduler's thread runner (rendering and encoding). ``resource``
+    names the concurrency limit the node draws from.
+    """
+
+    name: str
+    func: Callable[[], Any]
+    deps: Tuple[str, ...] = ()
+    resource: str = "io"
+    executor: str = ASYNC
+    always_run: bool = False  # Run even if a dependency failed (e.g. per-product bookkeeping)
+    retain: bool = True  # False drops the result once every dependent has finished
+    status: str = PENDING
+    result: Any = None
+    error: Optional[BaseException] = None
+    index: int = 0  # Insertion order, set by the scheduler; earlier nodes start first
+    ready_at: Optional[float] = None
+    start: Optional[float] = None
+    end: Optional[float] = None
+
+    @property
+    def duration_ms(self) -> float:
+        if self.start is None or self.end is None:
+            return 0.0
+        return (self.end - self.start) * 1000
+
+    @property
+    def wait_ms(self) -> float:
+        """Time spent ready but held back by its resource limit."""
+        if self.ready_at is None or self.start is None:
+            return 0.0
+        return (self.start - self.ready_at) * 1000
+
+
+class TaskGraph:
+    """
+    Nodes in insertion order plus their dependents.
+
+    A node may only depend on nodes already in the graph, so the graph is
+    acyclic by construction. Nodes can be added while the graph runs (for
+    example by a planning node that expands the work once its inputs are
+    known); they are picked up on the scheduler's next pass.
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, Node] = {}
+        self._order: List[Node] = []
+        self._dependents: Dict[str, List[str]] = {}
+
+    def add(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        deps: Iterable[str] = (),
+        resource: str = "io",
+        executor: str = ASYNC,
+        always_run: bool = False,
+        retain: bool = True
+    ) -> Node:
+        if name in self.nodes:
+            raise ValueError(f"Duplicate task '{name}'")
+        if executor not in (ASYNC, THREAD):
+            raise ValueError(f"Unknown executor '{executor}' for task '{name}'")
+        deps = tuple(deps)
+        missing = [dep for dep in deps if dep not in self.nodes]
+        if missing:
+            raise ValueError(f"Task '{name}' depends on unknown task(s): {', '.join(missing)}")
+
+        node = Node(name, func, deps, resource, executor, always_run, retain)
+        self.nodes[name] = node
+        self._order.append(node)
+        self._dependents[name] = []
+        for dep in deps:
+            self._dependents[dep].append(name)
+        return node
+
+    def __getitem__(self, name: str) -> Node:
+        return self.nodes[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.nodes
+
+    def __iter__(self):
+        return iter(list(self.nodes.values()))
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def result(self, name: str) -> Any:
+        return self.nodes[name].result
+
+    def added_since(self, count: int) -> List[Node]:
+        """Nodes after the first ``count``, in insertion order."""
+        return self._order[count:]
+
+    def dependents(self, name: str) -> List[Node]:
+        return [self.nodes[child] for child in self._dependents[name]]
+
+    def failures(self) -> List[Node]:
+        return [node for node in self.nodes.values() if node.status == FAILED]
+
+
+class DagScheduler:
+    """
+    Run a task graph as soon as each node's dependencies finish.
+
+    Each node keeps a count of unfinished dependencies; when it drops to
+    zero the node joins its resource's ready queue, so a pass only touches
+    the nodes that changed. Ready nodes start in insertion order while their
+    resource has a free slot; ``limits`` maps resource names to slot counts (resources without
+    a limit are unbounded). Holding nodes back until a slot frees, instead
+    of queueing them all on a semaphore, keeps later-inserted follow-up work
+    (an encode after its render) ahead of earlier-ready new work, so
+    intermediate images do not pile up.
+
+    A failed node's dependents are skipped unless they set ``always_run``.
+    Failures never abort the run; inspect ``graph.failures()`` afterwards.
+
+    ``reserve`` optionally enters an async context manager for each node
+    as soon as its dependencies finish, before it claims a resource slot,
+    and exits it when the node finishes; e.g. a memory reservation, which
+    must not hold a slot while it waits since the work that frees the
+    memory may need that slot. ``admit`` optionally wraps each node in an
+    async context manager entered after it claims its slot, e.g. a
+    ``PriorityArbiter`` slot shared with other campaigns. Time spent in
+    either counts as ``wait_ms``.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, int]] = None,
+        thread_runner: Optional[Callable[[Callable[[], Any]], Awaitable[Any]]] = None,
+        admit: Optional[Callable[[Node], AsyncContextManager]] = None,
+        reserve: Optional[Callable[[Node], AsyncContextManager]] = None
+    ):
+        self.limits = {resource: max(1, limit) for resource, limit in (limits or {}).items()}
+        self.thread_runner = thread_runner or asyncio.to_thread
+        self.admit = admit
+        self.reserve = reserve
+        self._reserving: Dict[asyncio.Task, Node] = {}  # Reservations being acquired
+        self._reservations: Dict[str, AsyncExitStack] = {}  # Node -> reservation held until it finishes
+        self._in_use: Dict[str, int] = {}
+        self._unfinished: Dict[str, int] = {}  # Registered node -> dependencies not yet finished
+        self._finished: set = set()  # Nodes whose completion has been propagated
+        self._ready: Dict[str, List[Tuple[int, Node]]] = {}  # Resource -> heap of (insertion index, node)
+
+    async def run(self, graph: TaskGraph) -> TaskGraph:
+        running: Dict[asyncio.Task, Node] = {}
+        self._unfinished = {}
+        self._finished = set()
+        self._ready = {}
+        self._reserving = {}
+        self._reservations = {}
+        registered = 0
+        try:
+            while True:
+                # Nodes added since the last pass (e.g. by a planning node)
+                for node in graph.added_since(registered):
+                    self._register(graph, node, registered)
+                    registered += 1
+                self._start_ready(running)
+                if not running and not self._reserving:
+                    return graph
+
+                done, _ = await asyncio.wait(
+                    [*running, *self._reserving], return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task in self._reserving:
+                        node = self._reserving.pop(task)
+                        if node.status == FAILED:
+                            self._finish(graph, node)
+                        else:
+                            self._queue(node)
+                        continue
+                    node = running.pop(task)
+                    self._in_use[node.resource] -= 1
+                    self._release_inputs(graph, node)
+                    self._finish(graph, node)
+        finally:
+            # Cancelled (e.g. a cancelled server job): stop whatever is still in flight
+            for task, node in running.items():
+                task.cancel()
+                self._in_use[node.resource] -= 1
+            for task in self._reserving:
+                task.cancel()
+            # Give back reservations of nodes that never got a slot
+            for stack in self._reservations.values():
+                await stack.aclose()
+
+    def _register(self, graph: TaskGraph, node: Node, index: int) -> None:
+        node.index = index
+        self._unfinished[node.name] = sum(1 for dep in node.deps if dep not in self._finished)
+        if self._unfinished[node.name] == 0:
+            self._make_ready(graph, node)
+
+    def _finish(self, graph: TaskGraph, node: Node) -> None:
+        """Count a finished node off its dependents, queueing any that became ready."""
+        finished = [node]
+        while finished:
+            node = finished.pop()
+            self._finished.add(node.name)
+            for child in graph.dependents(node.name):
+                if child.name not in self._unfinished:
+                    continue  # Not registered yet; it will see this node as finished
+                self._unfinished[child.name] -= 1
+                if self._unfinished[child.name] == 0 and self._make_ready(graph, child) == SKIPPED:
+                    finished.append(child)
+
+    def _make_ready(self, graph: TaskGraph, node: Node) -> str:
+        """Skip the node if a dependency failed, otherwise queue it for its resource."""
+        if not node.always_run:
+            blocked = next((graph[dep] for dep in node.deps if graph[dep].status != DONE), None)
+            if blocked is not None:
+                node.status = SKIPPED
+                node.error = blocked.error
+                self._release_inputs(graph, node)
+                self._finished.add(node.name)
+                return SKIPPED
+
+        node.ready_at = time.perf_counter()
+        if self.reserve is None:
+            self._queue(node)
+        else:
+            self._reserving[asyncio.create_task(self._reserve(node))] = node
+        return PENDING
+
+    def _queue(self, node: Node) -> None:
+        heapq.heappush(self._ready.setdefault(node.resource, []), (node.index, node))
+
+    async def _reserve(self, node: Node) -> None:
+        stack = AsyncExitStack()
+        try:
+            await stack.enter_async_context(self.reserve(node))
+        except Exception as e:
+            # Reservation itself failed
+            node.status = FAILED
+            node.error = e
+            node.end = time.perf_counter()
+            return
+        self._reservations[node.name] = stack
+
+    def _start_ready(self, running: Dict[asyncio.Task, Node]) -> None:
+        """Start queued nodes, earliest inserted first, while their resource has a free slot."""
+        for resource, ready in self._ready.items():
+            limit = self.limits.get(resource)
+            while ready and (limit is None or self._in_use.get(resource, 0) < limit):
+                _, node = heapq.heappop(ready)
+                self._in_use[resource] = self._in_use.get(resource, 0) + 1
+                node.status = RUNNING
+                running[asyncio.create_task(self._execute(node))] = node
+
+    async def _execute(self, node: Node) -> None:
+        try:
+            if self.admit is None:
+                await self._call(node)
+                return
+            try:
+                async with self.admit(node):
+                    await self._call(node)
+            except Exception as e:
+                # Admission itself failed
+                node.status = FAILED
+                node.error = e
+                node.end = time.perf_counter()
+        finally:
+            reservation = self._reservations.pop(node.name, None)
+            if reservation is not None:
+                await reservation.aclose()
+
+    async def _call(self, node: Node) -> None:
+        node.start = time.perf_counter()
+        try:
+            if node.executor == THREAD:
+                node.result = await self.thread_runner(node.func)
+            else:
+                node.result = await node.func()
+            node.status = DONE
+        except Exception as e:
+            node.status = FAILED
+            node.error = e
+        finally:
+            node.end = time.perf_counter()
+
+    def _release_inputs(self, graph: TaskGraph, node: Node) -> None:
+        """Drop intermediate results (e.g. rendered images) nobody needs any more."""
+        for name in node.deps:
+            dep = graph[name]
+            if not dep.retain and all(child.status in FINISHED for child in graph.dependents(name)):
+                dep.result = None
+
+
+# Levels a due deadline adds to a request's priority
+DEADLINE_BOOST = 2.0
+
+
+def effective_priority(
+    level: float,
+    waited_seconds: float,
+    deadline: Optional[float] = None,
+    aging_seconds: float = 30.0,
+    deadline_horizon_seconds: float = 600.0,
+    now: Optional[float] = None
+) -> float:
+    """
+    Priority level adjusted for aging and deadline pressure.
+
+    Waiting ``aging_seconds`` raises a request by one level, so low-priority
+    work is never starved. A deadline (Unix time) adds up to
+    ``DEADLINE_BOOST`` levels as it approaches over the final
+    ``deadline_horizon_seconds``, and the full boost once it has passed.
+    """
+    score = level + (waited_seconds / aging_seconds if aging_seconds > 0 else 0.0)
+    if deadline is not None:
+        remaining = deadline - (time.time() if now is None else now)
+        if deadline_horizon_seconds > 0:
+            pressure = 1 - remaining / deadline_horizon_seconds
+        else:
+            pressure = 1.0 if remaining <= 0 else 0.0
+        score += DEADLINE_BOOST * min(1.0, max(0.0, pressure))
+    return score
+
+
+def _rank_key(score: float, deadline: Optional[float], seq: int) -> Tuple[float, float, int]:
+    """Sort key (highest first): score, then earlier deadline, then earlier arrival."""
+    # Rounded so sub-percent aging differences fall through to the tie-breaks
+    return round(score, 2), -(deadline if deadline is not None else math.inf), -seq
+
+
+@dataclass(eq=False)
+class _Waiter:
+    campaign: str
+    level: float
+    priority_class: str
+    deadline: Optional[float]
+    future: asyncio.Future
+    seq: int
+    enqueued: float = field(default_factory=time.monotonic)
+
+
+class PriorityArbiter:
+    """
+    Share resource slots between concurrent campaigns by priority.
+
+    Campaigns in one batch or server ask for a slot per API call, render or
+    campaign admission. A free slot goes to the waiter with the highest
+    ``effective_priority`` (level + aging + deadline pressure; earlier
+    deadline, then arrival order break ties), so an urgent six-asset launch
+    overtakes a long evergreen refresh, while the refresh still ages its
+    way forward.
+
+    Fair share: while other campaigns are waiting for a resource, one
+    campaign may hold at most ``fair_share`` of its slots (at least one).
+    If every waiter is over its share, the best one is served anyway, so
+    slots never sit idle.
+
+    Resources without a capacity are not arbitrated. Wait times are kept per
+    priority class (``wait_summary()``) and exported as the
+    ``scheduler_queue_wait_seconds`` Prometheus histogram.
+    """
+
+    def __init__(
+        self,
+        capacities: Dict[str, int],
+        aging_seconds: float = 30.0,
+        fair_share: float = 0.5,
+        deadline_horizon_seconds: float = 600.0
+    ):
+        self.capacities = {resource: max(1, capacity) for resource, capacity in capacities.items()}
+        self.aging_seconds = aging_seconds
+        self.fair_share = fair_share
+        self.deadline_horizon_seconds = deadline_horizon_seconds
+        self._held: Dict[str, Dict[str, int]] = {resource: {} for resource in self.capacities}
+        self._waiting: Dict[str, List[_Waiter]] = {resource: [] for resource in self.capacities}
+        self._seq = itertools.count()
+        self.wait_histograms: Dict[str, LatencyHistogram] = {}
+
+    @classmethod
+    def from_config(cls, capacities: Dict[str, int]) -> "PriorityArbiter":
+        """Arbiter using the PRIORITY_* settings."""
+        from src.config import get_config
+
+        config = get_config()
+        return cls(
+            capacities,
+            aging_seconds=config.PRIORITY_AGING_SECONDS,
+            fair_share=config.PRIORITY_FAIR_SHARE,
+            deadline_horizon_seconds=config.PRIORITY_DEADLINE_HORIZON_SECONDS
+        )
+
+    def in_use(self, resource: str) -> int:
+        return sum(self._held.get(resource, {}).values())
+
+    def waiting(self, resource: str) -> int:
+        return len(self._waiting.get(resource, ()))
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        resource: str,
+        campaign: str,
+        level: float = 1,
+        deadline: Optional[float] = None,
+        priority_class: str = "normal"
+    ):
+        """Hold one slot of ``resource`` for the block; yields the wait in ms."""
+        if resource not in self.capacities:
+            yield 0.0
+            return
+
+        waiter = _Waiter(
+            campaign, level, priority_class, deadline,
+            asyncio.get_running_loop().create_future(), next(self._seq)
+        )
+        self._waiting[resource].append(waiter)
+        self._dispatch(resource)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter in self._waiting[resource]:
+                self._waiting[resource].remove(waiter)
+            elif waiter.future.done() and not waiter.future.cancelled():
+                self._release(resource, campaign)  # Granted just before the cancel landed
+            raise
+
+        wait_ms = (time.monotonic() - waiter.enqueued) * 1000
+        self.record_wait(resource, priority_class, wait_ms)
+        try:
+            yield wait_ms
+        finally:
+            self._release(resource, campaign)
+
+    def _release(self, resource: str, campaign: str) -> None:
+        held = self._held[resource]
+        held[campaign] -= 1
+        if not held[campaign]:
+            del held[campaign]
+        self._dispatch(resource)
+
+    def _dispatch(self, resource: str) -> None:
+        waiting = self._waiting[resource]
+        held = self._held[resource]
+        share = max(1, math.floor(self.capacities[resource] * self.fair_share))
+        while waiting and sum(held.values()) < self.capacities[resource]:
+            now = time.monotonic()
+            campaigns = {waiter.campaign for waiter in waiting}
+            eligible = waiting
+            if len(campaigns) > 1:
+                eligible = [w for w in waiting if held.get(w.campaign, 0) < share] or waiting
+            chosen = max(eligible, key=lambda w: self._rank(w, now))
+            waiting.remove(chosen)
+            held[chosen.campaign] = held.get(chosen.campaign, 0) + 1
+            chosen.future.set_result(None)
+
+    def _rank(self, waiter: _Waiter, now: float) -> Tuple[float, float, int]:
+        score = effective_priority(
+            waiter.level,
+            now - waiter.enqueued,
+            waiter.deadline,
+            self.aging_seconds,
+            self.deadline_horizon_seconds
+        )
+        return _rank_key(score, waiter.deadline, waiter.seq)
+
+    def record_wait(self, resource: str, priority_class: str, wait_ms: float) -> None:
+        """Count a wait (also used for waits queued outside the arbiter, e.g. server jobs)."""
+        from src import metrics
+
+        self.wait_histograms.setdefault(priority_class, LatencyHistogram()).record(wait_ms)
+        metrics.get_registry().histogram(
+            "scheduler_queue_wait_seconds",
+            "Time work waited for a shared resource slot, by priority class",
+            ("resource", "priority")
+        ).observe(wait_ms / 1000, resource=resource, priority=priority_class)
+
+    def wait_summary(self) -> Dict[str, Dict[str, float]]:
+        """Queue wait per priority class: count, mean, p50/p90/p99 and max in ms."""
+        return {
+            priority_class: {
+                "count": histogram.count,
+                "mean_ms": round(histogram.mean, 1),
+                "p50_ms": round(histogram.percentile(50), 1),
+                "p90_ms": round(histogram.percentile(90), 1),
+                "p99_ms": round(histogram.percentile(99), 1),
+                "max_ms": round(histogram.max or 0.0, 1),
+            }
+            for priority_class, histogram in sorted(self.wait_histograms.items())
+        }
+
+
+class AgingPriorityQueue(asyncio.Queue):
+    """
+    ``asyncio.Queue`` that hands out the item with the highest effective priority.
+
+    ``key(item)`` returns ``(level, deadline)``; aging and deadline pressure
+    are applied at ``get()`` time, so long-queued items move forward.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        key: Callable[[Any], Tuple[float, Optional[float]]] = lambda item: (1, None),
+        aging_seconds: float = 30.0,
+        deadline_horizon_seconds: float = 600.0
+    ):
+        self._key = key
+        self.aging_seconds = aging_seconds
+        self.deadline_horizon_seconds = deadline_horizon_seconds
+        self._seq = itertools.count()
+        super().__init__(maxsize)
+
+    def _init(self, maxsize: int) -> None:
+        self._queue: List[Tuple[float, int, Any]] = []
+
+    def _put(self, item: Any) -> None:
+        self._queue.append((time.monotonic(), next(self._seq), item))
+
+    def _get(self) -> Any:
+        now = time.monotonic()
+
+        def rank(entry):
+            enqueued, seq, item = entry
+            level, deadline = self._key(item)
+            score = effective_priority(level, now - enqueued, deadline, self.aging_seconds, self.deadline_horizon_seconds)
+            return _rank_key(score, deadline, seq)
+
+        entry = max(self._queue, key=rank)
+        self._queue.remove(entry)
+        return entry[2]
+
+    def items(self) -> List[Any]:
+        """Queued items in arrival order."""
+        return [item for _, _, item in self._queue]
+
+
+def critical_path(graph: TaskGraph) -> List[Node]:
+    """
+    The chain of nodes that determined the run's wall-clock time.
+
+    Starting from the node that finished last, repeatedly step to the
+    dependency that finished last (the one that actually gated the start).
+    Gaps between a node's gating dependency and its own start are resource
+    waits, reported as ``wait_ms`` on each node.
+    """
+    ran = [node for node in graph if node.start is not None and node.end is not None]
+    if not ran:
+        return []
+
+    path = [max(ran, key=lambda node: node.end)]
+    while True:
+        deps = [graph[dep] for dep in path[-1].deps if graph[dep].start is not None and graph[dep].end is not None]
+        if not deps:
+            break
+        path.append(max(deps, key=lambda node: node.end))
+    path.reverse()
+    return path
+
+
+def critical_path_summary(graph: TaskGraph) -> List[Dict[str, Any]]:
+    """JSON-friendly critical path with offsets from the first node's start."""
+    path = critical_path(graph)
+    starts = [node.start for node in graph if node.start is not None]
+    origin = min(starts) if starts else 0.0
+    return [
+        {
+            "task": node.name,
+            "resource": node.resource,
+            "status": node.status,
+            "start_ms": round((node.start - origin) * 1000, 1),
+            "duration_ms": round(node.duration_ms, 1),
+            "wait_ms": round(node.wait_ms, 1),
+        }
+        for node in path
+    ]
+
+
+def format_critical_path(steps: List[Dict[str, Any]]) -> str:
+    """Render ``critical_path_summary`` output as an aligned table."""
+    if not steps:
+        return "   (no tasks ran)"
+    width = max(len(step["task"]) for step in steps)
+    lines = []
+    for step in steps:
+        wait = f"  (waited {step['wait_ms']:.0f}ms for {step['resource']})" if step["wait_ms"] >= 1 else ""
+        lines.append(
+            f"   {step['start_ms']:>8.0f}ms  {step['task']:<{width}}  {step['duration_ms']:>8.0f}ms{wait}"
+        )
+    last = steps[-1]
+    lines.append(f"   Total: {last['start_ms'] + last['duration_ms']:.0f}ms over {len(steps)} task(s)")
+    return "\n".join(lines)
+
@@ -0,0 +1,387 @@
+"""Long-running pipeline server: HTTP job API over warm, shared pipeline state."""
+import asyncio
+import json
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+from pydantic import ValidationError
+
+from src import admission, metrics, progress
+from src.batch import HeroCache, LRUCache, RenderPool
+from src.config import get_config
+from src.genai.http import shared_session
+from src.models import PRIORITY_LEVELS, CampaignBrief, CampaignOutput, JobStatus
+from src.pipeline import CreativeAutomationPipeline
+from src.scheduler import AgingPriorityQueue, PriorityArbiter
+from src.storage import StorageManager
+
+
+TERMINAL_STATUSES = ("succeeded", "partial", "failed", "cancelled")
+
+# Comment line sent on idle event streams so proxies keep the connection open
+SSE_HEARTBEAT_SECONDS = 15.0
+
+
+class Job:
+    """A submitted brief with its live status, produced assets and progress event log."""
+
+    def __init__(self, brief: CampaignBrief):
+        self.brief = brief
+        self.status = JobStatus(
+            job_id=uuid.uuid4().hex[:12],
+            campaign_id=brief.campaign_id,
+            priority=brief.priority,
+            deadline=brief.deadline,
+            products_total=len(brief.products),
+            expected_assets=len(brief.products) * len(brief.target_locales) * len(brief.aspect_ratios)
+        )
+        self.output: Optional[CampaignOutput] = None
+        self.assets: List[Dict[str, Any]] = []
+        self.events: List[Dict[str, Any]] = []
+        self._updated = asyncio.Event()
+
+    @property
+    def job_id(self) -> str:
+        return self.status.job_id
+
+    @property
+    def finished(self) -> bool:
+        return self.status.status in TERMINAL_STATUSES
+
+    def record(self, event: str, data: Dict[str, Any]) -> None:
+        """Apply a pipeline progress event and wake any event-stream readers."""
+        if event == "product_completed":
+            self.status.products_completed += 1
+        elif event == "product_failed":
+            self.status.errors.append(data.get("error", ""))
+        elif event == "asset_completed":
+            self.status.assets_completed += 1
+            self.assets.append(data)
+        self.events.append({"event": event, "data": data})
+        self._updated.set()
+        self._updated = asyncio.Event()
+
+    def transition(self, status: str, **data: Any) -> None:
+        """Move to a new status and publish it as a ``job_<status>`` event."""
+        self.status.status = status
+        if status == "running":
+            self.status.started_at = datetime.now()
+        elif status in TERMINAL_STATUSES:
+            self.status.finished_at = datetime.now()
+        self.record(f"job_{status}", dict(data, job_id=self.job_id, status=status))
+
+    async def wait_for_events(self, position: int, timeout: Optional[float] = None) -> bool:
+        """Wait until there are events after ``position`` or the job finished; False on timeout."""
+        updated = self._updated
+        if len(self.events) > position or self.finished:
+            return True
+        try:
+            await asyncio.wait_for(updated.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+class PipelineServer:
+    """
+    Serve campaign jobs from pipelines that stay warm between requests.
+
+    Each worker owns a persistent ``CreativeAutomationPipeline``; all of
+    them share one storage manager and asset manifest, the guideline,
+    translation and hero caches, the image service chains (so hedging
+    history and budget carry across jobs), a render pool whose threads
+    keep their font and logo caches, and one pooled HTTP session. Jobs wait in a
+    bounded queue: when it is full, submissions are rejected with 503 and
+    ``Retry-After`` instead of piling up in memory.
+
+    Queued jobs start in brief priority order with aging (so low-priority
+    jobs still get their turn), and running jobs share image API and render
+    slots through a ``PriorityArbiter`` with per-campaign fair share.
+
+    Endpoints:
+        POST /jobs                      submit a brief (JSON body) -> 202
+        GET  /jobs                      recent jobs
+        GET  /jobs/{id}                 job status
+        GET  /jobs/{id}/events          progress as server-sent events
+        GET  /jobs/{id}/assets          assets produced so far
+        GET  /jobs/{id}/assets/{index}  asset file
+        GET  /healthz                   queue and worker state
+        GET  /metrics                   Prometheus metrics
+    """
+
+    def __init__(
+        self,
+        image_backend: Optional[str] = None,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        job_history: Optional[int] = None
+    ):
+        config = get_config()
+        self.image_backend = image_backend
+        self.workers = max(1, workers or config.SERVER_WORKERS)
+        self.queue_size = max(1, queue_size or config.SERVER_QUEUE_SIZE)
+        self.job_history = max(1, job_history or config.SERVER_JOB_HISTORY)
+        self.max_connections = max(1, config.MAX_CONCURRENT_REQUESTS)
+
+        self.storage = StorageManager()
+        self.guideline_cache = LRUCache(max(1, config.SERVER_GUIDELINE_CACHE_SIZE))
+        self.translation_cache = LRUCache(max(1, config.SERVER_TRANSLATION_CACHE_SIZE))
+        self.image_services: Dict = {}
+        self.hero_cache = HeroCache(config.BATCH_HERO_CACHE_MB * 1024 * 1024)
+        self.render_pool: Optional[RenderPool] = None
+        self.render_workers = max(1, config.BATCH_RENDER_WORKERS)
+        self.pipelines: List[CreativeAutomationPipeline] = []
+
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.queue = AgingPriorityQueue(
+            maxsize=self.queue_size,
+            key=_job_priority,
+            aging_seconds=config.PRIORITY_AGING_SECONDS,
+            deadline_horizon_seconds=config.PRIORITY_DEADLINE_HORIZON_SECONDS
+        )
+        self.arbiter = PriorityArbiter.from_config({
+            "image_api": self.max_connections,
+            "cpu": self.render_workers,
+        })
+        self.running = 0
+        self._supervisor: Optional[asyncio.Task] = None
+        self._runner: Optional[web.AppRunner] = None
+
+        registry = metrics.get_registry()
+        self._jobs_queued = registry.gauge("server_jobs_queued", "Jobs waiting for a worker")
+        self._jobs_running = registry.gauge("server_jobs_running", "Jobs being processed")
+        self._jobs_total = registry.counter("server_jobs_total", "Finished jobs by outcome", ("status",))
+        self._jobs_rejected = registry.counter("server_jobs_rejected_total", "Submissions rejected because the queue was full")
+        self._queue_wait = registry.histogram("server_job_queue_wait_seconds", "Time jobs spent queued before a worker started them")
+
+        self.app = web.Application()
+        self.app.add_routes([
+            web.post("/jobs", self.submit_job),
+            web.get("/jobs", self.list_jobs),
+            web.get("/jobs/{job_id}", self.get_job),
+            web.get("/jobs/{job_id}/events", self.stream_events),
+            web.get("/jobs/{job_id}/assets", self.list_assets),
+            web.get("/jobs/{job_id}/assets/{index}", self.get_asset),
+            web.get("/healthz", self.health),
+            web.get("/metrics", metrics.metrics_handler),
+        ])
+
+    def _create_pipeline(self) -> CreativeAutomationPipeline:
+        pipeline = CreativeAutomationPipeline(image_backend=self.image_backend)
+        pipeline.storage = self.storage
+        pipeline.guideline_cache = self.guideline_cache
+        pipeline.translation_cache = self.translation_cache
+        pipeline.image_services = self.image_services
+        pipeline.hero_cache = self.hero_cache
+        pipeline.render_pool = self.render_pool
+        pipeline.arbiter = self.arbiter
+        return pipeline
+
+    # Lifecycle
+
+    async def start_workers(self) -> None:
+        """Create the warm pipelines and start consuming the queue."""
+        self.render_pool = RenderPool(self.render_workers)
+        self.pipelines = [self._create_pipeline() for _ in range(self.workers)]
+        self._supervisor = asyncio.create_task(self._run_workers())
+
+    async def _run_workers(self) -> None:
+        # Workers are spawned inside the block so they all inherit the shared session
+        async with shared_session(limit=self.max_connections):
+            await asyncio.gather(*[self._worker(pipeline) for pipeline in self.pipelines])
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> str:
+        """Start workers and the HTTP listener; return the base URL."""
+        await self.start_workers()
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        return f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        """Stop listening, cancel workers and mark queued jobs as cancelled."""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+        if self._supervisor:
+            self._supervisor.cancel()
+            await asyncio.gather(self._supervisor, return_exceptions=True)
+            self._supervisor = None
+        for job in self.jobs.values():
+            if not job.finished:
+                job.transition("cancelled", error="Server shut down")
+        if self.render_pool:
+            await asyncio.to_thread(self.render_pool.shutdown)
+            self.render_pool = None
+
+    # Job execution
+
+    async def _worker(self, pipeline: CreativeAutomationPipeline) -> None:
+        while True:
+            job = await self.queue.get()
+            self._jobs_queued.dec()
+            try:
+                await self._run_job(pipeline, job)
+            finally:
+                self.queue.task_done()
+
+    async def _run_job(self, pipeline: CreativeAutomationPipeline, job: Job) -> None:
+        queue_wait = (datetime.now() - job.status.submitted_at).total_seconds()
+        self._queue_wait.observe(queue_wait)
+        self.arbiter.record_wait("campaign", job.brief.priority, queue_wait * 1000)
+        job.transition("running")
+        self.running += 1
+        self._jobs_running.inc()
+        try:
+            with progress.listen(job.record):
+                output = await pipeline.process_campaign(job.brief)
+        except asyncio.CancelledError:
+            job.transition("cancelled", error="Server shut down")
+            raise
+        except Exception as e:
+            job.status.errors.append(str(e))
+            job.transition("failed", error=str(e))
+        else:
+            job.output = output
+            job.status.success_rate = output.success_rate
+            job.status.processing_time_seconds = output.processing_time_seconds
+            # Product errors were already recorded from progress events
+            job.transition("partial" if output.errors else "succeeded", total_assets=output.total_assets)
+        finally:
+            self.running -= 1
+            self._jobs_running.dec()
+            self._jobs_total.inc(status=job.status.status)
+
+    def submit(self, brief: CampaignBrief) -> Job:
+        """Queue a brief; raises ``asyncio.QueueFull`` when at capacity."""
+        job = Job(brief)
+        self.queue.put_nowait(job)
+        self._jobs_queued.inc()
+        self.jobs[job.job_id] = job
+        job.transition("queued")
+        self._prune_jobs()
+        return job
+
+    def _prune_jobs(self) -> None:
+        """Forget the oldest finished jobs beyond the history limit."""
+        excess = len(self.jobs) - self.job_history
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.finished][:max(0, excess)]:
+            del self.jobs[job_id]
+
+    # HTTP handlers
+
+    def _job(self, request: web.Request) -> Job:
+        job = self.jobs.get(request.match_info["job_id"])
+        if job is None:
+            raise web.HTTPNotFound(text=json.dumps({"error": "Unknown job"}), content_type="application/json")
+        return job
+
+    def _job_links(self, job: Job) -> Dict[str, str]:
+        base = f"/jobs/{job.job_id}"
+        return {"status": base, "events": f"{base}/events", "assets": f"{base}/assets"}
+
+    async def submit_job(self, request: web.Request) -> web.Response:
+        try:
+            brief = CampaignBrief(**await request.json())
+        except ValidationError as e:
+            return web.json_response({"error": "Invalid brief", "details": json.loads(e.json())}, status=400)
+        except (json.JSONDecodeError, TypeError) as e:
+            return web.json_response({"error": f"Invalid JSON: {e}"}, status=400)
+
+        try:
+            job = self.submit(brief)
+        except asyncio.QueueFull:
+            self._jobs_rejected.inc()
+            return web.json_response(
+                {"error": "Job queue is full", "queue_size": self.queue_size},
+                status=503,
+                headers={"Retry-After": "5"}
+            )
+
+        body = dict(job.status.model_dump(mode="json"), links=self._job_links(job))
+        return web.json_response(body, status=202, headers={"Location": f"/jobs/{job.job_id}"})
+
+    async def list_jobs(self, request: web.Request) -> web.Response:
+        jobs = [job.status.model_dump(mode="json") for job in reversed(self.jobs.values())]
+        return web.json_response({"jobs": jobs})
+
+    async def get_job(self, request: web.Request) -> web.Response:
+        job = self._job(request)
+        return web.json_response(dict(job.status.model_dump(mode="json"), links=self._job_links(job)))
+
+    async def stream_events(self, request: web.Request) -> web.StreamResponse:
+        """Replay the job's events, then stream new ones until it finishes."""
+        job = self._job(request)
+        response = web.StreamResponse(headers={
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+        })
+        await response.prepare(request)
+
+        # Reconnecting clients resume after the last event they saw; a bad ID replays everything
+        try:
+            position = max(0, int(request.headers.get("Last-Event-ID", -1)) + 1)
+        except ValueError:
+            position = 0
+        while True:
+            if not await job.wait_for_events(position, SSE_HEARTBEAT_SECONDS):
+                await response.write(b": keep-alive\n\n")
+                continue
+            events = job.events[position:]
+            for offset, event in enumerate(events):
+                await response.write(
+                    f"id: {position + offset}\nevent: {event['event']}\n"
+                    f"data: {json.dumps(event['data'])}\n\n".encode("utf-8")
+                )
+            position += len(events)
+            if job.finished and position >= len(job.events):
+                break
+
+        await response.write_eof()
+        return response
+
+    async def list_assets(self, request: web.Request) -> web.Response:
+        job = self._job(request)
+        assets = [
+            dict(asset, index=index, url=f"/jobs/{job.job_id}/assets/{index}")
+            for index, asset in enumerate(job.assets)
+        ]
+        return web.json_response({"job_id": job.job_id, "status": job.status.status, "assets": assets})
+
+    async def get_asset(self, request: web.Request) -> web.FileResponse:
+        job = self._job(request)
+        try:
+            asset = job.assets[int(request.match_info["index"])]
+        except (ValueError, IndexError):
+            raise web.HTTPNotFound(text=json.dumps({"error": "Unknown asset"}), content_type="application/json")
+        path = Path(asset["file_path"])
+        if not path.is_file():
+            raise web.HTTPNotFound(text=json.dumps({"error": "Asset file is missing"}), content_type="application/json")
+        return web.FileResponse(path)
+
+    async def health(self, request: web.Request) -> web.Response:
+        memory = admission.get_controller()
+        return web.json_response({
+            "status": "ok",
+            "workers": self.workers,
+            "running": self.running,
+            "queued": self.queue.qsize(),
+            "queue_size": self.queue_size,
+            "hero_cache_entries": len(self.hero_cache),
+            "guideline_cache_entries": len(self.guideline_cache),
+            "translation_cache_entries": len(self.translation_cache),
+            "queue_wait_by_priority": self.arbiter.wait_summary(),
+            "render_memory": memory.summary() if memory is not None else None,
+        })
+
+
+def _job_priority(job: Job):
+    """Queue ordering key: the brief's priority level and deadline."""
+    deadline = job.brief.deadline.timestamp() if job.brief.deadline else None
+    return PRIORITY_LEVELS[job.brief.priority], deadline
@@ -1,12 +1,116 @@
 """Storage management for campaign outputs."""
 import json
+import os
 import shutil
+import uuid
+from io import BytesIO
 from pathlib import Path
 from PIL import Image
 from datetime import datetime
-from typing import Dict, List, Optional
-from src.models import CampaignOutput, CampaignBrief
+from typing import Any, Dict, List, Optional
+from src.models import CampaignOutput, CampaignBrief, GeneratedAsset
 from src.config import get_config
+from src.manifest import AssetManifest, HERO_KIND
+from src import histograms, metrics, tracing
+
+
+class CampaignReportWriter:
+    """
+    Stream a consolidated campaign report as JSONL.
+
+    One ``asset`` record is appended per generated asset as it is produced,
+    followed by a single ``summary`` record holding the campaign metrics and
+    a per-product index of asset record byte offsets. Per-product views are
+    read back through that index instead of re-serializing the whole output.
+    The report is written to a temporary file (unique per writer, so
+    concurrent runs of one campaign don't share it) and renamed on finalize;
+    ``abort`` discards it if the campaign fails first.
+    """
+
+    def __init__(self, report_path: Path):
+        self.report_path = Path(report_path)
+        self.report_path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp_path = self.report_path.with_name(
+            f"{self.report_path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        )
+        self._file = open(self._tmp_path, 'wb')
+        self._product_index: Dict[str, List[int]] = {}
+        self._asset_count = 0
+
+    def write_asset(self, asset: GeneratedAsset) -> None:
+        """Append one asset record."""
+        record = {"record_type": "asset", **asset.model_dump(mode="json")}
+        self._product_index.setdefault(asset.product_id, []).append(self._file.tell())
+        self._write_line(record)
+        self._asset_count += 1
+
+    def finalize(self, campaign_output: CampaignOutput) -> Path:
+        """Write the campaign summary record and publish the report."""
+        summary = campaign_output.model_dump(mode="json", exclude={"generated_assets"})
+        summary["record_type"] = "summary"
+        summary["asset_records"] = self._asset_count
+        summary["product_index"] = self._product_index
+        try:
+            self._write_line(summary)
+            self._file.close()
+            self._tmp_path.replace(self.report_path)
+        except BaseException:
+            self.abort()
+            raise
+        return self.report_path
+
+    def abort(self) -> None:
+        """Close and delete the unpublished report."""
+        self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+    def _write_line(self, record: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, default=str).encode("utf-8") + b"\n")
+
+
+def read_report_summary(report_path: Path) -> Dict[str, Any]:
+    """Read the summary record (the last line) of a JSONL campaign report."""
+    with open(report_path, 'rb') as f:
+        f.seek(0, 2)
+        position = f.tell()
+        chunk_size = 8192
+        buffer = b""
+        # Scan backwards for the newline preceding the final record
+        while position > 0:
+            read_size = min(chunk_size, position)
+            position -= read_size
+            f.seek(position)
+            buffer = f.read(read_size) + buffer
+            if buffer.count(b"\n") >= 2:
+                break
+    last_line = buffer.rstrip(b"\n").rsplit(b"\n", 1)[-1]
+    return json.loads(last_line)
+
+
+def read_product_report(report_path: Path, product_id: str) -> Dict[str, Any]:
+    """
+    Build a per-product report view from a JSONL campaign report.
+
+    Returns the campaign summary with ``generated_assets``, ``total_assets``
+    and ``products_processed`` narrowed to the requested product.
+    """
+    summary = read_report_summary(report_path)
+    offsets = summary.pop("product_index", {}).get(product_id, [])
+    summary.pop("record_type", None)
+    summary.pop("asset_records", None)
+
+    assets = []
+    with open(report_path, 'rb') as f:
+        for offset in offsets:
+            f.seek(offset)
+            record = json.loads(f.readline())
+            record.pop("record_type", None)
+            assets.append(record)
+
+    summary["generated_assets"] = assets
+    summary["total_assets"] = len(assets)
+    summary["products_processed"] = [product_id]
+    return summary
 
 
 class StorageManager:
@@ -15,6 +119,14 @@ class StorageManager:
     def __init__(self):
         self.config = get_config()
         self.output_dir = self.config.OUTPUT_DIR
+        self._manifest: Optional[AssetManifest] = None
+
+    @property
+    def manifest(self) -> AssetManifest:
+        """Asset manifest database (opened on first use)."""
+        if self._manifest is None:
+            self._manifest = AssetManifest(self.config.ASSET_MANIFEST_PATH)
+        return self._manifest
     
     def create_campaign_directory(self, campaign_id: str) -> Path:
         """Create campaign output directory structure."""
@@ -47,49 +159,94 @@ class StorageManager:
     
     def save_image(self, image: Image.Image, path: Path) -> None:
         """Save image to file."""
-        path.parent.mkdir(parents=True, exist_ok=True)
-        image.save(path, optimize=True, quality=95)
+        path = Path(path)
+        with histograms.timer("encode"):
+            data = self.encode_image(image, path.suffix)
+        self.write_encoded(data, path)
+
+    def write_encoded(self, data: bytes, path: Path) -> None:
+        """Write image bytes already produced by encode_image."""
+        path = Path(path)
+        with tracing.span("save", path=str(path), bytes=len(data)), histograms.timer("disk_write"):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+        histograms.add_bytes("disk_write", len(data))
+        registry = metrics.get_registry()
+        registry.counter(
+            "storage_assets_written_total", "Images written to disk by format", ("format",)
+        ).inc(format=path.suffix.lstrip(".").lower())
+        registry.counter("storage_bytes_written_total", "Encoded image bytes written to disk").inc(len(data))
+
+    def encode_image(self, image: Image.Image, extension: str) -> bytes:
+        """Encode an image in the format implied by a file extension."""
+        extension = extension.lower() if extension.startswith(".") else f".{extension.lower()}"
+        image_format = Image.registered_extensions().get(extension)
+        if image_format is None:
+            raise ValueError(f"Unsupported image extension: '{extension}'")
+
+        with tracing.span("encode", format=image_format) as span:
+            buffer = BytesIO()
+            image.save(buffer, format=image_format, optimize=True, quality=95)
+            span.set_attribute("bytes", buffer.tell())
+            return buffer.getvalue()
     
+    def get_reports_dir(self) -> Path:
+        """Return (and create) the campaign reports directory."""
+        reports_dir = self.output_dir / "campaign_reports"
+        reports_dir.mkdir(parents=True, exist_ok=True)
+        return reports_dir
+
+    def open_report_writer(self, campaign_id: str) -> CampaignReportWriter:
+        """
+        Open a streaming writer for the consolidated campaign report.
+
+        Reports are saved to output/campaign_reports/ with filename format:
+        campaign_report_CAMPAIGN_ID_YYYY-MM-DD.jsonl
+        """
+        timestamp = datetime.now().strftime("%Y-%m-%d")
+        filename = f"campaign_report_{campaign_id}_{timestamp}.jsonl"
+        return CampaignReportWriter(self.get_reports_dir() / filename)
+
     def save_report(
         self,
         campaign_output: CampaignOutput,
         campaign_id: str,
-        product_id: str
+        product_id: Optional[str] = None
     ) -> Path:
         """
-        Save per-product campaign report JSON with enhanced metrics.
+        Save a single indented JSON campaign report with enhanced metrics.
 
         Reports are saved to output/campaign_reports/ with filename format:
-        campaign_report_CAMPAIGN_ID_PRODUCT_ID_YYYY-MM-DD.json
+        campaign_report_CAMPAIGN_ID[_PRODUCT_ID]_YYYY-MM-DD.json
 
-        Historical reports are preserved (not overwritten).
+        The pipeline writes the consolidated JSONL report instead (see
+        ``open_report_writer``); this remains for one-off JSON exports.
         """
-        # Create campaign_reports directory at root output level
-        reports_dir = self.output_dir / "campaign_reports"
-        reports_dir.mkdir(parents=True, exist_ok=True)
+        reports_dir = self.get_reports_dir()
 
         # Generate timestamp for filename (YYYY-MM-DD format)
         timestamp = datetime.now().strftime("%Y-%m-%d")
 
-        # New filename format: campaign_report_CAMPAIGN_ID_PRODUCT_ID_YYYY-MM-DD.json
-        filename = f"campaign_report_{campaign_id}_{product_id}_{timestamp}.json"
-        report_path = reports_dir / filename
-
-        # Filter assets for this product only
-        product_assets = [
-            asset for asset in campaign_output.generated_assets
-            if asset.product_id == product_id
-        ]
-
-        # Create product-specific output
-        product_output = campaign_output.model_copy(update={
-            "generated_assets": product_assets,
-            "total_assets": len(product_assets),
-            "products_processed": [product_id]
-        })
+        if product_id is None:
+            filename = f"campaign_report_{campaign_id}_{timestamp}.json"
+            report_output = campaign_output
+        else:
+            filename = f"campaign_report_{campaign_id}_{product_id}_{timestamp}.json"
+
+            # Filter assets for this product only
+            product_assets = [
+                asset for asset in campaign_output.generated_assets
+                if asset.product_id == product_id
+            ]
+            report_output = campaign_output.model_copy(update={
+                "generated_assets": product_assets,
+                "total_assets": len(product_assets),
+                "products_processed": [product_id]
+            })
 
+        report_path = reports_dir / filename
         with open(report_path, 'w') as f:
-            json.dump(product_output.model_dump(), f, indent=2, default=str)
+            json.dump(report_output.model_dump(), f, indent=2, default=str)
 
         return report_path
 
@@ -181,3 +338,40 @@ class StorageManager:
             json.dump(brief_data, f, indent=2)
 
         print(f"✓ Updated campaign brief: {brief_file}")
+
+    def export_manifest_to_brief(self, brief_path: str, campaign_id: str) -> None:
+        """
+        Export manifest asset paths into a campaign brief's existing_assets.
+
+        Only products present in the manifest are touched; each product gets
+        its hero path plus one ``{locale}_{ratio}`` key per rendered variant.
+
+        Args:
+            brief_path: Path to campaign brief to update
+            campaign_id: Campaign whose manifest records are exported
+        """
+        brief_file = Path(brief_path)
+
+        with open(brief_file, 'r') as f:
+            brief_data = json.load(f)
+
+        assets_by_product: Dict[str, Dict[str, str]] = {}
+        for record in self.manifest.campaign_assets(campaign_id):
+            if record["kind"] == HERO_KIND:
+                asset_key = "hero"
+            else:
+                asset_key = f"{record['locale']}_{record['aspect_ratio']}"
+            assets_by_product.setdefault(record["product_id"], {})[asset_key] = record["file_path"]
+
+        for product in brief_data.get('products', []):
+            exported = assets_by_product.get(product['product_id'])
+            if not exported:
+                continue
+            if product.get('existing_assets') is None:
+                product['existing_assets'] = {}
+            product['existing_assets'].update(exported)
+
+        with open(brief_file, 'w') as f:
+            json.dump(brief_data, f, indent=2)
+
+        print(f"✓ Updated campaign brief: {brief_file}")
@@ -0,0 +1,272 @@
+"""Lightweight nested-span tracing with Chrome trace and OTLP JSON export."""
+import asyncio
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+TRACE_FORMATS = ("chrome", "otlp")
+
+_current_tracer: ContextVar[Optional["Tracer"]] = ContextVar("current_tracer", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """
+    One timed operation with attributes.
+
+    Spans nest through a context variable, so each asyncio task sees its own
+    parent chain. Use as a context manager, or call ``end()`` explicitly for
+    blocks that cannot be wrapped.
+    """
+
+    def __init__(self, tracer: "Tracer", name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.parent = parent
+        self.span_id = secrets.token_hex(8)
+        self.attributes = dict(attributes)
+        self.status = "ok"
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.lane = _current_lane()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_status(self, status: str) -> None:
+        self.status = status
+
+    def end(self, status: Optional[str] = None) -> None:
+        """Finish the span, closing any unfinished children first."""
+        if self.end_ns is not None:
+            return
+
+        # Restore the parent if this span (or an unfinished child) is current
+        current = _current_span.get()
+        while current is not None and current is not self and current.end_ns is None and self._is_ancestor_of(current):
+            current.end(status="unfinished")
+            current = _current_span.get()
+        if current is self:
+            _current_span.set(self.parent)
+
+        if status:
+            self.status = status
+        self.end_ns = time.perf_counter_ns()
+        self.tracer._record(self)
+
+    def _is_ancestor_of(self, span: "Span") -> bool:
+        parent = span.parent
+        while parent is not None:
+            if parent is self:
+                return True
+            parent = parent.parent
+        return False
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.perf_counter_ns()
+        return (end_ns - self.start_ns) / 1_000_000
+
+    def __enter__(self) -> "Span":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None:
+            self.set_attribute("error", f"{exc_type.__name__}: {exc}")
+        self.end(status="error" if exc is not None else None)
+
+
+class _NoopSpan:
+    """Span returned when tracing is disabled; every call is a no-op."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_status(self, status: str) -> None:
+        pass
+
+    def end(self, status: Optional[str] = None) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Collect finished spans for one trace and export them."""
+
+    def __init__(self, service_name: str = "creative-automation-pipeline"):
+        self.service_name = service_name
+        self.trace_id = secrets.token_hex(16)
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        # Anchor monotonic span clocks to wall time for absolute timestamps
+        self._wall_anchor_ns = time.time_ns()
+        self._perf_anchor_ns = time.perf_counter_ns()
+
+    def _record(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def _unix_ns(self, perf_ns: int) -> int:
+        return self._wall_anchor_ns + (perf_ns - self._perf_anchor_ns)
+
+    def to_chrome(self) -> Dict[str, Any]:
+        """Chrome trace-event format (chrome://tracing, Perfetto)."""
+        lanes: Dict[Any, int] = {}
+        events = []
+        for span in sorted(self.spans, key=lambda s: s.start_ns):
+            tid = lanes.setdefault(span.lane, len(lanes) + 1)
+            events.append({
+                "name": span.name,
+                "cat": span.name,
+                "ph": "X",
+                "ts": self._unix_ns(span.start_ns) / 1000,
+                "dur": (span.end_ns - span.start_ns) / 1000,
+                "pid": os.getpid(),
+                "tid": tid,
+                "args": dict(span.attributes, status=span.status, span_id=span.span_id),
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"trace_id": self.trace_id}}
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """OTLP/JSON ``ExportTraceServiceRequest`` (Jaeger, Tempo, otel-collector)."""
+        spans = []
+        for span in sorted(self.spans, key=lambda s: s.start_ns):
+            spans.append({
+                "traceId": self.trace_id,
+                "spanId": span.span_id,
+                "parentSpanId": span.parent.span_id if span.parent else "",
+                "name": span.name,
+                "kind": 1,  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(self._unix_ns(span.start_ns)),
+                "endTimeUnixNano": str(self._unix_ns(span.end_ns)),
+                "attributes": [_otlp_attribute(k, v) for k, v in span.attributes.items()],
+                "status": {"code": 2 if span.status == "error" else 1},
+            })
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{"scope": {"name": "src.tracing"}, "spans": spans}],
+            }]
+        }
+
+    def export(self, path: Path, format: str = "chrome") -> Path:
+        """Write the trace to a JSON file in the given format."""
+        if format not in TRACE_FORMATS:
+            raise ValueError(f"Unsupported trace format: '{format}'. Available: {', '.join(TRACE_FORMATS)}")
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = self.to_chrome() if format == "chrome" else self.to_otlp()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, default=str)
+        return path
+
+
+class trace:
+    """
+    Start a trace with a root span for the enclosed block.
+
+    Usage:
+        with trace("campaign", campaign_id="C1") as tracer:
+            ...
+        tracer.export(path)
+    """
+
+    def __init__(self, name: str, **attributes: Any):
+        self.tracer = Tracer()
+        self._name = name
+        self._attributes = attributes
+
+    def __enter__(self) -> Tracer:
+        self._tracer_token = _current_tracer.set(self.tracer)
+        self._span_token = _current_span.set(None)
+        self._root = start_span(self._name, **self._attributes)
+        return self.tracer
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._root.__exit__(exc_type, exc, tb)
+        _current_span.reset(self._span_token)
+        _current_tracer.reset(self._tracer_token)
+
+
+def start_span(name: str, **attributes: Any):
+    """Open a child of the current span; a no-op when no trace is active."""
+    tracer = _current_tracer.get()
+    if tracer is None:
+        return _NOOP_SPAN
+
+    span = Span(tracer, name, _current_span.get(), attributes)
+    _current_span.set(span)
+    return span
+
+
+# ``with span("render", ratio="1:1"):`` reads better at call sites
+span = start_span
+
+
+def open_span(name: str, **attributes: Any):
+    """
+    Open a child of the current span without making it current.
+
+    For operations spread over several tasks (a product whose hero and
+    renders are separate scheduler nodes): pass the span to ``use_span``
+    in each task and ``end()`` it when the last one finishes.
+    """
+    tracer = _current_tracer.get()
+    if tracer is None:
+        return _NOOP_SPAN
+    return Span(tracer, name, _current_span.get(), attributes)
+
+
+@contextmanager
+def use_span(parent):
+    """Make ``parent`` the current span for the enclosed block."""
+    if not isinstance(parent, Span):
+        yield parent
+        return
+    token = _current_span.set(parent)
+    try:
+        yield parent
+    finally:
+        _current_span.reset(token)
+
+
+def current_span():
+    """The innermost open span, or a no-op span outside a trace."""
+    return _current_span.get() or _NOOP_SPAN
+
+
+def _current_lane() -> Any:
+    """Identify the asyncio task (or thread) so overlapping spans get separate rows."""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return id(task) if task is not None else threading.get_ident()
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
@@ -0,0 +1,477 @@
+"""Watch-folder mode: process new and changed briefs as they land in a directory."""
+import asyncio
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from src.config import get_config
+
+
+# inotify(7) event masks
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+# Sent instead of a path when events were lost and everything must be rechecked
+RESCAN = Path("<rescan>")
+
+_libc = None
+
+
+def _load_libc():
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    return _libc
+
+
+def inotify_available() -> bool:
+    """Whether this platform's libc provides inotify."""
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        return hasattr(_load_libc(), "inotify_init1")
+    except OSError:
+        return False
+
+
+class InotifyWatcher:
+    """
+    Report changes in a set of directories through inotify (via ctypes).
+
+    Directories are watched non-recursively; every created, written, moved
+    or deleted entry is reported as its path. A queue overflow reports
+    ``RESCAN``. The file descriptor is read from the event loop.
+    """
+
+    def __init__(self):
+        self._fd: Optional[int] = None
+        self._dirs: Dict[int, Path] = {}
+        self._watched: Set[Path] = set()
+        self.events: "asyncio.Queue[Path]" = asyncio.Queue()
+
+    def start(self) -> "InotifyWatcher":
+        libc = _load_libc()
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 failed: {os.strerror(errno)}")
+        self._fd = fd
+        asyncio.get_running_loop().add_reader(fd, self._read)
+        return self
+
+    def watch(self, directory: Path) -> None:
+        directory = Path(directory).resolve()
+        if directory in self._watched or not directory.is_dir():
+            return
+        wd = _load_libc().inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_add_watch {directory}: {os.strerror(errno)}")
+        self._dirs[wd] = directory
+        self._watched.add(directory)
+
+    def _read(self) -> None:
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].split(b"\0", 1)[0]
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                self.events.put_nowait(RESCAN)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                # Directory deleted or unmounted; it can be watched again if it comes back
+                del self._dirs[wd]
+                self._watched.discard(directory)
+                continue
+            self.events.put_nowait(directory / os.fsdecode(name) if name else directory)
+
+    def close(self) -> None:
+        if self._fd is not None:
+            asyncio.get_running_loop().remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = None
+
+
+class PollingWatcher:
+    """
+    Report changes by re-listing watched directories every ``interval`` seconds.
+
+    Works everywhere (network shares, macOS, containers without inotify);
+    a file counts as changed when its mtime or size differs from the last scan.
+    """
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._snapshots: Dict[Path, Dict[Path, tuple]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.events: "asyncio.Queue[Path]" = asyncio.Queue()
+
+    def start(self) -> "PollingWatcher":
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    def watch(self, directory: Path) -> None:
+        directory = Path(directory).resolve()
+        if directory not in self._snapshots:
+            self._snapshots[directory] = _snapshot(directory)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            for directory, before in list(self._snapshots.items()):
+                after = await asyncio.to_thread(_snapshot, directory)
+                for path in before.keys() | after.keys():
+                    if before.get(path) != after.get(path):
+                        self.events.put_nowait(path)
+                self._snapshots[directory] = after
+
+    def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+def _snapshot(directory: Path) -> Dict[Path, tuple]:
+    entries = {}
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if not entry.is_dir():
+                    entries[Path(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+def create_watcher(mode: str = "auto", poll_interval: float = 1.0):
+    """An ``InotifyWatcher`` where available (``auto``/``inotify``), else a ``PollingWatcher``."""
+    if mode == "inotify" or (mode == "auto" and inotify_available()):
+        return InotifyWatcher()
+    return PollingWatcher(poll_interval)
+
+
+async def debounce(events: "asyncio.Queue[Path]", quiet: float, max_delay: float) -> Set[Path]:
+    """
+    Collect a burst of events: wait for the first one, then keep collecting
+    until nothing arrives for ``quiet`` seconds (or ``max_delay`` has passed,
+    so a folder that never settles is still processed).
+    """
+    changed = {await events.get()}
+    deadline = time.monotonic() + max_delay
+    while True:
+        timeout = min(quiet, deadline - time.monotonic())
+        if timeout <= 0:
+            return changed
+        try:
+            changed.add(await asyncio.wait_for(events.get(), timeout))
+        except asyncio.TimeoutError:
+            return changed
+
+
+def file_digest(path: Path) -> Optional[str]:
+    """SHA-256 of a file's contents, or None if it does not exist."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    except (FileNotFoundError, IsADirectoryError):
+        return None
+    return digest.hexdigest()
+
+
+def brief_dependencies(brief: Dict[str, Any]) -> List[Path]:
+    """Guideline, logo and hero files a brief reads, as the pipeline resolves them."""
+    paths = [
+        brief.get("brand_guidelines_file"),
+        brief.get("localization_guidelines_file"),
+        brief.get("legal_compliance_file"),
+    ]
+    for product in brief.get("products") or []:
+        existing = (product or {}).get("existing_assets") or {}
+        paths.extend(existing.get(kind) for kind in ("logo", "hero"))
+    return sorted({Path(path).resolve() for path in paths if path})
+
+
+class WatchState:
+    """
+    What each brief was last processed from, persisted as JSON.
+
+    Per brief: the content hash of the brief and of every file it depends
+    on, the campaign ID, the outcome and when. A brief is due when any of
+    those hashes differ from disk. File hashes are cached against
+    (mtime, size) so unchanged files are not re-read on every event.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.briefs: Dict[str, Dict[str, Any]] = {}
+        self.invalid: Dict[str, str] = {}  # Unparseable brief -> hash already reported
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("version") == self.VERSION:
+                self.briefs = data.get("briefs", {})
+                self.invalid = data.get("invalid", {})
+                self._stats = data.get("files", {})
+
+    def digest(self, path: Path) -> Optional[str]:
+        """Content hash of ``path``, re-read only when its mtime or size changed."""
+        key = str(path)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            self._stats.pop(key, None)
+            return None
+        cached = self._stats.get(key)
+        if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+            return cached["hash"]
+        value = file_digest(path)
+        self._stats[key] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "hash": value}
+        return value
+
+    def is_current(self, brief_path: Path, brief_hash: str, dependencies: Dict[str, Optional[str]]) -> bool:
+        entry = self.briefs.get(str(brief_path))
+        return bool(entry) and entry["hash"] == brief_hash and entry["dependencies"] == dependencies
+
+    def record(
+        self,
+        brief_path: Path,
+        brief_hash: str,
+        dependencies: Dict[str, Optional[str]],
+        campaign_id: Optional[str],
+        status: str,
+        total_assets: int = 0
+    ) -> None:
+        self.briefs[str(brief_path)] = {
+            "hash": brief_hash,
+            "dependencies": dependencies,
+            "campaign_id": campaign_id,
+            "status": status,
+            "total_assets": total_assets,
+            "processed_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.invalid.pop(str(brief_path), None)
+
+    def forget(self, brief_path: Path) -> None:
+        self.briefs.pop(str(brief_path), None)
+        self.invalid.pop(str(brief_path), None)
+
+    def dependents(self, path: Path) -> List[Path]:
+        """Briefs that last read ``path``."""
+        key = str(path)
+        return [Path(brief) for brief, entry in self.briefs.items() if key in entry["dependencies"]]
+
+    def save(self) -> None:
+        """Write atomically, so a crash never leaves a truncated state file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        files = {path: stat for path, stat in self._stats.items() if stat.get("hash")}
+        tmp.write_text(json.dumps(
+            {"version": self.VERSION, "briefs": self.briefs, "invalid": self.invalid, "files": files},
+            indent=2
+        ), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+class BriefWatcher:
+    """
+    Process briefs dropped into ``directory``, then keep them up to date.
+
+    On start, every brief that is new, changed, or failed last time is
+    processed. Afterwards, changes (inotify or polling) are debounced and
+    only affected briefs re-run: a changed brief, or every brief referencing
+    a changed guideline, logo or hero file. Within a re-run the asset
+    manifest reuses each variant whose inputs are unchanged, so only
+    affected assets are regenerated. Nothing is repeated while hashes match
+    the persisted ``WatchState``, including across restarts.
+
+    Runs go through a ``BatchProcessor`` kept for the watcher's lifetime,
+    so parsed guidelines, translations and heroes stay cached between
+    events. Briefs are never rewritten (``update_brief=False``), since the
+    write would itself look like a change.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        processor=None,
+        state_path: Optional[Path] = None,
+        debounce_seconds: Optional[float] = None,
+        mode: Optional[str] = None,
+        poll_interval: Optional[float] = None
+    ):
+        config = get_config()
+        self.directory = Path(directory).resolve()
+        if processor is None:
+            from src.batch import BatchProcessor
+            processor = BatchProcessor(update_brief=False)
+        self.processor = processor
+        self.state = WatchState(state_path or config.WATCH_STATE_PATH)
+        self.debounce_seconds = config.WATCH_DEBOUNCE_SECONDS if debounce_seconds is None else debounce_seconds
+        self.max_delay_seconds = max(self.debounce_seconds, config.WATCH_MAX_DELAY_SECONDS)
+        self.mode = mode or config.WATCH_MODE
+        self.poll_interval = config.WATCH_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.output_dir = Path(config.OUTPUT_DIR).resolve()
+        self.runs = 0
+
+    def briefs(self) -> List[Path]:
+        """JSON files in the watched directory (guideline JSON is filtered out when loaded)."""
+        return sorted(path.resolve() for path in self.directory.glob("*.json"))
+
+    def due(self, candidates: Optional[Iterable[Path]] = None, retry_failed: bool = False) -> List[Path]:
+        """
+        Briefs among ``candidates`` (default: all) whose inputs changed since
+        they were last processed; ``retry_failed`` adds briefs that failed.
+        """
+        due = []
+        for path in sorted(set(self.briefs() if candidates is None else candidates)):
+            brief_hash = self.state.digest(path)
+            if brief_hash is None:
+                if str(path) in self.state.briefs:
+                    print(f"🗑️  Brief removed: {path.name}")
+                    self.state.forget(path)
+                continue
+
+            brief = self._load(path, brief_hash)
+            if brief is None:
+                continue
+            dependencies = self._dependency_hashes(brief)
+            entry = self.state.briefs.get(str(path))
+            if not self.state.is_current(path, brief_hash, dependencies):
+                due.append(path)
+            elif retry_failed and entry["status"] == "failed":
+                due.append(path)
+        return due
+
+    def _load(self, path: Path, brief_hash: str) -> Optional[Dict[str, Any]]:
+        """The brief's JSON, or None for non-briefs and (reported once) broken files."""
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            if self.state.invalid.get(str(path)) != brief_hash:
+                print(f"⚠️  Skipping {path.name}: {e}")
+                self.state.invalid[str(path)] = brief_hash
+            return None
+        # Guideline JSON in the same folder is not a brief
+        if not isinstance(data, dict) or "campaign_id" not in data:
+            return None
+        return data
+
+    def _dependency_hashes(self, brief: Dict[str, Any]) -> Dict[str, Optional[str]]:
+        return {str(path): self.state.digest(path) for path in brief_dependencies(brief)}
+
+    def affected(self, changed: Iterable[Path]) -> Set[Path]:
+        """Briefs to re-check for a set of changed paths."""
+        candidates: Set[Path] = set()
+        for path in changed:
+            if path == RESCAN or path == self.directory:
+                return set(self.briefs()) | {Path(brief) for brief in self.state.briefs}
+            path = path.resolve()
+            if self.output_dir in path.parents or path == self.state.path.resolve():
+                continue
+            if path.parent == self.directory and path.suffix.lower() == ".json":
+                candidates.add(path)
+            candidates.update(self.state.dependents(path))
+        return candidates
+
+    async def process(self, brief_paths: List[Path]):
+        """Run the due briefs and record what they were built from."""
+        # Hash before running: an edit made mid-run leaves the brief due again
+        inputs = {}
+        for path in brief_paths:
+            brief = self._load(path, self.state.digest(path)) or {}
+            inputs[path] = (self.state.digest(path), self._dependency_hashes(brief))
+
+        print(f"\n👀 Processing {len(brief_paths)} changed brief(s): {', '.join(p.name for p in brief_paths)}")
+        report = await self.processor.run(brief_paths)
+        self.runs += 1
+
+        for result in report.briefs:
+            path = Path(result.brief_path).resolve()
+            brief_hash, dependencies = inputs[path]
+            self.state.record(
+                path, brief_hash, dependencies, result.campaign_id, result.status, result.total_assets
+            )
+        self.state.save()
+        return report
+
+    async def run_once(self):
+        """Process everything due now (new, changed or previously failed); None if nothing was."""
+        due = self.due(retry_failed=True)
+        self.state.save()
+        if not due:
+            return None
+        return await self.process(due)
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        """Process what is due, then watch for changes until ``stop`` is set."""
+        stop = stop or asyncio.Event()
+        watcher = create_watcher(self.mode, self.poll_interval).start()
+        try:
+            self._watch_dependencies(watcher)
+            print(f"👀 Watching {self.directory} ({type(watcher).__name__}, debounce {self.debounce_seconds:g}s)")
+            await self.run_once()
+            self._watch_dependencies(watcher)
+
+            stopped = asyncio.ensure_future(stop.wait())
+            try:
+                while not stop.is_set():
+                    batch = asyncio.ensure_future(
+                        debounce(watcher.events, self.debounce_seconds, self.max_delay_seconds)
+                    )
+                    await asyncio.wait([batch, stopped], return_when=asyncio.FIRST_COMPLETED)
+                    if not batch.done():
+                        batch.cancel()
+                        break
+                    due = self.due(self.affected(batch.result()))
+                    self.state.save()
+                    if due:
+                        await self.process(due)
+                        self._watch_dependencies(watcher)
+            finally:
+                stopped.cancel()
+        finally:
+            watcher.close()
+
+    def _watch_dependencies(self, watcher) -> None:
+        """Watch the brief folder and every folder holding a file a brief depends on."""
+        watcher.watch(self.directory)
+        for entry in self.state.briefs.values():
+            for path in entry["dependencies"]:
+                watcher.watch(Path(path).parent)
@@ -0,0 +1,309 @@
+"""SQLite-backed durable task queue with leases, visibility timeouts and retries."""
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+
+class WorkQueue:
+    """
+    Durable queue of campaign tasks shared by processes on one or more hosts.
+
+    A claimed task is leased to one worker until ``lease_expires_at``; if the
+    worker dies (or stops heartbeating) the lease lapses and the task becomes
+    claimable again, which is the visibility timeout. Failed attempts are
+    retried with exponential backoff up to ``max_attempts``, after which the
+    task and everything depending on it are marked failed. Completion is
+    fenced on the lease owner, so a worker whose lease was taken over cannot
+    overwrite the new owner's result.
+
+    Tasks run only once all of their dependencies are done. Claims use
+    ``BEGIN IMMEDIATE`` so concurrent workers never lease the same task.
+    Several hosts can share the database on a volume with working POSIX
+    locks; SQLite locking over NFS is not reliable.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            run_id        TEXT PRIMARY KEY,
+            campaign_id   TEXT NOT NULL,
+            brief         TEXT NOT NULL,
+            created_at    REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS tasks (
+            task_id           TEXT PRIMARY KEY,
+            run_id            TEXT NOT NULL,
+            kind              TEXT NOT NULL,
+            payload           TEXT NOT NULL,
+            status            TEXT NOT NULL DEFAULT 'pending',
+            attempts          INTEGER NOT NULL DEFAULT 0,
+            max_attempts      INTEGER NOT NULL,
+            available_at      REAL NOT NULL,
+            lease_owner       TEXT,
+            lease_expires_at  REAL,
+            result            TEXT,
+            error             TEXT,
+            created_at        REAL NOT NULL,
+            finished_at       REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_claim ON tasks (status, available_at);
+        CREATE INDEX IF NOT EXISTS idx_tasks_run ON tasks (run_id);
+        CREATE TABLE IF NOT EXISTS task_deps (
+            task_id     TEXT NOT NULL,
+            depends_on  TEXT NOT NULL,
+            PRIMARY KEY (task_id, depends_on)
+        );
+        CREATE INDEX IF NOT EXISTS idx_task_deps_parent ON task_deps (depends_on);
+    """
+
+    def __init__(self, db_path: Path, retry_backoff_seconds: float = 2.0):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self._lock = threading.Lock()
+        # Autocommit mode: transactions are opened explicitly below
+        self._conn = sqlite3.connect(
+            str(self.db_path),
+            check_same_thread=False,
+            timeout=30,
+            isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            # WAL lets workers read while another claims or completes
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self.SCHEMA)
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _transaction(self):
+        return _Transaction(self._conn, self._lock)
+
+    # Producer side
+
+    def add_run(self, run_id: str, campaign_id: str, brief: Dict[str, Any], tasks: Iterable[Dict[str, Any]], max_attempts: int = 3) -> None:
+        """
+        Enqueue a campaign run and its tasks atomically.
+
+        Each task is ``{"task_id", "kind", "payload", "depends_on": [task_ids]}``.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO runs (run_id, campaign_id, brief, created_at) VALUES (?, ?, ?, ?)",
+                (run_id, campaign_id, json.dumps(brief), now)
+            )
+            for task in tasks:
+                conn.execute(
+                    """
+                    INSERT INTO tasks (task_id, run_id, kind, payload, max_attempts, available_at, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (task["task_id"], run_id, task["kind"], json.dumps(task["payload"]), max_attempts, now, now)
+                )
+                conn.executemany(
+                    "INSERT INTO task_deps (task_id, depends_on) VALUES (?, ?)",
+                    [(task["task_id"], parent) for parent in task.get("depends_on", ())]
+                )
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if row is None:
+            return None
+        return dict(row, brief=json.loads(row["brief"]))
+
+    # Worker side
+
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        """
+        Lease the oldest runnable task to ``worker_id``.
+
+        Runnable means pending (and past its retry backoff) or leased with an
+        expired lease, with every dependency done. Returns None when idle.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            self._expire_leases(conn, now)
+            row = conn.execute(
+                """
+                SELECT * FROM tasks
+                WHERE ((status = 'pending' AND available_at <= :now)
+                       OR (status = 'leased' AND lease_expires_at < :now))
+                  AND NOT EXISTS (
+                      SELECT 1 FROM task_deps d JOIN tasks parent ON parent.task_id = d.depends_on
+                      WHERE d.task_id = tasks.task_id AND parent.status != 'done'
+                  )
+                ORDER BY created_at, rowid
+                LIMIT 1
+                """,
+                {"now": now}
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                """
+                UPDATE tasks SET status = 'leased', lease_owner = ?, lease_expires_at = ?, attempts = attempts + 1
+                WHERE task_id = ?
+                """,
+                (worker_id, now + lease_seconds, row["task_id"])
+            )
+        task = _task_dict(row)
+        task.update(status=LEASED, lease_owner=worker_id, attempts=row["attempts"] + 1)
+        return task
+
+    def extend_lease(self, task_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """Heartbeat: push the lease out; False if the lease was lost."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE tasks SET lease_expires_at = ?
+                WHERE task_id = ? AND status = 'leased' AND lease_owner = ?
+                """,
+                (time.time() + lease_seconds, task_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, task_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        """
+        Store a task's result; False (and ignored) if the lease is no longer held.
+
+        The last attempt's error is kept so retried tasks stay visible in reports.
+        """
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE tasks SET status = 'done', result = ?, finished_at = ?,
+                                 lease_owner = NULL, lease_expires_at = NULL
+                WHERE task_id = ? AND status = 'leased' AND lease_owner = ?
+                """,
+                (json.dumps(result), time.time(), task_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, task_id: str, worker_id: str, error: str, retry: bool = True) -> bool:
+        """Record a failed attempt: retry after backoff, or fail for good once attempts run out (or retry=False)."""
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT * FROM tasks WHERE task_id = ? AND status = 'leased' AND lease_owner = ?",
+                (task_id, worker_id)
+            ).fetchone()
+            if row is None:
+                return False
+            if retry and row["attempts"] < row["max_attempts"]:
+                backoff = self.retry_backoff_seconds * 2 ** (row["attempts"] - 1)
+                conn.execute(
+                    """
+                    UPDATE tasks SET status = 'pending', available_at = ?, error = ?,
+                                     lease_owner = NULL, lease_expires_at = NULL
+                    WHERE task_id = ?
+                    """,
+                    (now + backoff, error, task_id)
+                )
+            else:
+                self._fail_permanently(conn, task_id, error, now)
+            return True
+
+    def _expire_leases(self, conn: sqlite3.Connection, now: float) -> None:
+        """Fail tasks whose lease lapsed on their last allowed attempt."""
+        rows = conn.execute(
+            """
+            SELECT task_id, lease_owner FROM tasks
+            WHERE status = 'leased' AND lease_expires_at < ? AND attempts >= max_attempts
+            """,
+            (now,)
+        ).fetchall()
+        for row in rows:
+            self._fail_permanently(conn, row["task_id"], f"Lease expired on final attempt (worker {row['lease_owner']})", now)
+
+    def _fail_permanently(self, conn: sqlite3.Connection, task_id: str, error: str, now: float) -> None:
+        """Fail a task and, transitively, every task waiting on it."""
+        failed = [(task_id, error)]
+        while failed:
+            current, reason = failed.pop()
+            conn.execute(
+                """
+                UPDATE tasks SET status = 'failed', error = ?, finished_at = ?,
+                                 lease_owner = NULL, lease_expires_at = NULL
+                WHERE task_id = ?
+                """,
+                (reason, now, current)
+            )
+            dependents = conn.execute(
+                """
+                SELECT t.task_id FROM task_deps d JOIN tasks t ON t.task_id = d.task_id
+                WHERE d.depends_on = ? AND t.status IN ('pending', 'leased')
+                """,
+                (current,)
+            ).fetchall()
+            failed.extend((row["task_id"], f"Dependency {current} failed") for row in dependents)
+
+    # Inspection
+
+    def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        return _task_dict(row) if row else None
+
+    def run_tasks(self, run_id: str) -> List[Dict[str, Any]]:
+        """Every task of a run in creation order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM tasks WHERE run_id = ? ORDER BY created_at, rowid", (run_id,)
+            ).fetchall()
+        return [_task_dict(row) for row in rows]
+
+    def counts(self, run_id: Optional[str] = None) -> Dict[str, int]:
+        """Task counts by status, for one run or the whole queue."""
+        query = "SELECT status, COUNT(*) AS n FROM tasks"
+        params: tuple = ()
+        if run_id is not None:
+            query += " WHERE run_id = ?"
+            params = (run_id,)
+        with self._lock:
+            rows = self._conn.execute(query + " GROUP BY status", params).fetchall()
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        counts.update({row["status"]: row["n"] for row in rows})
+        return counts
+
+
+class _Transaction:
+    """``BEGIN IMMEDIATE`` ... ``COMMIT`` (or ``ROLLBACK``) under the connection lock."""
+
+    def __init__(self, conn: sqlite3.Connection, lock: threading.Lock):
+        self.conn = conn
+        self.lock = lock
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.lock.acquire()
+        try:
+            self.conn.execute("BEGIN IMMEDIATE")
+        except Exception:
+            self.lock.release()
+            raise
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.lock.release()
+
+
+def _task_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    task = dict(row)
+    task["payload"] = json.loads(task["payload"])
+    task["result"] = json.loads(task["result"]) if task["result"] else None
+    return task
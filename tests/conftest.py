@@ -257,6 +257,18 @@ def localization_guidelines_model():
     )
 
 
+@pytest.fixture
+def isolated_output(tmp_path, monkeypatch):
+    """Point the default output directory and asset manifest at tmp_path instead of ./output."""
+    from src import config
+
+    output_dir = tmp_path / "default_output"
+    monkeypatch.setenv("OUTPUT_DIR", str(output_dir))
+    monkeypatch.setenv("ASSET_MANIFEST_PATH", str(output_dir / "asset_manifest.db"))
+    monkeypatch.setattr(config, "_config", None)
+    return output_dir
+
+
 @pytest.fixture
 def temp_output_dir(tmp_path):
     """Temporary output directory for testing."""
@@ -274,3 +286,35 @@ def mock_env_vars(monkeypatch):
     monkeypatch.setenv("GEMINI_API_KEY", "test-gemini-key")
     monkeypatch.setenv("CLAUDE_API_KEY", "test-claude-key")
     monkeypatch.setenv("DEFAULT_IMAGE_BACKEND", "firefly")
+
+
+@pytest.fixture
+def fake_image_service(mock_image_bytes):
+    """Factory for in-memory image services with optional delay and failures."""
+    import asyncio
+    from src.genai.base import ImageGenerationService
+
+    class FakeImageService(ImageGenerationService):
+        def __init__(self, name="fake", delay=0.0, fail=False, image_bytes=mock_image_bytes):
+            super().__init__(api_key=f"{name}-key")
+            self.name = name
+            self.delay = delay
+            self.fail = fail
+            self.image_bytes = image_bytes
+            self.calls = []
+
+        async def generate_image(self, prompt, size="1024x1024", brand_guidelines=None):
+            self.calls.append((prompt, size))
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            if self.fail:
+                raise Exception(f"{self.name} API error: 500")
+            return self.image_bytes
+
+        def get_backend_name(self):
+            return f"Fake {self.name}"
+
+        def validate_config(self):
+            return True, []
+
+    return FakeImageService
@@ -0,0 +1,252 @@
+"""
+Tests for memory-budgeted render admission.
+"""
+import pytest
+import asyncio
+from unittest.mock import patch
+
+
+MB = 1024 * 1024
+
+
+class TestRenderEstimate:
+    """Test peak memory estimates for render jobs."""
+
+    def test_rgba_hero_dominates_crop(self):
+        """Test a 2048² RGBA hero costs at least its decoded size plus the output frame."""
+        from src.image_processor_v2 import ImageProcessorV2
+
+        processor = ImageProcessorV2()
+        estimate = processor.estimate_render_bytes((2048, 2048), 4, "9:16")
+
+        assert estimate >= 2048 * 2048 * 4 + 1080 * 1920 * 4
+        assert estimate > processor.estimate_render_bytes((2048, 2048), 3, "9:16")
+        assert estimate > processor.estimate_render_bytes((1024, 1024), 4, "9:16")
+
+    def test_pipeline_stages_add_up(self):
+        """Test a logo and post-processing raise the estimate for the same frame."""
+        from src.image_processor_v2 import ImageProcessorV2
+        from src.models import ComprehensiveBrandGuidelines, PostProcessingConfig
+
+        processor = ImageProcessorV2()
+        # A small hero so the overlay stages, not the decode, set the peak
+        base = processor.estimate_render_bytes((512, 512), 3, "16:9")
+        with_logo = processor.estimate_render_bytes((512, 512), 3, "16:9", has_logo=True)
+        guidelines = ComprehensiveBrandGuidelines(
+            source_file="minimal.pdf",
+            post_processing=PostProcessingConfig(enabled=True)
+        )
+        with_post = processor.estimate_render_bytes((512, 512), 3, "16:9", guidelines)
+
+        assert with_logo > base
+        assert with_post > base
+
+    def test_image_header_reads_size_and_bands(self, mock_image_bytes):
+        """Test the hero's size and bands come from its header."""
+        from src.admission import image_header
+
+        assert image_header(mock_image_bytes) == ((1024, 1024), 3)
+
+
+class TestContainerLimit:
+    """Test detecting the container memory limit."""
+
+    def test_reads_cgroup_v2_limit(self, tmp_path):
+        """Test a numeric memory.max is the limit and "max" means unlimited."""
+        from src import admission
+
+        limit_file = tmp_path / "memory.max"
+        with patch.object(admission, "CGROUP_MEMORY_LIMIT_FILES", (str(limit_file),)):
+            limit_file.write_text("536870912\n")
+            assert admission.container_memory_limit() == 512 * MB
+
+            limit_file.write_text("max\n")
+            assert admission.container_memory_limit() is None
+
+    def test_missing_and_unlimited_v1(self, tmp_path):
+        """Test no cgroup files, or cgroup v1's huge sentinel, mean no limit."""
+        from src import admission
+
+        limit_file = tmp_path / "memory.limit_in_bytes"
+        limit_file.write_text(str(9223372036854771712))
+        with patch.object(admission, "CGROUP_MEMORY_LIMIT_FILES", (str(tmp_path / "absent"), str(limit_file))):
+            assert admission.container_memory_limit() is None
+
+    def test_budget_from_config(self, mock_env_vars, monkeypatch):
+        """Test an explicit budget in MB, and 0 disabling admission control."""
+        from src.admission import MemoryAdmissionController
+        from src.config import reload_config
+
+        monkeypatch.setenv("RENDER_MEMORY_BUDGET_MB", "512")
+        reload_config()
+        assert MemoryAdmissionController.from_config().budget_bytes == 512 * MB
+
+        monkeypatch.setenv("RENDER_MEMORY_BUDGET_MB", "0")
+        reload_config()
+        assert MemoryAdmissionController.from_config() is None
+
+        monkeypatch.delenv("RENDER_MEMORY_BUDGET_MB")
+        reload_config()
+
+
+class TestMemoryAdmissionController:
+    """Test admitting render jobs against a memory budget."""
+
+    @pytest.mark.asyncio
+    async def test_blocks_until_memory_is_released(self):
+        """Test a job that would exceed the budget waits for a running job to finish."""
+        from src.admission import MemoryAdmissionController
+
+        controller = MemoryAdmissionController(100 * MB, rss=lambda: 10 * MB)
+        first = await controller.acquire(60 * MB)
+        second = asyncio.create_task(controller.acquire(60 * MB))
+        await asyncio.sleep(0.01)
+
+        assert not second.done()
+        assert controller.waiting() == 1
+
+        first.release()
+        reservation = await asyncio.wait_for(second, 1)
+        assert controller.reserved_bytes == 60 * MB
+        reservation.release()
+        assert controller.reserved_bytes == 0
+        assert controller.summary()["delayed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_oversized_job_runs_alone(self):
+        """Test a job larger than the whole budget is admitted once nothing else runs."""
+        from src.admission import MemoryAdmissionController
+
+        controller = MemoryAdmissionController(50 * MB, rss=lambda: 10 * MB)
+        async with controller.reserve(200 * MB):
+            assert controller.reserved_bytes == 200 * MB
+
+        assert controller.oversized == 1
+        assert controller.peak_reserved_bytes == 200 * MB
+
+    @pytest.mark.asyncio
+    async def test_large_job_is_not_overtaken(self):
+        """Test smaller jobs queue behind a large waiting job instead of starving it."""
+        from src.admission import MemoryAdmissionController
+
+        controller = MemoryAdmissionController(100 * MB, rss=lambda: 0)
+        running = await controller.acquire(50 * MB)
+        large = asyncio.create_task(controller.acquire(80 * MB))
+        await asyncio.sleep(0)
+        small = asyncio.create_task(controller.acquire(10 * MB))
+        await asyncio.sleep(0.01)
+
+        assert not small.done()
+        running.release()
+        (await asyncio.wait_for(large, 1)).release()
+        (await asyncio.wait_for(small, 1)).release()
+
+    @pytest.mark.asyncio
+    async def test_waits_for_measured_rss_to_drop(self):
+        """Test resident memory above the reservations also holds new jobs back."""
+        from src.admission import MemoryAdmissionController
+
+        rss = {"bytes": 0}
+        controller = MemoryAdmissionController(100 * MB, poll_interval=0.01, rss=lambda: rss["bytes"])
+        running = await controller.acquire(10 * MB)
+        rss["bytes"] = 95 * MB  # e.g. a cache grew outside any reservation
+
+        waiting = asyncio.create_task(controller.acquire(10 * MB))
+        await asyncio.sleep(0.03)
+        assert not waiting.done()
+
+        rss["bytes"] = 30 * MB
+        (await asyncio.wait_for(waiting, 1)).release()
+        running.release()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        """Test cancelling a waiting job reserves nothing."""
+        from src.admission import MemoryAdmissionController
+
+        controller = MemoryAdmissionController(100 * MB, rss=lambda: 0)
+        running = await controller.acquire(90 * MB)
+        waiting = asyncio.create_task(controller.acquire(50 * MB))
+        await asyncio.sleep(0)
+
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        assert controller.waiting() == 0
+
+        running.release()
+        assert controller.reserved_bytes == 0
+
+
+class TestPipelineAdmission:
+    """Test renders in a campaign go through memory admission."""
+
+    @pytest.mark.asyncio
+    async def test_renders_admitted_one_at_a_time_under_tight_budget(
+        self, mock_env_vars, example_brief, fake_image_service, tmp_path
+    ):
+        """Test a budget that fits one render still completes the campaign, one render at a time."""
+        from src.admission import MemoryAdmissionController
+        from src.pipeline import CreativeAutomationPipeline
+        from src.models import CampaignBrief
+        from src.manifest import AssetManifest
+
+        brief = CampaignBrief(**dict(example_brief, enable_localization=False))
+        controller = MemoryAdmissionController(1, rss=lambda: 0)
+
+        peak = {"reserved": 0}
+        acquire = controller.acquire
+
+        async def tracking_acquire(nbytes):
+            reservation = await acquire(nbytes)
+            peak["reserved"] = max(peak["reserved"], len(controller._held))
+            return reservation
+
+        controller.acquire = tracking_acquire
+
+        with patch('src.pipeline.ImageGenerationFactory.create', return_value=fake_image_service()):
+            pipeline = CreativeAutomationPipeline()
+            pipeline.storage.output_dir = tmp_path
+            pipeline.storage._manifest = AssetManifest(tmp_path / "manifest.db")
+            pipeline.memory_admission = controller
+            output = await pipeline.process_campaign(brief)
+
+        assert output.total_assets == 4
+        assert controller.admitted == 4
+        assert peak["reserved"] == 1
+        assert controller.reserved_bytes == 0
+
+    @pytest.mark.asyncio
+    async def test_staggered_heroes_on_one_cpu_worker_do_not_deadlock(
+        self, mock_env_vars, monkeypatch, example_brief, example_product, fake_image_service, tmp_path
+    ):
+        """Test renders waiting for memory don't hold the only cpu slot the freeing encode needs."""
+        from src.admission import MemoryAdmissionController
+        from src.pipeline import CreativeAutomationPipeline
+        from src.models import CampaignBrief
+        from src.manifest import AssetManifest
+        from src import config
+
+        monkeypatch.setenv("SCHEDULER_CPU_WORKERS", "1")
+        monkeypatch.setattr(config, "_config", None)
+
+        class StaggeredService(fake_image_service):
+            async def generate_image(self, prompt, size="1024x1024", brand_guidelines=None):
+                if "late" in prompt:
+                    await asyncio.sleep(0.05)
+                return await super().generate_image(prompt, size, brand_guidelines)
+
+        # The first product's renders become ready after the second's have reserved memory
+        late_product = dict(example_product, product_id="TEST-PROD-000", generation_prompt="late product photo")
+        brief = CampaignBrief(**dict(example_brief, enable_localization=False, products=[late_product, example_product]))
+        controller = MemoryAdmissionController(1, rss=lambda: 0)
+
+        with patch('src.pipeline.ImageGenerationFactory.create', return_value=StaggeredService()):
+            pipeline = CreativeAutomationPipeline()
+            pipeline.storage.output_dir = tmp_path
+            pipeline.storage._manifest = AssetManifest(tmp_path / "manifest.db")
+            pipeline.memory_admission = controller
+            output = await asyncio.wait_for(pipeline.process_campaign(brief), 30)
+
+        assert output.total_assets == 8
+        assert controller.admitted == 8
+        assert controller.reserved_bytes == 0
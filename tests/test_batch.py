@@ -0,0 +1,242 @@
+"""
+Tests for multi-brief batch processing.
+"""
+import pytest
+import json
+from unittest.mock import patch
+
+
+class TestDiscoverBriefs:
+    """Test expanding batch sources into brief paths."""
+
+    def test_directory_glob_and_manifests(self, tmp_path):
+        """Test directories, globs, text and JSON manifests resolve and dedupe."""
+        from src.batch import discover_briefs
+
+        for name in ("a.json", "b.json", "c.json"):
+            (tmp_path / name).write_text("{}")
+        (tmp_path / "list.txt").write_text("# comment\na.json\n\nc.json\n")
+        (tmp_path / "manifest.json").write_text(json.dumps({"briefs": ["b.json"]}))
+
+        sub = tmp_path / "sub"
+        sub.mkdir()
+        (sub / "d.json").write_text("{}")
+
+        assert [p.name for p in discover_briefs([str(sub)])] == ["d.json"]
+        assert [p.name for p in discover_briefs([str(tmp_path / "list.txt")])] == ["a.json", "c.json"]
+        assert [p.name for p in discover_briefs([str(tmp_path / "manifest.json")])] == ["b.json"]
+        assert [p.name for p in discover_briefs([str(tmp_path / "[ab].json"), str(tmp_path / "a.json")])] == ["a.json", "b.json"]
+
+    def test_unknown_source_rejected(self, tmp_path):
+        """Test a source that is not a brief, directory, glob or manifest raises."""
+        from src.batch import discover_briefs
+
+        with pytest.raises(ValueError):
+            discover_briefs([str(tmp_path / "briefs.yaml")])
+
+
+class TestHeroCache:
+    """Test the batch hero cache."""
+
+    def test_lru_eviction_by_bytes(self):
+        """Test the least recently used hero is evicted once over budget."""
+        from src.batch import HeroCache
+
+        cache = HeroCache(max_bytes=10)
+        cache.put("a", b"12345", "local")
+        cache.put("b", b"12345", "local")
+        assert cache.get("a") == (b"12345", "local")
+
+        cache.put("c", b"12345", "local")
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert (cache.hits, cache.misses) == (2, 1)
+
+    def test_oversized_entry_skipped(self):
+        """Test a hero larger than the whole budget is not cached."""
+        from src.batch import HeroCache
+
+        cache = HeroCache(max_bytes=4)
+        cache.put("a", b"12345", "local")
+
+        assert len(cache) == 0
+
+
+class TestLRUCache:
+    """Test the bounded task cache."""
+
+    def test_evicts_least_recently_used(self):
+        """Test reads refresh an entry and the oldest is dropped past the limit."""
+        from src.batch import LRUCache
+
+        cache = LRUCache(max_entries=2)
+        cache["a"] = 1
+        cache["b"] = 2
+        assert cache.get("a") == 1
+
+        cache["c"] = 3
+
+        assert list(cache) == ["a", "c"]
+        assert cache.get("b") is None
+
+
+class TestSharedSession:
+    """Test HTTP session sharing."""
+
+    @pytest.mark.asyncio
+    async def test_client_session_reuses_shared_session(self):
+        """Test services get the batch's session and don't close it."""
+        from src.genai.http import client_session, shared_session
+
+        async with shared_session(limit=2) as shared:
+            async with client_session() as first:
+                pass
+            async with client_session() as second:
+                pass
+            assert first is shared and second is shared
+            assert not shared.closed
+            assert shared.connector.limit == 2
+
+        assert shared.closed
+
+    @pytest.mark.asyncio
+    async def test_client_session_without_shared_session(self):
+        """Test a standalone call gets its own session, closed afterwards."""
+        from src.genai.http import client_session
+
+        async with client_session() as session:
+            assert not session.closed
+
+        assert session.closed
+
+
+class TestBatchProcessor:
+    """Test running several briefs through shared pipelines."""
+
+    def _write_briefs(self, tmp_path, example_brief, count):
+        paths = []
+        for i in range(count):
+            brief = dict(example_brief, campaign_id=f"BATCH-{i}", enable_localization=False)
+            path = tmp_path / f"brief_{i}.json"
+            path.write_text(json.dumps(brief))
+            paths.append(path)
+        return paths
+
+    @pytest.mark.asyncio
+    async def test_batch_shares_heroes_and_writes_report(self, mock_env_vars, tmp_path, example_brief, fake_image_service):
+        """Test the second brief reuses the first brief's hero and the report combines both."""
+        from src.batch import BatchProcessor
+        from src.manifest import AssetManifest
+
+        paths = self._write_briefs(tmp_path, example_brief, 2)
+        service = fake_image_service()
+
+        with patch('src.pipeline.ImageGenerationFactory.create', return_value=service):
+            processor = BatchProcessor(concurrency=1, render_workers=2)
+            processor.storage.output_dir = tmp_path / "output"
+            processor.storage._manifest = AssetManifest(tmp_path / "manifest.db")
+            report = await processor.run(paths)
+
+        assert len(service.calls) == 1
+        assert report.total_briefs == 2
+        assert report.succeeded == 2
+        assert report.hero_cache_hits == 1
+        assert report.total_assets == sum(r.total_assets for r in report.briefs) > 0
+        assert report.assets_per_second > 0
+        assert report.latency_histograms["render"]["count"] == report.total_assets
+
+        saved = list((tmp_path / "output" / "campaign_reports").glob("batch_report_*.json"))
+        assert len(saved) == 1
+        assert json.loads(saved[0].read_text())["total_assets"] == report.total_assets
+
+    @pytest.mark.asyncio
+    async def test_tight_memory_budget_does_not_deadlock(self, mock_env_vars, tmp_path, example_brief, fake_image_service):
+        """Test concurrent campaigns sharing one render slot finish when the memory budget fits one render."""
+        import asyncio
+        from src.admission import MemoryAdmissionController
+        from src.batch import BatchProcessor
+        from src.manifest import AssetManifest
+
+        paths = self._write_briefs(tmp_path, example_brief, 2)
+        controller = MemoryAdmissionController(1, rss=lambda: 0)
+
+        with patch('src.pipeline.ImageGenerationFactory.create', return_value=fake_image_service()), \
+                patch('src.admission.get_controller', return_value=controller):
+            processor = BatchProcessor(concurrency=2, render_workers=1)
+            processor.storage.output_dir = tmp_path / "output"
+            processor.storage._manifest = AssetManifest(tmp_path / "manifest.db")
+            report = await asyncio.wait_for(processor.run(paths), 30)
+
+        assert report.succeeded == 2
+        assert controller.admitted == report.total_assets == 8
+        assert controller.reserved_bytes == 0
+
+    @pytest.mark.asyncio
+    async def test_invalid_brief_does_not_stop_batch(self, mock_env_vars, tmp_path, example_brief, fake_image_service):
+        """Test a brief that fails to load is reported and the rest still run."""
+        from src.batch import BatchProcessor
+        from src.manifest import AssetManifest
+
+        paths = self._write_briefs(tmp_path, example_brief, 1)
+        broken = tmp_path / "broken.json"
+        broken.write_text("{not json")
+
+        with patch('src.pipeline.ImageGenerationFactory.create', return_value=fake_image_service()):
+            processor = BatchProcessor(concurrency=2, render_workers=1)
+            processor.storage.output_dir = tmp_path / "output"
+            processor.storage._manifest = AssetManifest(tmp_path / "manifest.db")
+            report = await processor.run([broken] + paths)
+
+        statuses = {r.brief_path: r.status for r in report.briefs}
+        assert statuses[str(broken)] == "failed"
+        assert statuses[str(paths[0])] == "success"
+        assert report.failed == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_briefs_count_only_their_own_calls(self, mock_env_vars, monkeypatch, tmp_path, example_brief, example_product, fake_image_service):
+        """Test failovers and coalesced requests are attributed to the brief that made the call."""
+        from src.batch import BatchProcessor
+        from src.manifest import AssetManifest
+        from src.storage import read_report_summary
+        from src.genai import failover
+        from src import config
+
+        monkeypatch.setenv("FALLBACK_IMAGE_BACKENDS", "gemini")
+        monkeypatch.setenv("CIRCUIT_BREAKER_FAILURE_THRESHOLD", "10")
+        monkeypatch.setattr(config, "_config", None)
+        monkeypatch.setattr(failover, "_circuit_breakers", {})
+
+        # Two briefs share a product (coalesced hero), the third has its own
+        paths = self._write_briefs(tmp_path, example_brief, 3)
+        other_product = dict(example_product, product_id="OTHER-PROD", generation_prompt="photo of another product")
+        brief = json.loads(paths[2].read_text())
+        paths[2].write_text(json.dumps(dict(brief, products=[other_product])))
+
+        services = {
+            "firefly": fake_image_service("firefly", fail=True),
+            "gemini": fake_image_service("gemini", delay=0.3),
+        }
+
+        with patch('src.genai.factory.ImageGenerationFactory.create', side_effect=lambda name, **kwargs: services[name]):
+            processor = BatchProcessor(concurrency=3, render_workers=2)
+            processor.storage.output_dir = tmp_path / "output"
+            processor.storage._manifest = AssetManifest(tmp_path / "manifest.db")
+            report = await processor.run(paths)
+
+        reports_dir = tmp_path / "output" / "campaign_reports"
+        campaign_metrics = {
+            campaign_id: read_report_summary(next(reports_dir.glob(f"campaign_report_{campaign_id}_*.jsonl")))["technical_metrics"]
+            for campaign_id in ("BATCH-0", "BATCH-1", "BATCH-2")
+        }
+        shared = [campaign_metrics["BATCH-0"], campaign_metrics["BATCH-1"]]
+
+        assert len(services["gemini"].calls) == 2
+        assert report.total_api_calls == 2
+        assert sorted(m["total_api_calls"] for m in shared) == [0, 1]
+        assert sorted(m["coalesced_requests"] for m in shared) == [0, 1]
+        assert sorted(m["retry_count"] for m in shared) == [0, 1]
+        assert campaign_metrics["BATCH-2"]["total_api_calls"] == 1
+        assert campaign_metrics["BATCH-2"]["coalesced_requests"] == 0
+        assert campaign_metrics["BATCH-2"]["retry_reasons"] == ["firefly: firefly API error: 500"]
+        assert all(m["circuit_open_skips"] == 0 for m in campaign_metrics.values())
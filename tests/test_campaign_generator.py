@@ -0,0 +1,185 @@
+"""
+Tests for campaign brief generation from templates and product feeds.
+"""
+import csv
+import json
+from pathlib import Path
+
+
+TEMPLATE = Path(__file__).parent.parent / "examples" / "templates" / "campaign_template.json"
+
+
+def write_csv(path: Path, rows, columns=("product_id", "product_name", "product_description", "product_category", "features", "hero")):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def sku(number: int, **overrides) -> dict:
+    row = {
+        "product_id": f"SKU-{number:03d}",
+        "product_name": f"Product {number}",
+        "product_description": "Lightweight and durable",
+        "product_category": "Outdoor",
+    }
+    row.update(overrides)
+    return row
+
+
+class TestCompiledTemplate:
+    """Test compiling a JSON template once and rendering it per brief."""
+
+    def test_renders_placeholders(self):
+        """Test whole-string placeholders keep their value's type and mixed strings are formatted."""
+        from src.campaign_generator import CompiledTemplate
+
+        template = CompiledTemplate({
+            "id": "{{CAMPAIGN_ID}}",
+            "title": "{{BRAND_NAME}} - {{CAMPAIGN_NAME}}!",
+            "locales": "{{LOCALES}}",
+            "ratios": ["1:1", "{{RATIO}}"],
+            "enabled": False,
+        })
+
+        values = {"CAMPAIGN_ID": "FALL", "BRAND_NAME": "Acme", "CAMPAIGN_NAME": "Fall", "LOCALES": ["en-US"], "RATIO": "9:16"}
+        first = template.render(values)
+        assert template.placeholders == {"CAMPAIGN_ID", "BRAND_NAME", "CAMPAIGN_NAME", "LOCALES", "RATIO"}
+        assert first == {"id": "FALL", "title": "Acme - Fall!", "locales": ["en-US"], "ratios": ["1:1", "9:16"], "enabled": False}
+
+        first["ratios"].append("16:9")
+        assert template.render(values)["ratios"] == ["1:1", "9:16"]
+
+    def test_quick_generate_fills_defaults(self, tmp_path, monkeypatch):
+        """Test quick_generate leaves no unfilled placeholders in the brief."""
+        from src.campaign_generator import CampaignGenerator
+        from src.models import CampaignBrief
+
+        monkeypatch.chdir(tmp_path)
+        path = CampaignGenerator(str(TEMPLATE)).quick_generate(
+            "SPRING", "Spring", [{"id": "P1", "name": "Tent", "description": "Two-person tent", "category": "Outdoor"}]
+        )
+
+        brief = json.loads(path.read_text())
+        assert brief["brand_name"] == "Your Brand"
+        assert "PLACEHOLDER" not in path.read_text()
+        CampaignBrief(**brief)
+
+
+class TestBulkCampaignGenerator:
+    """Test streaming a product feed into sharded briefs."""
+
+    def test_csv_feed_sharded_by_product_limit(self, tmp_path):
+        """Test a campaign's products are split into valid briefs of at most the limit."""
+        from src.campaign_generator import BulkCampaignGenerator
+        from src.models import CampaignBrief
+
+        feed = write_csv(tmp_path / "catalog.csv", [
+            sku(1, features="Waterproof | Light", hero="assets/sku1.png"),
+            sku(2),
+            sku(3),
+            sku(4),
+            sku(5),
+        ])
+        generator = BulkCampaignGenerator(
+            str(TEMPLATE), max_products_per_brief=2, campaign_id="FALL", campaign_name="Fall", brand_name="Acme"
+        )
+        report = generator.generate(str(feed), str(tmp_path / "briefs"))
+
+        assert (report.rows, report.products, report.briefs, report.skipped_rows) == (5, 5, 3, 0)
+        assert report.rows_per_second > 0
+        briefs = [CampaignBrief(**json.loads(Path(path).read_text())) for path in report.brief_paths]
+        assert [brief.campaign_id for brief in briefs] == ["FALL-001", "FALL-002", "FALL-003"]
+        assert [len(brief.products) for brief in briefs] == [2, 2, 1]
+        assert briefs[0].brand_name == "Acme"
+
+        first = briefs[0].products[0]
+        assert first.key_features == ["Waterproof", "Light"]
+        assert first.existing_assets == {"hero": "assets/sku1.png"}
+        # No prompt in the feed: the pipeline builds one per product instead of sharing a default
+        assert first.generation_prompt is None
+        assert briefs[0].products[1].key_features == ["High quality", "Great value", "Trusted brand"]
+
+    def test_jsonl_feed_grouped_by_campaign_with_bad_rows(self, tmp_path):
+        """Test rows are grouped by their campaign_id, and bad rows are reported and skipped."""
+        from src.campaign_generator import BulkCampaignGenerator
+
+        feed = tmp_path / "catalog.jsonl"
+        lines = [
+            json.dumps(sku(1, campaign_id="TENTS", campaign_name="Tents", features=["Two-person"])),
+            json.dumps(sku(2, campaign_id="STOVES")),
+            "{not json",
+            json.dumps({"product_name": "No ID", "campaign_id": "TENTS"}),
+            "",
+            json.dumps(sku(3, campaign_id="TENTS")),
+        ]
+        feed.write_text("\n".join(lines) + "\n")
+
+        report = BulkCampaignGenerator(str(TEMPLATE)).generate(str(feed), str(tmp_path / "briefs"))
+
+        assert (report.rows, report.skipped_rows, report.briefs) == (5, 2, 2)
+        assert [Path(path).name for path in report.brief_paths] == ["tents-001.json", "stoves-001.json"]
+        tents = json.loads(Path(report.brief_paths[0]).read_text())
+        assert tents["campaign_name"] == "Tents (1)"
+        assert [product["product_id"] for product in tents["products"]] == ["SKU-001", "SKU-003"]
+        assert report.errors[0].startswith("line 3: invalid JSON")
+        assert report.errors[1] == "line 4: missing product_id"
+
+    def test_invalid_product_row_skipped_without_losing_shard(self, tmp_path):
+        """Test a row that fails Product validation is skipped by line and the rest of its shard is kept."""
+        from src.campaign_generator import BulkCampaignGenerator
+
+        feed = tmp_path / "catalog.jsonl"
+        rows = [
+            {"id": "A1", "name": "Tent"},
+            {"id": 123, "name": "Stove"},
+            {"id": "C3", "name": "Lantern"},
+        ]
+        feed.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+        report = BulkCampaignGenerator(str(TEMPLATE), campaign_id="FALL").generate(str(feed), str(tmp_path / "briefs"))
+
+        assert (report.rows, report.skipped_rows, report.briefs, report.invalid_briefs) == (3, 1, 1, 0)
+        assert report.errors[0].startswith("line 2: invalid product at product_id")
+        brief = json.loads(Path(report.brief_paths[0]).read_text())
+        assert [product["product_id"] for product in brief["products"]] == ["A1", "C3"]
+
+    def test_invalid_briefs_not_written(self, tmp_path):
+        """Test a brief that fails CampaignBrief validation is counted and not written; dry runs write nothing."""
+        from src.campaign_generator import BulkCampaignGenerator
+
+        template = json.loads(TEMPLATE.read_text())
+        template["aspect_ratios"] = "{{RATIOS}}"
+        template_path = tmp_path / "template.json"
+        template_path.write_text(json.dumps(template))
+        feed = write_csv(tmp_path / "catalog.csv", [sku(1)])
+
+        invalid = BulkCampaignGenerator(str(template_path), campaign_id="FALL", ratios="square")
+        report = invalid.generate(str(feed), str(tmp_path / "briefs"))
+        assert (report.briefs, report.invalid_briefs) == (0, 1)
+        assert report.errors[0].startswith("FALL-001: 1 validation error(s), first at aspect_ratios")
+        assert list((tmp_path / "briefs").iterdir()) == []
+
+        dry_run = BulkCampaignGenerator(str(TEMPLATE), campaign_id="FALL")
+        report = dry_run.generate(str(feed), str(tmp_path / "dry"), write=False)
+        assert report.briefs == 1
+        assert report.brief_paths == []
+        assert not (tmp_path / "dry").exists()
+
+    def test_bulk_generate_command(self, tmp_path):
+        """Test the CLI writes the briefs and reports the generation rate."""
+        from click.testing import CliRunner
+        from src.cli import cli
+
+        feed = write_csv(tmp_path / "catalog.csv", [sku(number) for number in range(1, 4)])
+        output_dir = tmp_path / "briefs"
+        result = CliRunner().invoke(cli, [
+            "bulk-generate", str(feed), "-o", str(output_dir), "--campaign-id", "FALL",
+            "--max-products", "2", "--set", "HEADLINE=Gear Up"
+        ])
+
+        assert result.exit_code == 0, result.output
+        assert "rows/s" in result.output
+        assert sorted(path.name for path in output_dir.iterdir()) == ["fall-001.json", "fall-002.json"]
+        assert json.loads((output_dir / "fall-001.json").read_text())["campaign_message"]["headline"] == "Gear Up"
@@ -7,6 +7,10 @@ import json
 from pathlib import Path
 
 
+# Keep reports and the asset manifest out of the repository's ./output
+pytestmark = pytest.mark.usefixtures("isolated_output")
+
+
 class TestCLI:
     """Test CLI commands."""
 
@@ -490,3 +490,519 @@ class TestMultiBackendIntegration:
         imagen = ImageGenerationFactory.create("imagen", api_key="test")
         assert type(gemini) == type(imagen)
         assert isinstance(gemini, GeminiImageService)
+
+
+class TestSingleFlightImageService:
+    """Test coalescing of identical in-flight image requests."""
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_share_one_call(self, fake_image_service):
+        """Test concurrent identical requests hit the backend once."""
+        import asyncio
+        from src.genai.single_flight import SingleFlightImageService
+
+        service = fake_image_service(delay=0.05, image_bytes=b"image")
+        wrapper = SingleFlightImageService(service)
+
+        results = await asyncio.gather(*[
+            wrapper.generate_image("same prompt", size="2048x2048") for _ in range(5)
+        ])
+
+        assert results == [b"image"] * 5
+        assert len(service.calls) == 1
+        assert wrapper.request_count == 1
+        assert wrapper.coalesced_count == 4
+
+    @pytest.mark.asyncio
+    async def test_coalesces_across_wrappers(self, fake_image_service):
+        """Test wrappers around the same backend share the in-flight table."""
+        import asyncio
+        from src.genai.single_flight import SingleFlightImageService
+
+        service = fake_image_service(delay=0.05)
+        first = SingleFlightImageService(service)
+        second = SingleFlightImageService(service)
+
+        await asyncio.gather(
+            first.generate_image("shared", size="2048x2048"),
+            second.generate_image("shared", size="2048x2048")
+        )
+
+        assert len(service.calls) == 1
+        assert second.coalesced_count == 1
+
+    @pytest.mark.asyncio
+    async def test_different_requests_not_coalesced(self, fake_image_service):
+        """Test different prompts or sizes are separate calls."""
+        import asyncio
+        from src.genai.single_flight import SingleFlightImageService
+
+        service = fake_image_service(delay=0.05)
+        wrapper = SingleFlightImageService(service)
+
+        await asyncio.gather(
+            wrapper.generate_image("prompt a", size="2048x2048"),
+            wrapper.generate_image("prompt b", size="2048x2048"),
+            wrapper.generate_image("prompt a", size="1024x1024")
+        )
+
+        assert len(service.calls) == 3
+        assert wrapper.coalesced_count == 0
+
+    @pytest.mark.asyncio
+    async def test_different_backends_not_coalesced(self, fake_image_service):
+        """Test chains or endpoints that could serve different images keep separate calls."""
+        import asyncio
+        from src.genai.failover import CircuitBreaker, FailoverImageService
+        from src.genai.single_flight import SingleFlightImageService
+
+        primary = fake_image_service("primary", fail=True, delay=0.05)
+        first_fallback = fake_image_service("first")
+        second_fallback = fake_image_service("second")
+        first = SingleFlightImageService(FailoverImageService(
+            [("primary", primary), ("first", first_fallback)],
+            breakers={"primary": CircuitBreaker(), "first": CircuitBreaker()}
+        ))
+        second = SingleFlightImageService(FailoverImageService(
+            [("primary", primary), ("second", second_fallback)],
+            breakers={"primary": CircuitBreaker(), "second": CircuitBreaker()}
+        ))
+
+        endpoint_a = fake_image_service("first", delay=0.05)
+        endpoint_b = fake_image_service("first", delay=0.05)
+        endpoint_a.api_url = "http://127.0.0.1:9000/v1/images"
+        endpoint_b.api_url = "http://127.0.0.1:9001/v1/images"
+
+        await asyncio.gather(
+            first.generate_image("shared"),
+            second.generate_image("shared"),
+            SingleFlightImageService(endpoint_a).generate_image("shared"),
+            SingleFlightImageService(endpoint_b).generate_image("shared")
+        )
+
+        assert len(first_fallback.calls) == len(second_fallback.calls) == 1
+        assert len(endpoint_a.calls) == len(endpoint_b.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_sequential_requests_not_coalesced(self, fake_image_service):
+        """Test completed requests are not reused (no result caching)."""
+        from src.genai.single_flight import SingleFlightImageService
+
+        service = fake_image_service()
+        wrapper = SingleFlightImageService(service)
+
+        await wrapper.generate_image("prompt")
+        await wrapper.generate_image("prompt")
+
+        assert len(service.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_failure_propagates_to_all_waiters(self, fake_image_service):
+        """Test a failed shared request raises for every caller."""
+        import asyncio
+        from src.genai.single_flight import SingleFlightImageService
+
+        service = fake_image_service(delay=0.01, fail=True)
+        wrapper = SingleFlightImageService(service)
+
+        results = await asyncio.gather(
+            wrapper.generate_image("prompt"),
+            wrapper.generate_image("prompt"),
+            return_exceptions=True
+        )
+
+        assert all(isinstance(result, Exception) for result in results)
+        assert len(service.calls) == 1
+        assert SingleFlightImageService._inflight == {}
+
+
+class TestBatchImageGeneration:
+    """Test multi-image generate_images requests."""
+
+    @pytest.mark.asyncio
+    async def test_firefly_native_batch(self, mock_image_bytes):
+        """Test Firefly requests all candidates with a single n>1 call."""
+        from src.genai.firefly import FireflyImageService
+
+        mock_api_response = AsyncMock()
+        mock_api_response.status = 200
+        mock_api_response.json = AsyncMock(return_value={
+            "outputs": [{"image": {"url": f"https://example.com/{i}.png"}} for i in range(3)]
+        })
+
+        mock_image_response = AsyncMock()
+        mock_image_response.status = 200
+        mock_image_response.read = AsyncMock(return_value=mock_image_bytes)
+
+        with patch('aiohttp.ClientSession.post', return_value=AsyncMock(__aenter__=AsyncMock(return_value=mock_api_response))) as mock_post:
+            with patch('aiohttp.ClientSession.get', return_value=AsyncMock(__aenter__=AsyncMock(return_value=mock_image_response))) as mock_get:
+                service = FireflyImageService(api_key="test", client_id="test")
+                candidates = await service.generate_images("prompt", 3, size="2048x2048")
+
+                assert len(candidates) == 3
+                assert mock_post.call_count == 1
+                assert mock_post.call_args[1]["json"]["n"] == 3
+                assert mock_get.call_count == 3
+                assert [c.index for c in candidates] == [0, 1, 2]
+                assert all(c.batch_size == 3 for c in candidates)
+                assert all(c.elapsed_ms >= 0 for c in candidates)
+
+    @pytest.mark.asyncio
+    async def test_gemini_splits_above_cap(self):
+        """Test Gemini splits 6 candidates into sampleCount 4 + 2."""
+        from src.genai.gemini_service import GeminiImageService
+
+        image_b64 = base64.b64encode(b"img").decode()
+        sample_counts = []
+
+        def respond(*args, **kwargs):
+            count = kwargs["json"]["parameters"]["sampleCount"]
+            sample_counts.append(count)
+            response = AsyncMock()
+            response.status = 200
+            response.json = AsyncMock(return_value={
+                "predictions": [{"bytesBase64Encoded": image_b64}] * count
+            })
+            return AsyncMock(__aenter__=AsyncMock(return_value=response))
+
+        with patch('aiohttp.ClientSession.post', side_effect=respond):
+            service = GeminiImageService(api_key="test")
+            candidates = await service.generate_images("prompt", 6)
+
+            assert sorted(sample_counts) == [2, 4]
+            assert len(candidates) == 6
+            assert all(c.image_bytes == b"img" for c in candidates)
+
+    @pytest.mark.asyncio
+    async def test_openai_one_image_per_request(self, mock_openai_response, mock_image_bytes):
+        """Test DALL-E 3 (n=1 only) issues one request per candidate."""
+        from src.genai.openai_service import OpenAIImageService
+
+        mock_api_response = AsyncMock()
+        mock_api_response.status = 200
+        mock_api_response.json = AsyncMock(return_value=mock_openai_response)
+
+        mock_image_response = AsyncMock()
+        mock_image_response.status = 200
+        mock_image_response.read = AsyncMock(return_value=mock_image_bytes)
+
+        with patch('aiohttp.ClientSession.post', return_value=AsyncMock(__aenter__=AsyncMock(return_value=mock_api_response))) as mock_post:
+            with patch('aiohttp.ClientSession.get', return_value=AsyncMock(__aenter__=AsyncMock(return_value=mock_image_response))):
+                service = OpenAIImageService(api_key="test")
+                candidates = await service.generate_images("prompt", 2)
+
+                assert len(candidates) == 2
+                assert mock_post.call_count == 2
+                assert all(call[1]["json"]["n"] == 1 for call in mock_post.call_args_list)
+
+    @pytest.mark.asyncio
+    async def test_invalid_count(self):
+        """Test a count below one is rejected."""
+        from src.genai.gemini_service import GeminiImageService
+
+        service = GeminiImageService(api_key="test")
+
+        with pytest.raises(ValueError):
+            await service.generate_images("prompt", 0)
+
+
+class TestCircuitBreaker:
+    """Test per-backend circuit breaker state transitions."""
+
+    def test_opens_after_threshold(self):
+        """Test consecutive failures open the breaker."""
+        from src.genai.failover import CircuitBreaker
+
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure()
+        assert breaker.allow_request()
+
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow_request()
+
+    def test_half_open_single_probe(self):
+        """Test one probe is allowed after the reset timeout."""
+        from src.genai.failover import CircuitBreaker
+
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+        breaker.record_failure()
+        assert not breaker.allow_request()
+
+        now[0] = 11
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+
+        breaker.record_success(5)
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_probe_reopens(self):
+        """Test a failing half-open probe re-opens the breaker."""
+        from src.genai.failover import CircuitBreaker
+
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=lambda: now[0])
+        for _ in range(3):
+            breaker.record_failure()
+
+        now[0] = 11
+        assert breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+
+    def test_slow_calls_count_as_failures(self):
+        """Test calls over the latency threshold trip the breaker."""
+        from src.genai.failover import CircuitBreaker
+
+        breaker = CircuitBreaker(failure_threshold=1, latency_threshold_ms=1000)
+        breaker.record_success(5000)
+
+        assert breaker.state == CircuitBreaker.OPEN
+
+
+class TestFailoverImageService:
+    """Test ordered cross-backend failover."""
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_next_backend(self, fake_image_service):
+        """Test a failing primary is skipped in favour of the secondary."""
+        from src.genai.failover import FailoverImageService, CircuitBreaker
+
+        primary = fake_image_service("firefly", fail=True)
+        secondary = fake_image_service("openai")
+        service = FailoverImageService(
+            [("firefly", primary), ("openai", secondary)],
+            breakers={"firefly": CircuitBreaker(), "openai": CircuitBreaker()}
+        )
+
+        image_bytes, served_by = await service.generate_image_with_backend("prompt")
+
+        assert image_bytes == secondary.image_bytes
+        assert served_by == "openai"
+        assert len(service.failover_events) == 1
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_skips_backend(self, fake_image_service):
+        """Test a backend with an open breaker receives no requests."""
+        from src.genai.failover import FailoverImageService, CircuitBreaker
+
+        primary = fake_image_service("firefly", fail=True)
+        secondary = fake_image_service("openai")
+        service = FailoverImageService(
+            [("firefly", primary), ("openai", secondary)],
+            breakers={"firefly": CircuitBreaker(failure_threshold=1), "openai": CircuitBreaker()}
+        )
+
+        await service.generate_image("first")
+        await service.generate_image("second")
+
+        assert len(primary.calls) == 1
+        assert len(secondary.calls) == 2
+        # Only the attempted call failed over; the skip is recorded separately
+        assert service.failover_events == ["firefly: firefly API error: 500"]
+        assert service.skip_events == ["firefly: skipped (circuit open)"]
+
+    @pytest.mark.asyncio
+    async def test_all_backends_fail(self, fake_image_service):
+        """Test an error listing every backend when all fail."""
+        from src.genai.failover import FailoverImageService, CircuitBreaker
+
+        service = FailoverImageService(
+            [("firefly", fake_image_service("firefly", fail=True)),
+             ("gemini", fake_image_service("gemini", fail=True))],
+            breakers={"firefly": CircuitBreaker(), "gemini": CircuitBreaker()}
+        )
+
+        with pytest.raises(Exception) as exc_info:
+            await service.generate_image("prompt")
+
+        assert "firefly" in str(exc_info.value)
+        assert "gemini" in str(exc_info.value)
+
+    def test_factory_create_failover(self, mock_env_vars):
+        """Test the factory builds a deduplicated ordered chain."""
+        from src.genai.factory import ImageGenerationFactory
+        from src.genai.failover import FailoverImageService
+
+        service = ImageGenerationFactory.create_failover(["firefly", "openai", "firefly", "gemini"])
+
+        assert isinstance(service, FailoverImageService)
+        assert [name for name, _ in service.services] == ["firefly", "openai", "gemini"]
+        assert all(child.max_retries == 1 for _, child in service.services)
+
+
+class TestHedgedImageService:
+    """Test hedged requests against slow backends."""
+
+    @pytest.mark.asyncio
+    async def test_fast_request_is_not_hedged(self, fake_image_service):
+        """Test requests finishing before the hedge delay send one call."""
+        from src.genai.hedging import HedgedImageService
+
+        primary = fake_image_service("firefly")
+        service = HedgedImageService(primary, initial_delay_ms=1000, max_hedge_ratio=1.0)
+
+        await service.generate_image("prompt")
+
+        assert len(primary.calls) == 1
+        assert service.hedge_count == 0
+
+    @pytest.mark.asyncio
+    async def test_slow_request_is_hedged_to_secondary(self, fake_image_service):
+        """Test a slow primary loses to the hedge and is cancelled."""
+        from src.genai.hedging import HedgedImageService
+
+        primary = fake_image_service("firefly", delay=5)
+        secondary = fake_image_service("openai")
+        service = HedgedImageService(
+            primary,
+            hedge_service=secondary,
+            hedge_backend="openai",
+            initial_delay_ms=10,
+            max_hedge_ratio=1.0
+        )
+
+        image_bytes, served_by = await service.generate_image_with_backend("prompt")
+
+        assert image_bytes == secondary.image_bytes
+        assert served_by == "openai"
+        assert service.hedge_count == 1
+        assert service.hedge_wins == 1
+        assert service.hedge_rate == 100.0
+
+    @pytest.mark.asyncio
+    async def test_hedge_survives_primary_failure(self, fake_image_service):
+        """Test the hedge result is used when the original request fails."""
+        from src.genai.hedging import HedgedImageService
+
+        primary = fake_image_service("firefly", delay=0.05, fail=True)
+        secondary = fake_image_service("gemini")
+        service = HedgedImageService(primary, hedge_service=secondary, initial_delay_ms=10, max_hedge_ratio=1.0)
+
+        assert await service.generate_image("prompt") == secondary.image_bytes
+
+    @pytest.mark.asyncio
+    async def test_budget_caps_hedges(self, fake_image_service):
+        """Test no more than the hedge ratio of requests are duplicated."""
+        from src.genai.hedging import HedgedImageService
+
+        primary = fake_image_service("firefly", delay=0.02)
+        service = HedgedImageService(primary, initial_delay_ms=1, min_samples=1000, max_hedge_ratio=0.25)
+
+        for i in range(8):
+            await service.generate_image(f"prompt {i}")
+
+        assert service.request_count == 8
+        assert service.hedge_count == 2
+
+    @pytest.mark.asyncio
+    async def test_budget_counts_the_hedge_being_fired(self, fake_image_service):
+        """Test a small hedge ratio does not let the very first request hedge."""
+        from src.genai.hedging import HedgedImageService
+
+        primary = fake_image_service("firefly", delay=0.02)
+        service = HedgedImageService(primary, initial_delay_ms=1, min_samples=1000, max_hedge_ratio=0.1)
+
+        for i in range(9):
+            await service.generate_image(f"prompt {i}")
+        assert service.hedge_count == 0
+
+        await service.generate_image("prompt 9")
+        assert service.hedge_count == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_primary_counts_toward_delay(self, fake_image_service):
+        """Test a primary the hedge beat is recorded at its elapsed time, not dropped."""
+        from src.genai.hedging import HedgedImageService
+
+        primary = fake_image_service("firefly", delay=5)
+        secondary = fake_image_service("openai", delay=0.05)
+        service = HedgedImageService(primary, hedge_service=secondary, initial_delay_ms=10, max_hedge_ratio=1.0)
+
+        await service.generate_image("prompt")
+
+        # The hedge's own latency and the primary's lower bound (delay + hedge)
+        assert service.hedge_wins == 1
+        assert len(service._latencies) == 2
+        assert min(service._latencies) >= 45
+        assert max(service._latencies) >= 55
+
+    def test_delay_tracks_observed_percentile(self, fake_image_service):
+        """Test the hedge delay follows observed latencies once warmed up."""
+        from src.genai.hedging import HedgedImageService
+
+        service = HedgedImageService(fake_image_service(), percentile=90, initial_delay_ms=500, min_samples=10)
+        assert service.hedge_delay_ms() == 500
+
+        service._latencies.extend(range(1, 101))
+
+        assert service.hedge_delay_ms() == 90
+
+
+class TestLocalImageService:
+    """Test the offline synthetic backend."""
+
+    @pytest.mark.asyncio
+    async def test_images_are_deterministic(self):
+        """Test the same prompt renders identical bytes at the requested size."""
+        from PIL import Image
+        from io import BytesIO
+        from src.genai.local_service import LocalImageService
+
+        service = LocalImageService(seed=1)
+
+        first = await service.generate_image("sunrise over hills", size="320x200")
+        second = await service.generate_image("sunrise over hills", size="320x200")
+        other = await service.generate_image("city at night", size="320x200")
+
+        assert first == second
+        assert first != other
+        assert Image.open(BytesIO(first)).size == (320, 200)
+
+    @pytest.mark.asyncio
+    async def test_batch_returns_distinct_candidates(self):
+        """Test batch candidates differ from each other."""
+        from src.genai.local_service import LocalImageService
+
+        service = LocalImageService(seed=1)
+        candidates = await service.generate_images("prompt", 3, size="64x64")
+
+        assert len({c.image_bytes for c in candidates}) == 3
+        assert service.request_count == 1
+
+    @pytest.mark.asyncio
+    async def test_simulated_errors(self):
+        """Test simulated 500s and 429s surface as API errors."""
+        from src.genai.local_service import LocalImageService
+
+        failing = LocalImageService(max_retries=1, error_rate=1.0, seed=1)
+        with pytest.raises(Exception, match="500"):
+            await failing.generate_image("prompt", size="64x64")
+
+        throttled = LocalImageService(max_retries=1, rate_limit_rate=1.0, seed=1)
+        with pytest.raises(Exception, match="429"):
+            await throttled.generate_image("prompt", size="64x64")
+        assert throttled.rate_limited_count == 1
+
+    def test_latency_distributions(self):
+        """Test sampled latencies follow the configured distribution."""
+        from src.genai.local_service import LocalImageService
+
+        fixed = LocalImageService(latency_ms=50, latency_distribution="fixed", seed=1)
+        assert fixed._sample_latency_ms() == 50
+
+        uniform = LocalImageService(latency_ms=100, latency_distribution="uniform", latency_spread=0.5, seed=1)
+        assert all(50 <= uniform._sample_latency_ms() <= 150 for _ in range(100))
+
+        with pytest.raises(ValueError):
+            LocalImageService(latency_distribution="bimodal")
+
+    def test_factory_aliases(self):
+        """Test local and synthetic resolve to the local backend."""
+        from src.genai.factory import ImageGenerationFactory
+        from src.genai.local_service import LocalImageService
+
+        assert isinstance(ImageGenerationFactory.create("local"), LocalImageService)
+        assert isinstance(ImageGenerationFactory.create("synthetic"), LocalImageService)
@@ -0,0 +1,129 @@
+"""
+Tests for the latency histograms.
+"""
+import pytest
+import json
+import random
+from unittest.mock import patch
+
+
+class TestLatencyHistogram:
+    """Test the log-bucket histogram."""
+
+    def test_percentiles_within_bucket_error(self):
+        """Test percentiles stay within the bucket's relative error."""
+        from src.histograms import LatencyHistogram
+
+        rng = random.Random(7)
+        samples = [rng.lognormvariate(5, 1) for _ in range(5000)]
+        histogram = LatencyHistogram()
+        for value in samples:
+            histogram.record(value)
+
+        ordered = sorted(samples)
+        for q in (50, 90, 99):
+            exact = ordered[int(q / 100 * len(ordered)) - 1]
+            assert histogram.percentile(q) == pytest.approx(exact, rel=0.05)
+        assert histogram.count == 5000
+        assert histogram.mean == pytest.approx(sum(samples) / len(samples))
+
+    def test_empty_and_zero_samples(self):
+        """Test empty histograms and sub-resolution samples report zero."""
+        from src.histograms import LatencyHistogram
+
+        histogram = LatencyHistogram()
+        assert histogram.percentile(99) == 0.0
+
+        histogram.record(0.0)
+        histogram.record(0.0)
+        histogram.record(10.0)
+        assert histogram.percentile(50) == 0.0
+        assert histogram.percentile(99) == 10.0
+
+    def test_merge_matches_single_histogram(self):
+        """Test merging two histograms equals recording everything in one."""
+        from src.histograms import LatencyHistogram
+
+        combined, first, second = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for value in range(1, 200):
+            combined.record(value)
+            (first if value % 2 else second).record(value)
+
+        merged = first.merge(second)
+        assert merged.to_dict() == combined.to_dict()
+
+    def test_dict_round_trip(self):
+        """Test serialized histograms rebuild with identical percentiles."""
+        from src.histograms import LatencyHistogram
+
+        histogram = LatencyHistogram()
+        for value in (3.2, 15.0, 15.5, 480.0, 2200.0):
+            histogram.record(value)
+
+        data = json.loads(json.dumps(histogram.to_dict()))
+        restored = LatencyHistogram.from_dict(data)
+
+        assert restored.to_dict() == histogram.to_dict()
+        assert data["p99"] == 2200.0
+
+
+class TestCollection:
+    """Test the context-scoped collection helpers."""
+
+    def test_observe_is_noop_outside_collect(self):
+        """Test module-level helpers do nothing without an active collection."""
+        from src import histograms
+
+        histograms.observe("render", 12.0)
+        histograms.add_bytes("disk_write", 100)
+        assert histograms.current() is None
+
+    def test_collect_gathers_observations(self):
+        """Test observations, timers and byte counts land in the active collection."""
+        from src import histograms
+
+        with histograms.collect() as collected:
+            histograms.observe("render", 12.0)
+            histograms.add_bytes("disk_write", 100)
+            histograms.add_bytes("disk_write", 50)
+            with histograms.timer("encode"):
+                pass
+
+        assert collected.latencies["render"].count == 1
+        assert collected.latencies["encode"].count == 1
+        assert collected.bytes == {"disk_write": 150}
+        assert histograms.current() is None
+
+
+class TestPipelineHistograms:
+    """Test campaign reports carry per-operation histograms."""
+
+    @pytest.mark.asyncio
+    async def test_pipeline_records_histograms(self, mock_env_vars, tmp_path, example_brief, fake_image_service):
+        """Test metrics include per-operation histograms that merge across reports."""
+        from src.pipeline import CreativeAutomationPipeline
+        from src.models import CampaignBrief
+        from src.manifest import AssetManifest
+        from src.histograms import merge_reports
+
+        brief = CampaignBrief(**dict(example_brief, enable_localization=False))
+
+        with patch('src.pipeline.ImageGenerationFactory.create', return_value=fake_image_service()):
+            pipeline = CreativeAutomationPipeline()
+            pipeline.storage.output_dir = tmp_path
+            pipeline.storage._manifest = AssetManifest(tmp_path / "manifest.db")
+            output = await pipeline.process_campaign(brief)
+
+        metrics = output.technical_metrics
+        assert metrics.latency_histograms["render"]["count"] == output.total_assets
+        assert metrics.latency_histograms["encode"]["count"] == output.total_assets
+        assert metrics.latency_histograms["disk_write"]["count"] == output.total_assets
+        assert metrics.latency_histograms[f"hero_generation.{metrics.backend_used}"]["count"] == 1
+        assert {"p50", "p90", "p99"} <= set(metrics.latency_histograms["render"])
+        assert metrics.bytes_transferred["image_download"] > 0
+        assert metrics.bytes_transferred["disk_write"] > 0
+
+        reports = sorted(tmp_path.glob("campaign_reports/*.jsonl"))
+        merged = merge_reports(reports + reports)
+        assert merged.latencies["render"].count == 2 * output.total_assets
+        assert merged.bytes["disk_write"] == 2 * metrics.bytes_transferred["disk_write"]
@@ -0,0 +1,159 @@
+"""
+Tests for the SQLite asset manifest.
+"""
+import pytest
+import json
+from unittest.mock import patch
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    """Asset manifest backed by a temporary database."""
+    from src.manifest import AssetManifest
+
+    db = AssetManifest(tmp_path / "manifest.db")
+    yield db
+    db.close()
+
+
+class TestFingerprint:
+    """Test input fingerprinting."""
+
+    def test_fingerprint_is_stable(self, example_campaign_message):
+        """Test identical inputs produce identical fingerprints."""
+        from src.manifest import fingerprint
+        from src.models import CampaignMessage
+
+        message = CampaignMessage(**example_campaign_message)
+
+        assert fingerprint("variant", message, "1:1") == fingerprint("variant", message, "1:1")
+
+    def test_fingerprint_changes_with_inputs(self, example_campaign_message):
+        """Test any changed input produces a different fingerprint."""
+        from src.manifest import fingerprint
+        from src.models import CampaignMessage
+
+        message = CampaignMessage(**example_campaign_message)
+        changed = message.model_copy(update={"headline": "Different"})
+
+        assert fingerprint(message, "1:1") != fingerprint(changed, "1:1")
+        assert fingerprint(message, "1:1") != fingerprint(message, "9:16")
+
+
+class TestAssetManifest:
+    """Test AssetManifest record and lookup."""
+
+    def test_record_and_lookup_variant(self, manifest, tmp_path):
+        """Test a recorded variant is found with its fingerprint."""
+        from src.manifest import VARIANT_KIND
+
+        asset = tmp_path / "asset.png"
+        asset.write_bytes(b"png-data")
+
+        manifest.record(
+            "CAMP", "P1", VARIANT_KIND, str(asset), "fp-1",
+            locale="en-US", aspect_ratio="1:1", format="png", backend="firefly"
+        )
+
+        record = manifest.lookup_variant("CAMP", "P1", "en-US", "1:1", "png", input_fingerprint="fp-1")
+
+        assert record is not None
+        assert record["file_path"] == str(asset)
+        assert record["size_bytes"] == len(b"png-data")
+        assert record["backend"] == "firefly"
+
+    def test_lookup_rejects_stale_fingerprint(self, manifest, tmp_path):
+        """Test changed inputs invalidate the recorded asset."""
+        from src.manifest import VARIANT_KIND
+
+        asset = tmp_path / "asset.png"
+        asset.write_bytes(b"x")
+        manifest.record("CAMP", "P1", VARIANT_KIND, str(asset), "fp-1",
+                        locale="en-US", aspect_ratio="1:1", format="png")
+
+        assert manifest.lookup_variant("CAMP", "P1", "en-US", "1:1", "png", input_fingerprint="fp-2") is None
+
+    def test_lookup_rejects_missing_file(self, manifest, tmp_path):
+        """Test records whose file was deleted are not reused."""
+        from src.manifest import HERO_KIND
+
+        hero = tmp_path / "hero.png"
+        hero.write_bytes(b"x")
+        manifest.record("CAMP", "P1", HERO_KIND, str(hero), "fp")
+        hero.unlink()
+
+        assert manifest.lookup_hero("CAMP", "P1", input_fingerprint="fp") is None
+
+    def test_record_upserts(self, manifest, tmp_path):
+        """Test re-recording an asset replaces the previous row."""
+        from src.manifest import HERO_KIND
+
+        hero = tmp_path / "hero.png"
+        hero.write_bytes(b"x")
+        manifest.record("CAMP", "P1", HERO_KIND, str(hero), "fp-old")
+        manifest.record("CAMP", "P1", HERO_KIND, str(hero), "fp-new")
+
+        assert manifest.count("CAMP") == 1
+        assert manifest.lookup_hero("CAMP", "P1", input_fingerprint="fp-new") is not None
+
+
+class TestManifestBriefExport:
+    """Test exporting manifest records into a campaign brief."""
+
+    def test_export_manifest_to_brief(self, mock_env_vars, tmp_path, example_brief, manifest):
+        """Test hero and variant paths are written to existing_assets."""
+        from src.storage import StorageManager
+        from src.manifest import HERO_KIND, VARIANT_KIND
+
+        hero = tmp_path / "hero.png"
+        variant = tmp_path / "variant.png"
+        hero.write_bytes(b"x")
+        variant.write_bytes(b"x")
+
+        manifest.record("TEST-CAMPAIGN-001", "TEST-PROD-001", HERO_KIND, str(hero), "fp")
+        manifest.record("TEST-CAMPAIGN-001", "TEST-PROD-001", VARIANT_KIND, str(variant), "fp",
+                        locale="en-US", aspect_ratio="1:1", format="png")
+
+        brief_path = tmp_path / "brief.json"
+        brief_path.write_text(json.dumps(example_brief))
+
+        storage = StorageManager()
+        storage._manifest = manifest
+        storage.export_manifest_to_brief(str(brief_path), "TEST-CAMPAIGN-001")
+
+        data = json.loads(brief_path.read_text())
+        existing = data["products"][0]["existing_assets"]
+        assert existing["hero"] == str(hero)
+        assert existing["en-US_1:1"] == str(variant)
+
+
+class TestPipelineManifestReuse:
+    """Test the pipeline reuses assets through the manifest."""
+
+    @pytest.mark.asyncio
+    async def test_second_run_reuses_all_assets(self, mock_env_vars, tmp_path, example_brief, fake_image_service, manifest):
+        """Test a repeated run makes no API calls and renders nothing."""
+        from src.pipeline import CreativeAutomationPipeline
+        from src.models import CampaignBrief
+
+        brief_data = dict(example_brief, enable_localization=False)
+        brief = CampaignBrief(**brief_data)
+
+        fake_service = fake_image_service()
+
+        with patch('src.pipeline.ImageGenerationFactory.create', return_value=fake_service):
+            pipeline = CreativeAutomationPipeline()
+            pipeline.storage.output_dir = tmp_path
+            pipeline.storage._manifest = manifest
+
+            first = await pipeline.process_campaign(brief)
+            assert len(fake_service.calls) == 1
+            assert first.total_assets == 4
+
+            with patch.object(pipeline, '_render_variant') as mock_render:
+                second = await pipeline.process_campaign(brief)
+                mock_render.assert_not_called()
+
+            assert len(fake_service.calls) == 1
+            assert second.total_assets == 4
+            assert second.technical_metrics.cache_hits == 1
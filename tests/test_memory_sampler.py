@@ -0,0 +1,88 @@
+"""
+Tests for the background memory sampler.
+"""
+import pytest
+import time
+import tracemalloc
+from unittest.mock import patch
+
+
+class TestMemorySampler:
+    """Test sampling, peaks and timeline thinning."""
+
+    def test_samples_in_background(self, mock_env_vars):
+        """Test the thread records a timeline while the block runs."""
+        from src.memory_sampler import MemorySampler
+
+        with MemorySampler(interval_ms=5) as sampler:
+            time.sleep(0.1)
+
+        timeline = sampler.timeline()
+        assert sampler.sample_count >= 5
+        assert timeline[0]["t_s"] == 0.0
+        assert all(point["rss_mb"] > 0 for point in timeline)
+        assert sampler.peak_rss_mb == max(point["rss_mb"] for point in timeline)
+
+    def test_sees_transient_python_peak(self, mock_env_vars):
+        """Test a buffer freed between samples still shows up in the Python peak."""
+        from src.memory_sampler import MemorySampler
+
+        with MemorySampler(interval_ms=0, trace_python=True) as sampler:
+            transient = bytearray(16 * 1024 * 1024)
+            del transient
+
+        assert sampler.peak_python_mb >= 16
+        assert not tracemalloc.is_tracing()
+
+    def test_overlapping_samplers_share_tracemalloc(self, mock_env_vars):
+        """Test the first sampler to exit leaves tracing on for one still running."""
+        from src.memory_sampler import MemorySampler
+
+        first = MemorySampler(interval_ms=0, trace_python=True).start()
+        second = MemorySampler(interval_ms=0, trace_python=True).start()
+
+        first.stop()
+        assert tracemalloc.is_tracing()
+        assert second.sample().get("python_mb") is not None
+
+        second.stop()
+        assert not tracemalloc.is_tracing()
+
+    def test_timeline_is_thinned(self, mock_env_vars):
+        """Test the stored timeline stays within max_samples as samples accumulate."""
+        from src.memory_sampler import MemorySampler
+
+        sampler = MemorySampler(interval_ms=10, max_samples=8)
+        for _ in range(100):
+            sampler.sample()
+
+        assert len(sampler.timeline()) <= 8
+        assert sampler.timeline_interval_ms > 10
+        assert sampler.sample_count == 100
+
+
+class TestPipelineMemoryTimeline:
+    """Test the campaign report carries the memory timeline."""
+
+    @pytest.mark.asyncio
+    async def test_report_includes_timeline(self, mock_env_vars, monkeypatch, tmp_path, example_brief, fake_image_service):
+        """Test peak_memory_mb covers every timeline sample."""
+        from src.pipeline import CreativeAutomationPipeline
+        from src.models import CampaignBrief
+        from src.manifest import AssetManifest
+        from src import config
+
+        monkeypatch.setenv("MEMORY_SAMPLE_INTERVAL_MS", "5")
+        monkeypatch.setattr(config, "_config", None)
+        brief = CampaignBrief(**dict(example_brief, enable_localization=False))
+
+        with patch('src.pipeline.ImageGenerationFactory.create', return_value=fake_image_service(delay=0.05)):
+            pipeline = CreativeAutomationPipeline()
+            pipeline.storage.output_dir = tmp_path
+            pipeline.storage._manifest = AssetManifest(tmp_path / "manifest.db")
+            output = await pipeline.process_campaign(brief)
+
+        metrics = output.technical_metrics
+        assert len(metrics.memory_timeline) >= 2
+        assert metrics.memory_sample_interval_ms >= 5
+        assert metrics.peak_memory_mb >= max(point["rss_mb"] for point in metrics.memory_timeline)
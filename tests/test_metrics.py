@@ -0,0 +1,167 @@
+"""
+Tests for the Prometheus-style metrics registry and exporters.
+"""
+import pytest
+import aiohttp
+from unittest.mock import patch
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Fresh process-wide registry for each test."""
+    from src import metrics
+
+    monkeypatch.setattr(metrics, "_registry", None)
+    return metrics.get_registry()
+
+
+class TestRegistry:
+    """Test metric families and text exposition."""
+
+    def test_counter_exposition(self):
+        """Test counters render HELP, TYPE and one sample per label set."""
+        from src.metrics import MetricsRegistry
+
+        registry = MetricsRegistry()
+        counter = registry.counter("api_calls_total", "API calls", ("service",))
+        counter.inc(service="firefly")
+        counter.inc(2, service="firefly")
+        counter.inc(service="openai")
+
+        text = registry.render()
+        assert "# HELP api_calls_total API calls" in text
+        assert "# TYPE api_calls_total counter" in text
+        assert 'api_calls_total{service="firefly"} 3' in text
+        assert 'api_calls_total{service="openai"} 1' in text
+
+    def test_counter_rejects_decrease_and_wrong_labels(self):
+        """Test counters only increase and require their declared labels."""
+        from src.metrics import MetricsRegistry
+
+        counter = MetricsRegistry().counter("errors_total", "Errors", ("kind",))
+        with pytest.raises(ValueError):
+            counter.inc(-1, kind="x")
+        with pytest.raises(ValueError):
+            counter.inc(status="500")
+
+    def test_same_name_returns_existing_family(self):
+        """Test re-declaring a metric returns it, and a type clash raises."""
+        from src.metrics import MetricsRegistry
+
+        registry = MetricsRegistry()
+        assert registry.gauge("depth", "Depth") is registry.gauge("depth", "Depth")
+        with pytest.raises(ValueError):
+            registry.counter("depth", "Depth")
+
+    def test_gauge_function(self):
+        """Test callback gauges are read at scrape time."""
+        from src.metrics import MetricsRegistry
+
+        registry = MetricsRegistry()
+        gauge = registry.gauge("in_flight", "In flight")
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+        registry.gauge("memory_bytes", "Memory").set_function(lambda: 2048)
+
+        text = registry.render()
+        assert "in_flight 1" in text
+        assert "memory_bytes 2048" in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets, sum and count."""
+        from src.metrics import MetricsRegistry
+
+        registry = MetricsRegistry()
+        histogram = registry.histogram("render_seconds", "Render", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 3.0):
+            histogram.observe(value)
+
+        text = registry.render()
+        assert 'render_seconds_bucket{le="0.1"} 1' in text
+        assert 'render_seconds_bucket{le="1"} 3' in text
+        assert 'render_seconds_bucket{le="+Inf"} 4' in text
+        assert "render_seconds_sum 4.25" in text
+        assert "render_seconds_count 4" in text
+
+    def test_process_metrics_registered(self, registry):
+        """Test the global registry reports process memory."""
+        assert registry.get("process_resident_memory_bytes").value() > 0
+
+    def test_record_api_response_counts_rate_limits(self, registry):
+        """Test 429 responses are counted separately for alerting."""
+        from src.metrics import record_api_response
+
+        record_api_response("firefly", 200)
+        record_api_response("firefly", 429)
+        record_api_response("firefly", 429)
+
+        assert registry.get("genai_api_responses_total").value(service="firefly", status="200") == 1
+        assert registry.get("genai_rate_limited_total").value(service="firefly") == 2
+
+
+class TestExporters:
+    """Test the HTTP endpoint and textfile exporter."""
+
+    def test_textfile_written_on_stop(self, registry, tmp_path):
+        """Test the textfile exporter writes final values atomically on stop."""
+        from src.metrics import TextfileExporter
+
+        registry.counter("runs_total", "Runs").inc()
+        path = tmp_path / "textfile" / "pipeline.prom"
+        exporter = TextfileExporter(path, interval=60)
+        exporter.start()
+        exporter.stop()
+
+        assert "runs_total 1" in path.read_text()
+        assert list(path.parent.iterdir()) == [path]
+
+    @pytest.mark.asyncio
+    async def test_http_endpoint_serves_metrics(self, registry):
+        """Test /metrics serves the exposition while the exporters run."""
+        from src import metrics
+
+        registry.counter("runs_total", "Runs").inc()
+        server = metrics.MetricsServer(port=0)
+        url = await server.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(url) as response:
+                    body = await response.text()
+                    assert response.status == 200
+                    assert response.headers["Content-Type"].startswith("text/plain")
+        finally:
+            await server.stop()
+
+        assert "runs_total 1" in body
+
+
+class TestPipelineMetrics:
+    """Test the pipeline and local backend report into the registry."""
+
+    @pytest.mark.asyncio
+    async def test_pipeline_reports_metrics(self, registry, mock_env_vars, tmp_path, example_brief):
+        """Test cache, render, API and storage metrics after a campaign."""
+        from src.pipeline import CreativeAutomationPipeline
+        from src.models import CampaignBrief
+        from src.manifest import AssetManifest
+        from src.genai.local_service import LocalImageService
+
+        brief = CampaignBrief(**dict(example_brief, enable_localization=False))
+
+        with patch('src.pipeline.ImageGenerationFactory.create', return_value=LocalImageService(seed=1)):
+            pipeline = CreativeAutomationPipeline()
+            pipeline.storage.output_dir = tmp_path
+            pipeline.storage._manifest = AssetManifest(tmp_path / "manifest.db")
+            output = await pipeline.process_campaign(brief)
+            await pipeline.process_campaign(brief)
+
+        assert registry.get("genai_api_responses_total").value(service="local", status="200") == 1
+        assert registry.get("pipeline_cache_misses_total").value(kind="variant") == output.total_assets
+        assert registry.get("pipeline_cache_hits_total").value(kind="hero") == 1
+        assert registry.get("pipeline_cache_hits_total").value(kind="variant") == output.total_assets
+        assert registry.get("pipeline_render_seconds").count() == output.total_assets
+        assert registry.get("pipeline_renders_in_flight").value() == 0
+        assert registry.get("pipeline_products_pending").value() == 0
+        assert registry.get("pipeline_campaigns_total").value(status="success") == 2
+        assert registry.get("storage_bytes_written_total").value() > 0
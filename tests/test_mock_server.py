@@ -0,0 +1,114 @@
+"""
+Tests for the local mock provider server.
+"""
+import pytest
+
+
+@pytest.fixture
+async def mock_server(mock_env_vars, monkeypatch):
+    """Running mock server with all service URLs pointed at it."""
+    from src.genai.mock_server import MockProviderServer
+    from src import config
+
+    async with MockProviderServer(image_size=(64, 64), seed=1) as server:
+        for name, value in server.env().items():
+            monkeypatch.setenv(name, value)
+        monkeypatch.setattr(config, "_config", None)
+        yield server
+
+
+class TestMockProviderServer:
+    """Test the real service code paths against the mock server."""
+
+    @pytest.mark.asyncio
+    async def test_firefly_generates_and_downloads(self, mock_server):
+        """Test Firefly responses are parsed and image URLs downloaded."""
+        from PIL import Image
+        from io import BytesIO
+        from src.genai.firefly import FireflyImageService
+
+        service = FireflyImageService()
+        candidates = await service.generate_images("mountain lake", 2, size="2048x2048")
+
+        assert len(candidates) == 2
+        assert Image.open(BytesIO(candidates[0].image_bytes)).size == (64, 64)
+        trace = mock_server.requests_for("firefly")[0]
+        assert trace.payload["n"] == 2
+        assert trace.headers["x-api-key"] == "test-firefly-key"
+        assert len(mock_server.requests_for("images")) == 2
+
+    @pytest.mark.asyncio
+    async def test_openai_and_gemini(self, mock_server):
+        """Test OpenAI URL downloads and Gemini base64 decoding."""
+        from src.genai.openai_service import OpenAIImageService
+        from src.genai.gemini_service import GeminiImageService
+
+        openai_image = await OpenAIImageService().generate_image("prompt")
+        gemini_image = await GeminiImageService().generate_image("prompt", size="1024x1792")
+
+        assert openai_image.startswith(b"\x89PNG")
+        assert gemini_image.startswith(b"\x89PNG")
+        assert mock_server.requests_for("gemini")[0].payload["parameters"]["aspectRatio"] == "9:16"
+
+    @pytest.mark.asyncio
+    async def test_claude_localization(self, mock_server):
+        """Test Claude messages responses flow through localize_message."""
+        from src.genai.claude import ClaudeService
+        from src.models import CampaignMessage
+
+        message = CampaignMessage(headline="Hello", subheadline="World", cta="Buy")
+        localized = await ClaudeService().localize_message(message, "es-MX")
+
+        assert localized.headline == "[es-MX] Hello"
+        assert localized.cta == "[es-MX] Buy"
+
+    @pytest.mark.asyncio
+    async def test_injected_throttle_is_retried(self, mock_server):
+        """Test an injected 429 goes through the service retry loop."""
+        from src.genai.openai_service import OpenAIImageService
+
+        mock_server.inject("openai", status=429)
+
+        image = await OpenAIImageService(max_retries=2).generate_image("prompt")
+
+        assert image.startswith(b"\x89PNG")
+        assert [t.status for t in mock_server.requests_for("openai")] == [429, 200]
+
+    @pytest.mark.asyncio
+    async def test_short_batch_response_raises(self, mock_server):
+        """Test a response with fewer images than requested fails clearly."""
+        from src.genai.firefly import FireflyImageService
+        from src.genai.openai_service import OpenAIImageService
+        from src.genai.gemini_service import GeminiImageService
+
+        mock_server.inject("firefly", dropped_images=1)
+        mock_server.inject("openai", dropped_images=1)
+        mock_server.inject("gemini", dropped_images=2)
+
+        with pytest.raises(Exception, match="returned 1 of 2 requested images"):
+            await FireflyImageService(max_retries=1).generate_images("prompt", 2)
+        with pytest.raises(Exception, match="returned 0 of 1 requested images"):
+            await OpenAIImageService(max_retries=1).generate_image("prompt")
+        with pytest.raises(Exception, match="returned 2 of 4 requested images"):
+            await GeminiImageService(max_retries=1).generate_images("prompt", 4)
+
+    @pytest.mark.asyncio
+    async def test_failure_rate_and_latency(self, mock_server):
+        """Test steady-state failures and latency are applied and traced."""
+        from src.genai.gemini_service import GeminiImageService
+
+        mock_server.configure("gemini", error_rate=1.0, latency_ms=20)
+
+        with pytest.raises(Exception, match="500"):
+            await GeminiImageService(max_retries=1).generate_image("prompt")
+
+        trace = mock_server.requests_for("gemini")[0]
+        assert trace.status == 500
+        assert trace.duration_ms >= 20
+
+    def test_unknown_provider_rejected(self):
+        """Test scripting an unknown provider raises."""
+        from src.genai.mock_server import MockProviderServer
+
+        with pytest.raises(ValueError):
+            MockProviderServer().inject("midjourney", status=500)
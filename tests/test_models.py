@@ -241,7 +241,7 @@ class TestCampaignBrief:
         from src.models import CampaignBrief, CampaignMessage, Product
 
         # Valid backends
-        valid_backends = ["firefly", "openai", "dall-e", "dalle", "gemini", "imagen", "claude"]
+        valid_backends = ["firefly", "openai", "dall-e", "dalle", "gemini", "imagen", "claude", "local", "synthetic"]
 
         for backend in valid_backends:
             brief = CampaignBrief(
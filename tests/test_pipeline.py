@@ -6,6 +6,10 @@ from unittest.mock import patch, AsyncMock
 import json
 
 
+# Keep reports and the asset manifest out of the repository's ./output
+pytestmark = pytest.mark.usefixtures("isolated_output")
+
+
 class TestCreativeAutomationPipeline:
     """Test main pipeline orchestrator."""
 
@@ -258,6 +262,32 @@ class TestCreativeAutomationPipeline:
                 assert len(output.errors) > 0 or output.success_rate < 1.0
 
 
+    @pytest.mark.asyncio
+    async def test_cancelled_campaign_removes_partial_report(self, mock_env_vars, tmp_path, example_brief, fake_image_service):
+        """Test a campaign cancelled mid-run leaves no temporary report behind."""
+        import asyncio
+        from src.pipeline import CreativeAutomationPipeline
+        from src.models import CampaignBrief
+        from src.manifest import AssetManifest
+
+        brief = CampaignBrief(**dict(example_brief, enable_localization=False))
+        service = fake_image_service(delay=5)
+
+        with patch('src.pipeline.ImageGenerationFactory.create', return_value=service):
+            pipeline = CreativeAutomationPipeline()
+            pipeline.storage.output_dir = tmp_path
+            pipeline.storage._manifest = AssetManifest(tmp_path / "manifest.db")
+
+            task = asyncio.create_task(pipeline.process_campaign(brief))
+            while not service.calls:
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        assert not list((tmp_path / "campaign_reports").glob("*"))
+
+
 class TestPipelineIntegration:
     """End-to-end integration tests."""
 
@@ -302,3 +332,90 @@ class TestPipelineIntegration:
                 assert output.campaign_name == brief.campaign_name
                 assert output.processing_time_seconds > 0
                 assert 0 <= output.success_rate <= 1
+
+
+class TestPipelineFailover:
+    """Test failover configuration in the pipeline."""
+
+    @pytest.mark.asyncio
+    async def test_assets_record_serving_backend(self, mock_env_vars, monkeypatch, tmp_path, example_brief, fake_image_service):
+        """Test generation_method names the backend that actually served the hero."""
+        from src.pipeline import CreativeAutomationPipeline
+        from src.models import CampaignBrief
+        from src.manifest import AssetManifest
+        from src.genai import failover
+        from src import config
+
+        monkeypatch.setenv("FALLBACK_IMAGE_BACKENDS", "gemini")
+        monkeypatch.setattr(config, "_config", None)
+        monkeypatch.setattr(failover, "_circuit_breakers", {})
+
+        services = {
+            "firefly": fake_image_service("firefly", fail=True),
+            "gemini": fake_image_service("gemini"),
+        }
+
+        brief = CampaignBrief(**dict(example_brief, enable_localization=False))
+
+        with patch('src.genai.factory.ImageGenerationFactory.create', side_effect=lambda name, **kwargs: services[name]):
+            pipeline = CreativeAutomationPipeline()
+            pipeline.storage.output_dir = tmp_path
+            pipeline.storage._manifest = AssetManifest(tmp_path / "manifest.db")
+
+            output = await pipeline.process_campaign(brief)
+
+        assert output.total_assets == 4
+        assert {asset.generation_method for asset in output.generated_assets} == {"gemini"}
+        assert output.technical_metrics.retry_count == 1
+
+
+class TestPipelineHedging:
+    """Test hedging state across campaigns."""
+
+    @pytest.mark.asyncio
+    async def test_hedger_is_kept_across_campaigns(self, mock_env_vars, monkeypatch, tmp_path, example_brief, fake_image_service):
+        """Test a pipeline reuses one hedger, so its latency history and budget span campaigns."""
+        from src.pipeline import CreativeAutomationPipeline
+        from src.models import CampaignBrief
+        from src.manifest import AssetManifest
+        from src import config
+
+        monkeypatch.setenv("HEDGE_ENABLED", "true")
+        monkeypatch.setattr(config, "_config", None)
+
+        with patch('src.pipeline.ImageGenerationFactory.create', return_value=fake_image_service()) as create:
+            pipeline = CreativeAutomationPipeline()
+            pipeline.storage.output_dir = tmp_path
+            pipeline.storage._manifest = AssetManifest(tmp_path / "manifest.db")
+
+            for campaign_id in ("HEDGE-1", "HEDGE-2"):
+                brief = CampaignBrief(**dict(example_brief, campaign_id=campaign_id, enable_localization=False))
+                output = await pipeline.process_campaign(brief)
+                assert output.technical_metrics.hedged_requests == 0
+
+        assert create.call_count == 1
+        (_, _, hedger), = pipeline.image_services.values()
+        assert hedger.request_count >= 1
+
+
+class TestPipelineLocalBackend:
+    """Test running the pipeline end-to-end without network access."""
+
+    @pytest.mark.asyncio
+    async def test_local_backend_end_to_end(self, mock_env_vars, tmp_path, example_brief):
+        """Test a campaign completes on the local backend with no HTTP calls."""
+        from src.pipeline import CreativeAutomationPipeline
+        from src.models import CampaignBrief
+        from src.manifest import AssetManifest
+
+        brief = CampaignBrief(**dict(example_brief, enable_localization=False, image_generation_backend="local"))
+
+        with patch('aiohttp.ClientSession.post', side_effect=AssertionError("network used")):
+            pipeline = CreativeAutomationPipeline()
+            pipeline.storage.output_dir = tmp_path
+            pipeline.storage._manifest = AssetManifest(tmp_path / "manifest.db")
+
+            output = await pipeline.process_campaign(brief)
+
+        assert output.total_assets == 4
+        assert output.technical_metrics.backend_used == "local"
@@ -0,0 +1,194 @@
+"""
+Tests for pre-flight campaign planning.
+"""
+import pytest
+import json
+from unittest.mock import patch
+
+
+def make_planner(tmp_path, manifest, **kwargs):
+    from src.planner import CampaignPlanner, LatencyModel
+
+    planner = CampaignPlanner(latency=kwargs.pop("latency", LatencyModel()), **kwargs)
+    planner.storage.output_dir = tmp_path
+    planner.storage._manifest = manifest
+    return planner
+
+
+class TestCampaignPlanner:
+    """Test resolving the work a brief would do."""
+
+    @pytest.mark.asyncio
+    async def test_fresh_brief_needs_everything(self, mock_env_vars, example_brief, tmp_path):
+        """Test a brief with nothing to reuse plans one hero call and every variant."""
+        from src.manifest import AssetManifest
+        from src.models import CampaignBrief
+
+        planner = make_planner(tmp_path, AssetManifest(tmp_path / "manifest.db"))
+        plan = await planner.plan(CampaignBrief(**example_brief))
+
+        assert plan.hero_calls == {"firefly": 1}
+        assert plan.claude_calls == {}
+        assert plan.renders == 4
+        assert plan.reused_assets == 0
+        assert plan.estimated_cost_usd == pytest.approx(0.04)
+        assert plan.worst_case_cost_usd == plan.estimated_cost_usd
+        assert [task.action for task in plan.tasks].count("encode") == 4
+        assert plan.latency_sources["hero_generation.firefly"] == "default"
+        # Hero -> render -> encode -> save
+        assert [step["task"].split(":")[0] for step in plan.critical_path] == ["hero", "render", "encode", "save"]
+        assert plan.estimated_duration_seconds > 15
+
+    @pytest.mark.asyncio
+    async def test_plan_after_run_reuses_everything(
+        self, mock_env_vars, example_brief, fake_image_service, tmp_path
+    ):
+        """Test planning a brief that already ran finds its hero and variants in the manifest."""
+        from src.manifest import AssetManifest
+        from src.models import CampaignBrief
+        from src.pipeline import CreativeAutomationPipeline
+
+        brief = CampaignBrief(**example_brief)
+        manifest = AssetManifest(tmp_path / "manifest.db")
+        with patch('src.pipeline.ImageGenerationFactory.create', return_value=fake_image_service()):
+            pipeline = CreativeAutomationPipeline()
+            pipeline.storage.output_dir = tmp_path
+            pipeline.storage._manifest = manifest
+            await pipeline.process_campaign(brief)
+
+        plan = await make_planner(tmp_path, manifest).plan(brief)
+        assert plan.hero_calls == {}
+        assert plan.renders == 0
+        assert plan.reused_assets == 4
+        assert plan.assumed_reuse == 0
+        assert plan.estimated_cost_usd == 0
+
+        # Another backend would generate a new hero, but the variants are keyed on the hero's inputs
+        plan = await make_planner(tmp_path, manifest, image_backend="openai").plan(brief)
+        assert plan.hero_calls == {"openai": 1}
+        assert plan.renders == 4
+
+    @pytest.mark.asyncio
+    async def test_unparsed_brand_guidelines_assume_reuse(
+        self, mock_env_vars, example_brief, fake_image_service, tmp_path
+    ):
+        """Test reuse that depends on Claude-extracted guidelines is reported as assumed."""
+        from src.manifest import AssetManifest
+        from src.models import CampaignBrief, ComprehensiveBrandGuidelines
+        from src.pipeline import CreativeAutomationPipeline
+
+        guide = tmp_path / "brand.md"
+        guide.write_text("Primary color: #123456\n")
+        brief = CampaignBrief(**dict(example_brief, brand_guidelines_file=str(guide)))
+        manifest = AssetManifest(tmp_path / "manifest.db")
+        guidelines = ComprehensiveBrandGuidelines(source_file=str(guide))
+        with patch('src.pipeline.ImageGenerationFactory.create', return_value=fake_image_service()), \
+                patch('src.parsers.brand_parser.BrandGuidelinesParser.parse', return_value=guidelines):
+            pipeline = CreativeAutomationPipeline()
+            pipeline.storage.output_dir = tmp_path
+            pipeline.storage._manifest = manifest
+            await pipeline.process_campaign(brief)
+
+        plan = await make_planner(tmp_path, manifest).plan(brief)
+        assert plan.claude_calls == {"guidelines": 1}
+        assert plan.reused_assets == plan.assumed_reuse == 4
+        assert plan.hero_calls == {}
+        assert plan.worst_case_cost_usd == pytest.approx(plan.estimated_cost_usd + 0.04)
+        assert any("--parse-guidelines" in warning for warning in plan.warnings)
+
+        with patch('src.parsers.brand_parser.BrandGuidelinesParser.parse', return_value=guidelines):
+            exact = await make_planner(tmp_path, manifest, parse_guidelines=True).plan(brief)
+        assert exact.reused_assets == 4
+        assert exact.assumed_reuse == 0
+        assert exact.worst_case_cost_usd == exact.estimated_cost_usd
+
+    @pytest.mark.asyncio
+    async def test_localization_planned_once_per_locale(self, mock_env_vars, example_brief, tmp_path):
+        """Test structured localization rules are read offline and each locale is localized once."""
+        from src.manifest import AssetManifest
+        from src.models import CampaignBrief
+
+        rules = tmp_path / "localization.yaml"
+        rules.write_text("source_file: localization.yaml\n")
+        brief = CampaignBrief(**dict(example_brief, localization_guidelines_file=str(rules)))
+
+        plan = await make_planner(tmp_path, AssetManifest(tmp_path / "manifest.db")).plan(brief)
+        assert plan.claude_calls == {"localization": 1}
+        localize = [task for task in plan.tasks if task.action == "localize"]
+        assert [task.name for task in localize] == ["localize:es-MX"]
+        assert plan.cost_breakdown == {"firefly": 0.04, "claude": 0.01}
+
+
+class TestPlanEstimates:
+    """Test latency history, scheduling simulation and pricing."""
+
+    def test_latency_from_history_merges_backend_aliases(self):
+        """Test recorded heroes are used for their backend and its aliases, defaults otherwise."""
+        from src.histograms import OperationHistograms
+        from src.planner import LatencyModel
+
+        histograms = OperationHistograms()
+        for value in (1000, 2000, 3000):
+            histograms.observe("hero_generation.dalle", value)
+
+        latency = LatencyModel(histograms)
+        p50, p90 = latency.estimate("hero_generation.openai")
+        assert 1900 < p50 < 2100
+        assert p90 >= p50
+        assert latency.sources["hero_generation.openai"] == "history (3 samples)"
+        assert latency.estimate("hero_generation.firefly") == (15000.0, 15000.0)
+        assert latency.estimate("hero_generation.synthetic") == (200.0, 200.0)
+
+    def test_simulation_respects_resource_limits(self):
+        """Test ready tasks queue for their resource in insertion order."""
+        from src.models import PlannedTask
+        from src.planner import simulate_schedule
+
+        tasks = [
+            PlannedTask(name="hero", action="generate", resource="image_api"),
+            PlannedTask(name="render:a", action="render", resource="cpu", deps=["hero"]),
+            PlannedTask(name="render:b", action="render", resource="cpu", deps=["hero"]),
+            PlannedTask(name="save:a", action="save", resource="disk", deps=["render:a"]),
+        ]
+        durations = {"hero": 100, "render:a": 50, "render:b": 50, "save:a": 10}
+
+        schedule = simulate_schedule(tasks, durations, {"cpu": 1})
+        assert schedule["render:a"] == (100, 150)
+        assert schedule["render:b"] == (150, 200)
+        assert schedule["save:a"] == (150, 160)
+
+        assert simulate_schedule(tasks, durations, {"cpu": 2})["render:b"] == (100, 150)
+
+    def test_image_api_costs_from_config(self, mock_env_vars, monkeypatch):
+        """Test IMAGE_API_COSTS parses into per-backend prices."""
+        from src.config import reload_config
+
+        monkeypatch.setenv("IMAGE_API_COSTS", "firefly=0.05, openai = 0.12,,local=0")
+        assert reload_config().IMAGE_API_COSTS == {"firefly": 0.05, "openai": 0.12, "local": 0.0}
+
+        monkeypatch.delenv("IMAGE_API_COSTS")
+        reload_config()
+
+
+class TestPlanCommand:
+    """Test the plan CLI command."""
+
+    def test_plan_json(self, mock_env_vars, example_brief, tmp_path, monkeypatch):
+        """Test --json prints only the plan, priced for the chosen backend."""
+        from click.testing import CliRunner
+        from src.cli import cli
+        from src.config import reload_config
+
+        monkeypatch.setenv("OUTPUT_DIR", str(tmp_path / "output"))
+        reload_config()
+        brief_path = tmp_path / "brief.json"
+        brief_path.write_text(json.dumps(example_brief))
+
+        result = CliRunner().invoke(cli, ["plan", "--brief", str(brief_path), "--backend", "openai", "--json"])
+        monkeypatch.delenv("OUTPUT_DIR")
+        reload_config()
+
+        assert result.exit_code == 0, result.output
+        plan = json.loads(result.stdout)
+        assert plan["hero_calls"] == {"openai": 1}
+        assert plan["estimated_cost_usd"] == pytest.approx(0.08)
@@ -0,0 +1,74 @@
+"""
+Tests for campaign profiling.
+"""
+import pytest
+import json
+import pstats
+import tracemalloc
+from unittest.mock import patch, AsyncMock
+from click.testing import CliRunner
+
+
+def _busy_work():
+    return sorted(str(i) for i in range(20000))
+
+
+class TestCampaignProfiler:
+    """Test CPU and memory profiling artifacts."""
+
+    def test_cpu_profile_writes_pstats_and_summary(self, tmp_path):
+        """Test cProfile output is a loadable .pstats plus a text summary."""
+        from src.profiling import CampaignProfiler
+
+        with CampaignProfiler("cpu", tmp_path, "C1", top=5) as profiler:
+            _busy_work()
+
+        stats_path, summary_path = profiler.artifacts
+        assert stats_path.suffix == ".pstats"
+        assert pstats.Stats(str(stats_path)).total_calls > 0
+        assert "_busy_work" in summary_path.read_text()
+
+    def test_memory_profile_reports_peak_and_sites(self, tmp_path):
+        """Test tracemalloc reports the transient peak and allocation sites."""
+        from src.profiling import CampaignProfiler
+
+        with CampaignProfiler("memory", tmp_path, "C1", top=5) as profiler:
+            transient = bytearray(8 * 1024 * 1024)
+            del transient
+
+        assert profiler.peak_bytes >= 8 * 1024 * 1024
+        assert not tracemalloc.is_tracing()
+        snapshot_path, summary_path = profiler.artifacts
+        assert tracemalloc.Snapshot.load(str(snapshot_path)) is not None
+        assert "Peak traced memory" in summary_path.read_text()
+
+    def test_unknown_mode_rejected(self, tmp_path):
+        """Test unsupported profile modes raise."""
+        from src.profiling import CampaignProfiler
+
+        with pytest.raises(ValueError):
+            CampaignProfiler("gpu", tmp_path, "C1")
+
+
+class TestProfileOption:
+    """Test the process command's --profile option."""
+
+    def test_process_with_cpu_profile(self, mock_env_vars, monkeypatch, tmp_path, example_brief):
+        """Test --profile cpu writes artifacts into the campaign reports directory."""
+        from src.cli import cli
+        from src.models import CampaignOutput
+        from src import config
+
+        monkeypatch.setenv("OUTPUT_DIR", str(tmp_path / "output"))
+        monkeypatch.setattr(config, "_config", None)
+        brief_path = tmp_path / "brief.json"
+        brief_path.write_text(json.dumps(example_brief))
+
+        output = CampaignOutput(campaign_id="TEST-CAMPAIGN-001", campaign_name="Test")
+        with patch('src.pipeline.CreativeAutomationPipeline.process_campaign', new=AsyncMock(return_value=output)):
+            result = CliRunner().invoke(cli, ['process', '--brief', str(brief_path), '--profile', 'cpu'])
+
+        assert result.exit_code == 0, result.output
+        reports_dir = tmp_path / "output" / "campaign_reports"
+        assert len(list(reports_dir.glob("profile_cpu_TEST-CAMPAIGN-001_*.pstats"))) == 1
+        assert len(list(reports_dir.glob("profile_cpu_TEST-CAMPAIGN-001_*.txt"))) == 1
@@ -0,0 +1,488 @@
+"""
+Tests for the dependency-graph task scheduler.
+"""
+import pytest
+import asyncio
+import time
+from unittest.mock import patch
+
+
+class TestDagScheduler:
+    """Test running task graphs."""
+
+    @pytest.mark.asyncio
+    async def test_runs_in_dependency_order(self):
+        """Test a node starts only after all of its dependencies finished."""
+        from src.scheduler import DagScheduler, TaskGraph, DONE
+
+        order = []
+
+        def step(name):
+            async def run():
+                order.append(name)
+                await asyncio.sleep(0.01 if name == "b" else 0)
+                return name.upper()
+            return run
+
+        graph = TaskGraph()
+        graph.add("a", step("a"))
+        graph.add("b", step("b"), deps=["a"])
+        graph.add("c", step("c"), deps=["a"])
+        graph.add("d", step("d"), deps=["b", "c"])
+
+        await DagScheduler().run(graph)
+
+        assert order[0] == "a"
+        assert order[-1] == "d"
+        assert all(node.status == DONE for node in graph)
+        assert graph.result("d") == "D"
+
+    def test_unknown_or_duplicate_dependency_rejected(self):
+        """Test the graph refuses forward references (keeping it acyclic) and duplicates."""
+        from src.scheduler import TaskGraph
+
+        graph = TaskGraph()
+        graph.add("a", lambda: None)
+        with pytest.raises(ValueError):
+            graph.add("b", lambda: None, deps=["missing"])
+        with pytest.raises(ValueError):
+            graph.add("a", lambda: None)
+
+    @pytest.mark.asyncio
+    async def test_resource_limits(self):
+        """Test no more nodes of a resource run at once than its limit."""
+        from src.scheduler import DagScheduler, TaskGraph
+
+        active = {"api": 0, "disk": 0}
+        peak = {"api": 0, "disk": 0}
+
+        def step(resource):
+            async def run():
+                active[resource] += 1
+                peak[resource] = max(peak[resource], active[resource])
+                await asyncio.sleep(0.01)
+                active[resource] -= 1
+            return run
+
+        graph = TaskGraph()
+        for i in range(6):
+            graph.add(f"api:{i}", step("api"), resource="api")
+            graph.add(f"disk:{i}", step("disk"), resource="disk")
+
+        await DagScheduler(limits={"api": 2, "disk": 1}).run(graph)
+
+        assert peak == {"api": 2, "disk": 1}
+        assert max(graph[f"api:{i}"].wait_ms for i in range(6)) > 0
+
+    @pytest.mark.asyncio
+    async def test_thread_nodes_use_thread_runner(self):
+        """Test blocking nodes go through the thread runner, off the event loop."""
+        import threading
+        from src.scheduler import DagScheduler, TaskGraph, THREAD
+
+        graph = TaskGraph()
+        graph.add("cpu", lambda: threading.get_ident(), executor=THREAD)
+
+        await DagScheduler().run(graph)
+
+        assert graph.result("cpu") != threading.get_ident()
+
+    @pytest.mark.asyncio
+    async def test_failure_skips_dependents(self):
+        """Test dependents of a failed node are skipped unless they always run."""
+        from src.scheduler import DagScheduler, TaskGraph, DONE, FAILED, SKIPPED
+
+        async def boom():
+            raise RuntimeError("hero failed")
+
+        async def ok():
+            return "ok"
+
+        graph = TaskGraph()
+        graph.add("hero", boom)
+        graph.add("render", ok, deps=["hero"])
+        graph.add("save", ok, deps=["render"])
+        graph.add("other", ok)
+        graph.add("report", ok, deps=["save", "other"], always_run=True)
+
+        await DagScheduler().run(graph)
+
+        assert graph["hero"].status == FAILED
+        assert graph["render"].status == SKIPPED
+        assert graph["save"].status == SKIPPED
+        assert str(graph["save"].error) == "hero failed"
+        assert graph["other"].status == DONE
+        assert graph["report"].status == DONE
+        assert graph.failures() == [graph["hero"]]
+
+    @pytest.mark.asyncio
+    async def test_nodes_added_while_running(self):
+        """Test a planning node can expand the graph mid-run."""
+        from src.scheduler import DagScheduler, TaskGraph
+
+        graph = TaskGraph()
+
+        async def leaf():
+            return "leaf"
+
+        async def plan():
+            graph.add("expanded", leaf, deps=["plan"])
+
+        graph.add("plan", plan)
+        await DagScheduler().run(graph)
+
+        assert graph.result("expanded") == "leaf"
+
+    @pytest.mark.asyncio
+    async def test_reserve_waits_outside_the_resource_slot(self):
+        """Test a node waiting on its reservation doesn't hold the slot the releasing node needs."""
+        from contextlib import asynccontextmanager
+        from src.scheduler import DagScheduler, TaskGraph, DONE
+
+        graph = TaskGraph()
+        released = asyncio.Event()
+        exited = []
+
+        @asynccontextmanager
+        async def reserve(node):
+            if node.name == "waits":
+                await released.wait()
+            try:
+                yield
+            finally:
+                exited.append(node.name)
+
+        async def waits():
+            return "waited"
+
+        async def releases():
+            released.set()
+
+        graph.add("waits", waits, resource="cpu")
+        graph.add("releases", releases, resource="cpu")
+        await asyncio.wait_for(DagScheduler(limits={"cpu": 1}, reserve=reserve).run(graph), 5)
+
+        assert graph["waits"].status == DONE
+        assert sorted(exited) == ["releases", "waits"]
+
+    @pytest.mark.asyncio
+    async def test_intermediate_results_released(self):
+        """Test results marked retain=False are dropped once consumed."""
+        from src.scheduler import DagScheduler, TaskGraph
+
+        graph = TaskGraph()
+
+        async def image():
+            return b"pixels"
+
+        async def encode():
+            return len(graph.result("render"))
+
+        graph.add("render", image, retain=False)
+        graph.add("encode", encode, deps=["render"])
+        await DagScheduler().run(graph)
+
+        assert graph.result("render") is None
+        assert graph.result("encode") == 6
+
+
+class TestPriorityArbiter:
+    """Test sharing resource slots between campaigns by priority."""
+
+    async def _grant_order(self, arbiter, requests, resource="image_api"):
+        """Hold the only slot, queue ``requests`` behind it, then record the grant order."""
+        order = []
+        release = asyncio.Event()
+
+        async def holder():
+            async with arbiter.slot(resource, "holder"):
+                await release.wait()
+
+        async def request(campaign, level, deadline=None, priority_class="normal"):
+            async with arbiter.slot(resource, campaign, level, deadline, priority_class):
+                order.append(campaign)
+
+        held = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(request(*args)) for args in requests]
+        await asyncio.sleep(0.02)
+        release.set()
+        await asyncio.gather(held, *waiters)
+        return order
+
+    @pytest.mark.asyncio
+    async def test_higher_priority_served_first(self):
+        """Test an urgent request overtakes earlier normal and low ones."""
+        from src.scheduler import PriorityArbiter
+
+        arbiter = PriorityArbiter({"image_api": 1}, aging_seconds=3600)
+        order = await self._grant_order(arbiter, [("evergreen", 0), ("refresh", 1), ("launch", 3)])
+
+        assert order == ["launch", "refresh", "evergreen"]
+
+    @pytest.mark.asyncio
+    async def test_aging_prevents_starvation(self):
+        """Test a long-waiting low-priority request beats a fresh high-priority one."""
+        from src.scheduler import PriorityArbiter
+
+        arbiter = PriorityArbiter({"image_api": 1}, aging_seconds=0.005)
+        order = []
+        release = asyncio.Event()
+
+        async def holder():
+            async with arbiter.slot("image_api", "holder"):
+                await release.wait()
+
+        async def request(campaign, level):
+            async with arbiter.slot("image_api", campaign, level):
+                order.append(campaign)
+
+        held = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        old = asyncio.create_task(request("evergreen", 0))
+        await asyncio.sleep(0.05)  # ~10 levels of aging
+        fresh = asyncio.create_task(request("launch", 3))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(held, old, fresh)
+
+        assert order == ["evergreen", "launch"]
+
+    @pytest.mark.asyncio
+    async def test_deadline_boost_and_tie_break(self):
+        """Test a due deadline lifts a request, and earlier deadlines win ties."""
+        from src.scheduler import PriorityArbiter
+
+        arbiter = PriorityArbiter({"image_api": 1}, aging_seconds=3600, deadline_horizon_seconds=60)
+        now = time.time()
+        order = await self._grant_order(arbiter, [
+            ("high", 2),
+            ("due-now", 1, now - 1),
+            ("later", 1, now + 3600),
+            ("sooner", 1, now + 3000),
+        ])
+
+        assert order == ["due-now", "high", "sooner", "later"]
+
+    @pytest.mark.asyncio
+    async def test_fair_share_caps_one_campaign(self):
+        """Test a high-priority campaign cannot take every slot while another waits."""
+        from src.scheduler import PriorityArbiter
+
+        arbiter = PriorityArbiter({"cpu": 4}, aging_seconds=3600, fair_share=0.5)
+        release = asyncio.Event()
+        holder_release = asyncio.Event()
+        granted = []
+
+        async def work(campaign, level):
+            async with arbiter.slot("cpu", campaign, level):
+                granted.append(campaign)
+                await release.wait()
+
+        async def holder():
+            async with arbiter.slot("cpu", "holder"):
+                await holder_release.wait()
+
+        # With both campaigns waiting, the urgent one is held to half the slots
+        holders = [asyncio.create_task(holder()) for _ in range(4)]
+        await asyncio.sleep(0)
+        tasks = [asyncio.create_task(work("launch", 3)) for _ in range(4)]
+        tasks += [asyncio.create_task(work("refresh", 0)) for _ in range(2)]
+        await asyncio.sleep(0)
+        holder_release.set()
+        await asyncio.sleep(0.01)
+
+        assert sorted(granted) == ["launch", "launch", "refresh", "refresh"]
+        release.set()
+        await asyncio.gather(*holders, *tasks)
+        assert arbiter.in_use("cpu") == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        """Test cancelling a queued request frees nothing it never held."""
+        from src.scheduler import PriorityArbiter
+
+        arbiter = PriorityArbiter({"image_api": 1})
+        release = asyncio.Event()
+
+        async def holder():
+            async with arbiter.slot("image_api", "a"):
+                await release.wait()
+
+        async def waiter():
+            async with arbiter.slot("image_api", "b"):
+                pass
+
+        held = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(waiter())
+        await asyncio.sleep(0)
+        assert arbiter.waiting("image_api") == 1
+
+        queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
+        assert arbiter.waiting("image_api") == 0
+
+        release.set()
+        await held
+        assert arbiter.in_use("image_api") == 0
+
+    @pytest.mark.asyncio
+    async def test_wait_summary_per_priority_class(self):
+        """Test waits are reported per priority class; unknown resources pass through."""
+        from src.scheduler import PriorityArbiter
+
+        arbiter = PriorityArbiter({"image_api": 1}, aging_seconds=3600)
+        await self._grant_order(arbiter, [("a", 0, None, "low"), ("b", 3, None, "urgent")])
+
+        async with arbiter.slot("disk", "a") as waited:
+            assert waited == 0.0
+
+        summary = arbiter.wait_summary()
+        assert set(summary) == {"low", "normal", "urgent"}
+        assert summary["low"]["count"] == 1
+        assert summary["low"]["max_ms"] >= summary["urgent"]["max_ms"] >= 10
+
+
+class TestAgingPriorityQueue:
+    """Test the priority job queue."""
+
+    @pytest.mark.asyncio
+    async def test_orders_by_priority_then_arrival(self):
+        """Test get() returns the highest priority first and FIFO within a level."""
+        from src.scheduler import AgingPriorityQueue
+
+        queue = AgingPriorityQueue(maxsize=3, key=lambda item: (item[1], None), aging_seconds=3600)
+        queue.put_nowait(("first-normal", 1))
+        queue.put_nowait(("urgent", 3))
+        queue.put_nowait(("second-normal", 1))
+        with pytest.raises(asyncio.QueueFull):
+            queue.put_nowait(("overflow", 0))
+
+        assert [(await queue.get())[0] for _ in range(3)] == ["urgent", "first-normal", "second-normal"]
+
+
+class TestCriticalPath:
+    """Test critical path extraction."""
+
+    @pytest.mark.asyncio
+    async def test_follows_slowest_chain(self):
+        """Test the path walks back through the dependency that finished last."""
+        from src.scheduler import DagScheduler, TaskGraph, critical_path, critical_path_summary, format_critical_path
+
+        def sleep(seconds):
+            async def run():
+                await asyncio.sleep(seconds)
+            return run
+
+        graph = TaskGraph()
+        graph.add("guidelines", sleep(0.01))
+        graph.add("hero:fast", sleep(0.01), deps=["guidelines"])
+        graph.add("hero:slow", sleep(0.05), deps=["guidelines"])
+        graph.add("render:fast", sleep(0.01), deps=["hero:fast"])
+        graph.add("render:slow", sleep(0.01), deps=["hero:slow"])
+        graph.add("report", sleep(0), deps=["render:fast", "render:slow"])
+
+        await DagScheduler().run(graph)
+
+        assert [node.name for node in critical_path(graph)] == ["guidelines", "hero:slow", "render:slow", "report"]
+        steps = critical_path_summary(graph)
+        assert steps[0]["start_ms"] == 0
+        assert steps[1]["duration_ms"] >= 40
+        text = format_critical_path(steps)
+        assert "hero:slow" in text
+        assert "over 4 task(s)" in text
+
+    def test_empty_graph(self):
+        """Test a graph that never ran has no critical path."""
+        from src.scheduler import TaskGraph, critical_path, format_critical_path
+
+        assert critical_path(TaskGraph()) == []
+        assert "no tasks" in format_critical_path([])
+
+
+class TestPipelineGraph:
+    """Test the campaign pipeline running on the scheduler."""
+
+    @pytest.mark.asyncio
+    async def test_campaign_reports_critical_path(self, mock_env_vars, example_brief, fake_image_service, tmp_path):
+        """Test a campaign produces every asset in brief order and records its critical path."""
+        from src.pipeline import CreativeAutomationPipeline
+        from src.models import CampaignBrief
+        from src.manifest import AssetManifest
+
+        brief = CampaignBrief(**dict(example_brief, enable_localization=False))
+        fake_service = fake_image_service(delay=0.02)
+
+        with patch('src.pipeline.ImageGenerationFactory.create', return_value=fake_service):
+            pipeline = CreativeAutomationPipeline()
+            pipeline.storage.output_dir = tmp_path
+            pipeline.storage._manifest = AssetManifest(tmp_path / "manifest.db")
+            output = await pipeline.process_campaign(brief)
+
+        assert output.total_assets == 4
+        assert [(a.locale, a.aspect_ratio) for a in output.generated_assets] == [
+            ("en-US", "1:1"), ("en-US", "9:16"), ("es-MX", "1:1"), ("es-MX", "9:16")
+        ]
+        path = [step["task"] for step in output.technical_metrics.critical_path]
+        assert path[0] == "plan"
+        assert path[1] == "hero:TEST-PROD-001"
+        assert path[-1] == "product:TEST-PROD-001"
+        assert any(task.startswith("save:") for task in path)
+
+    @pytest.mark.asyncio
+    async def test_failed_hero_fails_only_its_product(self, mock_env_vars, example_brief, fake_image_service, tmp_path):
+        """Test a hero failure skips that product's variants while other products complete."""
+        from src.pipeline import CreativeAutomationPipeline
+        from src.models import CampaignBrief
+        from src.manifest import AssetManifest
+
+        second = dict(example_brief["products"][0], product_id="TEST-PROD-002", product_name="Second Product")
+        brief = CampaignBrief(**dict(
+            example_brief,
+            enable_localization=False,
+            products=[example_brief["products"][0], dict(second, generation_prompt="broken")]
+        ))
+
+        class PartlyFailingService(fake_image_service):
+            async def generate_image(self, prompt, *args, **kwargs):
+                if prompt == "broken":
+                    raise RuntimeError("backend exploded")
+                return await super().generate_image(prompt, *args, **kwargs)
+
+        with patch('src.pipeline.ImageGenerationFactory.create', return_value=PartlyFailingService()):
+            pipeline = CreativeAutomationPipeline()
+            pipeline.storage.output_dir = tmp_path
+            pipeline.storage._manifest = AssetManifest(tmp_path / "manifest.db")
+            output = await pipeline.process_campaign(brief)
+
+        assert output.total_assets == 4
+        assert {a.product_id for a in output.generated_assets} == {"TEST-PROD-001"}
+        assert output.errors == ["Error processing product TEST-PROD-002: backend exploded"]
+        assert output.technical_metrics.full_error_traces[0]["product_id"] == "TEST-PROD-002"
+
+    @pytest.mark.asyncio
+    async def test_batch_admits_urgent_brief_first(self, mock_env_vars, example_brief, fake_image_service, tmp_path):
+        """Test an urgent brief listed last starts before queued normal ones and waits are reported."""
+        import json
+        from src.batch import BatchProcessor
+        from src.manifest import AssetManifest
+
+        paths = []
+        for i, priority in enumerate(["normal", "normal", "urgent"]):
+            brief = dict(example_brief, campaign_id=f"PRIO-{i}", enable_localization=False, priority=priority)
+            brief["products"] = [dict(example_brief["products"][0], generation_prompt=f"prompt {i}")]
+            path = tmp_path / f"brief_{i}.json"
+            path.write_text(json.dumps(brief))
+            paths.append(path)
+
+        with patch('src.pipeline.ImageGenerationFactory.create', return_value=fake_image_service(delay=0.05)):
+            processor = BatchProcessor(concurrency=1, render_workers=1)
+            processor.storage.output_dir = tmp_path / "output"
+            processor.storage._manifest = AssetManifest(tmp_path / "manifest.db")
+            report = await processor.run(paths)
+
+        waits = {r.campaign_id: r.admission_wait_seconds for r in report.briefs}
+        assert waits["PRIO-2"] < waits["PRIO-1"]
+        assert [r.priority for r in report.briefs] == ["normal", "normal", "urgent"]
+        assert set(report.queue_wait_by_priority) >= {"normal", "urgent"}
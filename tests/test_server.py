@@ -0,0 +1,189 @@
+"""
+Tests for the pipeline server job API.
+"""
+import pytest
+import asyncio
+from unittest.mock import patch
+
+
+@pytest.fixture
+async def server_client(mock_env_vars, tmp_path):
+    """Start a PipelineServer (offline local backend) behind an aiohttp test client."""
+    from aiohttp.test_utils import TestClient, TestServer
+    from src.server import PipelineServer
+    from src.manifest import AssetManifest
+
+    server = PipelineServer(image_backend="local", workers=1, queue_size=2)
+    server.storage.output_dir = tmp_path
+    server.storage._manifest = AssetManifest(tmp_path / "manifest.db")
+    await server.start_workers()
+    client = TestClient(TestServer(server.app))
+    await client.start_server()
+    try:
+        yield server, client
+    finally:
+        await client.close()
+        await server.stop()
+
+
+async def _wait_finished(client, job_id, timeout=30):
+    for _ in range(int(timeout / 0.05)):
+        status = await (await client.get(f"/jobs/{job_id}")).json()
+        if status["status"] not in ("queued", "running"):
+            return status
+        await asyncio.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+class TestJobApi:
+    """Test submitting, tracking and fetching jobs."""
+
+    @pytest.mark.asyncio
+    async def test_submit_and_fetch_assets(self, server_client, example_brief):
+        """Test a submitted brief runs to completion and its assets can be downloaded."""
+        server, client = server_client
+        brief = dict(example_brief, enable_localization=False)
+
+        response = await client.post("/jobs", json=brief)
+        assert response.status == 202
+        job = await response.json()
+        assert response.headers["Location"] == f"/jobs/{job['job_id']}"
+
+        status = await _wait_finished(client, job["job_id"])
+        assert status["status"] == "succeeded"
+        assert status["assets_completed"] == status["expected_assets"] == 4
+        assert status["products_completed"] == 1
+
+        assets = (await (await client.get(f"/jobs/{job['job_id']}/assets")).json())["assets"]
+        assert len(assets) == 4
+        download = await client.get(assets[0]["url"])
+        assert download.status == 200
+        assert (await download.read())[:8] == b"\x89PNG\r\n\x1a\n"
+
+    @pytest.mark.asyncio
+    async def test_event_stream_replays_progress(self, server_client, example_brief):
+        """Test the SSE stream delivers progress events through job completion."""
+        server, client = server_client
+        job = await (await client.post("/jobs", json=dict(example_brief, enable_localization=False))).json()
+
+        response = await client.get(f"/jobs/{job['job_id']}/events")
+        assert response.headers["Content-Type"] == "text/event-stream"
+        body = (await response.read()).decode()
+
+        events = [line.split(": ", 1)[1] for line in body.splitlines() if line.startswith("event: ")]
+        assert events[0] == "job_queued"
+        assert events[-1] == "job_succeeded"
+        assert events.count("asset_completed") == 4
+        assert "campaign_started" in events
+
+        # Reconnecting after the last event returns only the end of the stream
+        last_id = [line for line in body.splitlines() if line.startswith("id: ")][-2].split(": ")[1]
+        resumed = await client.get(f"/jobs/{job['job_id']}/events", headers={"Last-Event-ID": last_id})
+        assert (await resumed.read()).decode().count("event: ") == 1
+
+        # An unparseable ID replays the whole stream instead of failing
+        replayed = await client.get(f"/jobs/{job['job_id']}/events", headers={"Last-Event-ID": "abc"})
+        assert replayed.status == 200
+        assert (await replayed.read()).decode().count("event: ") == len(events)
+
+    @pytest.mark.asyncio
+    async def test_invalid_brief_rejected(self, server_client):
+        """Test an invalid brief gets a 400 with validation details."""
+        server, client = server_client
+
+        response = await client.post("/jobs", json={"campaign_id": "X"})
+
+        assert response.status == 400
+        assert (await response.json())["details"]
+
+    @pytest.mark.asyncio
+    async def test_unknown_job_is_404(self, server_client):
+        """Test status and asset lookups for unknown jobs return 404."""
+        server, client = server_client
+
+        assert (await client.get("/jobs/missing")).status == 404
+        assert (await client.get("/jobs/missing/assets/0")).status == 404
+
+    @pytest.mark.asyncio
+    async def test_health_and_metrics(self, server_client):
+        """Test the health and Prometheus endpoints."""
+        server, client = server_client
+
+        health = await (await client.get("/healthz")).json()
+        assert health["status"] == "ok"
+        assert health["queue_size"] == 2
+
+        exposition = await (await client.get("/metrics")).text()
+        assert "# TYPE server_jobs_queued gauge" in exposition
+
+
+class TestBackpressure:
+    """Test the bounded job queue."""
+
+    @pytest.mark.asyncio
+    async def test_full_queue_returns_503(self, mock_env_vars, tmp_path, example_brief):
+        """Test submissions beyond the queue size are rejected with Retry-After."""
+        from aiohttp.test_utils import TestClient, TestServer
+        from src.server import PipelineServer
+
+        server = PipelineServer(workers=1, queue_size=1)
+        server.storage.output_dir = tmp_path
+        brief = dict(example_brief, enable_localization=False)
+
+        # Workers not started: nothing drains the queue
+        async with TestClient(TestServer(server.app)) as client:
+            assert (await client.post("/jobs", json=brief)).status == 202
+            rejected = await client.post("/jobs", json=brief)
+
+            assert rejected.status == 503
+            assert rejected.headers["Retry-After"]
+
+        await server.stop()
+        assert all(job.status.status == "cancelled" for job in server.jobs.values())
+
+    @pytest.mark.asyncio
+    async def test_failed_campaign_marks_job_failed(self, mock_env_vars, tmp_path, example_brief):
+        """Test an exception escaping the pipeline fails the job without stopping the worker."""
+        from src.server import PipelineServer
+        from src.models import CampaignBrief
+
+        server = PipelineServer(workers=1, queue_size=2)
+        with patch('src.pipeline.CreativeAutomationPipeline.process_campaign', side_effect=RuntimeError("boom")):
+            await server.start_workers()
+            job = server.submit(CampaignBrief(**example_brief))
+            await asyncio.wait_for(server.queue.join(), 5)
+
+        assert job.status.status == "failed"
+        assert "boom" in job.status.errors[0]
+        assert job.events[-1]["event"] == "job_failed"
+        await server.stop()
+
+
+class TestWarmCaches:
+    """Test state kept warm between jobs."""
+
+    @pytest.mark.asyncio
+    async def test_translation_cache_localizes_once(self, mock_env_vars, tmp_path, example_brief):
+        """Test the same message and locale are localized once across campaigns."""
+        from src.pipeline import CreativeAutomationPipeline
+        from src.models import CampaignBrief, CampaignMessage, LocalizationGuidelines
+        from src.manifest import AssetManifest
+
+        calls = []
+
+        async def localize(message, locale, guidelines):
+            calls.append(locale)
+            return CampaignMessage(**dict(message.model_dump(), locale=locale))
+
+        pipeline = CreativeAutomationPipeline()
+        pipeline.storage.output_dir = tmp_path
+        pipeline.storage._manifest = AssetManifest(tmp_path / "manifest.db")
+        guidelines = LocalizationGuidelines(source_file="rules.yaml")
+        message = CampaignBrief(**example_brief).campaign_message
+
+        with patch.object(pipeline.claude_service, "localize_message", side_effect=localize):
+            first = await asyncio.gather(*[pipeline._localize(message, "es-MX", guidelines) for _ in range(3)])
+            second = await pipeline._localize(message, "es-MX", guidelines)
+
+        assert calls == ["es-MX"]
+        assert first[0] is second
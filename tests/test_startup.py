@@ -0,0 +1,100 @@
+"""
+Cold-start budgets for CLI subcommands.
+
+Each command runs in a fresh interpreter so import costs are real. The
+heavy-module checks are the strict guard; the time budgets are generous
+enough for slow CI machines and catch gross regressions.
+"""
+import pytest
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that only campaign processing should load
+HEAVY_MODULES = [
+    "aiohttp", "fitz", "docx", "PIL", "psutil", "yaml",
+    "src.pipeline", "src.genai.claude", "src.genai.firefly", "src.parsers.brand_parser",
+]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from src.cli import cli
+try:
+    cli.main(sys.argv[1:], standalone_mode=False)
+except BaseException:
+    pass
+elapsed_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({"elapsed_ms": elapsed_ms, "modules": sorted(sys.modules)}))
+"""
+
+
+def run_cold(*args, tmp_path):
+    """Run a CLI command in a fresh interpreter; return elapsed ms and loaded modules."""
+    env = {
+        "PATH": "",
+        "PYTHONPATH": str(REPO_ROOT),
+        "PYTHONDONTWRITEBYTECODE": "1",
+        "OUTPUT_DIR": str(tmp_path / "output"),
+        "TEMP_DIR": str(tmp_path / "temp"),
+        "DEFAULT_IMAGE_BACKEND": "local",
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, *args],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=60
+    )
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    return data["elapsed_ms"], set(data["modules"])
+
+
+class TestColdStart:
+    """Test lightweight commands stay fast and skip heavy imports."""
+
+    @pytest.mark.parametrize("args,budget_ms", [
+        (["validate-config"], 1000),
+        (["list-examples"], 1000),
+        (["new-campaign", "--help"], 1000),
+        (["process", "--brief", "examples/campaign_brief.json", "--dry-run"], 2000),
+    ])
+    def test_command_cold_start(self, tmp_path, args, budget_ms):
+        """Test the command loads no heavy modules and finishes within budget."""
+        elapsed_ms, modules = run_cold(*args, tmp_path=tmp_path)
+
+        assert not modules & set(HEAVY_MODULES), f"{args[0]} imported {sorted(modules & set(HEAVY_MODULES))}"
+        assert elapsed_ms < budget_ms, f"{args[0]} took {elapsed_ms:.0f}ms (budget {budget_ms}ms)"
+
+    def test_backend_registry_is_lazy(self, tmp_path):
+        """Test listing backends doesn't import any backend module."""
+        probe = (
+            "import json, sys\n"
+            "from src.genai.factory import ImageGenerationFactory\n"
+            "names = ImageGenerationFactory.list_backends()\n"
+            "print(json.dumps(sorted(sys.modules)))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", probe],
+            cwd=REPO_ROOT, env={"PATH": "", "PYTHONPATH": str(REPO_ROOT)},
+            capture_output=True, text=True, timeout=60
+        )
+        modules = set(json.loads(result.stdout.strip().splitlines()[-1]))
+
+        assert "src.genai.firefly" not in modules
+        assert "aiohttp" not in modules
+
+
+class TestLazyRegistry:
+    """Test the lazy backend registry behaves like the old dict."""
+
+    def test_registry_resolves_classes(self):
+        """Test lookups import and cache the backend class."""
+        from src.genai.factory import ImageGenerationFactory
+        from src.genai.local_service import LocalImageService
+
+        assert "local" in ImageGenerationFactory.BACKENDS
+        assert ImageGenerationFactory.BACKENDS["local"] is LocalImageService
+        assert ImageGenerationFactory.BACKENDS["synthetic"] is LocalImageService
+        assert dict(ImageGenerationFactory.BACKENDS)["local"] is LocalImageService
@@ -8,6 +8,10 @@ from PIL import Image
 import io
 
 
+# Keep reports and the asset manifest out of the repository's ./output
+pytestmark = pytest.mark.usefixtures("isolated_output")
+
+
 class TestStorageManager:
     """Test StorageManager class."""
 
@@ -70,6 +74,20 @@ class TestStorageManager:
         assert path.exists()
         assert path.stat().st_size > 0
 
+    def test_encode_image_by_extension(self, mock_env_vars):
+        """Test images are encoded in the format implied by the extension."""
+        from src.storage import StorageManager
+        from io import BytesIO
+
+        storage = StorageManager()
+        img = Image.new('RGB', (50, 50), color='blue')
+
+        assert Image.open(BytesIO(storage.encode_image(img, ".jpg"))).format == "JPEG"
+        assert Image.open(BytesIO(storage.encode_image(img, "png"))).format == "PNG"
+
+        with pytest.raises(ValueError):
+            storage.encode_image(img, ".xyz")
+
     def test_save_report(self, mock_env_vars, tmp_path, monkeypatch):
         """Test saving campaign report."""
         from src.storage import StorageManager
@@ -206,3 +224,92 @@ class TestStorageIntegration:
         # Verify all files exist
         for asset in assets:
             assert Path(asset.file_path).exists()
+
+
+class TestCampaignReportWriter:
+    """Test the streaming JSONL campaign report."""
+
+    def _write_report(self, tmp_path, products=("P1", "P2"), locales=("en-US", "es-MX")):
+        from src.storage import CampaignReportWriter
+        from src.models import CampaignOutput, GeneratedAsset
+
+        writer = CampaignReportWriter(tmp_path / "campaign_report_TEST.jsonl")
+        assets = []
+        for product in products:
+            for locale in locales:
+                asset = GeneratedAsset(
+                    product_id=product,
+                    locale=locale,
+                    aspect_ratio="1:1",
+                    file_path=f"/tmp/{product}_{locale}.png",
+                    generation_method="firefly"
+                )
+                writer.write_asset(asset)
+                assets.append(asset)
+
+        output = CampaignOutput(
+            campaign_id="TEST",
+            campaign_name="Test Campaign",
+            generated_assets=assets,
+            total_assets=len(assets),
+            products_processed=list(products)
+        )
+        return writer.finalize(output)
+
+    def test_one_record_per_asset_plus_summary(self, tmp_path):
+        """Test the report holds one asset line each and a final summary."""
+        report_path = self._write_report(tmp_path)
+
+        lines = [json.loads(line) for line in report_path.read_text().splitlines()]
+
+        assert [line["record_type"] for line in lines] == ["asset"] * 4 + ["summary"]
+        assert "generated_assets" not in lines[-1]
+        assert lines[-1]["total_assets"] == 4
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_concurrent_writers_and_abort(self, tmp_path):
+        """Test two writers for one report don't share a temp file and abort removes it."""
+        from src.storage import CampaignReportWriter
+
+        first = CampaignReportWriter(tmp_path / "campaign_report_TEST.jsonl")
+        second = CampaignReportWriter(tmp_path / "campaign_report_TEST.jsonl")
+        assert len(list(tmp_path.glob("*.tmp"))) == 2
+
+        first.abort()
+        second.abort()
+
+        assert not list(tmp_path.iterdir())
+
+    def test_read_report_summary(self, tmp_path):
+        """Test reading only the summary record."""
+        from src.storage import read_report_summary
+
+        report_path = self._write_report(tmp_path)
+        summary = read_report_summary(report_path)
+
+        assert summary["campaign_id"] == "TEST"
+        assert set(summary["product_index"]) == {"P1", "P2"}
+
+    def test_read_product_report(self, tmp_path):
+        """Test per-product views are derived from the offset index."""
+        from src.storage import read_product_report
+
+        report_path = self._write_report(tmp_path)
+        view = read_product_report(report_path, "P2")
+
+        assert view["products_processed"] == ["P2"]
+        assert view["total_assets"] == 2
+        assert {asset["locale"] for asset in view["generated_assets"]} == {"en-US", "es-MX"}
+        assert all(asset["product_id"] == "P2" for asset in view["generated_assets"])
+
+    def test_open_report_writer_path(self, mock_env_vars, tmp_path):
+        """Test the consolidated report lands in campaign_reports/."""
+        from src.storage import StorageManager
+
+        storage = StorageManager()
+        storage.output_dir = tmp_path
+        writer = storage.open_report_writer("TEST")
+
+        assert writer.report_path.parent == tmp_path / "campaign_reports"
+        assert writer.report_path.name.startswith("campaign_report_TEST_")
+        assert writer.report_path.suffix == ".jsonl"
@@ -0,0 +1,180 @@
+"""
+Tests for the tracing layer.
+"""
+import pytest
+import json
+import asyncio
+from unittest.mock import patch
+
+
+class TestSpans:
+    """Test span nesting and lifecycle."""
+
+    def test_spans_are_noops_without_trace(self):
+        """Test spans outside a trace record nothing."""
+        from src import tracing
+
+        with tracing.span("render") as span:
+            span.set_attribute("ratio", "1:1")
+
+        assert tracing.current_span() is span
+
+    def test_nested_spans_record_parents(self):
+        """Test child spans point at the enclosing span."""
+        from src import tracing
+
+        with tracing.trace("campaign", campaign_id="C1") as tracer:
+            with tracing.span("product", product_id="P1"):
+                with tracing.span("render", ratio="1:1"):
+                    pass
+
+        spans = {span.name: span for span in tracer.spans}
+        assert spans["render"].parent is spans["product"]
+        assert spans["product"].parent is spans["campaign"]
+        assert spans["campaign"].parent is None
+        assert spans["render"].attributes == {"ratio": "1:1"}
+
+    def test_exception_marks_span_error(self):
+        """Test a raising block marks its span as failed."""
+        from src import tracing
+
+        with tracing.trace("campaign") as tracer:
+            with pytest.raises(ValueError):
+                with tracing.span("hero"):
+                    raise ValueError("boom")
+
+        hero = next(span for span in tracer.spans if span.name == "hero")
+        assert hero.status == "error"
+        assert "boom" in hero.attributes["error"]
+
+    def test_end_closes_unfinished_children(self):
+        """Test ending a parent closes children left open by an early exit."""
+        from src import tracing
+
+        with tracing.trace("campaign") as tracer:
+            product = tracing.start_span("product")
+            tracing.start_span("hero")
+            product.end()
+            assert tracing.current_span().name == "campaign"
+
+        hero = next(span for span in tracer.spans if span.name == "hero")
+        assert hero.status == "unfinished"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_tasks_get_separate_lanes(self):
+        """Test overlapping async spans land on separate Chrome trace rows."""
+        from src import tracing
+
+        async def work(name):
+            with tracing.span(name):
+                await asyncio.sleep(0.01)
+
+        with tracing.trace("campaign") as tracer:
+            await asyncio.gather(work("a"), work("b"))
+
+        events = {event["name"]: event for event in tracer.to_chrome()["traceEvents"]}
+        assert events["a"]["tid"] != events["b"]["tid"]
+
+
+class TestTraceExport:
+    """Test trace file formats."""
+
+    def test_chrome_export(self, tmp_path):
+        """Test Chrome trace-event JSON has complete events in microseconds."""
+        from src import tracing
+
+        with tracing.trace("campaign", campaign_id="C1") as tracer:
+            with tracing.span("save", bytes=10):
+                pass
+
+        path = tracer.export(tmp_path / "trace.json", "chrome")
+        data = json.loads(path.read_text())
+
+        events = {event["name"]: event for event in data["traceEvents"]}
+        assert events["save"]["ph"] == "X"
+        assert events["save"]["args"]["bytes"] == 10
+        assert events["campaign"]["dur"] >= events["save"]["dur"]
+
+    def test_otlp_export(self, tmp_path):
+        """Test OTLP JSON links spans by trace and parent span IDs."""
+        from src import tracing
+
+        with tracing.trace("campaign") as tracer:
+            with tracing.span("encode", format="PNG", bytes=42):
+                pass
+
+        data = json.loads(tracer.export(tmp_path / "trace.json", "otlp").read_text())
+        spans = {s["name"]: s for s in data["resourceSpans"][0]["scopeSpans"][0]["spans"]}
+
+        assert spans["encode"]["parentSpanId"] == spans["campaign"]["spanId"]
+        assert spans["encode"]["traceId"] == spans["campaign"]["traceId"]
+        assert {"key": "bytes", "value": {"intValue": "42"}} in spans["encode"]["attributes"]
+
+    def test_unknown_format_rejected(self, tmp_path):
+        """Test exporting an unsupported format raises."""
+        from src.tracing import Tracer
+
+        with pytest.raises(ValueError):
+            Tracer().export(tmp_path / "trace.json", "zipkin")
+
+
+class TestPipelineTracing:
+    """Test the pipeline emits a campaign trace when enabled."""
+
+    @pytest.mark.asyncio
+    async def test_pipeline_writes_trace(self, mock_env_vars, monkeypatch, tmp_path, example_brief, fake_image_service):
+        """Test campaign, product, hero, render, encode and save spans are exported."""
+        from src.pipeline import CreativeAutomationPipeline
+        from src.models import CampaignBrief
+        from src.manifest import AssetManifest
+        from src import config
+
+        monkeypatch.setenv("TRACE_ENABLED", "true")
+        monkeypatch.setenv("TRACE_DIR", str(tmp_path / "traces"))
+        monkeypatch.setattr(config, "_config", None)
+
+        brief = CampaignBrief(**dict(example_brief, enable_localization=False))
+
+        with patch('src.pipeline.ImageGenerationFactory.create', return_value=fake_image_service()):
+            pipeline = CreativeAutomationPipeline()
+            pipeline.storage.output_dir = tmp_path
+            pipeline.storage._manifest = AssetManifest(tmp_path / "manifest.db")
+            output = await pipeline.process_campaign(brief)
+
+        trace_files = list((tmp_path / "traces").glob("trace_TEST-CAMPAIGN-001_*.json"))
+        assert len(trace_files) == 1
+
+        events = json.loads(trace_files[0].read_text())["traceEvents"]
+        names = [event["name"] for event in events]
+        assert names.count("campaign") == 1
+        assert names.count("product") == 1
+        assert names.count("render") == output.total_assets
+        assert names.count("encode") == names.count("save") == output.total_assets
+        hero = next(event for event in events if event["name"] == "hero")
+        assert hero["args"]["source"] == "generated"
+
+    @pytest.mark.asyncio
+    async def test_bad_trace_format_does_not_fail_campaign(self, mock_env_vars, monkeypatch, tmp_path, example_brief, fake_image_service):
+        """Test an unknown TRACE_FORMAT is logged at export and the campaign still returns its output."""
+        from src.pipeline import CreativeAutomationPipeline
+        from src.models import CampaignBrief
+        from src.manifest import AssetManifest
+        from src import config
+
+        monkeypatch.setenv("TRACE_ENABLED", "true")
+        monkeypatch.setenv("TRACE_FORMAT", "jaeger")
+        monkeypatch.setenv("TRACE_DIR", str(tmp_path / "traces"))
+        monkeypatch.setattr(config, "_config", None)
+
+        brief = CampaignBrief(**dict(example_brief, enable_localization=False))
+
+        with patch('src.pipeline.ImageGenerationFactory.create', return_value=fake_image_service()):
+            pipeline = CreativeAutomationPipeline()
+            pipeline.storage.output_dir = tmp_path
+            pipeline.storage._manifest = AssetManifest(tmp_path / "manifest.db")
+            output = await pipeline.process_campaign(brief)
+
+        assert output.total_assets == 4
+        assert not list(tmp_path.glob("traces/*"))
+        is_valid, errors = config.get_config().validate()
+        assert any("TRACE_FORMAT" in error for error in errors)
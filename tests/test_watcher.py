@@ -0,0 +1,242 @@
+"""
+Tests for watch-folder mode.
+"""
+import pytest
+import asyncio
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+
+class FakeProcessor:
+    """Records the briefs of each run and reports them all as successful."""
+
+    def __init__(self, status="success"):
+        self.status = status
+        self.runs = []
+
+    async def run(self, brief_paths):
+        from src.models import BatchBriefResult, BatchReport
+
+        self.runs.append([Path(path).name for path in brief_paths])
+        results = [
+            BatchBriefResult(brief_path=str(path), campaign_id=Path(path).stem, status=self.status, total_assets=1)
+            for path in brief_paths
+        ]
+        return BatchReport(batch_id="test", concurrency=1, total_briefs=len(results), briefs=results)
+
+
+def write_brief(directory: Path, name: str, example_brief: dict, **overrides) -> Path:
+    path = directory / f"{name}.json"
+    path.write_text(json.dumps(dict(example_brief, campaign_id=name, **overrides)))
+    return path
+
+
+async def wait_for(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.02)
+
+
+class TestBriefWatcher:
+    """Test deciding which briefs are due."""
+
+    @pytest.mark.asyncio
+    async def test_processes_new_briefs_once(self, mock_env_vars, tmp_path, example_brief):
+        """Test new briefs run once and unchanged briefs never run again, across restarts."""
+        from src.watcher import BriefWatcher
+
+        briefs = tmp_path / "briefs"
+        briefs.mkdir()
+        write_brief(briefs, "spring", example_brief)
+        write_brief(briefs, "summer", example_brief)
+        (briefs / "notes.json").write_text(json.dumps({"locales": ["en-US"]}))  # Not a brief
+        state_path = tmp_path / "state.json"
+
+        processor = FakeProcessor()
+        watcher = BriefWatcher(briefs, processor=processor, state_path=state_path)
+        await watcher.run_once()
+        assert processor.runs == [["spring.json", "summer.json"]]
+        assert await watcher.run_once() is None
+
+        restarted = BriefWatcher(briefs, processor=processor, state_path=state_path)
+        assert restarted.due() == []
+        assert restarted.state.briefs[str((briefs / "spring.json").resolve())]["status"] == "success"
+
+    def test_changed_brief_and_guideline_are_due(self, mock_env_vars, tmp_path, example_brief):
+        """Test editing a brief, or a guideline file it references, makes only that brief due."""
+        from src.watcher import BriefWatcher
+
+        briefs = tmp_path / "briefs"
+        briefs.mkdir()
+        guidelines = tmp_path / "guidelines"
+        guidelines.mkdir()
+        rules = guidelines / "localization.yaml"
+        rules.write_text("tone: friendly\n")
+        spring = write_brief(briefs, "spring", example_brief, localization_guidelines_file=str(rules))
+        summer = write_brief(briefs, "summer", example_brief)
+
+        watcher = BriefWatcher(briefs, processor=FakeProcessor(), state_path=tmp_path / "state.json")
+        asyncio.run(watcher.process(watcher.due()))
+        assert watcher.due() == []
+
+        rules.write_text("tone: formal\n")
+        assert watcher.affected([rules]) == {spring.resolve()}
+        assert watcher.due(watcher.affected([rules])) == [spring.resolve()]
+
+        write_brief(briefs, "summer", example_brief, priority="high")
+        assert watcher.due() == [spring.resolve(), summer.resolve()]
+
+    def test_touch_without_change_is_not_due(self, mock_env_vars, tmp_path, example_brief):
+        """Test a rewrite with identical content (new mtime) does not re-run the brief."""
+        from src.watcher import BriefWatcher
+
+        brief = write_brief(tmp_path, "spring", example_brief)
+        watcher = BriefWatcher(tmp_path, processor=FakeProcessor(), state_path=tmp_path / "state" / "watch.json")
+        asyncio.run(watcher.process(watcher.due()))
+
+        brief.write_text(brief.read_text())
+        assert watcher.due() == []
+
+    def test_failed_brief_retried_on_start_only(self, mock_env_vars, tmp_path, example_brief):
+        """Test a failed brief is retried at startup but not on unrelated events."""
+        from src.watcher import BriefWatcher
+
+        write_brief(tmp_path, "spring", example_brief)
+        watcher = BriefWatcher(tmp_path, processor=FakeProcessor(status="failed"), state_path=tmp_path / "s" / "w.json")
+        asyncio.run(watcher.process(watcher.due()))
+
+        assert watcher.due() == []
+        assert len(watcher.due(retry_failed=True)) == 1
+
+    def test_removed_brief_is_forgotten(self, mock_env_vars, tmp_path, example_brief):
+        """Test deleting a brief drops it from the state."""
+        from src.watcher import BriefWatcher
+
+        brief = write_brief(tmp_path, "spring", example_brief)
+        watcher = BriefWatcher(tmp_path, processor=FakeProcessor(), state_path=tmp_path / "s" / "w.json")
+        asyncio.run(watcher.process(watcher.due()))
+
+        brief.unlink()
+        assert watcher.due(watcher.affected([brief])) == []
+        assert watcher.state.briefs == {}
+
+
+class TestChangeDetection:
+    """Test the inotify and polling watchers and debouncing."""
+
+    @pytest.mark.asyncio
+    async def test_debounce_collects_a_burst(self):
+        """Test events arriving close together come back as one batch."""
+        from src.watcher import debounce
+
+        events = asyncio.Queue()
+
+        async def burst():
+            for name in ("a.json", "b.json", "a.json"):
+                events.put_nowait(Path(name))
+                await asyncio.sleep(0.01)
+
+        producer = asyncio.create_task(burst())
+        changed = await debounce(events, quiet=0.1, max_delay=5)
+        await producer
+        assert changed == {Path("a.json"), Path("b.json")}
+
+    @pytest.mark.asyncio
+    async def test_polling_watcher_reports_changes(self, tmp_path):
+        """Test created, modified and deleted files are reported by polling."""
+        from src.watcher import PollingWatcher
+
+        existing = tmp_path / "existing.json"
+        existing.write_text("{}")
+        watcher = PollingWatcher(interval=0.02).start()
+        watcher.watch(tmp_path)
+        try:
+            (tmp_path / "new.json").write_text("{}")
+            existing.unlink()
+            seen = set()
+            await wait_for(lambda: seen.update(_drain(watcher.events)) or len(seen) >= 2)
+            assert {p.name for p in seen} == {"new.json", "existing.json"}
+        finally:
+            watcher.close()
+
+    @pytest.mark.asyncio
+    async def test_inotify_watcher_reports_writes(self, tmp_path):
+        """Test a file written into a watched directory is reported via inotify."""
+        from src.watcher import InotifyWatcher, inotify_available
+
+        if not inotify_available():
+            pytest.skip("inotify not available")
+        watcher = InotifyWatcher().start()
+        watcher.watch(tmp_path)
+        try:
+            (tmp_path / "brief.json").write_text("{}")
+            seen = set()
+            await wait_for(lambda: seen.update(_drain(watcher.events)) or bool(seen))
+            assert (tmp_path / "brief.json").resolve() in seen
+        finally:
+            watcher.close()
+
+    @pytest.mark.asyncio
+    async def test_watch_loop_processes_dropped_brief(self, mock_env_vars, tmp_path, example_brief):
+        """Test the watch loop picks up a brief dropped after it started."""
+        from src.watcher import BriefWatcher
+
+        briefs = tmp_path / "briefs"
+        briefs.mkdir()
+        processor = FakeProcessor()
+        watcher = BriefWatcher(
+            briefs, processor=processor, state_path=tmp_path / "state.json",
+            debounce_seconds=0.05, mode="poll", poll_interval=0.02
+        )
+        stop = asyncio.Event()
+        loop = asyncio.create_task(watcher.run(stop))
+        await asyncio.sleep(0.05)
+
+        write_brief(briefs, "spring", example_brief)
+        await wait_for(lambda: processor.runs)
+        stop.set()
+        await asyncio.wait_for(loop, 5)
+
+        assert processor.runs == [["spring.json"]]
+
+
+class TestIncrementalRerun:
+    """Test re-runs reuse unchanged work."""
+
+    @pytest.mark.asyncio
+    async def test_edited_brief_reuses_hero(self, mock_env_vars, tmp_path, example_brief, fake_image_service):
+        """Test editing a brief's message re-renders its variants without regenerating the hero."""
+        from src.batch import BatchProcessor
+        from src.manifest import AssetManifest
+        from src.watcher import BriefWatcher
+
+        briefs = tmp_path / "briefs"
+        briefs.mkdir()
+        brief = dict(example_brief, enable_localization=False)
+        write_brief(briefs, "spring", brief)
+        service = fake_image_service()
+
+        with patch('src.pipeline.ImageGenerationFactory.create', return_value=service):
+            processor = BatchProcessor(concurrency=1, render_workers=2, update_brief=False)
+            processor.storage.output_dir = tmp_path / "output"
+            processor.storage._manifest = AssetManifest(tmp_path / "manifest.db")
+            watcher = BriefWatcher(briefs, processor=processor, state_path=tmp_path / "state.json")
+
+            first = await watcher.run_once()
+            assert await watcher.run_once() is None
+
+            message = dict(brief["campaign_message"], headline="Now 20% off")
+            write_brief(briefs, "spring", brief, campaign_message=message)
+            second = await watcher.run_once()
+
+        assert first.total_assets == second.total_assets == 4
+        assert len(service.calls) == 1
+
+
+def _drain(queue):
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
@@ -0,0 +1,266 @@
+"""
+Tests for the durable work queue and distributed campaign execution.
+"""
+import pytest
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+
+# Keep reports and the asset manifest out of the repository's ./output
+pytestmark = pytest.mark.usefixtures("isolated_output")
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _task(task_id, depends_on=()):
+    return {"task_id": task_id, "kind": "test", "payload": {"n": task_id}, "depends_on": list(depends_on)}
+
+
+class TestWorkQueue:
+    """Test leasing, dependencies and retries."""
+
+    def test_claim_respects_dependencies(self, tmp_path):
+        """Test a task is only claimable once its dependencies are done."""
+        from src.work_queue import WorkQueue
+
+        queue = WorkQueue(tmp_path / "queue.db")
+        queue.add_run("r1", "C1", {}, [_task("a"), _task("b", ["a"])])
+
+        first = queue.claim("w1", 30)
+        assert first["task_id"] == "a"
+        assert queue.claim("w2", 30) is None
+
+        assert queue.complete("a", "w1", {"ok": True})
+        second = queue.claim("w2", 30)
+        assert second["task_id"] == "b"
+        assert queue.get_task("a")["result"] == {"ok": True}
+
+    def test_expired_lease_is_reclaimed_and_fenced(self, tmp_path):
+        """Test an expired lease is taken over and the old owner can no longer complete."""
+        from src.work_queue import WorkQueue
+
+        queue = WorkQueue(tmp_path / "queue.db")
+        queue.add_run("r1", "C1", {}, [_task("a")])
+
+        queue.claim("w1", 0.01)
+        time.sleep(0.02)
+        taken = queue.claim("w2", 30)
+
+        assert taken["task_id"] == "a"
+        assert taken["attempts"] == 2
+        assert not queue.complete("a", "w1", {"stale": True})
+        assert not queue.extend_lease("a", "w1", 30)
+        assert queue.complete("a", "w2", {"fresh": True})
+        assert queue.get_task("a")["result"] == {"fresh": True}
+
+    def test_retry_backoff_then_cascade_failure(self, tmp_path):
+        """Test failures retry after backoff, then fail the task and its dependents."""
+        from src.work_queue import WorkQueue
+
+        queue = WorkQueue(tmp_path / "queue.db", retry_backoff_seconds=0.05)
+        queue.add_run("r1", "C1", {}, [_task("a"), _task("b", ["a"])], max_attempts=2)
+
+        queue.claim("w1", 30)
+        assert queue.fail("a", "w1", "boom")
+        assert queue.claim("w1", 30) is None  # Backing off
+
+        time.sleep(0.06)
+        assert queue.claim("w1", 30)["attempts"] == 2
+        queue.fail("a", "w1", "boom again")
+
+        assert queue.get_task("a")["status"] == "failed"
+        assert queue.get_task("b")["status"] == "failed"
+        assert queue.get_task("b")["error"] == "Dependency a failed"
+        assert queue.counts("r1") == {"pending": 0, "leased": 0, "done": 0, "failed": 2}
+
+    def test_fail_without_retry(self, tmp_path):
+        """Test non-retryable failures fail on the first attempt."""
+        from src.work_queue import WorkQueue
+
+        queue = WorkQueue(tmp_path / "queue.db")
+        queue.add_run("r1", "C1", {}, [_task("a")], max_attempts=3)
+
+        queue.claim("w1", 30)
+        queue.fail("a", "w1", "compliance", retry=False)
+
+        assert queue.get_task("a")["status"] == "failed"
+
+
+class TestPlanTasks:
+    """Test campaign decomposition."""
+
+    def test_plan_links_renders_to_hero_and_localization(self, example_brief):
+        """Test each render waits on its product's hero and its locale's localization."""
+        from src.distributed import plan_tasks
+        from src.models import CampaignBrief
+
+        brief = CampaignBrief(**dict(example_brief, localization_guidelines_file="rules.yaml"))
+        tasks = {task["task_id"]: task for task in plan_tasks(brief, "run")}
+
+        kinds = [task["kind"] for task in tasks.values()]
+        assert kinds.count("hero") == 1
+        assert kinds.count("localize") == 1  # es-MX; en-US is the source locale
+        assert kinds.count("render") == 4
+        assert tasks["run:render:TEST-PROD-001:es-MX:9:16"]["depends_on"] == ["run:hero:TEST-PROD-001", "run:localize:es-MX"]
+        assert tasks["run:render:TEST-PROD-001:en-US:1:1"]["depends_on"] == ["run:hero:TEST-PROD-001"]
+
+
+class TestDistributedCampaign:
+    """Test coordinator and workers end to end."""
+
+    @pytest.mark.asyncio
+    async def test_workers_share_a_campaign(self, mock_env_vars, tmp_path, example_brief, fake_image_service):
+        """Test two workers split the tasks and the coordinator assembles the output."""
+        from src.distributed import Coordinator, Worker
+        from src.work_queue import WorkQueue
+        from src.manifest import AssetManifest
+
+        queue = WorkQueue(tmp_path / "queue.db")
+        brief = dict(example_brief, enable_localization=False)
+        service = fake_image_service(delay=0.05)
+
+        with patch('src.pipeline.ImageGenerationFactory.create', return_value=service):
+            workers = [Worker(queue, worker_id=f"w{i}", concurrency=2, poll_interval=0.01) for i in range(2)]
+            for worker in workers:
+                worker.pipeline.storage.output_dir = tmp_path
+                worker.pipeline.storage._manifest = AssetManifest(tmp_path / "manifest.db")
+            coordinator = Coordinator(queue, storage=workers[0].pipeline.storage)
+
+            from src.models import CampaignBrief
+            run_id = coordinator.submit(CampaignBrief(**brief))
+            await asyncio.gather(*[worker.run(stop_when_idle=True) for worker in workers])
+            output = await coordinator.wait(run_id, timeout=5)
+
+        assert output.total_assets == 4
+        assert output.success_rate == 1.0
+        assert output.errors == []
+        assert len(service.calls) == 1
+        assert output.technical_metrics.total_api_calls == 1
+        assert sum(worker.completed for worker in workers) == 5
+        assert all(Path(asset.file_path).exists() for asset in output.generated_assets)
+        assert list((tmp_path / "campaign_reports").glob("campaign_report_TEST-CAMPAIGN-001_*.jsonl"))
+
+    @pytest.mark.asyncio
+    async def test_failed_hero_skips_renders(self, mock_env_vars, tmp_path, example_brief, fake_image_service):
+        """Test a hero that keeps failing is retried, then its renders are reported as skipped."""
+        from src.distributed import Coordinator, Worker
+        from src.work_queue import WorkQueue
+        from src.models import CampaignBrief
+
+        queue = WorkQueue(tmp_path / "queue.db", retry_backoff_seconds=0.01)
+        with patch('src.pipeline.ImageGenerationFactory.create', return_value=fake_image_service(fail=True)):
+            worker = Worker(queue, worker_id="w1", poll_interval=0.01)
+            worker.pipeline.storage.output_dir = tmp_path
+            coordinator = Coordinator(queue, storage=worker.pipeline.storage)
+            run_id = coordinator.submit(CampaignBrief(**dict(example_brief, enable_localization=False)), max_attempts=2)
+            await worker.run(stop_when_idle=True)
+            output = coordinator.assemble(run_id)
+
+        assert worker.failed == 2
+        assert output.total_assets == 0
+        assert "hero task" in output.errors[0]
+        assert "4 task(s) skipped" in output.errors[-1]
+        assert output.technical_metrics.retry_count == 1
+
+    @pytest.mark.asyncio
+    async def test_worker_queue_calls_run_off_the_event_loop(self, mock_env_vars, tmp_path, example_brief, fake_image_service):
+        """Test claim, complete and fail run in worker threads, not on the event loop thread."""
+        import threading
+        from src.distributed import Coordinator, Worker
+        from src.work_queue import WorkQueue
+        from src.manifest import AssetManifest
+        from src.models import CampaignBrief
+
+        queue = WorkQueue(tmp_path / "queue.db", retry_backoff_seconds=0.01)
+        threads = {}
+        for name in ("claim", "complete", "fail"):
+            def recorded(*args, _call=getattr(queue, name), _name=name, **kwargs):
+                threads.setdefault(_name, set()).add(threading.get_ident())
+                return _call(*args, **kwargs)
+            setattr(queue, name, recorded)
+
+        # A failing campaign, then a succeeding one
+        for campaign_id, service in (("FAILS", fake_image_service(fail=True)), ("SUCCEEDS", fake_image_service())):
+            with patch('src.pipeline.ImageGenerationFactory.create', return_value=service):
+                worker = Worker(queue, worker_id="w1", poll_interval=0.01)
+                worker.pipeline.storage.output_dir = tmp_path
+                worker.pipeline.storage._manifest = AssetManifest(tmp_path / "manifest.db")
+                Coordinator(queue, storage=worker.pipeline.storage).submit(
+                    CampaignBrief(**dict(example_brief, campaign_id=campaign_id, enable_localization=False)), max_attempts=1
+                )
+                await worker.run(stop_when_idle=True)
+
+        assert set(threads) == {"claim", "complete", "fail"}
+        assert all(threading.get_ident() not in idents for idents in threads.values())
+
+    @pytest.mark.asyncio
+    async def test_render_memory_held_through_save(self, mock_env_vars, tmp_path, example_brief, fake_image_service):
+        """Test a render's memory stays reserved while its frame is encoded, and the save runs off the event loop."""
+        import threading
+        from src.admission import MemoryAdmissionController
+        from src.distributed import Coordinator, Worker
+        from src.work_queue import WorkQueue
+        from src.manifest import AssetManifest
+        from src.models import CampaignBrief
+
+        queue = WorkQueue(tmp_path / "queue.db")
+        controller = MemoryAdmissionController(1, rss=lambda: 0)
+        saves = []
+
+        with patch('src.pipeline.ImageGenerationFactory.create', return_value=fake_image_service()):
+            worker = Worker(queue, worker_id="w1", poll_interval=0.01)
+            worker.pipeline.storage.output_dir = tmp_path
+            worker.pipeline.storage._manifest = AssetManifest(tmp_path / "manifest.db")
+            worker.pipeline.memory_admission = controller
+            save_image = worker.pipeline.storage.save_image
+
+            def recorded_save(image, path):
+                saves.append((controller.reserved_bytes, threading.get_ident()))
+                return save_image(image, path)
+
+            worker.pipeline.storage.save_image = recorded_save
+            coordinator = Coordinator(queue, storage=worker.pipeline.storage)
+            run_id = coordinator.submit(CampaignBrief(**dict(example_brief, enable_localization=False)))
+            await worker.run(stop_when_idle=True)
+            output = coordinator.assemble(run_id)
+
+        assert output.total_assets == 4
+        assert len(saves) == 4
+        assert all(reserved > 0 for reserved, _ in saves)
+        assert all(ident != threading.get_ident() for _, ident in saves)
+        assert controller.reserved_bytes == 0
+
+    def test_worker_processes(self, tmp_path, example_brief):
+        """Test separate worker processes drain a submitted campaign with the offline backend."""
+        env = dict(os.environ, OUTPUT_DIR=str(tmp_path), PYTHONPATH=str(REPO_ROOT),
+                   WORK_QUEUE_POLL_INTERVAL="0.05", CLAUDE_API_KEY="test-claude-key")
+        brief_path = tmp_path / "brief.json"
+        brief_path.write_text(json.dumps(dict(example_brief, enable_localization=False)))
+
+        submit = subprocess.run(
+            [sys.executable, "-m", "src.cli", "submit", "--brief", str(brief_path), "--no-wait"],
+            cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=60
+        )
+        assert submit.returncode == 0, submit.stderr
+        run_id = submit.stdout.split("Queued run ")[1].split(":")[0]
+
+        workers = [
+            subprocess.Popen(
+                [sys.executable, "-m", "src.cli", "worker", "--backend", "local", "--exit-when-idle"],
+                cwd=REPO_ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+            )
+            for _ in range(2)
+        ]
+        for process in workers:
+            process.wait(timeout=120)
+            assert process.returncode == 0, process.stdout.read()
+
+        from src.work_queue import WorkQueue
+        counts = WorkQueue(tmp_path / "work_queue.db").counts(run_id)
+        assert counts == {"pending": 0, "leased": 0, "done": 5, "failed": 0}